@@ -0,0 +1,75 @@
+import sys
+from typing import Any
+
+from pydantic import BaseModel
+
+from bam_masterdata.benchmarks.generator import DatamodelSize, generate_datamodel
+from bam_masterdata.benchmarks.suite import time_call
+from bam_masterdata.metadata.frozen import FrozenDatamodel
+
+# Attributes read for each property assignment in the attribute access benchmark
+_ACCESSED_ATTRIBUTES = ('code', 'data_type', 'mandatory', 'property_label', 'section')
+
+
+def object_overhead(definition: Any) -> int:
+    """
+    Returns the bytes used by a definition itself, excluding its field values (which are shared by the
+    pydantic and frozen definitions): the object and, for the pydantic models, their `__dict__` and set
+    of fields.
+
+    Args:
+        definition (Any): A pydantic definition or a frozen record.
+
+    Returns:
+        int: The size in bytes.
+    """
+    size = sys.getsizeof(definition)
+    if isinstance(definition, BaseModel):
+        size += sys.getsizeof(definition.__dict__)
+        size += sys.getsizeof(definition.__pydantic_fields_set__)
+    return size
+
+
+def run_frozen_benchmark(size: DatamodelSize, repeats: int = 5) -> dict:
+    """
+    Compares the pydantic definitions of a synthetic datamodel of the given `size` with their
+    `FrozenDatamodel` view:
+
+        - `bytes_per_object`: mean `object_overhead` of the property assignments.
+        - `attribute_access`: time reading `_ACCESSED_ATTRIBUTES` of all the property assignments.
+        - `freeze`: time freezing the whole datamodel.
+
+    Args:
+        size (DatamodelSize): The size of the synthetic datamodel.
+        repeats (int, optional): The number of repetitions of each timing. Defaults to 5.
+
+    Returns:
+        dict: The memory and timings of the `pydantic` and `frozen` definitions.
+    """
+    registry = generate_datamodel(size)
+    models = [prop for _, prop in registry.iter_property_assignments()]
+    datamodel = FrozenDatamodel.from_registry(registry)
+    records = [
+        prop
+        for code in datamodel.codes('object_types')
+        for prop in datamodel.object_type(code).items
+    ]
+
+    def access(definitions: list) -> None:
+        for definition in definitions:
+            for name in _ACCESSED_ATTRIBUTES:
+                getattr(definition, name)
+
+    return {
+        'size': size.model_dump(),
+        'n_property_assignments': len(models),
+        'bytes_per_object': {
+            'pydantic': sum(map(object_overhead, models)) / max(len(models), 1),
+            'frozen': sum(map(object_overhead, records)) / max(len(records), 1),
+        },
+        'attribute_access': {
+            'pydantic': time_call(lambda: access(models), repeats),
+            'frozen': time_call(lambda: access(records), repeats),
+        },
+        'freeze': time_call(lambda: FrozenDatamodel.from_registry(registry), repeats),
+    }
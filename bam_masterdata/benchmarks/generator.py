@@ -0,0 +1,196 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from bam_masterdata.metadata.definitions import (
+    DataType,
+    ObjectTypeDef,
+    PropertyTypeAssignment,
+    VocabularyTerm,
+    VocabularyTypeDef,
+)
+from bam_masterdata.metadata.entities import ObjectType, VocabularyType
+from bam_masterdata.metadata.registry import EntityRegistry
+
+# Data types cycled through when generating the (non-vocabulary) property type assignments
+SYNTHETIC_DATA_TYPES = [
+    DataType.VARCHAR,
+    DataType.INTEGER,
+    DataType.REAL,
+    DataType.BOOLEAN,
+    DataType.MULTILINE_VARCHAR,
+    DataType.DATE,
+]
+
+
+class DatamodelSize(BaseModel):
+    """
+    Parameters controlling the size of a synthetic datamodel generated by `generate_datamodel`.
+    """
+
+    n_object_types: int = Field(
+        10, ge=0, description='Number of object types to generate.'
+    )
+
+    n_properties: int = Field(
+        5,
+        ge=0,
+        description='Number of property type assignments defined in each object type.',
+    )
+
+    n_vocabularies: int = Field(
+        2, ge=0, description='Number of vocabulary types to generate.'
+    )
+
+    n_terms: int = Field(
+        10, ge=0, description='Number of terms defined in each vocabulary type.'
+    )
+
+    depth: int = Field(
+        1,
+        ge=1,
+        description="""
+        Inheritance depth of the object types. The object types are generated in chains of `depth`
+        classes, each one inheriting from the previous one, e.g., `depth=1` generates classes
+        inheriting directly from `ObjectType`.
+        """,
+    )
+
+
+def code_suffix(index: int, width: int = 4) -> str:
+    """
+    Converts a number into an uppercase letter string, as digits are not allowed in the `code` of
+    the entity definitions, e.g., `code_suffix(27) == 'AABB'`.
+
+    Args:
+        index (int): The number to convert.
+        width (int, optional): The minimum length of the resulting string. Defaults to 4.
+
+    Returns:
+        str: The letter string representing `index`.
+    """
+    letters = []
+    while index > 0:
+        index, remainder = divmod(index, 26)
+        letters.append(chr(ord('A') + remainder))
+    return ''.join(reversed(letters)).rjust(width, 'A')
+
+
+def generate_vocabulary_types(
+    n_vocabularies: int, n_terms: int
+) -> list[type[VocabularyType]]:
+    """
+    Generates `n_vocabularies` `VocabularyType` classes with `n_terms` terms each.
+
+    Args:
+        n_vocabularies (int): Number of vocabulary types.
+        n_terms (int): Number of terms per vocabulary type.
+
+    Returns:
+        list[type[VocabularyType]]: The generated vocabulary type classes.
+    """
+    vocabulary_types = []
+    for i in range(n_vocabularies):
+        vocabulary_code = f'SYNTHETIC_VOCABULARY_{code_suffix(i)}'
+        attrs = {
+            '__module__': __name__,
+            'defs': VocabularyTypeDef(
+                version=1,
+                code=vocabulary_code,
+                description=f'Synthetic vocabulary {i}//Synthetisches Vokabular {i}',
+            ),
+        }
+        for j in range(n_terms):
+            attrs[f'term_{j}'] = VocabularyTerm(
+                version=1,
+                code=f'TERM_{code_suffix(j)}',
+                label=f'Term {j}',
+                description=f'Synthetic term {j}//Synthetischer Begriff {j}',
+            )
+        vocabulary_types.append(
+            type(f'SyntheticVocabulary{i}', (VocabularyType,), attrs)
+        )
+    return vocabulary_types
+
+
+def generate_object_types(
+    n_object_types: int,
+    n_properties: int,
+    depth: int = 1,
+    vocabulary_codes: Optional[list[str]] = None,
+) -> list[type[ObjectType]]:
+    """
+    Generates `n_object_types` `ObjectType` classes with `n_properties` property type assignments each.
+    The classes are generated in inheritance chains of length `depth`, so that the deeper classes
+    also inherit the property type assignments of their parents.
+
+    If `vocabulary_codes` are given, every fourth property type assignment is a `CONTROLLEDVOCABULARY`
+    pointing to one of them.
+
+    Args:
+        n_object_types (int): Number of object types.
+        n_properties (int): Number of property type assignments defined in each object type.
+        depth (int, optional): Inheritance depth of the object types. Defaults to 1.
+        vocabulary_codes (Optional[list[str]], optional): Codes of the vocabularies to assign. Defaults to None.
+
+    Returns:
+        list[type[ObjectType]]: The generated object type classes.
+    """
+    vocabulary_codes = vocabulary_codes or []
+    object_types: list[type[ObjectType]] = []
+    for i in range(n_object_types):
+        level = i % depth
+        parent = object_types[-1] if level > 0 else ObjectType
+        code = f'SYNTHETIC_OBJECT_{code_suffix(i)}'
+        if level > 0:
+            code = f'{parent.defs.code}.{code}'
+        attrs: dict = {
+            '__module__': __name__,
+            'defs': ObjectTypeDef(
+                version=1,
+                code=code,
+                description=f'Synthetic object {i}//Synthetisches Objekt {i}',
+                generated_code_prefix=f'SYN_{code_suffix(i)}',
+            ),
+        }
+        for j in range(n_properties):
+            prop_code = f'SYNTHETIC_PROPERTY_{code_suffix(i)}_{code_suffix(j)}'
+            vocabulary_code = None
+            if vocabulary_codes and j % 4 == 3:
+                data_type = DataType.CONTROLLEDVOCABULARY
+                vocabulary_code = vocabulary_codes[(i + j) % len(vocabulary_codes)]
+            else:
+                data_type = SYNTHETIC_DATA_TYPES[j % len(SYNTHETIC_DATA_TYPES)]
+            attrs[f'property_{i}_{j}'] = PropertyTypeAssignment(
+                version=1,
+                code=prop_code,
+                data_type=data_type,
+                vocabulary_code=vocabulary_code,
+                property_label=f'Property {j}',
+                description=f'Synthetic property {j}//Synthetische Eigenschaft {j}',
+                mandatory=j == 0,
+                show_in_edit_views=True,
+                section='General information' if j % 2 == 0 else 'Details',
+            )
+        object_types.append(type(f'SyntheticObject{i}', (parent,), attrs))
+    return object_types
+
+
+def generate_datamodel(size: DatamodelSize) -> EntityRegistry:
+    """
+    Generates a synthetic datamodel of the given `size`.
+
+    Args:
+        size (DatamodelSize): The parameters controlling the size of the datamodel.
+
+    Returns:
+        EntityRegistry: The registry containing the generated entity classes.
+    """
+    vocabulary_types = generate_vocabulary_types(size.n_vocabularies, size.n_terms)
+    object_types = generate_object_types(
+        n_object_types=size.n_object_types,
+        n_properties=size.n_properties,
+        depth=size.depth,
+        vocabulary_codes=[vocab.defs.code for vocab in vocabulary_types],
+    )
+    return EntityRegistry(object_types=object_types, vocabulary_types=vocabulary_types)
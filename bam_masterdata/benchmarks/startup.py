@@ -0,0 +1,111 @@
+import multiprocessing
+import time
+from typing import Optional
+
+from bam_masterdata.benchmarks.generator import DatamodelSize, generate_datamodel
+from bam_masterdata.metadata.shared import (
+    DEFINITION_MODELS,
+    SharedDatamodel,
+    init_worker,
+    worker_datamodel,
+)
+
+# Strategies to ship the datamodel to the worker processes:
+#   - `pickle`: the dumped datamodel is pickled to each worker, which validates it into pydantic models.
+#   - `shared_memory`: the workers attach to a `SharedDatamodel` and build the definitions lazily.
+STARTUP_STRATEGIES = ('pickle', 'shared_memory')
+
+# Definitions validated by `_init_pickled` in each worker process
+_pickled_definitions: dict = {}
+
+
+def _init_pickled(datamodel: dict) -> None:
+    global _pickled_definitions
+    _pickled_definitions = {}
+    for kind, definitions in datamodel.items():
+        defs_model, item_model, items_key = DEFINITION_MODELS[kind]
+        for code, data in definitions.items():
+            _pickled_definitions[(kind, code)] = (
+                defs_model.model_validate(data['defs']),
+                [item_model.model_validate(item) for item in data.get(items_key, [])],
+            )
+
+
+def _task_pickled(_) -> int:
+    return sum(len(items) for _, items in _pickled_definitions.values())
+
+
+def _task_shared_memory(_) -> int:
+    datamodel = worker_datamodel()
+    return sum(
+        len(datamodel.object_type(code)[1]) for code in datamodel.codes('object_types')
+    )
+
+
+def time_worker_startup(
+    datamodel: dict,
+    strategy: str,
+    n_workers: int,
+    shared_name: Optional[str] = None,
+    start_method: str = 'spawn',
+) -> float:
+    """
+    Times starting a pool of `n_workers` processes, shipping the datamodel to them with `strategy`, and
+    running one task per worker which accesses all the property assignments of the object types.
+
+    Args:
+        datamodel (dict): The datamodel, in the format of `EntityRegistry.to_dict()`.
+        strategy (str): One of the `STARTUP_STRATEGIES`.
+        n_workers (int): The number of worker processes.
+        shared_name (Optional[str], optional): The name of the `SharedDatamodel` block, required for the
+            `shared_memory` strategy. Defaults to None.
+        start_method (str, optional): The start method of the processes. With `'fork'`, the pickled
+            strategy does not pay for pickling. Defaults to 'spawn'.
+
+    Returns:
+        float: The elapsed time in seconds.
+    """
+    if strategy == 'pickle':
+        initializer, initargs, task = _init_pickled, (datamodel,), _task_pickled
+    elif strategy == 'shared_memory':
+        initializer, initargs, task = init_worker, (shared_name,), _task_shared_memory
+    else:
+        raise ValueError(
+            f'`strategy` must be one of {STARTUP_STRATEGIES}, got {strategy}.'
+        )
+    start = time.perf_counter()
+    context = multiprocessing.get_context(start_method)
+    with context.Pool(n_workers, initializer=initializer, initargs=initargs) as pool:
+        pool.map(task, range(n_workers), chunksize=1)
+    return time.perf_counter() - start
+
+
+def run_startup_benchmark(
+    size: DatamodelSize, worker_counts: list[int], repeats: int = 3
+) -> dict:
+    """
+    Benchmarks the startup time of worker pools versus the number of workers for each of the
+    `STARTUP_STRATEGIES` over a synthetic datamodel of the given `size`.
+
+    Args:
+        size (DatamodelSize): The size of the synthetic datamodel.
+        worker_counts (list[int]): The numbers of workers to benchmark, e.g., `[1, 2, 4, 8]`.
+        repeats (int, optional): The number of repetitions of each measurement. Defaults to 3.
+
+    Returns:
+        dict: The median startup time in seconds keyed by strategy and number of workers, and the size in
+            bytes of the shared datamodel.
+    """
+    registry = generate_datamodel(size)
+    datamodel = registry.to_dict()
+    results: dict = {strategy: {} for strategy in STARTUP_STRATEGIES}
+    with SharedDatamodel.create(registry) as shared:
+        for n_workers in worker_counts:
+            for strategy in STARTUP_STRATEGIES:
+                timings = sorted(
+                    time_worker_startup(datamodel, strategy, n_workers, shared.name)
+                    for _ in range(repeats)
+                )
+                results[strategy][n_workers] = timings[len(timings) // 2]
+        shared_size = shared.size
+    return {'size': size.model_dump(), 'shared_bytes': shared_size, 'results': results}
@@ -0,0 +1,193 @@
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from bam_masterdata.benchmarks.generator import DatamodelSize, generate_datamodel
+from bam_masterdata.logger import logger
+from bam_masterdata.metadata.definitions import (
+    ObjectTypeDef,
+    PropertyTypeAssignment,
+    VocabularyTerm,
+    VocabularyTypeDef,
+)
+from bam_masterdata.metadata.registry import EntityRegistry
+
+
+def time_call(func: Callable, repeats: int = 5) -> dict:
+    """
+    Times `func` by calling it `repeats` times and returns the statistics of the timings in seconds.
+
+    Args:
+        func (Callable): The function to time. It is called without arguments.
+        repeats (int, optional): The number of times `func` is called. Defaults to 5.
+
+    Returns:
+        dict: The `min`, `max`, `mean` and `median` timings and the number of `repeats`.
+    """
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {
+        'min': min(timings),
+        'max': max(timings),
+        'mean': statistics.mean(timings),
+        'median': statistics.median(timings),
+        'repeats': repeats,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    """Returns the current git commit hash, or None if it cannot be resolved."""
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def _validate_definitions(registry: EntityRegistry) -> None:
+    """Re-validates the dumped definitions of all entities in `registry` using pydantic."""
+    for object_type in registry.object_types:
+        ObjectTypeDef.model_validate(object_type.defs.model_dump())
+        for prop in registry.instance(object_type).properties:
+            PropertyTypeAssignment.model_validate(prop.model_dump())
+    for vocabulary_type in registry.vocabulary_types:
+        VocabularyTypeDef.model_validate(vocabulary_type.defs.model_dump())
+        for term in registry.instance(vocabulary_type).terms:
+            VocabularyTerm.model_validate(term.model_dump())
+
+
+def run_benchmarks(size: DatamodelSize, repeats: int = 5) -> dict:
+    """
+    Runs the benchmark suite over a synthetic datamodel of the given `size`. The suite times:
+
+        - `class_definition`: generation of the `ObjectType` and `VocabularyType` classes.
+        - `instantiation`: instantiation of all the entity classes.
+        - `to_json` and `to_dict`: serialization of all the entities.
+        - `validation`: pydantic validation of all the dumped definitions.
+        - `export`: export of the whole datamodel to a JSON file.
+
+    Args:
+        size (DatamodelSize): The size of the synthetic datamodel.
+        repeats (int, optional): The number of repetitions of each benchmark. Defaults to 5.
+
+    Returns:
+        dict: The benchmark results and the metadata of the run (commit, timestamp, python version
+            and datamodel size).
+    """
+    registry = generate_datamodel(size)
+    entities = registry.object_types + registry.vocabulary_types
+
+    def instantiate():
+        for entity_cls in entities:
+            entity_cls()
+
+    # Fill the instance cache of the registry before timing the serialization
+    instances = [registry.instance(entity_cls) for entity_cls in entities]
+
+    def to_json():
+        for instance in instances:
+            instance.to_json()
+
+    def to_dict():
+        for instance in instances:
+            instance.to_dict()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        export_path = os.path.join(tmpdir, 'datamodel.json')
+
+        def export():
+            with open(export_path, 'w', encoding='utf-8') as f:
+                f.write(registry.to_json())
+
+        results = {
+            'class_definition': time_call(lambda: generate_datamodel(size), repeats),
+            'instantiation': time_call(instantiate, repeats),
+            'to_json': time_call(to_json, repeats),
+            'to_dict': time_call(to_dict, repeats),
+            'validation': time_call(lambda: _validate_definitions(registry), repeats),
+            'export': time_call(export, repeats),
+        }
+
+    return {
+        'commit': _git_commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'size': size.model_dump(),
+        'results': results,
+    }
+
+
+def save_results(results: dict, path: str) -> None:
+    """
+    Saves the benchmark `results` as a JSON file in `path`.
+
+    Args:
+        results (dict): The results returned by `run_benchmarks`.
+        path (str): The path of the JSON file.
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+
+
+def load_results(path: str) -> dict:
+    """
+    Loads benchmark results from the JSON file in `path`.
+
+    Args:
+        path (str): The path of the JSON file.
+
+    Returns:
+        dict: The benchmark results.
+    """
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare_results(baseline: dict, current: dict, tolerance: float = 0.1) -> dict:
+    """
+    Compares the `median` timings of two benchmark runs and returns the benchmarks that regressed,
+    i.e., whose timings in `current` are slower than in `baseline` by more than `tolerance`.
+
+    Args:
+        baseline (dict): The results of the reference run, e.g., from the main branch.
+        current (dict): The results of the run to check.
+        tolerance (float, optional): The allowed relative slow-down. Defaults to 0.1 (10%).
+
+    Returns:
+        dict: The regressed benchmarks with their `baseline` and `current` medians and their `ratio`.
+    """
+    if baseline.get('size') != current.get('size'):
+        logger.warning(
+            'Comparing benchmark results obtained with different datamodel sizes.',
+            baseline_size=baseline.get('size'),
+            current_size=current.get('size'),
+        )
+
+    regressions = {}
+    for name, current_timing in current.get('results', {}).items():
+        baseline_timing = baseline.get('results', {}).get(name)
+        if not baseline_timing or not baseline_timing['median']:
+            continue
+        ratio = current_timing['median'] / baseline_timing['median']
+        if ratio > 1 + tolerance:
+            regressions[name] = {
+                'baseline': baseline_timing['median'],
+                'current': current_timing['median'],
+                'ratio': ratio,
+            }
+    return regressions
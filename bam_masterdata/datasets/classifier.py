@@ -0,0 +1,203 @@
+import os
+import queue
+import re
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Union
+
+from bam_masterdata.metadata.definitions import DataSetTypeDef
+from bam_masterdata.metadata.entities import DataSetType
+from bam_masterdata.metadata.registry import EntityRegistry
+
+# Sentinel put in the results queue by each worker thread when its subtree is exhausted
+_DONE = object()
+
+
+def _to_defs(dataset_type: Union[DataSetTypeDef, type[DataSetType]]) -> DataSetTypeDef:
+    """Returns the `DataSetTypeDef` of a data set type class, or the definition itself."""
+    return getattr(dataset_type, 'defs', dataset_type)
+
+
+class DataSetClassifier:
+    """
+    Classifier of files into data set types using the `main_dataset_pattern` and `main_dataset_path`
+    of their `DataSetTypeDef`. The patterns of all the data set types are compiled into a single
+    regular expression, so that each file path is matched only once independently of the number of
+    data set types. If several data set types match the same path, the first one registered wins.
+
+    The files are matched using their path relative to the walked root directory (with `/` as
+    separator). A data set type matches a path if its `main_dataset_pattern` matches the file name
+    (or the end of the path) and, if defined, the path starts with its `main_dataset_path`. Data set
+    types without a pattern nor a path are ignored. E.g.:
+
+    ```python
+    classifier = DataSetClassifier([RawData, ProcessedData])
+    for path, code in classifier.walk('/data/instrument', workers=8):
+        ...
+    ```
+    """
+
+    def __init__(
+        self,
+        dataset_types: list[Union[DataSetTypeDef, type[DataSetType]]],
+        queue_size: int = 10000,
+    ):
+        self.codes: dict[str, str] = {}
+        self.queue_size = queue_size
+        alternatives = []
+        for dataset_type in dataset_types:
+            defs = _to_defs(dataset_type)
+            if not defs.main_dataset_pattern and not defs.main_dataset_path:
+                continue
+            group = f'_t{len(self.codes)}'
+            self.codes[group] = defs.code
+            alternatives.append(f'(?P<{group}>{self._type_regex(defs)})')
+        self.regex: Optional[re.Pattern] = (
+            re.compile('|'.join(alternatives)) if alternatives else None
+        )
+
+    @classmethod
+    def from_registry(
+        cls, registry: EntityRegistry, queue_size: int = 10000
+    ) -> 'DataSetClassifier':
+        """
+        Creates a classifier for all the data set types of an `EntityRegistry`.
+
+        Args:
+            registry (EntityRegistry): The registry containing the data set types.
+            queue_size (int, optional): The maximum number of results buffered from the worker threads.
+                Defaults to 10000.
+
+        Returns:
+            DataSetClassifier: The classifier.
+        """
+        return cls(registry.dataset_types, queue_size=queue_size)
+
+    @staticmethod
+    def _type_regex(defs: DataSetTypeDef) -> str:
+        """Returns the regular expression matching the relative file paths of a data set type."""
+        # Named groups are turned into non-capturing groups to avoid clashes between data set types
+        pattern = re.sub(r'\(\?P<[^>]+>', '(?:', defs.main_dataset_pattern or '[^/]+')
+        prefix = ''
+        if defs.main_dataset_path:
+            prefix = f'{re.escape(defs.main_dataset_path.strip("/"))}/'
+        return f'{prefix}(?:.*/)?(?:{pattern})'
+
+    def classify(self, relative_path: str) -> Optional[str]:
+        """
+        Returns the code of the data set type matching a relative file path.
+
+        Args:
+            relative_path (str): The file path relative to the root of the data, using `/` as separator.
+
+        Returns:
+            Optional[str]: The code of the matching data set type, or None if no data set type matches.
+        """
+        if self.regex is None:
+            return None
+        match = self.regex.fullmatch(relative_path)
+        if match is None:
+            return None
+        return self.codes[match.lastgroup]
+
+    def _walk_tree(
+        self, directory: str, root_length: int, include_unmatched: bool
+    ) -> Iterator[tuple[str, Optional[str]]]:
+        """Walks `directory` depth-first with `os.scandir` and yields the classified files."""
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                            continue
+                        relative_path = entry.path[root_length:]
+                        if os.sep != '/':
+                            relative_path = relative_path.replace(os.sep, '/')
+                        code = self.classify(relative_path)
+                        if code is not None or include_unmatched:
+                            yield entry.path, code
+            except (PermissionError, FileNotFoundError):
+                continue
+
+    def walk(
+        self, root: str, workers: int = 0, include_unmatched: bool = False
+    ) -> Iterator[tuple[str, Optional[str]]]:
+        """
+        Walks the directory tree in `root` and yields the `(path, dataset_type_code)` of each file
+        matching a data set type. The results are streamed, i.e., the full list of files is never
+        built in memory.
+
+        If `workers > 0`, each subdirectory of `root` is walked in a separate thread of a pool of
+        `workers` threads, and the results are streamed through a bounded queue. The order of the
+        results is not deterministic in that case.
+
+        Args:
+            root (str): The root directory to walk.
+            workers (int, optional): The number of worker threads. Defaults to 0 (no threads).
+            include_unmatched (bool, optional): If True, the files not matching any data set type are
+                yielded with a None code. Defaults to False.
+
+        Yields:
+            tuple[str, Optional[str]]: The path of each file and the code of its data set type.
+        """
+        root = os.path.abspath(root)
+        root_length = len(root) + len(os.sep)
+        if workers <= 0:
+            yield from self._walk_tree(root, root_length, include_unmatched)
+            return
+
+        results: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+
+        def put(item) -> bool:
+            # Avoids blocking forever on a full queue if the consumer stopped iterating
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce(directory: str) -> None:
+            try:
+                for item in self._walk_tree(directory, root_length, include_unmatched):
+                    if not put(item):
+                        return
+            except Exception as exc:
+                put(exc)
+            finally:
+                put(_DONE)
+
+        subdirectories = []
+        top_files = []
+        with os.scandir(root) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append(entry.path)
+                else:
+                    top_files.append(entry)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for directory in subdirectories:
+                pool.submit(produce, directory)
+            try:
+                for entry in top_files:
+                    code = self.classify(entry.name)
+                    if code is not None or include_unmatched:
+                        yield entry.path, code
+                pending = len(subdirectories)
+                while pending:
+                    item = results.get()
+                    if item is _DONE:
+                        pending -= 1
+                    elif isinstance(item, Exception):
+                        raise item
+                    else:
+                        yield item
+            finally:
+                stop.set()
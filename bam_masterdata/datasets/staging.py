@@ -0,0 +1,341 @@
+import hashlib
+import mmap
+import os
+import shutil
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Union
+
+from pydantic import BaseModel, Field
+
+from bam_masterdata.datasets.classifier import DataSetClassifier
+from bam_masterdata.logger import logger
+from bam_masterdata.metadata.definitions import DataSetTypeDef
+from bam_masterdata.metadata.entities import DataSetType
+from bam_masterdata.metrics import metrics
+
+# Default size of the chunks in which the files are hashed and uploaded (8 MiB)
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+class FileManifest(BaseModel):
+    """
+    Staging state of a single file: its chunk checksums and the number of chunks confirmed by the
+    data store.
+    """
+
+    path: str = Field(..., description='Absolute path of the staged file.')
+
+    size: int = Field(..., description='Size of the file in bytes.')
+
+    mtime_ns: int = Field(
+        ...,
+        description="""
+        Modification time of the file in nanoseconds. If the file changes, its staging state is discarded.
+        """,
+    )
+
+    chunk_size: int = Field(..., description='Size of the chunks in bytes.')
+
+    checksum: str = Field(..., description='SHA-256 checksum of the whole file.')
+
+    chunk_checksums: list[str] = Field(
+        default=[], description='SHA-256 checksums of each chunk of the file.'
+    )
+
+    dataset_type: str = Field(..., description='Code of the data set type of the file.')
+
+    confirmed_chunks: int = Field(
+        0, description='Number of chunks confirmed as uploaded by the data store.'
+    )
+
+    dataset_id: Optional[str] = Field(
+        default=None,
+        description='Identifier of the registered data set once the upload is finalized.',
+    )
+
+    @property
+    def upload_id(self) -> str:
+        """Deterministic identifier of the upload, so that it can be resumed in the data store."""
+        return f'{self.dataset_type}-{self.checksum[:32]}'
+
+
+class StagingManifest(BaseModel):
+    """
+    Local manifest storing the `FileManifest` of each staged file, keyed by its path.
+    """
+
+    files: dict[str, FileManifest] = Field(default={})
+
+    @classmethod
+    def load(cls, path: str) -> 'StagingManifest':
+        """
+        Loads the manifest from the JSON file in `path`, or returns an empty manifest if it does not exist.
+        """
+        if not os.path.exists(path):
+            return cls()
+        with open(path, encoding='utf-8') as f:
+            return cls.model_validate_json(f.read())
+
+    def save(self, path: str) -> None:
+        """
+        Saves the manifest as a JSON file in `path`. The file is replaced atomically, so that an
+        interruption never leaves a corrupted manifest.
+        """
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.model_dump_json())
+        os.replace(tmp_path, path)
+
+
+def hash_file(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> tuple[str, list[str]]:
+    """
+    Computes the SHA-256 checksum of a file and of each of its chunks of `chunk_size` bytes. The file
+    is memory-mapped, so that the chunks are hashed without copying them into Python buffers.
+
+    Args:
+        path (str): The path of the file.
+        chunk_size (int, optional): The size of the chunks in bytes. Defaults to `DEFAULT_CHUNK_SIZE`.
+
+    Returns:
+        tuple[str, list[str]]: The checksum of the whole file and the list of checksums of its chunks.
+    """
+    file_hash = hashlib.sha256()
+    chunk_checksums = []
+    with metrics.timer('staging.hash'), open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return file_hash.hexdigest(), []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                for start in range(0, size, chunk_size):
+                    chunk = view[start : start + chunk_size]
+                    file_hash.update(chunk)
+                    chunk_checksums.append(hashlib.sha256(chunk).hexdigest())
+                    chunk.release()
+            finally:
+                view.release()
+    return file_hash.hexdigest(), chunk_checksums
+
+
+class DataStore(ABC):
+    """
+    Interface of the data store receiving the chunked uploads of the `StagingPipeline`. The uploads
+    are identified by the `upload_id` of the `FileManifest`, and the data store must be able to report
+    how many chunks of an upload it has already confirmed.
+    """
+
+    @abstractmethod
+    def confirmed_chunks(self, upload_id: str) -> int:
+        """Returns the number of consecutive chunks of `upload_id` stored in the data store."""
+
+    @abstractmethod
+    def upload_chunk(
+        self, upload_id: str, index: int, data: bytes, checksum: str
+    ) -> None:
+        """Stores the chunk `index` of `upload_id`, checking its `checksum`."""
+
+    @abstractmethod
+    def finalize(self, upload_id: str, manifest: FileManifest) -> str:
+        """Registers the data set once all the chunks are uploaded and returns its identifier."""
+
+
+class LocalDataStore(DataStore):
+    """
+    Data store backed by a local directory, used as a stand-in of the data store for testing. The
+    chunks are appended to `<root>/uploads/<upload_id>.part` and the finalized files are moved to
+    `<root>/<dataset_type>/<upload_id>/<file name>`.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.uploads_dir = os.path.join(root, 'uploads')
+        os.makedirs(self.uploads_dir, exist_ok=True)
+        # Number of chunks received per upload (including re-sent ones), useful to test resumption
+        self.received_chunks: dict[str, int] = {}
+
+    def _part_path(self, upload_id: str) -> str:
+        return os.path.join(self.uploads_dir, f'{upload_id}.part')
+
+    def _count_path(self, upload_id: str) -> str:
+        return os.path.join(self.uploads_dir, f'{upload_id}.count')
+
+    def confirmed_chunks(self, upload_id: str) -> int:
+        count_path = self._count_path(upload_id)
+        if not os.path.exists(count_path):
+            return 0
+        with open(count_path, encoding='utf-8') as f:
+            return int(f.read() or 0)
+
+    def upload_chunk(
+        self, upload_id: str, index: int, data: bytes, checksum: str
+    ) -> None:
+        if hashlib.sha256(data).hexdigest() != checksum:
+            raise ValueError(f'Checksum mismatch in chunk {index} of {upload_id}.')
+        confirmed = self.confirmed_chunks(upload_id)
+        if index != confirmed:
+            raise ValueError(
+                f'Chunk {index} of {upload_id} is out of order, expected chunk {confirmed}.'
+            )
+        self.received_chunks[upload_id] = self.received_chunks.get(upload_id, 0) + 1
+        with open(self._part_path(upload_id), 'ab') as f:
+            f.write(data)
+        with open(self._count_path(upload_id), 'w', encoding='utf-8') as f:
+            f.write(str(index + 1))
+
+    def finalize(self, upload_id: str, manifest: FileManifest) -> str:
+        part_path = self._part_path(upload_id)
+        if not os.path.exists(part_path):
+            # Empty files have no chunks
+            open(part_path, 'wb').close()
+        target_dir = os.path.join(self.root, manifest.dataset_type, upload_id)
+        os.makedirs(target_dir, exist_ok=True)
+        target = os.path.join(target_dir, os.path.basename(manifest.path))
+        shutil.move(part_path, target)
+        count_path = self._count_path(upload_id)
+        if os.path.exists(count_path):
+            os.remove(count_path)
+        return upload_id
+
+
+class StagingPipeline:
+    """
+    Pipeline uploading files of a data set type to a `DataStore` in chunks. The files are hashed in
+    chunks of `chunk_size` bytes using memory-mapped reads, and the hashing of the next file overlaps
+    with the upload of the current one. The staging state is stored in a local manifest at most every
+    `save_interval` seconds while uploading, when an upload fails and when a file is finalized. The
+    interrupted uploads resume from the last chunk confirmed by the data store instead of starting
+    over, so the manifest may lag behind it. E.g.:
+
+    ```python
+    pipeline = StagingPipeline(RawData, store, manifest_path='staging.json')
+    for file_manifest in pipeline.stage(['/data/run_1.raw', '/data/run_2.raw']):
+        print(file_manifest.dataset_id)
+    ```
+    """
+
+    def __init__(
+        self,
+        dataset_type: Union[DataSetTypeDef, type[DataSetType]],
+        store: DataStore,
+        manifest_path: str,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        *,
+        save_interval: float = 5.0,
+    ):
+        self.defs: DataSetTypeDef = getattr(dataset_type, 'defs', dataset_type)
+        self.store = store
+        self.manifest_path = manifest_path
+        self.chunk_size = chunk_size
+        self.save_interval = save_interval
+        self.manifest = StagingManifest.load(manifest_path)
+        # Only the file names are checked against the `main_dataset_pattern`
+        self._classifier = DataSetClassifier(
+            [self.defs.model_copy(update={'main_dataset_path': None})]
+        )
+
+    def _prepare(self, path: str) -> FileManifest:
+        """Returns the `FileManifest` of `path`, reusing the stored one if the file did not change."""
+        stat = os.stat(path)
+        stored = self.manifest.files.get(path)
+        if (
+            stored is not None
+            and stored.size == stat.st_size
+            and stored.mtime_ns == stat.st_mtime_ns
+            and stored.chunk_size == self.chunk_size
+            and stored.dataset_type == self.defs.code
+        ):
+            return stored
+        checksum, chunk_checksums = hash_file(path, self.chunk_size)
+        return FileManifest(
+            path=path,
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            chunk_size=self.chunk_size,
+            checksum=checksum,
+            chunk_checksums=chunk_checksums,
+            dataset_type=self.defs.code,
+        )
+
+    def _upload(self, file_manifest: FileManifest) -> FileManifest:
+        """Uploads the chunks of a file not yet confirmed by the data store and finalizes it."""
+        upload_id = file_manifest.upload_id
+        self.manifest.files[file_manifest.path] = file_manifest
+        if file_manifest.dataset_id is not None:
+            return file_manifest
+
+        # The data store is the reference, as the manifest may lag behind after an interruption
+        start = self.store.confirmed_chunks(upload_id)
+        if start < file_manifest.confirmed_chunks:
+            logger.warning(
+                'The data store confirmed less chunks than the manifest, resuming from the data store.',
+                path=file_manifest.path,
+                manifest_chunks=file_manifest.confirmed_chunks,
+                store_chunks=start,
+            )
+        file_manifest.confirmed_chunks = start
+
+        n_chunks = len(file_manifest.chunk_checksums)
+        if start < n_chunks:
+            last_save = time.monotonic()
+            with open(file_manifest.path, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    try:
+                        for index in range(start, n_chunks):
+                            offset = index * self.chunk_size
+                            with metrics.timer('staging.upload_chunk'):
+                                self.store.upload_chunk(
+                                    upload_id,
+                                    index,
+                                    mm[offset : offset + self.chunk_size],
+                                    file_manifest.chunk_checksums[index],
+                                )
+                            file_manifest.confirmed_chunks = index + 1
+                            if time.monotonic() - last_save >= self.save_interval:
+                                self.manifest.save(self.manifest_path)
+                                last_save = time.monotonic()
+                    except Exception:
+                        self.manifest.save(self.manifest_path)
+                        raise
+
+        file_manifest.dataset_id = self.store.finalize(upload_id, file_manifest)
+        self.manifest.save(self.manifest_path)
+        return file_manifest
+
+    def stage(self, paths: list[str]) -> list[FileManifest]:
+        """
+        Hashes and uploads the files in `paths`. The files must match the `main_dataset_pattern` of the
+        data set type, if it is defined. Files already finalized in the manifest are skipped.
+
+        Args:
+            paths (list[str]): The paths of the files to upload.
+
+        Returns:
+            list[FileManifest]: The staging state of each file, with the `dataset_id` of the registered
+                data set.
+        """
+        paths = [os.path.abspath(path) for path in paths]
+        if self.defs.main_dataset_pattern:
+            for path in paths:
+                if self._classifier.classify(os.path.basename(path)) is None:
+                    raise ValueError(
+                        f'The file {path} does not match the `main_dataset_pattern` of {self.defs.code}.'
+                    )
+
+        results = []
+        with ThreadPoolExecutor(max_workers=1) as hasher:
+            next_manifest: Optional[Future] = (
+                hasher.submit(self._prepare, paths[0]) if paths else None
+            )
+            for i in range(len(paths)):
+                file_manifest = next_manifest.result()
+                # Hash the next file while the current one is uploaded
+                next_manifest = (
+                    hasher.submit(self._prepare, paths[i + 1])
+                    if i + 1 < len(paths)
+                    else None
+                )
+                results.append(self._upload(file_manifest))
+        return results
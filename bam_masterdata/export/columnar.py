@@ -0,0 +1,677 @@
+import datetime
+import os
+import re
+import shutil
+import struct
+from collections.abc import Sequence
+from typing import Any, Optional, Union
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from bam_masterdata.ingestion.dates import NUMPY_UNITS
+from bam_masterdata.logger import logger
+from bam_masterdata.metadata.definitions import DataType, PropertyTypeAssignment
+from bam_masterdata.metadata.entities import ObjectType
+from bam_masterdata.metrics import metrics
+
+MANIFEST_NAME = 'manifest.json'
+
+FORMAT_VERSION = 1
+
+# Size of the `.npy` header reserved by `_NpyAppender`, so that it can be rewritten with the final
+# length (a multiple of 64 bytes, as written by NumPy)
+_NPY_HEADER_SIZE = 128
+
+# Encodings of the columns:
+#   - `plain`: a single `values` array (float64 with NaN, datetime64 with NaT, int64 or bool).
+#   - `dictionary`: int32 `codes` into the `dictionary` of the manifest, -1 for missing values.
+#   - `string`: the UTF-8 bytes of all the values in `data` and the int64 `offsets` of each value.
+# The `plain` INTEGER and BOOLEAN columns and the `string` columns have a `valid` mask if values are missing.
+# None, NaN and blank strings are missing values in all the encodings, also for the mandatory properties.
+ENCODINGS = ('plain', 'dictionary', 'string')
+
+_PLAIN_DTYPES = {
+    DataType.INTEGER: np.dtype(np.int64),
+    DataType.REAL: np.dtype(np.float64),
+    DataType.BOOLEAN: np.dtype(np.bool_),
+    DataType.DATE: np.dtype('datetime64[D]'),
+    DataType.TIMESTAMP: np.dtype('datetime64[s]'),
+}
+
+
+class ColumnSpec(BaseModel):
+    """Column of a property in a columnar export."""
+
+    code: str = Field(..., description='Code of the property, e.g., `$NAME`.')
+
+    data_type: DataType = Field(..., description='Data type of the property.')
+
+    version: int = Field(..., description='Version of the property assignment.')
+
+    encoding: str = Field(..., description='Encoding of the column (see `ENCODINGS`).')
+
+    files: dict[str, str] = Field(
+        default={},
+        description='Names of the `.npy` files of the column keyed by role (`values`, `codes`, `data`, `offsets`, `valid`).',
+    )
+
+    vocabulary_code: Optional[str] = Field(
+        None, description='Code of the vocabulary of a CONTROLLEDVOCABULARY property.'
+    )
+
+    dictionary: list[str] = Field(
+        default=[],
+        description='Terms of a dictionary-encoded column, indexed by the codes.',
+    )
+
+
+class ColumnarManifest(BaseModel):
+    """Manifest of a columnar export, stored as `manifest.json` next to the columns."""
+
+    format_version: int = Field(
+        FORMAT_VERSION, description='Version of the export format.'
+    )
+
+    object_type: str = Field(
+        ..., description='Code of the `ObjectType` of the instances.'
+    )
+
+    object_type_version: int = Field(
+        ...,
+        description='Version of the `ObjectTypeDef` the instances were validated against.',
+    )
+
+    n_rows: int = Field(0, description='Number of exported instances.')
+
+    columns: list[ColumnSpec] = Field(default=[], description='Columns of the export.')
+
+
+class _NpyAppender:
+    """
+    Writes a one-dimensional `.npy` file in batches, without knowing its final length: a header is
+    reserved and rewritten with the final shape when the file is closed.
+    """
+
+    def __init__(self, path: str, dtype: np.dtype):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.length = 0
+        self.file = open(path, 'wb')  # noqa: SIM115
+        self.file.write(self._header())
+
+    def _header(self) -> bytes:
+        header = repr(
+            {
+                'descr': np.lib.format.dtype_to_descr(self.dtype),
+                'fortran_order': False,
+                'shape': (self.length,),
+            }
+        )
+        preamble_size = len(np.lib.format.MAGIC_PREFIX) + 4
+        padding = _NPY_HEADER_SIZE - preamble_size - len(header) - 1
+        return (
+            np.lib.format.MAGIC_PREFIX
+            + bytes([1, 0])
+            + struct.pack('<H', _NPY_HEADER_SIZE - preamble_size)
+            + (header + ' ' * padding + '\n').encode('latin1')
+        )
+
+    def append(self, values: np.ndarray) -> None:
+        values = np.ascontiguousarray(values, dtype=self.dtype)
+        self.file.write(values.tobytes())
+        self.length += len(values)
+
+    def close(self) -> None:
+        self.file.seek(0)
+        self.file.write(self._header())
+        self.file.close()
+
+
+def _encoding(prop: PropertyTypeAssignment) -> str:
+    if prop.data_type in _PLAIN_DTYPES:
+        return 'plain'
+    if prop.data_type == DataType.CONTROLLEDVOCABULARY:
+        return 'dictionary'
+    return 'string'
+
+
+# UTC designator or offset at the end of a timestamp string, e.g., `'2024-01-02T10:00+01:00'`
+_UTC_OFFSET = re.compile(r'\d:\d\d(:\d\d(\.\d+)?)?\s*(Z|[+-]\d\d:?\d\d)$')
+
+
+def _is_timezone_aware(value: Any) -> bool:
+    """Returns whether a date or timestamp value carries a timezone, which datetime64 cannot store."""
+    if isinstance(value, datetime.datetime):
+        return value.tzinfo is not None
+    return isinstance(value, str) and _UTC_OFFSET.search(value.strip()) is not None
+
+
+def _is_missing(value: Any) -> bool:
+    """Returns whether a value is missing: None, NaN and blank strings, for all the encodings."""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return True
+    return isinstance(value, str) and not value.strip()
+
+
+class _ColumnWriter:
+    """Validates, encodes and appends the batches of one property column."""
+
+    def __init__(
+        self,
+        directory: str,
+        index: int,
+        prop: PropertyTypeAssignment,
+        terms: Optional[Sequence[str]],
+    ):
+        self.prop = prop
+        self.spec = ColumnSpec(
+            code=prop.code,
+            data_type=prop.data_type,
+            version=prop.version,
+            encoding=_encoding(prop),
+            vocabulary_code=prop.vocabulary_code,
+        )
+        self.fixed_dictionary = terms is not None
+        self.dictionary: dict[str, int] = {
+            term: i for i, term in enumerate(sorted(terms or []))
+        }
+        self._new_terms: dict[str, int] = {}
+        self.has_missing = False
+        self.n_bytes = 0
+        self.directory = directory
+        self.index = index
+        self.appenders: dict[str, _NpyAppender] = {}
+
+    def _open(self) -> None:
+        """Creates the files of the column, once its first batch is accepted."""
+        roles = {
+            'plain': [('values', _PLAIN_DTYPES.get(self.prop.data_type))],
+            'dictionary': [('codes', np.dtype(np.int32))],
+            'string': [('data', np.dtype(np.uint8)), ('offsets', np.dtype(np.int64))],
+        }[self.spec.encoding]
+        if self.spec.encoding != 'dictionary':
+            roles.append(('valid', np.dtype(np.bool_)))
+        for role, dtype in roles:
+            name = f'col_{self.index:04d}.{role}.npy'
+            self.spec.files[role] = name
+            self.appenders[role] = _NpyAppender(
+                os.path.join(self.directory, name), dtype
+            )
+        if self.spec.encoding == 'string':
+            self.appenders['offsets'].append(np.zeros(1, dtype=np.int64))
+
+    def encode(
+        self, values: Union[Sequence[Any], np.ndarray]
+    ) -> tuple[dict, list[str]]:
+        """
+        Encodes a batch of values into the arrays of each role, returning the errors instead if some
+        values are not valid for the property.
+        """
+        data_type = self.prop.data_type
+        errors: list[str] = []
+        if self.spec.encoding == 'plain':
+            dtype = _PLAIN_DTYPES[data_type]
+            if isinstance(values, np.ndarray) and values.dtype == dtype:
+                if data_type == DataType.REAL:
+                    valid = ~np.isnan(values)
+                elif data_type in NUMPY_UNITS:
+                    valid = ~np.isnat(values)
+                else:
+                    valid = np.ones(len(values), dtype=bool)
+                return {'values': values, 'valid': valid}, []
+            if data_type in NUMPY_UNITS:
+                # The timezone-aware values, the dates with a time of day and the timestamps with
+                # fractions of a second are rejected, as casting them to the datetime64 unit of the
+                # column would silently drop the offset, the time or the fraction
+                if isinstance(values, np.ndarray) and values.dtype.kind == 'M':
+                    exact = values
+                else:
+                    values = [None if _is_missing(value) else value for value in values]
+                    errors = [
+                        f'{self.prop.code}[{i}]: timezone-aware {data_type.value} `{value}`, convert it to naive UTC'
+                        for i, value in enumerate(values)
+                        if _is_timezone_aware(value)
+                    ]
+                    if errors:
+                        return {}, errors
+                    try:
+                        # The generic unit keeps the precision of each value
+                        exact = np.array(values, dtype='datetime64')
+                    except ValueError as e:
+                        return {}, [f'{self.prop.code}: {e}']
+                array = exact.astype(dtype)
+                lossy = (
+                    'with a time of day'
+                    if data_type == DataType.DATE
+                    else 'with fractions of a second'
+                )
+                errors = [
+                    f'{self.prop.code}[{i}]: invalid {data_type.value} `{values[i]}` {lossy}'
+                    for i in np.flatnonzero(~np.isnat(exact) & (exact != array))
+                ]
+                return {'values': array, 'valid': ~np.isnat(array)}, errors
+            valid = np.array([not _is_missing(value) for value in values], dtype=bool)
+            array = np.zeros(len(valid), dtype=dtype)
+            if data_type == DataType.REAL:
+                array[:] = np.nan
+            for i, value in enumerate(values):
+                if not valid[i]:
+                    continue
+                try:
+                    if data_type == DataType.BOOLEAN and not isinstance(
+                        value, (bool, np.bool_)
+                    ):
+                        raise ValueError('expected a boolean')
+                    if data_type == DataType.INTEGER and (
+                        isinstance(value, (bool, np.bool_))
+                        or float(value) != int(value)
+                    ):
+                        raise ValueError('expected an integer')
+                    array[i] = value
+                except (TypeError, ValueError, OverflowError):
+                    errors.append(
+                        f'{self.prop.code}[{i}]: invalid {data_type.value} `{value}`'
+                    )
+            return {'values': array, 'valid': valid}, errors
+
+        if self.spec.encoding == 'dictionary':
+            # The new terms are only added to the dictionary if the batch is accepted
+            self._new_terms = {}
+            codes = np.full(len(values), -1, dtype=np.int32)
+            for i, value in enumerate(values):
+                if _is_missing(value):
+                    continue
+                value = str(value).strip()
+                code = self.dictionary.get(value, self._new_terms.get(value))
+                if code is None:
+                    if self.fixed_dictionary:
+                        errors.append(
+                            f'{self.prop.code}[{i}]: `{value}` is not a term of {self.prop.vocabulary_code}'
+                        )
+                        continue
+                    code = len(self.dictionary) + len(self._new_terms)
+                    self._new_terms[value] = code
+                codes[i] = code
+            return {'codes': codes}, errors
+
+        strings = [None if _is_missing(value) else str(value) for value in values]
+
+        encoded = [b'' if value is None else value.encode('utf-8') for value in strings]
+        lengths = np.fromiter(
+            (len(value) for value in encoded), dtype=np.int64, count=len(encoded)
+        )
+        return {
+            'data': np.frombuffer(b''.join(encoded), dtype=np.uint8),
+            'offsets': self.n_bytes + np.cumsum(lengths),
+            'valid': np.array([value is not None for value in strings], dtype=bool),
+        }, errors
+
+    def append(self, arrays: dict[str, np.ndarray]) -> None:
+        if not self.appenders:
+            self._open()
+        self.dictionary.update(self._new_terms)
+        self._new_terms = {}
+        for role, array in arrays.items():
+            self.appenders[role].append(array)
+        if 'valid' in arrays:
+            self.has_missing |= not arrays['valid'].all()
+        if 'data' in arrays:
+            self.n_bytes += len(arrays['data'])
+
+    def close(self, directory: str) -> ColumnSpec:
+        if not self.appenders:
+            self._open()
+        for appender in self.appenders.values():
+            appender.close()
+        # The mask of a column without missing values, or with NaN and NaT as missing values, is dropped
+        if 'valid' in self.spec.files and (
+            not self.has_missing or self.prop.data_type in (DataType.REAL, *NUMPY_UNITS)
+        ):
+            os.remove(os.path.join(directory, self.spec.files.pop('valid')))
+        if self.spec.encoding == 'dictionary':
+            self.spec.dictionary = sorted(self.dictionary, key=self.dictionary.get)
+        return self.spec
+
+
+class ColumnarWriter:
+    """
+    Writes instances of an object type as a columnar export: a directory with one set of raw `.npy` files
+    per property column (see `ENCODINGS`) and a `manifest.json` with the code and versions of the
+    `ObjectType` and its property assignments. The instances are given in batches of columns keyed by
+    property code, validated against the object type and appended to the files, so that exports larger
+    than the memory can be written. E.g.:
+
+    ```python
+    with ColumnarWriter('instruments.columnar', Instrument(), vocabularies=vocabulary_terms(registry)) as writer:
+        for batch in batches:
+            writer.write(batch)  # e.g., {'$NAME': [...], 'DOCUMENT_TYPE': [...]}
+    ```
+
+    The export is written in a temporary directory, which is renamed to `path` when closed. The
+    TIMESTAMP values are stored as naive UTC in seconds: the timezone-aware values must be converted
+    first, and the TIMESTAMP values with fractions of a second and the DATE values with a time of day are
+    rejected instead of truncated.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        object_type: ObjectType,
+        *,
+        vocabularies: Optional[dict[str, frozenset[str]]] = None,
+        overwrite: bool = False,
+    ):
+        if os.path.exists(path) and not overwrite:
+            raise FileExistsError(f'The export {path} already exists.')
+        self.path = path
+        self.object_type = object_type
+        self.vocabularies = vocabularies
+        self.n_rows = 0
+        self.overwrite = overwrite
+        self._tmp_path = f'{path}.tmp'
+        if os.path.exists(self._tmp_path):
+            shutil.rmtree(self._tmp_path)
+        os.makedirs(self._tmp_path)
+        self.properties = {prop.code: prop for prop in object_type.properties}
+        self._columns: dict[str, _ColumnWriter] = {}
+        self._accepted = False
+        self._closed = False
+
+    def _column(self, code: str) -> _ColumnWriter:
+        column = self._columns.get(code)
+        if column is None:
+            prop = self.properties[code]
+            terms = None
+            if (
+                prop.data_type == DataType.CONTROLLEDVOCABULARY
+                and self.vocabularies is not None
+            ):
+                terms = self.vocabularies.get(prop.vocabulary_code)
+                if terms is None:
+                    raise ValueError(
+                        f'Unknown vocabulary {prop.vocabulary_code} of {code}.'
+                    )
+            column = _ColumnWriter(self._tmp_path, len(self._columns), prop, terms)
+            self._columns[code] = column
+        return column
+
+    def write(self, columns: dict[str, Union[Sequence[Any], np.ndarray]]) -> None:
+        """
+        Validates and appends a batch of instances. The first batch fixes the exported columns. The whole
+        batch is rejected, without writing anything, if it contains unknown properties, misses mandatory
+        values or has values which are not valid for their property.
+
+        Args:
+            columns (dict[str, Union[Sequence[Any], np.ndarray]]): The values of each property.
+        """
+        if self._closed:
+            raise RuntimeError('The export is closed.')
+        unknown = sorted(set(columns) - set(self.properties))
+        if unknown:
+            raise ValueError(
+                f'The properties {unknown} are not assigned to {self.object_type.defs.code}.'
+            )
+        if self._accepted and set(columns) != set(self._columns):
+            raise ValueError(
+                f'The batch has the columns {sorted(columns)}, expected {sorted(self._columns)}.'
+            )
+        lengths = {len(values) for values in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f'The columns have different lengths: {sorted(lengths)}.')
+        n = lengths.pop() if lengths else 0
+
+        errors = [
+            f'missing mandatory column {code}'
+            for code, prop in self.properties.items()
+            if prop.mandatory and code not in columns
+        ]
+        encoded = {}
+        for code, values in columns.items():
+            column = self._column(code)
+            arrays, column_errors = column.encode(values)
+            errors.extend(column_errors)
+            if self.properties[code].mandatory and not column_errors:
+                missing = (
+                    (arrays['codes'] < 0) if 'codes' in arrays else ~arrays['valid']
+                )
+                if missing.any():
+                    errors.append(
+                        f'{code}: {int(missing.sum())} missing values of a mandatory property'
+                    )
+            encoded[code] = arrays
+        if errors:
+            shown = '; '.join(errors[:10])
+            more = f' (and {len(errors) - 10} more)' if len(errors) > 10 else ''
+            raise ValueError(f'The batch was rejected: {shown}{more}.')
+
+        if not self._accepted:
+            # Drop the columns of the rejected batches which are not part of the export
+            self._columns = {code: self._columns[code] for code in columns}
+            for index, column in enumerate(self._columns.values()):
+                column.index = index
+            self._accepted = True
+        with metrics.timer('columnar.write'):
+            for code, arrays in encoded.items():
+                self._columns[code].append(arrays)
+        self.n_rows += n
+        metrics.increment('columnar.rows', n)
+
+    def close(self) -> ColumnarManifest:
+        """
+        Finalizes the files, writes the manifest and moves the export to `path`.
+
+        Returns:
+            ColumnarManifest: The manifest of the export.
+        """
+        if self._closed:
+            raise RuntimeError('The export is closed.')
+        self._closed = True
+        manifest = ColumnarManifest(
+            object_type=self.object_type.defs.code,
+            object_type_version=self.object_type.defs.version,
+            n_rows=self.n_rows,
+            columns=[column.close(self._tmp_path) for column in self._columns.values()],
+        )
+        with open(
+            os.path.join(self._tmp_path, MANIFEST_NAME), 'w', encoding='utf-8'
+        ) as f:
+            f.write(manifest.model_dump_json(indent=2))
+        if os.path.exists(self.path):
+            shutil.rmtree(self.path)
+        os.replace(self._tmp_path, self.path)
+        logger.info(
+            f'Exported {self.n_rows} instances of {manifest.object_type} to {self.path}.'
+        )
+        return manifest
+
+    def abort(self) -> None:
+        """Removes the partial export."""
+        self._closed = True
+        for column in self._columns.values():
+            for appender in column.appenders.values():
+                appender.file.close()
+        shutil.rmtree(self._tmp_path, ignore_errors=True)
+
+    def __enter__(self) -> 'ColumnarWriter':
+        return self
+
+    def __exit__(self, exc_type, *args) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def write_columnar(
+    path: str,
+    object_type: ObjectType,
+    columns: dict[str, Union[Sequence[Any], np.ndarray]],
+    *,
+    vocabularies: Optional[dict[str, frozenset[str]]] = None,
+    overwrite: bool = False,
+) -> ColumnarManifest:
+    """
+    Writes a single batch of instances as a columnar export (see `ColumnarWriter`).
+
+    Args:
+        path (str): The directory of the export.
+        object_type (ObjectType): The object type of the instances.
+        columns (dict[str, Union[Sequence[Any], np.ndarray]]): The values of each property.
+        vocabularies (Optional[dict[str, frozenset[str]]], optional): The term codes keyed by vocabulary
+            code (see `vocabulary_terms`). If given, the dictionaries of the CONTROLLEDVOCABULARY columns
+            are the sorted terms of their vocabulary. Defaults to None (the values found, in order).
+        overwrite (bool, optional): If True, an existing export is replaced. Defaults to False.
+
+    Returns:
+        ColumnarManifest: The manifest of the export.
+    """
+    writer = ColumnarWriter(
+        path, object_type, vocabularies=vocabularies, overwrite=overwrite
+    )
+    try:
+        writer.write(columns)
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.close()
+
+
+def _read_manifest(path: str) -> ColumnarManifest:
+    with open(os.path.join(path, MANIFEST_NAME), encoding='utf-8') as f:
+        manifest = ColumnarManifest.model_validate_json(f.read())
+    if manifest.format_version > FORMAT_VERSION:
+        raise ValueError(
+            f'The export {path} has the format version {manifest.format_version}, newer than {FORMAT_VERSION}.'
+        )
+    return manifest
+
+
+class StringColumn:
+    """String column of a columnar export, decoded value by value from the memory-mapped buffers."""
+
+    def __init__(
+        self, data: np.ndarray, offsets: np.ndarray, valid: Optional[np.ndarray]
+    ):
+        self.data = data
+        self.offsets = offsets
+        self.valid = valid
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> Optional[str]:
+        if self.valid is not None and not self.valid[index]:
+            return None
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return self.data[start:end].tobytes().decode('utf-8')
+
+    def to_list(self) -> list[Optional[str]]:
+        """Decodes all the values."""
+        return [self[i] for i in range(len(self))]
+
+
+class DictionaryColumn:
+    """Dictionary-encoded column of a columnar export: memory-mapped codes into the dictionary of terms."""
+
+    def __init__(self, codes: np.ndarray, dictionary: list[str]):
+        self.codes = codes
+        self.dictionary = dictionary
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, index: int) -> Optional[str]:
+        code = self.codes[index]
+        return None if code < 0 else self.dictionary[code]
+
+    def decode(self) -> np.ndarray:
+        """Returns the terms as an object array, with None for the missing values."""
+        terms = np.array([*self.dictionary, None], dtype=object)
+        return terms[self.codes]
+
+
+class ColumnarExport:
+    """
+    Columnar export opened for reading. Only the manifest is read when it is opened; the `.npy` files of a
+    column are memory-mapped the first time the column is accessed, so that opening a multi-gigabyte
+    export is instant and only the pages of the touched columns are read from disk. E.g.:
+
+    ```python
+    export = ColumnarExport('instruments.columnar')
+    export.manifest.object_type, export.manifest.object_type_version
+    names = export.column('$NAME')  # `StringColumn`
+    weights = export.column('WEIGHT')  # memory-mapped float64 array
+    ```
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.manifest = _read_manifest(path)
+        self.specs = {spec.code: spec for spec in self.manifest.columns}
+        self._cache: dict[str, Any] = {}
+
+    def __len__(self) -> int:
+        return self.manifest.n_rows
+
+    @property
+    def codes(self) -> list[str]:
+        """The property codes of the columns."""
+        return list(self.specs)
+
+    def _load(self, name: str) -> np.ndarray:
+        return np.load(os.path.join(self.path, name), mmap_mode='r')
+
+    def column(self, code: str) -> Union[np.ndarray, StringColumn, DictionaryColumn]:
+        """
+        Returns a column, memory-mapping its files the first time.
+
+        Args:
+            code (str): The code of the property.
+
+        Returns:
+            Union[np.ndarray, StringColumn, DictionaryColumn]: The memory-mapped array of a `plain` column,
+                or the `StringColumn` or `DictionaryColumn` over the memory-mapped arrays.
+        """
+        column = self._cache.get(code)
+        if column is not None:
+            return column
+        spec = self.specs.get(code)
+        if spec is None:
+            raise KeyError(f'The property {code} is not in the export.')
+        if spec.encoding == 'plain':
+            column = self._load(spec.files['values'])
+        elif spec.encoding == 'dictionary':
+            column = DictionaryColumn(self._load(spec.files['codes']), spec.dictionary)
+        else:
+            column = StringColumn(
+                self._load(spec.files['data']),
+                self._load(spec.files['offsets']),
+                self._load(spec.files['valid']) if 'valid' in spec.files else None,
+            )
+        self._cache[code] = column
+        return column
+
+    def valid(self, code: str) -> np.ndarray:
+        """
+        Returns the mask of the non-missing values of a column.
+
+        Args:
+            code (str): The code of the property.
+
+        Returns:
+            np.ndarray: The boolean mask.
+        """
+        spec = self.specs.get(code)
+        if spec is None:
+            raise KeyError(f'The property {code} is not in the export.')
+        column = self.column(code)
+        if 'valid' in spec.files:
+            return self._load(spec.files['valid'])
+        if spec.encoding == 'dictionary':
+            return column.codes >= 0
+        if spec.data_type == DataType.REAL:
+            return ~np.isnan(column)
+        if spec.data_type in NUMPY_UNITS:
+            return ~np.isnat(column)
+        return np.ones(len(self), dtype=bool)
@@ -0,0 +1,259 @@
+import re
+from collections.abc import Sequence
+from datetime import datetime
+from typing import NamedTuple, Optional, Union
+
+import numpy as np
+
+from bam_masterdata.metadata.definitions import DataType
+
+# Candidate formats tried when detecting the format of a column, in order of preference
+DATE_FORMATS = ['%Y-%m-%d', '%d.%m.%Y', '%d/%m/%Y', '%Y/%m/%d', '%Y%m%d']
+TIMESTAMP_FORMATS = [
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%d %H:%M',
+    '%Y-%m-%dT%H:%M',
+    '%d.%m.%Y %H:%M:%S',
+    '%d.%m.%Y %H:%M',
+    '%d/%m/%Y %H:%M:%S',
+    '%d/%m/%Y %H:%M',
+]
+
+# Formats used by openBIS for the string values of the DATE and TIMESTAMP properties
+OPENBIS_FORMATS = {
+    DataType.DATE: '%Y-%m-%d',
+    DataType.TIMESTAMP: '%Y-%m-%d %H:%M:%S',
+}
+
+# Resolution of the `datetime64` arrays of each data type
+NUMPY_UNITS = {DataType.DATE: 'D', DataType.TIMESTAMP: 's'}
+
+# Width in characters of each supported strptime directive
+_DIRECTIVE_WIDTHS = {'Y': 4, 'm': 2, 'd': 2, 'H': 2, 'M': 2, 'S': 2}
+
+# Number of non-empty values used to detect the format of a column
+_DETECTION_SAMPLE = 100
+
+
+class ParsedColumn(NamedTuple):
+    """
+    Result of parsing a column of date or timestamp strings with `parse_dates`:
+
+        - `values`: the parsed `datetime64` values, `NaT` for the empty and failed entries.
+        - `failed`: boolean mask of the non-empty entries which could not be parsed or are out of range.
+        - `format`: the strptime format detected (or given) for the column.
+    """
+
+    values: np.ndarray
+    failed: np.ndarray
+    format: Optional[str]
+
+
+def _layout(fmt: str) -> tuple[int, dict[str, tuple[int, int]], dict[int, str]]:
+    """
+    Returns the total width, the `(start, width)` of each directive and the literal characters of a
+    fixed-width strptime format, e.g., `'%d.%m.%Y'`.
+    """
+    fields: dict[str, tuple[int, int]] = {}
+    literals: dict[int, str] = {}
+    position = 0
+    for match in re.finditer(r'%(.)|(.)', fmt, flags=re.DOTALL):
+        directive, literal = match.groups()
+        if directive is not None:
+            if directive not in _DIRECTIVE_WIDTHS:
+                raise ValueError(f'Unsupported directive %{directive} in format {fmt}.')
+            width = _DIRECTIVE_WIDTHS[directive]
+            fields[directive] = (position, width)
+            position += width
+        else:
+            literals[position] = literal
+            position += 1
+    return position, fields, literals
+
+
+def _parse_fixed_width(
+    values: np.ndarray, fmt: str, unit: str
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Parses an array of strings with a fixed-width `fmt` using vectorized operations on the code points
+    of the strings. Returns the `datetime64` values and a mask of the successfully parsed entries.
+    """
+    width, fields, literals = _layout(fmt)
+    n = len(values)
+    result = np.full(n, np.datetime64('NaT'), dtype=f'datetime64[{unit}]')
+    ok = np.char.str_len(values) == width
+    if n == 0 or not ok.any():
+        return result, np.zeros(n, dtype=bool)
+
+    chars = values.astype(f'<U{width}').view(np.uint32).reshape(n, width)
+    for position, literal in literals.items():
+        ok &= chars[:, position] == ord(literal)
+    digits = chars.astype(np.int64) - ord('0')
+
+    components = {}
+    for directive, (start, size) in fields.items():
+        block = digits[:, start : start + size]
+        ok &= ((block >= 0) & (block <= 9)).all(axis=1)
+        components[directive] = block @ (10 ** np.arange(size - 1, -1, -1))
+
+    n_rows = np.zeros(n, dtype=np.int64)
+    year = components.get('Y', n_rows + 1970)
+    month = components.get('m', n_rows + 1)
+    day = components.get('d', n_rows + 1)
+    hour = components.get('H', n_rows)
+    minute = components.get('M', n_rows)
+    second = components.get('S', n_rows)
+    ok &= (month >= 1) & (month <= 12) & (day >= 1) & (day <= 31)
+    ok &= (hour < 24) & (minute < 60) & (second < 60)
+
+    months = np.where(ok, (year - 1970) * 12 + month - 1, 0).astype('datetime64[M]')
+    dates = months.astype('datetime64[D]') + np.where(ok, day - 1, 0)
+    # Days beyond the end of the month roll over into the next month
+    ok &= dates.astype('datetime64[M]') == months
+    timestamps = dates.astype(f'datetime64[{unit}]')
+    if unit != 'D':
+        seconds = (hour * 3600 + minute * 60 + second).astype('timedelta64[s]')
+        timestamps = timestamps + seconds.astype(f'timedelta64[{unit}]')
+    result[ok] = timestamps[ok]
+    return result, ok
+
+
+def _candidate_formats(data_type: DataType) -> list[str]:
+    if data_type == DataType.DATE:
+        return DATE_FORMATS
+    if data_type == DataType.TIMESTAMP:
+        return TIMESTAMP_FORMATS
+    raise ValueError(f'`data_type` must be DATE or TIMESTAMP, got {data_type}.')
+
+
+def detect_format(
+    values: Sequence[Optional[str]], data_type: DataType = DataType.DATE
+) -> Optional[str]:
+    """
+    Detects the format of a column of date or timestamp strings using a sample of its non-empty values.
+    The candidate format parsing most of the sample is returned (ties are resolved by the order in
+    `DATE_FORMATS` or `TIMESTAMP_FORMATS`).
+
+    Args:
+        values (Sequence[Optional[str]]): The column of strings.
+        data_type (DataType, optional): `DataType.DATE` or `DataType.TIMESTAMP`. Defaults to DATE.
+
+    Returns:
+        Optional[str]: The detected strptime format, or None if no candidate parses any value.
+    """
+    candidates = _candidate_formats(data_type)
+    sample = []
+    for value in values:
+        if value:
+            sample.append(value.strip())
+            if len(sample) >= _DETECTION_SAMPLE:
+                break
+    if not sample:
+        return None
+    sample_array = np.array(sample, dtype=str)
+    best, best_count = None, 0
+    for fmt in candidates:
+        _, ok = _parse_fixed_width(sample_array, fmt, NUMPY_UNITS[data_type])
+        count = int(ok.sum())
+        if count > best_count:
+            best, best_count = fmt, count
+            if count == len(sample):
+                break
+    return best
+
+
+def parse_dates(
+    values: Sequence[Optional[str]],
+    data_type: Union[DataType, str] = DataType.DATE,
+    fmt: Optional[str] = None,
+    min_value: Optional[Union[str, np.datetime64]] = None,
+    max_value: Optional[Union[str, np.datetime64]] = None,
+) -> ParsedColumn:
+    """
+    Converts a whole column of date or timestamp strings into a NumPy `datetime64` array. The format
+    is detected once for the column (see `detect_format`) and the values with its fixed width are parsed
+    with vectorized operations; only the remaining values (e.g., without zero padding) are parsed one
+    by one with `datetime.strptime`. Empty values are converted to `NaT` without failing. E.g.:
+
+    ```python
+    column = parse_dates(['01.02.2024', '', '31.02.2024'], data_type='DATE')
+    column.values  # ['2024-02-01', 'NaT', 'NaT']
+    column.failed  # [False, False, True]
+    ```
+
+    Args:
+        values (Sequence[Optional[str]]): The column of strings.
+        data_type (Union[DataType, str], optional): `DATE` (daily resolution) or `TIMESTAMP` (resolution
+            in seconds). Defaults to DATE.
+        fmt (Optional[str], optional): The strptime format of the column. Defaults to None (detected).
+        min_value (Optional[Union[str, np.datetime64]], optional): The earliest valid value. The values
+            before are marked as failed. Defaults to None.
+        max_value (Optional[Union[str, np.datetime64]], optional): The latest valid value. The values
+            after are marked as failed. Defaults to None.
+
+    Returns:
+        ParsedColumn: The parsed values, the mask of failed entries and the format of the column.
+    """
+    data_type = DataType(data_type)
+    unit = NUMPY_UNITS.get(data_type)
+    if unit is None:
+        raise ValueError(f'`data_type` must be DATE or TIMESTAMP, got {data_type}.')
+    strings = np.array([value.strip() if value else '' for value in values], dtype=str)
+    empty = strings == ''
+    n = len(strings)
+    if fmt is None:
+        fmt = detect_format(values, data_type)
+    if fmt is None:
+        return ParsedColumn(
+            values=np.full(n, np.datetime64('NaT'), dtype=f'datetime64[{unit}]'),
+            failed=~empty,
+            format=None,
+        )
+
+    result, ok = _parse_fixed_width(strings, fmt, unit)
+    # Fallback for the values not matching the fixed width of the format
+    for i in np.flatnonzero(~ok & ~empty):
+        try:
+            parsed = datetime.strptime(strings[i], fmt)
+        except ValueError:
+            continue
+        result[i] = np.datetime64(parsed, unit)
+        ok[i] = True
+
+    if min_value is not None:
+        too_early = ok & (result < np.datetime64(min_value, unit))
+        result[too_early] = np.datetime64('NaT')
+        ok &= ~too_early
+    if max_value is not None:
+        too_late = ok & (result > np.datetime64(max_value, unit))
+        result[too_late] = np.datetime64('NaT')
+        ok &= ~too_late
+
+    return ParsedColumn(values=result, failed=~ok & ~empty, format=fmt)
+
+
+def format_dates(
+    values: np.ndarray, data_type: Union[DataType, str] = DataType.DATE
+) -> list[Optional[str]]:
+    """
+    Converts a `datetime64` array back into the string format used by openBIS (see `OPENBIS_FORMATS`)
+    for uploading, with None for the `NaT` entries.
+
+    Args:
+        values (np.ndarray): The `datetime64` values.
+        data_type (Union[DataType, str], optional): `DATE` or `TIMESTAMP`. Defaults to DATE.
+
+    Returns:
+        list[Optional[str]]: The openBIS strings.
+    """
+    data_type = DataType(data_type)
+    unit = NUMPY_UNITS.get(data_type)
+    if unit is None:
+        raise ValueError(f'`data_type` must be DATE or TIMESTAMP, got {data_type}.')
+    values = np.asarray(values).astype(f'datetime64[{unit}]')
+    strings = np.datetime_as_string(values, unit=unit)
+    if data_type == DataType.TIMESTAMP:
+        strings = np.char.replace(strings, 'T', ' ')
+    missing = np.isnat(values)
+    return [None if is_missing else str(s) for s, is_missing in zip(strings, missing)]
@@ -0,0 +1,553 @@
+import datetime
+import re
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal, InvalidOperation
+from typing import Any, NamedTuple, Optional, Union
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from bam_masterdata.ingestion.dates import NUMPY_UNITS, parse_dates
+from bam_masterdata.logger import logger
+from bam_masterdata.metadata.definitions import (
+    DataType,
+    ObjectTypeDef,
+    PropertyTypeAssignment,
+)
+from bam_masterdata.metadata.entities import ObjectType
+from bam_masterdata.metrics import metrics
+
+# Version of an object type: an `ObjectType` or its definition and property assignments as returned by
+# `DefinitionStore.load_object_type`
+ObjectTypeVersion = Union[
+    ObjectType, tuple[ObjectTypeDef, Sequence[PropertyTypeAssignment]]
+]
+
+# Strings of the legacy values treated as missing, e.g., after `astype(str)` of None or NaN
+_MISSING = frozenset({'', 'None', 'nan', 'NaN', 'NaT'})
+
+_INT64_MIN, _INT64_MAX = int(np.iinfo(np.int64).min), int(np.iinfo(np.int64).max)
+
+_BOOLEANS = {
+    'TRUE': True,
+    'YES': True,
+    'Y': True,
+    '1': True,
+    'FALSE': False,
+    'NO': False,
+    'N': False,
+    '0': False,
+}
+
+_STRING_TYPES = (
+    DataType.VARCHAR,
+    DataType.MULTILINE_VARCHAR,
+    DataType.HYPERLINK,
+    DataType.XML,
+)
+
+
+class MigrationStep(BaseModel):
+    """Migration of the values of one property between two versions of an object type."""
+
+    source: Optional[str] = Field(
+        None,
+        description='Code of the property in the old version. None if it was added.',
+    )
+
+    target: Optional[str] = Field(
+        None,
+        description='Code of the property in the new version. None if it was removed.',
+    )
+
+    source_type: Optional[DataType] = Field(
+        None, description='Data type of the property in the old version.'
+    )
+
+    target_type: Optional[DataType] = Field(
+        None, description='Data type of the property in the new version.'
+    )
+
+    source_vocabulary: Optional[str] = Field(
+        None, description='Vocabulary code of the property in the old version.'
+    )
+
+    target_vocabulary: Optional[str] = Field(
+        None, description='Vocabulary code of the property in the new version.'
+    )
+
+    term_mapping: dict[str, str] = Field(
+        default={},
+        description="""
+        Term code of the legacy values of a CONTROLLEDVOCABULARY property, e.g., `{'Calib. cert.':
+        'CALIBRATION_CERTIFICATE'}`. The values without mapping are normalized into a code (uppercase,
+        separated by underscores).
+        """,
+    )
+
+    terms: list[str] = Field(
+        default=[],
+        description='Valid term codes of the new vocabulary. If empty, the mapped terms are not checked.',
+    )
+
+    default: Any = Field(
+        None, description='Value of the rows for a property added in the new version.'
+    )
+
+    mandatory: bool = Field(
+        False, description='If True, the property is mandatory in the new version.'
+    )
+
+    @property
+    def is_rename(self) -> bool:
+        return (
+            self.source is not None
+            and self.target is not None
+            and self.source != self.target
+        )
+
+    @property
+    def is_coercion(self) -> bool:
+        return (
+            self.source is not None
+            and self.target is not None
+            and (
+                self.source_type != self.target_type
+                or self.source_vocabulary != self.target_vocabulary
+                or bool(self.term_mapping)
+            )
+        )
+
+
+class MigrationPlan(BaseModel):
+    """Steps migrating the instance data of an object type from one version to another."""
+
+    object_type: str = Field(..., description='Code of the object type.')
+
+    source_version: int = Field(..., description='Version of the old definition.')
+
+    target_version: int = Field(..., description='Version of the new definition.')
+
+    steps: list[MigrationStep] = Field(default=[], description='Steps of the plan.')
+
+    @property
+    def renames(self) -> dict[str, str]:
+        return {step.source: step.target for step in self.steps if step.is_rename}
+
+    @property
+    def coercions(self) -> list[MigrationStep]:
+        return [step for step in self.steps if step.is_coercion]
+
+    @property
+    def added(self) -> list[str]:
+        return [step.target for step in self.steps if step.source is None]
+
+    @property
+    def removed(self) -> list[str]:
+        return [step.source for step in self.steps if step.target is None]
+
+
+class MigrationResult(NamedTuple):
+    """
+    Migrated columns keyed by the property codes of the new version, with the mask of the values which
+    could not be migrated for each column. The failed values are set as missing.
+    """
+
+    columns: dict[str, np.ndarray]
+    failed: dict[str, np.ndarray]
+
+    def failed_rows(self) -> np.ndarray:
+        """Returns the mask of the rows with at least one failed value."""
+        n = len(next(iter(self.columns.values()))) if self.columns else 0
+        mask = np.zeros(n, dtype=bool)
+        for failed in self.failed.values():
+            mask |= failed
+        return mask
+
+
+def _unpack(version: ObjectTypeVersion) -> tuple[ObjectTypeDef, list]:
+    if isinstance(version, ObjectType):
+        return version.defs, version.properties
+    defs, properties = version
+    return defs, list(properties)
+
+
+def _normalize_label(label: str) -> str:
+    return ' '.join(label.split()).casefold()
+
+
+def _term_code(value: str) -> str:
+    """Normalizes a legacy value into a term code, e.g., `'Calib. cert.'` into `'CALIB_CERT'`."""
+    return re.sub(r'[^A-Z0-9]+', '_', value.strip().upper()).strip('_')
+
+
+def plan_migration(
+    source: ObjectTypeVersion,
+    target: ObjectTypeVersion,
+    *,
+    renames: Optional[dict[str, str]] = None,
+    term_mappings: Optional[dict[str, dict[str, str]]] = None,
+    vocabularies: Optional[dict[str, frozenset[str]]] = None,
+    defaults: Optional[dict[str, Any]] = None,
+) -> MigrationPlan:
+    """
+    Derives the migration plan of the instance data between two versions of an object type. The
+    properties with the same code are kept or coerced (if their data type or vocabulary changed). The
+    renamed properties are taken from `renames` or, if not given, inferred by matching the
+    `property_label` of the removed and added properties. E.g.:
+
+    ```python
+    plan = plan_migration(
+        store.load_object_type('INSTRUMENT', release='1.0.0'),
+        Instrument(),
+        term_mappings={'DOCUMENT_TYPE': {'Calib. cert.': 'CALIBRATION_CERTIFICATE'}},
+        vocabularies=vocabulary_terms(EntityRegistry.from_datamodel()),
+    )
+    plan.renames  # {'ALIAS': 'NICKNAME'}
+    ```
+
+    Args:
+        source (ObjectTypeVersion): The old version, as an `ObjectType` or as the definition and property
+            assignments returned by `DefinitionStore.load_object_type`.
+        target (ObjectTypeVersion): The new version.
+        renames (Optional[dict[str, str]], optional): The new code of the renamed properties keyed by their
+            old code. Defaults to None (inferred from the property labels).
+        term_mappings (Optional[dict[str, dict[str, str]]], optional): The term code of the legacy values
+            keyed by the new code of the CONTROLLEDVOCABULARY properties. Defaults to None.
+        vocabularies (Optional[dict[str, frozenset[str]]], optional): The term codes keyed by vocabulary
+            code (see `vocabulary_terms`), used to check the mapped terms. Defaults to None.
+        defaults (Optional[dict[str, Any]], optional): The value of the added properties keyed by their
+            code. Defaults to None.
+
+    Returns:
+        MigrationPlan: The steps of the migration.
+    """
+    source_defs, source_properties = _unpack(source)
+    target_defs, target_properties = _unpack(target)
+    if source_defs.code != target_defs.code:
+        raise ValueError(
+            f'The versions belong to different object types: {source_defs.code} and {target_defs.code}.'
+        )
+    old = {prop.code: prop for prop in source_properties}
+    new = {prop.code: prop for prop in target_properties}
+    term_mappings = term_mappings or {}
+    defaults = defaults or {}
+
+    if renames is None:
+        renames = {}
+        removed = [code for code in old if code not in new]
+        added_labels: dict[str, list[str]] = {}
+        for code, prop in new.items():
+            if code not in old:
+                added_labels.setdefault(
+                    _normalize_label(prop.property_label), []
+                ).append(code)
+        for code in removed:
+            candidates = added_labels.get(
+                _normalize_label(old[code].property_label), []
+            )
+            if len(candidates) == 1:
+                renames[code] = candidates[0]
+                logger.info(
+                    f'Inferred the rename of {code} into {candidates[0]} from their property label.'
+                )
+    for old_code, new_code in renames.items():
+        if old_code not in old or new_code not in new:
+            raise ValueError(
+                f'The rename of {old_code} into {new_code} does not match the properties of the versions.'
+            )
+
+    steps = []
+    sources = {new_code: old_code for old_code, new_code in renames.items()}
+    for code, prop in new.items():
+        old_code = sources.get(code)
+        if old_code is None and code in old and code not in renames:
+            old_code = code
+        old_prop = old.get(old_code) if old_code else None
+        step = MigrationStep(
+            source=old_code,
+            target=code,
+            source_type=old_prop.data_type if old_prop else None,
+            target_type=prop.data_type,
+            source_vocabulary=old_prop.vocabulary_code if old_prop else None,
+            target_vocabulary=prop.vocabulary_code,
+            default=defaults.get(code),
+            mandatory=prop.mandatory,
+        )
+        if prop.data_type == DataType.CONTROLLEDVOCABULARY:
+            step.term_mapping = dict(term_mappings.get(code, {}))
+            if vocabularies is not None:
+                if prop.vocabulary_code not in vocabularies:
+                    raise ValueError(
+                        f'Unknown vocabulary {prop.vocabulary_code} of {code}.'
+                    )
+                step.terms = sorted(vocabularies[prop.vocabulary_code])
+        if old_prop is None and step.default is None and prop.mandatory:
+            logger.warning(
+                f'The mandatory property {code} was added without default: all the rows will fail.'
+            )
+        steps.append(step)
+    for code, prop in old.items():
+        if code not in new and code not in renames:
+            steps.append(MigrationStep(source=code, source_type=prop.data_type))
+    return MigrationPlan(
+        object_type=target_defs.code,
+        source_version=source_defs.version,
+        target_version=target_defs.version,
+        steps=steps,
+    )
+
+
+def _coerce_value(data_type: DataType, value: str) -> Any:
+    """Converts a legacy string into the Python value of a data type, raising a ValueError if invalid."""
+    if data_type == DataType.INTEGER:
+        try:
+            number = int(value)
+        except ValueError:
+            # E.g., `'2.0'` or `'1e3'`, parsed exactly so that large values are not rounded
+            try:
+                decimal = Decimal(value)
+            except InvalidOperation:
+                raise ValueError(f'`{value}` is not an integer') from None
+            if not decimal.is_finite() or decimal != decimal.to_integral_value():
+                raise ValueError(f'`{value}` is not an integer') from None
+            number = int(decimal)
+        if not _INT64_MIN <= number <= _INT64_MAX:
+            raise ValueError(f'`{value}` is out of the range of INTEGER')
+        return number
+    if data_type == DataType.REAL:
+        return float(value)
+    if data_type == DataType.BOOLEAN:
+        return _BOOLEANS[value.upper()]
+    if data_type in _STRING_TYPES:
+        return value
+    raise ValueError(f'cannot coerce values into {data_type}')
+
+
+def _empty(data_type: Optional[DataType], n: int) -> np.ndarray:
+    """Returns a column of `n` missing values of a data type."""
+    if data_type == DataType.REAL:
+        return np.full(n, np.nan)
+    if data_type in NUMPY_UNITS:
+        return np.full(
+            n, np.datetime64('NaT'), dtype=f'datetime64[{NUMPY_UNITS[data_type]}]'
+        )
+    return np.full(n, None, dtype=object)
+
+
+def _coerce_column(
+    step: MigrationStep, values: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Coerces a column into the data type (and vocabulary) of the new version. Each distinct value is
+    converted once, and the results are gathered back into the column with its inverse indices, so
+    that the work in Python depends on the number of distinct values and not on the number of rows.
+    """
+    n = len(values)
+    target_type = step.target_type
+    if values.dtype.kind == 'M' and target_type in NUMPY_UNITS:
+        # Dates and timestamps are cast to the unit of the new type; NaT stays missing
+        return (
+            values.astype(f'datetime64[{NUMPY_UNITS[target_type]}]'),
+            np.zeros(n, dtype=bool),
+        )
+    if values.dtype == object and target_type in NUMPY_UNITS:
+        # The `date` and `datetime` objects are cast like the datetime64 columns, not as strings
+        is_date = np.fromiter(
+            (isinstance(value, datetime.date) for value in values), dtype=bool, count=n
+        )
+        if is_date.any():
+            result = _empty(target_type, n)
+            failed = np.zeros(n, dtype=bool)
+            result[is_date] = np.array(
+                values[is_date].tolist(), dtype='datetime64[us]'
+            ).astype(result.dtype)
+            if not is_date.all():
+                result[~is_date], failed[~is_date] = _coerce_column(
+                    step, values[~is_date]
+                )
+            return result, failed
+    if values.dtype.kind in 'iuf' and target_type in (DataType.REAL, DataType.INTEGER):
+        if target_type == DataType.REAL:
+            return values.astype(np.float64), np.zeros(n, dtype=bool)
+        result = np.full(n, None, dtype=object)
+        if values.dtype.kind in 'iu':
+            # Only the unsigned integers above the int64 range cannot be stored
+            failed = values > _INT64_MAX
+            result[~failed] = values[~failed].tolist()
+            return result, failed
+        missing = np.isnan(values)
+        with np.errstate(invalid='ignore'):
+            failed = ~missing & ((np.mod(values, 1) != 0) | (np.abs(values) >= 2.0**63))
+        valid = ~missing & ~failed
+        result[valid] = values[valid].astype(np.int64).tolist()
+        return result, failed
+
+    uniques, inverse = np.unique(values.astype(str), return_inverse=True)
+    stripped = [value.strip() for value in uniques.tolist()]
+    missing = np.array([value in _MISSING for value in stripped], dtype=bool)
+    if target_type in NUMPY_UNITS:
+        parsed = parse_dates(
+            [
+                None if is_missing else value
+                for value, is_missing in zip(stripped, missing)
+            ],
+            target_type,
+        )
+        return parsed.values[inverse], parsed.failed[inverse]
+
+    converted = np.full(len(uniques), None, dtype=object)
+    failed = np.zeros(len(uniques), dtype=bool)
+    terms = frozenset(step.terms)
+    for i, value in enumerate(stripped):
+        if missing[i]:
+            continue
+        if target_type == DataType.CONTROLLEDVOCABULARY:
+            term = step.term_mapping.get(value) or _term_code(value)
+            if terms and term not in terms:
+                failed[i] = True
+            else:
+                converted[i] = term
+            continue
+        try:
+            converted[i] = _coerce_value(target_type, value)
+        except (KeyError, ValueError):
+            failed[i] = True
+    if target_type == DataType.REAL:
+        converted = np.where(converted == None, np.nan, converted).astype(np.float64)  # noqa: E711
+    return converted[inverse], failed[inverse]
+
+
+def migrate_columns(
+    plan: MigrationPlan, columns: dict[str, Union[Sequence[Any], np.ndarray]]
+) -> MigrationResult:
+    """
+    Applies a migration plan to a batch of instances, given as columns keyed by the property codes of the
+    old version. The kept properties are passed through without copy, the renamed ones are moved to
+    their new code, and the coerced ones are converted column-wise. The columns which are not properties
+    of the old version are returned unchanged, and the removed properties are dropped.
+
+    The values which cannot be coerced are set as missing and flagged in the `failed` masks, e.g.:
+
+    ```python
+    result = migrate_columns(plan, {'LENGTH': ['1.5', 'n/a', None]})
+    result.columns['LENGTH']  # [1.5, nan, nan]
+    result.failed['LENGTH']  # [False, True, False]
+    ```
+
+    Args:
+        plan (MigrationPlan): The migration plan.
+        columns (dict[str, Union[Sequence[Any], np.ndarray]]): The values of each property.
+
+    Returns:
+        MigrationResult: The migrated columns and their masks of failed values.
+    """
+    arrays = {
+        code: values
+        if isinstance(values, np.ndarray)
+        else np.array(values, dtype=object)
+        for code, values in columns.items()
+    }
+    lengths = {len(values) for values in arrays.values()}
+    if len(lengths) > 1:
+        raise ValueError(f'The columns have different lengths: {sorted(lengths)}.')
+    n = lengths.pop() if lengths else 0
+
+    migrated: dict[str, np.ndarray] = {}
+    failed: dict[str, np.ndarray] = {}
+    sources = set()
+    for step in plan.steps:
+        sources.add(step.source)
+        if step.target is None:
+            continue
+        if step.source is None or step.source not in arrays:
+            if step.source is None and step.default is None and step.mandatory:
+                migrated[step.target] = _empty(step.target_type, n)
+                failed[step.target] = np.ones(n, dtype=bool)
+            elif step.source is None:
+                migrated[step.target] = (
+                    _empty(step.target_type, n)
+                    if step.default is None
+                    else np.full(n, step.default, dtype=object)
+                )
+                failed[step.target] = np.zeros(n, dtype=bool)
+            continue
+        values = arrays[step.source]
+        if step.is_coercion:
+            migrated[step.target], failed[step.target] = _coerce_column(step, values)
+            metrics.increment('migration.failed', int(failed[step.target].sum()))
+        else:
+            migrated[step.target] = values
+            failed[step.target] = np.zeros(n, dtype=bool)
+    for code, values in arrays.items():
+        if code not in sources:
+            migrated[code] = values
+    metrics.increment('migration.rows', n)
+    return MigrationResult(columns=migrated, failed=failed)
+
+
+def _migrate_chunk(
+    args: tuple[MigrationPlan, dict[str, np.ndarray]],
+) -> MigrationResult:
+    plan, columns = args
+    with metrics.timer('migration.chunk'):
+        return migrate_columns(plan, columns)
+
+
+def migrate(
+    plan: MigrationPlan,
+    columns: dict[str, Union[Sequence[Any], np.ndarray]],
+    *,
+    chunk_size: int = 100000,
+    workers: int = 0,
+) -> MigrationResult:
+    """
+    Applies a migration plan to a large dataset, in chunks of `chunk_size` rows migrated in parallel by
+    `workers` processes (see `migrate_columns`). The results are concatenated in the order of the rows.
+
+    Args:
+        plan (MigrationPlan): The migration plan.
+        columns (dict[str, Union[Sequence[Any], np.ndarray]]): The values of each property.
+        chunk_size (int, optional): The number of rows sent to a worker at once. Defaults to 100000.
+        workers (int, optional): The number of processes. Defaults to 0 (run in the calling process).
+
+    Returns:
+        MigrationResult: The migrated columns and their masks of failed values.
+    """
+    if chunk_size < 1:
+        raise ValueError(f'`chunk_size` must be at least 1, got {chunk_size}.')
+    arrays = {
+        code: values
+        if isinstance(values, np.ndarray)
+        else np.array(values, dtype=object)
+        for code, values in columns.items()
+    }
+    n = len(next(iter(arrays.values()))) if arrays else 0
+    if workers <= 0 or n <= chunk_size:
+        return _migrate_chunk((plan, arrays))
+    chunks = [
+        (
+            plan,
+            {
+                code: values[start : start + chunk_size]
+                for code, values in arrays.items()
+            },
+        )
+        for start in range(0, n, chunk_size)
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(_migrate_chunk, chunks))
+    logger.info(
+        f'Migrated {n} rows of {plan.object_type} to version {plan.target_version} in {len(chunks)} chunks.'
+    )
+    return MigrationResult(
+        columns={
+            code: np.concatenate([result.columns[code] for result in results])
+            for code in results[0].columns
+        },
+        failed={
+            code: np.concatenate([result.failed[code] for result in results])
+            for code in results[0].failed
+        },
+    )
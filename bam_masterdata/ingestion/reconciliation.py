@@ -0,0 +1,280 @@
+import json
+import os
+import re
+import unicodedata
+from collections import Counter
+from collections.abc import Iterable
+from difflib import SequenceMatcher
+from typing import NamedTuple, Optional
+
+from bam_masterdata.logger import logger
+from bam_masterdata.metadata.entities import VocabularyType
+from bam_masterdata.metrics import metrics
+
+# Tiers of `VocabularyReconciler.match`, from the most to the least reliable
+TIERS = ('accepted', 'exact', 'normalized', 'fuzzy')
+
+# Priority of the indexed texts of a term when two terms share the same text
+_PRIORITIES = {'code': 0, 'label': 1, 'description': 2}
+
+
+class Match(NamedTuple):
+    """Term matched for a legacy value, with the tier and the score (1.0 except for fuzzy matches)."""
+
+    value: str
+    term: Optional[str]
+    tier: Optional[str]
+    score: float
+
+
+def normalize_text(value: str) -> str:
+    """
+    Normalizes a free-text value for matching: accents are removed, the text is case-folded and only the
+    alphanumeric words are kept, e.g., `'Calib. Cert.'` into `'calib cert'` and `'Prüfbericht'` into
+    `'prufbericht'`.
+
+    Args:
+        value (str): The text to normalize.
+
+    Returns:
+        str: The normalized text.
+    """
+    decomposed = unicodedata.normalize('NFKD', value)
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(re.findall(r'[a-z0-9]+', stripped.casefold()))
+
+
+def _similarity(value: str, key: str) -> float:
+    """
+    Scores the similarity of two normalized texts. A value whose words are abbreviations (prefixes of
+    at least two characters) of the words of the key, e.g., `'calib cert'` of `'calibration
+    certificate'`, scores 0.9; otherwise the ratio of `difflib.SequenceMatcher` is used.
+    """
+    words, key_words = value.split(), key.split()
+    if (
+        len(words) == len(key_words)
+        and words != key_words
+        and all(
+            len(word) >= 2 and key_word.startswith(word)
+            for word, key_word in zip(words, key_words)
+        )
+    ):
+        return 0.9
+    return SequenceMatcher(None, value, key).ratio()
+
+
+class VocabularyReconciler:
+    """
+    Reconciles free-text legacy values (e.g., `'Calib. cert.'` or `'Kalibrierschein'`) with the terms of a
+    vocabulary type. The term codes, labels and both halves of the bilingual descriptions
+    (`'English//German'`) are indexed, and each value is resolved through the tiers:
+
+    1. `accepted`: decisions recorded with `accept`, kept in the persistent mapping cache.
+    2. `exact`: the value equals a code, a label or a description half.
+    3. `normalized`: the values are equal after `normalize_text`.
+    4. `fuzzy`: the most similar indexed text scores at least `threshold`, and no other term ties.
+
+    Each distinct value is resolved once and memoized, so that the repeated values of millions of rows
+    are resolved in O(1). E.g.:
+
+    ```python
+    reconciler = VocabularyReconciler(DocumentType(), cache_path='mappings.json')
+    reconciler.match('Kalibrierschein')  # Match(term='CALIBRATION_CERTIFICATE', tier='exact', ...)
+    reconciler.match('Calib. cert.')  # Match(term='CALIBRATION_CERTIFICATE', tier='fuzzy', score=0.9)
+    reconciler.accept('Calib. cert.', 'CALIBRATION_CERTIFICATE')
+    reconciler.save()
+    ```
+
+    The texts shared by several terms with the same priority (code, then label, then description) are
+    ambiguous and not indexed.
+    """
+
+    def __init__(
+        self,
+        vocabulary: VocabularyType,
+        *,
+        cache_path: Optional[str] = None,
+        threshold: float = 0.85,
+    ):
+        if not 0 < threshold <= 1:
+            raise ValueError(f'`threshold` must be in (0, 1], got {threshold}.')
+        self.code = vocabulary.defs.code
+        self.terms = frozenset(term.code for term in vocabulary.terms)
+        self.cache_path = cache_path
+        self.threshold = threshold
+        self.stats: Counter = Counter()
+        self._exact = self._index(vocabulary, lambda text: text)
+        self._normalized = self._index(vocabulary, normalize_text)
+        self._candidates = sorted(self._normalized.items())
+        self._memo: dict[str, Match] = {}
+        self.accepted: dict[str, str] = {}
+        if cache_path and os.path.exists(cache_path):
+            self._load()
+
+    @staticmethod
+    def _index(vocabulary: VocabularyType, key) -> dict[str, str]:
+        """Indexes the texts of the terms, dropping the ones shared by terms of the same priority."""
+        index: dict[str, tuple[int, str]] = {}
+        ambiguous: set[str] = set()
+        for term in vocabulary.terms:
+            texts = [('code', term.code), ('label', term.label)]
+            texts.extend(('description', half) for half in term.description.split('//'))
+            for kind, text in texts:
+                text = key(text.strip())
+                if not text:
+                    continue
+                priority = _PRIORITIES[kind]
+                current = index.get(text)
+                if current is None or priority < current[0]:
+                    index[text] = (priority, term.code)
+                    ambiguous.discard(text)
+                elif priority == current[0] and current[1] != term.code:
+                    ambiguous.add(text)
+        return {
+            text: code for text, (_, code) in index.items() if text not in ambiguous
+        }
+
+    def _load(self) -> None:
+        try:
+            with open(self.cache_path, encoding='utf-8') as f:
+                mappings = json.load(f).get(self.code, {})
+        except (OSError, ValueError):
+            logger.warning(f'Ignoring the unreadable mapping cache {self.cache_path}.')
+            return
+        for value, term in mappings.items():
+            if term in self.terms:
+                self.accepted[value] = term
+            else:
+                logger.warning(
+                    f'Dropping the cached mapping of `{value}` to {term}, which is no longer a term of {self.code}.'
+                )
+
+    def save(self) -> None:
+        """
+        Writes the accepted decisions to the mapping cache file. The mappings of the other vocabularies
+        stored in the file are kept.
+        """
+        if not self.cache_path:
+            raise ValueError('The reconciler has no `cache_path`.')
+        data = {}
+        if os.path.exists(self.cache_path):
+            try:
+                with open(self.cache_path, encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                logger.warning(
+                    f'Overwriting the unreadable mapping cache {self.cache_path}.'
+                )
+        data[self.code] = dict(sorted(self.accepted.items()))
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{self.cache_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.cache_path)
+
+    def accept(self, value: str, term: str) -> None:
+        """
+        Records the term of a legacy value, e.g., after a review of a fuzzy match. The decision takes
+        precedence over the other tiers and is persisted by `save`.
+
+        Args:
+            value (str): The legacy value.
+            term (str): The code of the term.
+        """
+        if term not in self.terms:
+            raise ValueError(f'`{term}` is not a term of {self.code}.')
+        value = value.strip()
+        self.accepted[value] = term
+        self._memo[value] = Match(value, term, 'accepted', 1.0)
+
+    def _resolve(self, value: str) -> Match:
+        term = self.accepted.get(value)
+        if term is not None:
+            return Match(value, term, 'accepted', 1.0)
+        term = self._exact.get(value)
+        if term is not None:
+            return Match(value, term, 'exact', 1.0)
+        normalized = normalize_text(value)
+        term = self._normalized.get(normalized)
+        if term is not None:
+            return Match(value, term, 'normalized', 1.0)
+        if not normalized:
+            return Match(value, None, None, 0.0)
+        best, best_score, tied = None, 0.0, False
+        for key, candidate in self._candidates:
+            # `real_quick_ratio` is an upper bound of `ratio`, so that only the keys which the value may
+            # abbreviate are scored below the threshold
+            if SequenceMatcher(
+                None, normalized, key
+            ).real_quick_ratio() < self.threshold and not key.startswith(
+                normalized[:2]
+            ):
+                continue
+            score = _similarity(normalized, key)
+            if score > best_score:
+                best, best_score, tied = candidate, score, False
+            elif score == best_score and candidate != best:
+                tied = True
+        if best is None or best_score < self.threshold or tied:
+            return Match(value, None, None, best_score)
+        return Match(value, best, 'fuzzy', best_score)
+
+    def match(self, value: Optional[str]) -> Match:
+        """
+        Resolves a legacy value into a term of the vocabulary.
+
+        Args:
+            value (Optional[str]): The legacy value.
+
+        Returns:
+            Match: The term, tier and score. The `term` and `tier` are None if the value is missing, not
+                similar enough to any term, or equally similar to several terms.
+        """
+        value = '' if value is None else str(value).strip()
+        match = self._memo.get(value)
+        if match is None:
+            match = self._resolve(value)
+            self._memo[value] = match
+            self.stats[match.tier or 'unresolved'] += 1
+            metrics.increment(f'reconciliation.{match.tier or "unresolved"}')
+        else:
+            self.stats['memoized'] += 1
+        return match
+
+    def reconcile(self, values: Iterable[Optional[str]]) -> list[Match]:
+        """
+        Resolves a column of legacy values. The distinct values are resolved once.
+
+        Args:
+            values (Iterable[Optional[str]]): The legacy values.
+
+        Returns:
+            list[Match]: The match of each value.
+        """
+        with metrics.timer('reconciliation.reconcile'):
+            return [self.match(value) for value in values]
+
+    def term_mapping(
+        self, values: Iterable[Optional[str]], min_score: Optional[float] = None
+    ) -> dict[str, str]:
+        """
+        Returns the term of the distinct resolved values, e.g., as the `term_mappings` of
+        `plan_migration`.
+
+        Args:
+            values (Iterable[Optional[str]]): The legacy values.
+            min_score (Optional[float], optional): The minimum score of the fuzzy matches. Defaults to
+                None (the `threshold`).
+
+        Returns:
+            dict[str, str]: The term codes keyed by value.
+        """
+        min_score = self.threshold if min_score is None else min_score
+        mapping = {}
+        for value in set(values):
+            match = self.match(value)
+            if match.term is not None and match.score >= min_score:
+                mapping[match.value] = match.term
+        return mapping
@@ -0,0 +1,430 @@
+import csv
+import datetime
+import re
+from collections.abc import Iterator
+from typing import Any, Callable, NamedTuple, Optional
+
+import numpy as np
+from openpyxl import load_workbook
+from openpyxl.utils import get_column_letter
+from pydantic import BaseModel, Field
+
+from bam_masterdata.ingestion.dates import NUMPY_UNITS, format_dates, parse_dates
+from bam_masterdata.logger import logger
+from bam_masterdata.metadata.definitions import DataType, PropertyTypeAssignment
+from bam_masterdata.metadata.entities import ObjectType
+from bam_masterdata.metadata.registry import EntityRegistry
+from bam_masterdata.metrics import metrics
+
+# Spellings of the boolean values accepted in text cells
+_BOOLEANS = {
+    'TRUE': True,
+    'YES': True,
+    '1': True,
+    'FALSE': False,
+    'NO': False,
+    '0': False,
+}
+
+# Columns of the error report
+REPORT_COLUMNS = ('cell', 'property', 'value', 'message')
+
+
+class CellError(NamedTuple):
+    """Validation error of a cell, with its coordinate in the sheet, e.g., `'C12'`."""
+
+    cell: str
+    property: str
+    value: Any
+    message: str
+
+
+class SpreadsheetReport(BaseModel):
+    """Summary of the validation of a spreadsheet of object instances."""
+
+    rows: int = Field(0, description='Number of non-empty rows read.')
+
+    valid_rows: int = Field(0, description='Number of rows without errors.')
+
+    uploaded_rows: int = Field(
+        0, description='Number of rows passed to the upload callback.'
+    )
+
+    chunks: int = Field(0, description='Number of chunks validated.')
+
+    uploaded_chunks: int = Field(
+        0, description='Number of chunks passed to the upload callback.'
+    )
+
+    n_errors: int = Field(0, description='Total number of cell errors.')
+
+    errors: list[CellError] = Field(
+        default=[],
+        description="""
+        First cell errors found, up to `max_errors`. The complete list is written to the report file.
+        """,
+    )
+
+    columns: dict[str, str] = Field(
+        default={},
+        description='Property code matched by each header of the sheet.',
+    )
+
+
+def _normalize_header(header: Any) -> str:
+    return re.sub(r'\s+', ' ', str(header)).strip().upper()
+
+
+def map_headers(
+    headers: tuple, properties: list[PropertyTypeAssignment]
+) -> tuple[dict[int, PropertyTypeAssignment], list[str]]:
+    """
+    Maps the headers of a sheet to the property assignments of an object type, matching them by code
+    (e.g., `'$NAME'`) or by property label (e.g., `'Name'`), case-insensitive.
+
+    Args:
+        headers (tuple): The values of the header row.
+        properties (list[PropertyTypeAssignment]): The property assignments of the object type.
+
+    Returns:
+        tuple[dict[int, PropertyTypeAssignment], list[str]]: The property assignment of each matched
+            column index, and the headers which could not be matched.
+    """
+    lookup: dict[str, PropertyTypeAssignment] = {}
+    for prop in properties:
+        lookup.setdefault(_normalize_header(prop.property_label), prop)
+    # The codes take precedence over the labels
+    for prop in properties:
+        lookup[_normalize_header(prop.code)] = prop
+    columns: dict[int, PropertyTypeAssignment] = {}
+    unknown = []
+    for index, header in enumerate(headers):
+        if header is None or str(header).strip() == '':
+            continue
+        prop = lookup.get(_normalize_header(header))
+        if prop is None:
+            unknown.append(str(header))
+        else:
+            columns[index] = prop
+    return columns, unknown
+
+
+def vocabulary_terms(registry: EntityRegistry) -> dict[str, frozenset[str]]:
+    """
+    Returns the codes of the terms of each vocabulary type of a registry.
+
+    Args:
+        registry (EntityRegistry): The registry of the datamodel.
+
+    Returns:
+        dict[str, frozenset[str]]: The term codes keyed by vocabulary code.
+    """
+    terms: dict[str, set[str]] = {}
+    for vocabulary_type, term in registry.iter_vocabulary_terms():
+        terms.setdefault(vocabulary_type.defs.code, set()).add(term.code)
+    return {code: frozenset(codes) for code, codes in terms.items()}
+
+
+def _convert(prop: PropertyTypeAssignment, value: Any, vocabularies: dict) -> Any:
+    """
+    Converts the value of a cell into the value uploaded for the property, raising a `ValueError`
+    with the message of the report if it is not valid. The DATE and TIMESTAMP strings are parsed
+    column-wise in `_convert_dates`.
+    """
+    data_type = prop.data_type
+    if data_type == DataType.INTEGER:
+        if isinstance(value, bool):
+            raise ValueError('expected an integer, got a boolean')
+        if isinstance(value, float):
+            if not value.is_integer():
+                raise ValueError('expected an integer')
+            return int(value)
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise ValueError('expected an integer') from None
+    if data_type == DataType.REAL:
+        if isinstance(value, bool):
+            raise ValueError('expected a number, got a boolean')
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            raise ValueError('expected a number') from None
+    if data_type == DataType.BOOLEAN:
+        if isinstance(value, bool):
+            return value
+        parsed = _BOOLEANS.get(str(value).strip().upper())
+        if parsed is None:
+            raise ValueError('expected a boolean')
+        return parsed
+    if data_type == DataType.CONTROLLEDVOCABULARY:
+        term = str(value).strip().upper()
+        terms = vocabularies.get(prop.vocabulary_code)
+        if terms is None:
+            raise ValueError(f'unknown vocabulary `{prop.vocabulary_code}`')
+        if term not in terms:
+            raise ValueError(f'`{term}` is not a term of {prop.vocabulary_code}')
+        return term
+    if isinstance(value, str):
+        return value
+    return str(value)
+
+
+def _convert_dates(
+    prop: PropertyTypeAssignment,
+    values: list[Any],
+    formats: dict[str, Optional[str]],
+) -> tuple[list[Optional[str]], np.ndarray]:
+    """
+    Converts a column of DATE or TIMESTAMP cells, which openpyxl returns as `datetime` objects or
+    strings, into the openBIS strings. The format of the strings is detected once per property and
+    reused for the next chunks.
+    """
+    unit = NUMPY_UNITS[prop.data_type]
+    parsed = np.full(len(values), np.datetime64('NaT'), dtype=f'datetime64[{unit}]')
+    failed = np.zeros(len(values), dtype=bool)
+    strings: list[Optional[str]] = [None] * len(values)
+    text_indices = []
+    for i, value in enumerate(values):
+        if isinstance(value, (datetime.date, datetime.datetime)):
+            parsed[i] = np.datetime64(value, unit)
+        elif value is not None:
+            strings[i] = str(value)
+            text_indices.append(i)
+    if text_indices:
+        column = parse_dates(
+            [strings[i] for i in text_indices],
+            prop.data_type,
+            fmt=formats.get(prop.code),
+        )
+        if column.format is not None:
+            formats.setdefault(prop.code, column.format)
+        parsed[text_indices] = column.values
+        failed[text_indices] = column.failed
+    return format_dates(parsed, prop.data_type), failed
+
+
+class _ChunkValidator:
+    """Validates the chunks of rows of a sheet against the mapped property assignments."""
+
+    def __init__(
+        self,
+        columns: dict[int, PropertyTypeAssignment],
+        mandatory: list[PropertyTypeAssignment],
+        vocabularies: dict[str, frozenset[str]],
+    ):
+        self.columns = columns
+        self.mandatory = mandatory
+        self.vocabularies = vocabularies
+        self.formats: dict[str, Optional[str]] = {}
+
+    def validate(
+        self, chunk: list[tuple[int, tuple]]
+    ) -> tuple[list[Optional[dict[str, Any]]], list[CellError]]:
+        """
+        Returns the record of each row of the chunk (None for the invalid rows) and the cell errors.
+        """
+        records: list[Optional[dict[str, Any]]] = [{} for _ in chunk]
+        errors: list[CellError] = []
+        # Errors are collected per row and sorted by column, so that the report follows the sheet
+        row_errors: list[list[tuple[int, CellError]]] = [[] for _ in chunk]
+        for index, prop in self.columns.items():
+            letter = get_column_letter(index + 1)
+            values = [row[index] if index < len(row) else None for _, row in chunk]
+            values = [
+                None if isinstance(value, str) and value.strip() == '' else value
+                for value in values
+            ]
+            if prop.data_type in NUMPY_UNITS:
+                converted, failed = _convert_dates(prop, values, self.formats)
+                for i, value in enumerate(values):
+                    if failed[i]:
+                        row_errors[i].append(
+                            (
+                                index,
+                                CellError(
+                                    f'{letter}{chunk[i][0]}',
+                                    prop.code,
+                                    value,
+                                    f'expected a {prop.data_type.value.lower()}',
+                                ),
+                            )
+                        )
+                    elif value is not None:
+                        records[i][prop.code] = converted[i]
+            else:
+                for i, value in enumerate(values):
+                    if value is None:
+                        continue
+                    try:
+                        records[i][prop.code] = _convert(prop, value, self.vocabularies)
+                    except ValueError as exc:
+                        row_errors[i].append(
+                            (
+                                index,
+                                CellError(
+                                    f'{letter}{chunk[i][0]}', prop.code, value, str(exc)
+                                ),
+                            )
+                        )
+            if prop.mandatory:
+                for i, value in enumerate(values):
+                    if value is None:
+                        row_errors[i].append(
+                            (
+                                index,
+                                CellError(
+                                    f'{letter}{chunk[i][0]}',
+                                    prop.code,
+                                    None,
+                                    'mandatory value is missing',
+                                ),
+                            )
+                        )
+        for i, cell_errors in enumerate(row_errors):
+            # Mandatory properties without column in the sheet are reported on the first cell of the row
+            for prop in self.mandatory:
+                cell_errors.append(
+                    (
+                        -1,
+                        CellError(
+                            f'A{chunk[i][0]}',
+                            prop.code,
+                            None,
+                            'mandatory property has no column',
+                        ),
+                    )
+                )
+            if cell_errors:
+                records[i] = None
+                errors.extend(
+                    error for _, error in sorted(cell_errors, key=lambda e: e[0])
+                )
+        return records, errors
+
+
+def _iter_chunks(
+    rows: Iterator[tuple], first_row: int, chunk_size: int
+) -> Iterator[list[tuple[int, tuple]]]:
+    chunk: list[tuple[int, tuple]] = []
+    for row_number, row in enumerate(rows, start=first_row):
+        if all(value is None or str(value).strip() == '' for value in row):
+            continue
+        chunk.append((row_number, row))
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def validate_spreadsheet(
+    path: str,
+    object_type: ObjectType,
+    upload: Optional[Callable[[list[dict[str, Any]]], None]] = None,
+    *,
+    report_path: Optional[str] = None,
+    sheet_name: Optional[str] = None,
+    header_row: int = 1,
+    chunk_size: int = 1000,
+    vocabularies: Optional[dict[str, frozenset[str]]] = None,
+    partial: bool = False,
+    max_errors: int = 100,
+) -> SpreadsheetReport:
+    """
+    Validates a spreadsheet of instances of an object type filled by the users, e.g., thousands of
+    `Instrument` rows to register. The workbook is streamed in openpyxl `read_only` mode and validated
+    in chunks of `chunk_size` rows, so that the memory used does not depend on the size of the sheet:
+
+        - The headers are mapped to the property assignments of `object_type` by code or label.
+        - Each cell is checked against the data type of its property, the mandatory properties and
+          the terms of the controlled vocabularies.
+        - The errors are written to a CSV report with the coordinate of each cell, e.g., `'C12'`.
+        - The chunks without errors are passed to `upload` as lists of `{property_code: value}` records,
+          with the values converted for openBIS (e.g., dates as `'2024-02-01'`).
+
+    E.g.:
+
+    ```python
+    report = validate_spreadsheet(
+        'instruments.xlsx', Instrument(), upload=create_objects, report_path='errors.csv'
+    )
+    print(f'{report.uploaded_rows} of {report.rows} rows uploaded, {report.n_errors} errors')
+    ```
+
+    Args:
+        path (str): The path of the Excel file.
+        object_type (ObjectType): The object type of the instances.
+        upload (Optional[Callable[[list[dict[str, Any]]], None]], optional): The callback receiving the
+            records of each valid chunk. Defaults to None (only validation).
+        report_path (Optional[str], optional): The path of the CSV error report. Defaults to None.
+        sheet_name (Optional[str], optional): The name of the sheet. Defaults to None (the active sheet).
+        header_row (int, optional): The number of the row with the headers. Defaults to 1.
+        chunk_size (int, optional): The number of rows validated and uploaded together. Defaults to 1000.
+        vocabularies (Optional[dict[str, frozenset[str]]], optional): The term codes keyed by vocabulary
+            code. Defaults to None (the vocabularies of the datamodel, see `vocabulary_terms`).
+        partial (bool, optional): If True, the valid rows of the chunks with errors are also uploaded.
+            Defaults to False.
+        max_errors (int, optional): The number of errors kept in the returned report. Defaults to 100.
+
+    Returns:
+        SpreadsheetReport: The summary of the validation.
+    """
+    properties = object_type.properties
+    report = SpreadsheetReport()
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    report_file = (
+        open(report_path, 'w', newline='', encoding='utf-8') if report_path else None
+    )
+    try:
+        sheet = workbook[sheet_name] if sheet_name else workbook.active
+        rows = sheet.iter_rows(min_row=header_row, values_only=True)
+        headers = next(rows, ())
+        columns, unknown = map_headers(headers, properties)
+        if not columns:
+            raise ValueError(
+                f'No header of the sheet matches a property of {object_type.defs.code}.'
+            )
+        for header in unknown:
+            logger.warning(f'Ignoring the column `{header}` of {path}.')
+        report.columns = {
+            str(headers[index]): prop.code for index, prop in columns.items()
+        }
+        matched = {prop.code for prop in columns.values()}
+        missing = [
+            prop for prop in properties if prop.mandatory and prop.code not in matched
+        ]
+        if vocabularies is None:
+            vocabularies = {}
+            if any(
+                prop.data_type == DataType.CONTROLLEDVOCABULARY
+                for prop in columns.values()
+            ):
+                vocabularies = vocabulary_terms(EntityRegistry.from_datamodel())
+        validator = _ChunkValidator(columns, missing, vocabularies)
+
+        writer = csv.writer(report_file) if report_file else None
+        if writer:
+            writer.writerow(REPORT_COLUMNS)
+        for chunk in _iter_chunks(rows, header_row + 1, chunk_size):
+            with metrics.timer('spreadsheet.chunk'):
+                records, errors = validator.validate(chunk)
+            valid = [record for record in records if record is not None]
+            report.rows += len(chunk)
+            report.valid_rows += len(valid)
+            report.chunks += 1
+            report.n_errors += len(errors)
+            if len(report.errors) < max_errors:
+                report.errors.extend(errors[: max_errors - len(report.errors)])
+            if writer:
+                writer.writerows(errors)
+            if upload is not None and valid and (partial or not errors):
+                upload(valid)
+                report.uploaded_rows += len(valid)
+                report.uploaded_chunks += 1
+            metrics.increment('spreadsheet.rows', len(chunk))
+    finally:
+        if report_file:
+            report_file.close()
+        workbook.close()
+    return report
@@ -0,0 +1,297 @@
+import functools
+import re
+from collections.abc import Sequence
+from typing import NamedTuple, Optional, Union
+
+import numpy as np
+
+from bam_masterdata.metadata.definitions import DataType, PropertyTypeDef
+from bam_masterdata.metadata.entities import ObjectType
+
+# Exponents of the SI base dimensions: length, mass, time, electric current, temperature, amount of
+# substance and luminous intensity
+Dimension = tuple[int, int, int, int, int, int, int]
+
+_DIMENSIONLESS: Dimension = (0, 0, 0, 0, 0, 0, 0)
+
+
+def _dimension(*, L=0, M=0, T=0, I=0, Th=0, N=0, J=0) -> Dimension:  # noqa: E741
+    return (L, M, T, I, Th, N, J)
+
+
+class Unit(NamedTuple):
+    """
+    Parsed unit: `value_in_si = value * factor + offset`. The `offset` is only non-zero for the
+    temperature scales with a shifted zero, e.g., degree Celsius.
+    """
+
+    factor: float
+    dimension: Dimension
+    offset: float = 0.0
+
+
+# Units recognized by `parse_unit`, expressed in SI base units. The SI prefixes can be added to all
+# the units except the ones with an offset, e.g., `'mm'` or `'kPa'`.
+UNITS: dict[str, Unit] = {
+    '': Unit(1.0, _DIMENSIONLESS),
+    '1': Unit(1.0, _DIMENSIONLESS),
+    '%': Unit(0.01, _DIMENSIONLESS),
+    'ppm': Unit(1e-6, _DIMENSIONLESS),
+    'rad': Unit(1.0, _DIMENSIONLESS),
+    'deg': Unit(np.pi / 180, _DIMENSIONLESS),
+    '°': Unit(np.pi / 180, _DIMENSIONLESS),
+    # Length
+    'm': Unit(1.0, _dimension(L=1)),
+    'in': Unit(0.0254, _dimension(L=1)),
+    'ft': Unit(0.3048, _dimension(L=1)),
+    'Å': Unit(1e-10, _dimension(L=1)),
+    # Mass
+    'g': Unit(1e-3, _dimension(M=1)),
+    't': Unit(1e3, _dimension(M=1)),
+    'lb': Unit(0.45359237, _dimension(M=1)),
+    # Time
+    's': Unit(1.0, _dimension(T=1)),
+    'min': Unit(60.0, _dimension(T=1)),
+    'h': Unit(3600.0, _dimension(T=1)),
+    'd': Unit(86400.0, _dimension(T=1)),
+    # Electric current, temperature, amount of substance and luminous intensity
+    'A': Unit(1.0, _dimension(I=1)),
+    'K': Unit(1.0, _dimension(Th=1)),
+    '°C': Unit(1.0, _dimension(Th=1), 273.15),
+    'degC': Unit(1.0, _dimension(Th=1), 273.15),
+    '°F': Unit(5 / 9, _dimension(Th=1), 273.15 - 32 * 5 / 9),
+    'degF': Unit(5 / 9, _dimension(Th=1), 273.15 - 32 * 5 / 9),
+    'mol': Unit(1.0, _dimension(N=1)),
+    'cd': Unit(1.0, _dimension(J=1)),
+    # Derived units
+    'L': Unit(1e-3, _dimension(L=3)),
+    'l': Unit(1e-3, _dimension(L=3)),
+    'Hz': Unit(1.0, _dimension(T=-1)),
+    'N': Unit(1.0, _dimension(L=1, M=1, T=-2)),
+    'Pa': Unit(1.0, _dimension(L=-1, M=1, T=-2)),
+    'bar': Unit(1e5, _dimension(L=-1, M=1, T=-2)),
+    'atm': Unit(101325.0, _dimension(L=-1, M=1, T=-2)),
+    'psi': Unit(6894.757293168, _dimension(L=-1, M=1, T=-2)),
+    'J': Unit(1.0, _dimension(L=2, M=1, T=-2)),
+    'eV': Unit(1.602176634e-19, _dimension(L=2, M=1, T=-2)),
+    'W': Unit(1.0, _dimension(L=2, M=1, T=-3)),
+    'C': Unit(1.0, _dimension(T=1, I=1)),
+    'V': Unit(1.0, _dimension(L=2, M=1, T=-3, I=-1)),
+    'Ohm': Unit(1.0, _dimension(L=2, M=1, T=-3, I=-2)),
+    'Ω': Unit(1.0, _dimension(L=2, M=1, T=-3, I=-2)),
+}
+
+# SI prefixes and their factors. `u` is accepted as an alternative to `µ`.
+PREFIXES = {
+    'P': 1e15,
+    'T': 1e12,
+    'G': 1e9,
+    'M': 1e6,
+    'k': 1e3,
+    'h': 1e2,
+    'da': 1e1,
+    'd': 1e-1,
+    'c': 1e-2,
+    'm': 1e-3,
+    'µ': 1e-6,
+    'u': 1e-6,
+    'n': 1e-9,
+    'p': 1e-12,
+    'f': 1e-15,
+}
+
+# Each factor of a compound unit, e.g., `'mm^2'` or `'s-1'`, and the operators between factors
+_FACTOR_PATTERN = re.compile(r'^(?P<symbol>[^\d^+-]+?)(?:\^?(?P<exponent>[+-]?\d+))?$')
+_OPERATOR_PATTERN = re.compile(r'\s*([*/·])\s*|\s+')
+
+
+def _parse_symbol(symbol: str) -> Unit:
+    """Parses a single unit symbol, optionally with an SI prefix, e.g., `'kPa'`."""
+    unit = UNITS.get(symbol)
+    if unit is not None:
+        return unit
+    for prefix, prefix_factor in PREFIXES.items():
+        if symbol.startswith(prefix):
+            unit = UNITS.get(symbol[len(prefix) :])
+            if unit is not None and unit.offset == 0 and symbol[len(prefix) :]:
+                return Unit(unit.factor * prefix_factor, unit.dimension)
+    raise ValueError(f'Unknown unit `{symbol}`.')
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_unit(unit: str) -> Unit:
+    """
+    Parses a unit expression into its factor and offset to SI base units and its dimension. The
+    expressions are products and quotients of the symbols in `UNITS` with optional SI prefixes and
+    integer exponents, e.g., `'mm'`, `'N/mm^2'`, `'kg*m/s2'` or `'J mol-1 K-1'`. The results are cached.
+
+    Args:
+        unit (str): The unit expression.
+
+    Returns:
+        Unit: The parsed unit.
+    """
+    expression = unit.strip()
+    if expression in UNITS:
+        return UNITS[expression]
+    parts = _OPERATOR_PATTERN.split(expression)
+    factor = 1.0
+    dimension = list(_DIMENSIONLESS)
+    sign = 1
+    for i, part in enumerate(parts):
+        if i % 2:
+            # Separators: `/` divides by the next factor, `*`, `·` and whitespace multiply by it
+            sign = -1 if part == '/' else 1
+            continue
+        match = _FACTOR_PATTERN.match(part or '')
+        if not match:
+            raise ValueError(f'Invalid unit expression `{unit}`.')
+        parsed = _parse_symbol(match.group('symbol'))
+        if parsed.offset:
+            raise ValueError(
+                f'The unit `{match.group("symbol")}` has an offset and cannot be part of the '
+                f'compound unit `{unit}`.'
+            )
+        exponent = sign * int(match.group('exponent') or 1)
+        factor *= parsed.factor**exponent
+        dimension = [d + exponent * e for d, e in zip(dimension, parsed.dimension)]
+    return Unit(factor, tuple(dimension))
+
+
+@functools.lru_cache(maxsize=1024)
+def conversion_factors(source: str, target: str) -> tuple[float, float]:
+    """
+    Returns the `scale` and `shift` converting values in the `source` unit into the `target` unit
+    as `value * scale + shift`. The results are cached per pair of units.
+
+    Args:
+        source (str): The unit of the values.
+        target (str): The unit to convert the values to.
+
+    Returns:
+        tuple[float, float]: The scale and shift of the conversion.
+    """
+    source_unit = parse_unit(source)
+    target_unit = parse_unit(target)
+    if source_unit.dimension != target_unit.dimension:
+        raise ValueError(
+            f'Cannot convert `{source}` into `{target}`: incompatible dimensions.'
+        )
+    scale = source_unit.factor / target_unit.factor
+    shift = (source_unit.offset - target_unit.offset) / target_unit.factor
+    return scale, shift
+
+
+def convert_values(
+    values: Union[Sequence[Optional[float]], np.ndarray],
+    source: str,
+    target: str,
+    precision: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Converts an array of values from the `source` unit into the `target` unit, rounding them to
+    `precision` decimals in the same pass. Missing values (None or NaN) are kept as NaN.
+
+    Args:
+        values (Union[Sequence[Optional[float]], np.ndarray]): The values to convert.
+        source (str): The unit of the values.
+        target (str): The unit to convert the values to.
+        precision (Optional[int], optional): The number of decimals of the result. Defaults to None.
+
+    Returns:
+        np.ndarray: The converted values as a float64 array.
+    """
+    scale, shift = conversion_factors(source, target)
+    result = np.array(
+        [np.nan if value is None else value for value in values]
+        if not isinstance(values, np.ndarray)
+        else values,
+        dtype=np.float64,
+    )
+    if scale != 1.0:
+        np.multiply(result, scale, out=result)
+    if shift:
+        np.add(result, shift, out=result)
+    if precision is not None:
+        np.round(result, precision, out=result)
+    return result
+
+
+def property_unit(prop: PropertyTypeDef) -> tuple[Optional[str], Optional[int]]:
+    """
+    Returns the unit and precision declared in the `metadata` of a property type, e.g.,
+    `{'unit': 'm', 'precision': 2}`.
+
+    Args:
+        prop (PropertyTypeDef): The property type or property type assignment.
+
+    Returns:
+        tuple[Optional[str], Optional[int]]: The unit and the precision, None if they are not declared.
+    """
+    metadata = prop.metadata or {}
+    return metadata.get('unit'), metadata.get('precision')
+
+
+def convert_columns(
+    object_type: ObjectType,
+    columns: dict[str, Union[Sequence[Optional[float]], np.ndarray]],
+    units: dict[str, str],
+) -> dict[str, np.ndarray]:
+    """
+    Unit conversion stage for a batch of instances of an object type. Each column of a REAL property,
+    keyed by the property code, is converted from its unit in `units` into the unit declared in the
+    property `metadata`, and rounded to its declared precision. E.g.:
+
+    ```python
+    converted = convert_columns(
+        Instrument(), {'LENGTH': [1.0, 2.5]}, units={'LENGTH': 'mm'}
+    )  # if `LENGTH` declares `metadata={'unit': 'm', 'precision': 4}`, `[0.001, 0.0025]`
+    ```
+
+    All the units are checked before any value is converted, so that a column with incompatible
+    dimensions rejects the whole batch.
+
+    Args:
+        object_type (ObjectType): The object type of the instances.
+        columns (dict[str, Union[Sequence[Optional[float]], np.ndarray]]): The values of each property.
+        units (dict[str, str]): The unit of each column. Columns without unit are assumed to be in the
+            declared unit of the property.
+
+    Returns:
+        dict[str, np.ndarray]: The converted columns. The columns which are not REAL properties with a
+            declared unit are returned unchanged.
+    """
+    properties = {prop.code: prop for prop in object_type.properties}
+    conversions: dict[str, tuple[str, str, Optional[int]]] = {}
+    errors = []
+    for code in columns:
+        prop = properties.get(code)
+        if prop is None or prop.data_type != DataType.REAL:
+            if code in units:
+                errors.append(
+                    f'`{code}` is not a REAL property of {object_type.defs.code}'
+                )
+            continue
+        target, precision = property_unit(prop)
+        if target is None:
+            if code in units:
+                errors.append(f'`{code}` does not declare a unit in its metadata')
+            continue
+        source = units.get(code, target)
+        try:
+            conversion_factors(source, target)
+        except ValueError as e:
+            errors.append(f'`{code}`: {e}')
+            continue
+        conversions[code] = (source, target, precision)
+    if errors:
+        raise ValueError(f'The batch was rejected: {"; ".join(errors)}.')
+
+    converted = {}
+    for code, values in columns.items():
+        if code in conversions:
+            source, target, precision = conversions[code]
+            converted[code] = convert_values(values, source, target, precision)
+        else:
+            converted[code] = values
+    return converted
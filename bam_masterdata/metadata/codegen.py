@@ -0,0 +1,476 @@
+import ast
+import hashlib
+import json
+import os
+import re
+from typing import NamedTuple, Optional
+
+from openpyxl import load_workbook
+from pydantic import BaseModel, Field
+
+from bam_masterdata.metadata.definitions import (
+    ObjectTypeDef,
+    PropertyTypeAssignment,
+    VocabularyTerm,
+    VocabularyTypeDef,
+)
+
+
+class _ModuleSpec(NamedTuple):
+    """Layout of a generated datamodel module."""
+
+    filename: str
+    base: str
+    defs_model: type[BaseModel]
+    item_model: type[BaseModel]
+    items_key: str
+    multiline_description: bool
+    header: str
+
+
+MODULES = {
+    'object_types': _ModuleSpec(
+        filename='object_types.py',
+        base='ObjectType',
+        defs_model=ObjectTypeDef,
+        item_model=PropertyTypeAssignment,
+        items_key='properties',
+        multiline_description=True,
+        header=(
+            'from bam_masterdata.metadata.definitions import ObjectTypeDef, PropertyTypeAssignment\n'
+            'from bam_masterdata.metadata.entities import ObjectType'
+        ),
+    ),
+    'vocabulary_types': _ModuleSpec(
+        filename='vocabulary_types.py',
+        base='VocabularyType',
+        defs_model=VocabularyTypeDef,
+        item_model=VocabularyTerm,
+        items_key='terms',
+        multiline_description=False,
+        header=(
+            'from bam_masterdata.metadata.definitions import (\n'
+            '    VocabularyTerm,\n'
+            '    VocabularyTypeDef,\n'
+            ')\n'
+            'from bam_masterdata.metadata.entities import VocabularyType'
+        ),
+    ),
+}
+
+# Order of the keyword arguments in the generated definitions, as written by hand in the datamodel.
+# The fields not listed are written afterwards in the order of the pydantic model.
+FIELD_ORDER = (
+    'version',
+    'code',
+    'data_type',
+    'vocabulary_code',
+    'property_label',
+    'label',
+    'description',
+)
+
+# Names of the entity blocks in the openBIS Excel masterdata exports
+EXCEL_BLOCKS = {
+    'SAMPLE_TYPE': 'object_types',
+    'OBJECT_TYPE': 'object_types',
+    'VOCABULARY_TYPE': 'vocabulary_types',
+}
+
+# Excel headers whose field name differs from the header in snake case
+_EXCEL_HEADERS = {'auto_generate_codes': 'auto_generated_codes'}
+
+
+class CodegenReport(BaseModel):
+    """Summary of the regeneration of a datamodel module."""
+
+    path: str = Field(..., description='Path of the generated module.')
+
+    written: bool = Field(
+        False,
+        description='If `True`, the module was written. Otherwise, it was left untouched.',
+    )
+
+    added: list[str] = Field(default=[], description='Codes of the new classes.')
+
+    changed: list[str] = Field(
+        default=[], description='Codes of the classes which were rewritten.'
+    )
+
+    removed: list[str] = Field(
+        default=[], description='Codes of the classes which were removed.'
+    )
+
+    unchanged: list[str] = Field(
+        default=[], description='Codes of the classes which were kept byte-identical.'
+    )
+
+
+class _ExistingClass(NamedTuple):
+    """Class parsed from an existing datamodel module."""
+
+    name: str
+    base: Optional[str]
+    source: str
+    content_hash: Optional[str]
+    attributes: dict[str, str]
+
+
+def _normalize(model: type[BaseModel], data: dict) -> dict:
+    """Validates `data` with the pydantic `model` and returns it in JSON-compatible form."""
+    return model(**data).model_dump(mode='json')
+
+
+def content_hash(defs: dict, items: list[dict]) -> str:
+    """
+    Returns the hash of the normalized content of a class of the datamodel: its `defs` and its own
+    property assignments or vocabulary terms. The order of the items does not change the hash.
+
+    Args:
+        defs (dict): The normalized definition of the entity.
+        items (list[dict]): The normalized property assignments or terms defined in the class itself.
+
+    Returns:
+        str: The SHA-256 hash of the content.
+    """
+    content = {'defs': defs, 'items': sorted(items, key=lambda item: item['code'])}
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+
+def read_excel_export(path: str) -> dict:
+    """
+    Reads an openBIS masterdata export in Excel format. Each entity is a block starting with a row
+    with its kind (`SAMPLE_TYPE`, `OBJECT_TYPE` or `VOCABULARY_TYPE`), followed by the headers and values
+    of its definition, and by the headers and rows of its property assignments or terms, until an
+    empty row. The rest of the blocks are skipped.
+
+    Args:
+        path (str): The path of the Excel file.
+
+    Returns:
+        dict: The masterdata with the same structure as `EntityRegistry.to_dict()`.
+    """
+    export: dict = {kind: {} for kind in MODULES}
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for sheet in workbook.worksheets:
+            block: list[tuple] = []
+            for row in sheet.iter_rows(values_only=True):
+                if all(cell is None or str(cell).strip() == '' for cell in row):
+                    _parse_excel_block(block, export)
+                    block = []
+                else:
+                    block.append(row)
+            _parse_excel_block(block, export)
+    finally:
+        workbook.close()
+    return export
+
+
+def _excel_record(headers: tuple, values: tuple) -> dict:
+    record = {}
+    for header, value in zip(headers, values):
+        if header is None or value is None or value == '':
+            continue
+        field = re.sub(r'\W+', '_', str(header).strip().lower())
+        field = _EXCEL_HEADERS.get(field, field)
+        if isinstance(value, str) and value.upper() in ('TRUE', 'FALSE'):
+            value = value.upper() == 'TRUE'
+        elif field == 'metadata' and isinstance(value, str):
+            value = json.loads(value)
+        record[field] = value
+    return record
+
+
+def _parse_excel_block(block: list[tuple], export: dict) -> None:
+    if len(block) < 3:
+        return
+    kind = EXCEL_BLOCKS.get(str(block[0][0]).strip().upper())
+    if kind is None:
+        return
+    spec = MODULES[kind]
+    defs = _excel_record(block[1], block[2])
+    items = []
+    if len(block) > 3:
+        items = [_excel_record(block[3], row) for row in block[4:]]
+    export[kind][defs['code']] = {'defs': defs, spec.items_key: items}
+
+
+def load_export(path: str) -> dict:
+    """
+    Loads a masterdata export from a JSON file (with the structure of `EntityRegistry.to_dict()`) or from
+    an Excel file (see `read_excel_export`).
+
+    Args:
+        path (str): The path of the export.
+
+    Returns:
+        dict: The masterdata with the same structure as `EntityRegistry.to_dict()`.
+    """
+    if path.endswith(('.xlsx', '.xlsm')):
+        return read_excel_export(path)
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _class_name(code: str) -> str:
+    """Returns the class name of a code, e.g., `'INSTRUMENT.WELDING_EQUIPMENT'` -> `'WeldingEquipment'`."""
+    return ''.join(
+        word.capitalize()
+        for word in re.split(r'[_$]+', code.rsplit('.', maxsplit=1)[-1])
+        if word
+    )
+
+
+def _attribute_name(code: str, full: bool = False) -> str:
+    """Returns the attribute name of a code, e.g., `'$NAME'` -> `'name'`."""
+    name = code if full else code.rsplit('.', maxsplit=1)[-1]
+    return re.sub(r'\W+', '_', name.replace('$', '')).strip('_').lower()
+
+
+def _literal(value, multiline: bool = False) -> str:
+    if isinstance(value, str):
+        if multiline and '\n' not in value and '"""' not in value and '\\' not in value:
+            return f'"""\n        {value}\n        """'
+        return repr(value)
+    return repr(value)
+
+
+def _render_call(
+    name: str, model: type[BaseModel], data: dict, spec: _ModuleSpec
+) -> str:
+    fields = [field for field in FIELD_ORDER if field in model.model_fields]
+    fields += [field for field in model.model_fields if field not in fields]
+    lines = [f'    {name} = {model.__name__}(']
+    for field in fields:
+        info = model.model_fields[field]
+        value = data.get(field)
+        if not info.is_required() and value == info.default:
+            continue
+        multiline = spec.multiline_description and field == 'description'
+        lines.append(f'        {field}={_literal(value, multiline)},')
+    lines.append('    )')
+    return '\n'.join(lines)
+
+
+def _parse_existing(
+    source: str, spec: _ModuleSpec
+) -> tuple[str, dict[str, _ExistingClass]]:
+    """Splits an existing module into its header and the source of each class, keyed by code."""
+    tree = ast.parse(source)
+    lines = source.splitlines(keepends=True)
+    starts = [
+        min([node.lineno] + [d.lineno for d in getattr(node, 'decorator_list', [])])
+        for node in tree.body
+    ]
+    classes = {}
+    header = None
+    for i, node in enumerate(tree.body):
+        if not isinstance(node, ast.ClassDef):
+            continue
+        start = starts[i]
+        end = next(
+            (
+                s
+                for j, s in enumerate(starts)
+                if j > i and isinstance(tree.body[j], ast.ClassDef)
+            ),
+            None,
+        )
+        if header is None:
+            header = ''.join(lines[: start - 1]).rstrip()
+        segment = ''.join(lines[start - 1 : (end - 1) if end else len(lines)]).rstrip()
+        defs = None
+        items = []
+        attributes = {}
+        parsable = True
+        for stmt in node.body:
+            if not (
+                isinstance(stmt, ast.Assign)
+                and len(stmt.targets) == 1
+                and isinstance(stmt.targets[0], ast.Name)
+                and isinstance(stmt.value, ast.Call)
+                and isinstance(stmt.value.func, ast.Name)
+            ):
+                continue
+            try:
+                kwargs = {
+                    kw.arg: ast.literal_eval(kw.value) for kw in stmt.value.keywords
+                }
+            except ValueError:
+                parsable = False
+                continue
+            func = stmt.value.func.id
+            if func == spec.defs_model.__name__ and stmt.targets[0].id == 'defs':
+                defs = kwargs
+            elif func == spec.item_model.__name__:
+                items.append(kwargs)
+                attributes[kwargs.get('code')] = stmt.targets[0].id
+        if defs is None or 'code' not in defs:
+            continue
+        try:
+            hashed = content_hash(
+                _normalize(spec.defs_model, defs),
+                [_normalize(spec.item_model, item) for item in items],
+            )
+        except ValueError:
+            hashed = None
+        base = (
+            node.bases[0].id
+            if node.bases and isinstance(node.bases[0], ast.Name)
+            else None
+        )
+        classes[defs['code']] = _ExistingClass(
+            name=node.name,
+            base=base,
+            source=segment,
+            content_hash=hashed if parsable else None,
+            attributes=attributes,
+        )
+    return header if header is not None else source.rstrip(), classes
+
+
+def _parent_code(code: str, codes: set[str]) -> Optional[str]:
+    """Returns the longest code of `codes` which is a dotted prefix of `code`."""
+    parts = code.split('.')
+    for i in range(len(parts) - 1, 0, -1):
+        candidate = '.'.join(parts[:i])
+        if candidate in codes:
+            return candidate
+    return None
+
+
+def generate_module(path: str, kind: str, definitions: dict) -> CodegenReport:
+    """
+    Regenerates incrementally a datamodel module from the definitions of an export. A class is rewritten
+    only if the content hash of its definition and own items changed, so that the source of the
+    unchanged classes (including hand-written comments) is kept as is. The classes are sorted by code,
+    so that parents precede their children, and a class inherits from the class whose code is the
+    longest dotted prefix of its own code, declaring only the items not inherited. The file is only
+    written if its content changes.
+
+    Args:
+        path (str): The path of the module, e.g., `'bam_masterdata/datamodel/object_types.py'`.
+        kind (str): `'object_types'` or `'vocabulary_types'`.
+        definitions (dict): The definitions keyed by code, with the structure of `EntityRegistry.to_dict()`.
+
+    Returns:
+        CodegenReport: The summary of the regeneration.
+    """
+    spec = MODULES[kind]
+    source = ''
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            source = f.read()
+    header, existing = (
+        _parse_existing(source, spec) if source.strip() else (spec.header, {})
+    )
+    report = CodegenReport(path=path)
+
+    codes = sorted(definitions)
+    code_set = set(codes)
+    normalized = {}
+    for code in codes:
+        data = definitions[code]
+        items = {}
+        for item in data.get(spec.items_key, []):
+            item = _normalize(spec.item_model, item)
+            items[item['code']] = item
+        normalized[code] = (_normalize(spec.defs_model, data['defs']), items)
+
+    used_names = {cls.name for c, cls in existing.items() if c in code_set}
+    class_names: dict[str, str] = {}
+    inherited_attributes: dict[str, dict[str, str]] = {}
+    segments = []
+    for code in codes:
+        defs, items = normalized[code]
+        parent = _parent_code(code, code_set)
+        parent_items = normalized[parent][1] if parent else {}
+        own_items = [
+            item
+            for item_code, item in items.items()
+            if parent_items.get(item_code) != item
+        ]
+        current = existing.get(code)
+        name = current.name if current else _class_name(code)
+        if not current:
+            # Classes of different codes ending with the same word are named after their full code
+            if name in used_names:
+                name = _class_name(code.replace('.', '_'))
+            n = 2
+            while name in used_names:
+                name = f'{_class_name(code.replace(".", "_"))}{n}'
+                n += 1
+            used_names.add(name)
+        class_names[code] = name
+        base = class_names[parent] if parent else spec.base
+        attributes = dict(inherited_attributes.get(parent, {})) if parent else {}
+
+        if (
+            current
+            and current.content_hash == content_hash(defs, own_items)
+            and current.base == base
+        ):
+            segments.append(current.source)
+            report.unchanged.append(code)
+            attributes.update(current.attributes)
+            inherited_attributes[code] = attributes
+            continue
+
+        (report.changed if current else report.added).append(code)
+        blocks = [
+            f'class {name}({base}):\n'
+            + _render_call('defs', spec.defs_model, defs, spec)
+        ]
+        for item in own_items:
+            attribute = (
+                current.attributes.get(item['code']) if current else None
+            ) or _attribute_name(item['code'])
+            taken = {
+                attr
+                for item_code, attr in attributes.items()
+                if item_code != item['code']
+            }
+            if attribute in taken:
+                attribute = _attribute_name(item['code'], full=True)
+            attributes[item['code']] = attribute
+            blocks.append(_render_call(attribute, spec.item_model, item, spec))
+        inherited_attributes[code] = attributes
+        segments.append('\n\n'.join(blocks))
+
+    report.removed = sorted(code for code in existing if code not in code_set)
+    text = '\n\n\n'.join([header] + segments) + '\n'
+    if text != source:
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+        report.written = True
+    return report
+
+
+def generate_datamodel(export: dict, output_dir: str) -> list[CodegenReport]:
+    """
+    Regenerates incrementally the `object_types.py` and `vocabulary_types.py` modules in `output_dir` from
+    a masterdata export. E.g.:
+
+    ```python
+    reports = generate_datamodel(
+        load_export('masterdata.xlsx'), output_dir='bam_masterdata/datamodel'
+    )
+    ```
+
+    Args:
+        export (dict): The masterdata with the structure of `EntityRegistry.to_dict()` (see `load_export`).
+        output_dir (str): The directory of the datamodel modules.
+
+    Returns:
+        list[CodegenReport]: The summary of the regeneration of each module.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    return [
+        generate_module(
+            os.path.join(output_dir, spec.filename), kind, export.get(kind, {})
+        )
+        for kind, spec in MODULES.items()
+    ]
@@ -0,0 +1,182 @@
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Union
+
+from bam_masterdata.metadata.definitions import ObjectTypeDef
+from bam_masterdata.metadata.entities import ObjectType
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+
+class SequenceStore(ABC):
+    """
+    Persistent store of the next free sequence number of each code prefix. The numbers are reserved in
+    blocks, and a reserved block is never handed out again, even after a restart.
+    """
+
+    @abstractmethod
+    def reserve(self, prefix: str, size: int) -> int:
+        """
+        Reserves a block of `size` consecutive sequence numbers for `prefix`.
+
+        Args:
+            prefix (str): The code prefix, e.g., `'INS'`.
+            size (int): The number of sequence numbers to reserve.
+
+        Returns:
+            int: The first sequence number of the reserved block.
+        """
+
+    @abstractmethod
+    def ensure_at_least(self, prefix: str, value: int) -> None:
+        """
+        Moves the next free sequence number of `prefix` to `value` if it is lower, e.g., to skip the codes
+        already registered in openBIS.
+        """
+
+
+class FileSequenceStore(SequenceStore):
+    """
+    `SequenceStore` persisted in a JSON file mapping each prefix to its next free sequence number. The
+    file is locked during each reservation (on POSIX systems), so that several processes can share it,
+    and it is replaced atomically, so that an interruption never loses a reservation.
+    """
+
+    def __init__(self, path: str, start: int = 1):
+        self.path = path
+        self.start = start
+        self._lock = threading.Lock()
+
+    def _update(self, prefix: str, func) -> int:
+        """Applies `func` to the next free sequence number of `prefix` and returns its old value."""
+        with self._lock, open(f'{self.path}.lock', 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                sequences = {}
+                if os.path.exists(self.path):
+                    with open(self.path, encoding='utf-8') as f:
+                        sequences = json.load(f)
+                current = sequences.get(prefix, self.start)
+                sequences[prefix] = func(current)
+                tmp_path = f'{self.path}.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(sequences, f, indent=2, sort_keys=True)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+                return current
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def reserve(self, prefix: str, size: int) -> int:
+        if size < 1:
+            raise ValueError(
+                f'The size of the reserved block must be positive, got {size}.'
+            )
+        return self._update(prefix, lambda current: current + size)
+
+    def ensure_at_least(self, prefix: str, value: int) -> None:
+        self._update(prefix, lambda current: max(current, value))
+
+
+class CodeAllocator:
+    """
+    Allocator of the auto-generated codes of an object type, composed of its `generated_code_prefix`
+    followed by a sequence number, e.g., `'INS42'`.
+
+    The sequence numbers are reserved in blocks of `block_size` in a `SequenceStore` (hi/lo allocation).
+    Each thread hands out codes from its own block, so that no lock is taken except when a block is
+    exhausted. As a consequence, the codes are unique but not contiguous across threads. The unused
+    numbers of a block are lost when the process exits. E.g.:
+
+    ```python
+    store = FileSequenceStore('sequences.json')
+    allocator = CodeAllocator.for_object_type(Instrument, store)
+    codes = allocator.allocate(1000)  # at most one reservation in the store
+    ```
+    """
+
+    def __init__(self, prefix: str, store: SequenceStore, block_size: int = 100):
+        if block_size < 1:
+            raise ValueError(f'`block_size` must be positive, got {block_size}.')
+        self.prefix = prefix
+        self.store = store
+        self.block_size = block_size
+        self._local = threading.local()
+
+    @classmethod
+    def for_object_type(
+        cls,
+        object_type: Union[ObjectTypeDef, type[ObjectType]],
+        store: SequenceStore,
+        block_size: int = 100,
+    ) -> 'CodeAllocator':
+        """
+        Creates the allocator of an object type using its `generated_code_prefix`.
+
+        Args:
+            object_type (Union[ObjectTypeDef, type[ObjectType]]): The object type or its definition.
+            store (SequenceStore): The store of the sequence numbers.
+            block_size (int, optional): The number of sequence numbers reserved at once. Defaults to 100.
+
+        Returns:
+            CodeAllocator: The allocator of the codes of the object type.
+        """
+        defs = getattr(object_type, 'defs', object_type)
+        if not defs.auto_generated_codes:
+            raise ValueError(
+                f'The object type {defs.code} does not use auto-generated codes.'
+            )
+        return cls(defs.generated_code_prefix, store, block_size=block_size)
+
+    def _format(self, number: int) -> str:
+        return f'{self.prefix}{number}'
+
+    def next_code(self) -> str:
+        """
+        Returns the next code of the block of the current thread, reserving a new block if needed.
+
+        Returns:
+            str: The allocated code.
+        """
+        local = self._local
+        number = getattr(local, 'next', 0)
+        if number >= getattr(local, 'end', 0):
+            number = self.store.reserve(self.prefix, self.block_size)
+            local.end = number + self.block_size
+        local.next = number + 1
+        return self._format(number)
+
+    def allocate(self, n: int) -> list[str]:
+        """
+        Allocates `n` codes at once, using first the remainder of the block of the current thread and
+        reserving the missing numbers in a single call to the store.
+
+        Args:
+            n (int): The number of codes to allocate.
+
+        Returns:
+            list[str]: The allocated codes.
+        """
+        local = self._local
+        start = getattr(local, 'next', 0)
+        end = getattr(local, 'end', 0)
+        taken = min(max(end - start, 0), n)
+        numbers = list(range(start, start + taken))
+        local.next = start + taken
+        missing = n - taken
+        if missing > 0:
+            # Round the reservation up to whole blocks and keep the remainder for the next calls
+            size = -(-missing // self.block_size) * self.block_size
+            first = self.store.reserve(self.prefix, size)
+            numbers.extend(range(first, first + missing))
+            local.next = first + missing
+            local.end = first + size
+        return [self._format(number) for number in numbers]
@@ -1,3 +1,4 @@
+import datetime
 import re
 from enum import Enum
 from typing import Any, Optional
@@ -33,14 +34,14 @@ class DataType(str, Enum):
         mapping = {
             'BOOLEAN': bool,
             # 'CONTROLLEDVOCABULARY': ,
-            # 'DATE': ,
+            'DATE': datetime.date,
             'HYPERLINK': str,
             'INTEGER': int,
             # 'MATERIAL': ,
             'MULTILINE_VARCHAR': str,
             # 'OBJECT': ,
             'REAL': float,
-            # 'TIMESTAMP': ,
+            'TIMESTAMP': datetime.datetime,
             'VARCHAR': str,
             # 'XML': ,
         }
@@ -146,16 +147,20 @@ class DataSetTypeDef(BaseObjectTypeDef):
         )
     """
 
-    # TODO add descriptions for `main_dataset_pattern` and `main_dataset_path`
-
     main_dataset_pattern: Optional[str] = Field(
         default=None,
-        description="""""",
+        description="""
+        Regular expression matching the name of the main file of the data set, e.g., `'.*\\.txt'`. It is
+        used to classify files into data set types (see `bam_masterdata.datasets.classifier`).
+        """,
     )
 
     main_dataset_path: Optional[str] = Field(
         default=None,
-        description="""""",
+        description="""
+        Path (relative to the root of the data set) of the folder containing the main file of the data set,
+        e.g., `'original/spectra'`.
+        """,
     )
 
 
@@ -4,19 +4,30 @@ from typing import Any, Optional
 from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 from bam_masterdata.metadata.definitions import (
+    DataSetTypeDef,
     ObjectTypeDef,
     PropertyTypeAssignment,
     VocabularyTerm,
     VocabularyTypeDef,
 )
+from bam_masterdata.metrics import metrics, timed
 
 
 class BaseEntity(BaseModel):
     """
     Base class used to define `ObjectType` and `VocabularyType` classes. It extends the `BaseModel`
     adding new methods that are useful for interfacing with openBIS.
+
+    The instantiation (`entity.init`, including the pydantic validation), the collection of the property
+    or term assignments (`entity.collect_assignments`) and the serialization of the entities are timed in
+    the `metrics` registry when it is enabled.
     """
 
+    def __init__(self, **data: Any):
+        with metrics.timer('entity.init'):
+            super().__init__(**data)
+
+    @timed('entity.to_json')
     def to_json(self, indent: Optional[int] = None) -> str:
         """
         Returns the model as a string in JSON format storing the data `defs` and the property or
@@ -39,6 +50,7 @@ class BaseEntity(BaseModel):
 
         return json.dumps(data, indent=indent)
 
+    @timed('entity.to_dict')
     def to_dict(self) -> dict:
         """
         Returns the model as a dictionary storing the data `defs` and the property or vocabulary term
@@ -82,10 +94,11 @@ class ObjectType(BaseEntity):
             Any: The data with the validated fields.
         """
         # Add all the properties assigned to the object type to the `properties` list.
-        for attr_name in dir(cls):
-            attr = getattr(cls, attr_name)
-            if isinstance(attr, PropertyTypeAssignment):
-                data.properties.append(attr)
+        with metrics.timer('entity.collect_assignments'):
+            for attr_name in dir(cls):
+                attr = getattr(cls, attr_name)
+                if isinstance(attr, PropertyTypeAssignment):
+                    data.properties.append(attr)
 
         return data
 
@@ -121,10 +134,11 @@ class VocabularyType(BaseEntity):
             Any: The data with the validated fields.
         """
         # Add all the vocabulary terms defined in the vocabulary type to the `terms` list.
-        for attr_name in dir(cls):
-            attr = getattr(cls, attr_name)
-            if isinstance(attr, VocabularyTerm):
-                data.terms.append(attr)
+        with metrics.timer('entity.collect_assignments'):
+            for attr_name in dir(cls):
+                attr = getattr(cls, attr_name)
+                if isinstance(attr, VocabularyTerm):
+                    data.terms.append(attr)
 
         return data
 
@@ -135,3 +149,22 @@ class PropertyType(BaseEntity):
 
 class CollectionType(ObjectType):
     pass
+
+
+class DataSetType(ObjectType):
+    """
+    Base class used to define data set types. All data set types must inherit from this class. The
+    `defs` of a data set type are a `DataSetTypeDef`, e.g.:
+
+    ```python
+    class RawData(DataSetType):
+        defs = DataSetTypeDef(
+            version=1,
+            code='RAW_DATA',
+            description='Raw data//Rohdaten',
+            main_dataset_pattern='.*\\.csv',
+        )
+    ```
+    """
+
+    model_config = ConfigDict(ignored_types=(DataSetTypeDef, PropertyTypeAssignment))
@@ -0,0 +1,174 @@
+import inspect
+import json
+from collections.abc import Iterator
+from types import ModuleType
+from typing import Optional
+
+from bam_masterdata.datamodel import object_types as datamodel_object_types
+from bam_masterdata.datamodel import vocabulary_types as datamodel_vocabulary_types
+from bam_masterdata.metadata.definitions import PropertyTypeAssignment, VocabularyTerm
+from bam_masterdata.metadata.entities import DataSetType, ObjectType, VocabularyType
+
+
+class EntityRegistry:
+    """
+    Registry of the entity classes (`ObjectType` and `VocabularyType` subclasses) that together form a
+    datamodel. The registry stores the classes and instantiates them lazily, so that the properties and
+    vocabulary terms are resolved only once per class. E.g.:
+
+    ```python
+    from bam_masterdata.datamodel import object_types as datamodel_object_types
+    from bam_masterdata.datamodel import vocabulary_types as datamodel_vocabulary_types
+
+    registry = EntityRegistry.from_modules(datamodel_object_types, datamodel_vocabulary_types)
+    instrument = registry.get_object_type('INSTRUMENT')
+    ```
+    """
+
+    def __init__(
+        self,
+        object_types: Optional[list[type[ObjectType]]] = None,
+        vocabulary_types: Optional[list[type[VocabularyType]]] = None,
+        dataset_types: Optional[list[type[DataSetType]]] = None,
+    ):
+        self.object_types: list[type[ObjectType]] = list(object_types or [])
+        self.vocabulary_types: list[type[VocabularyType]] = list(vocabulary_types or [])
+        self.dataset_types: list[type[DataSetType]] = list(dataset_types or [])
+        self._instances: dict[type, object] = {}
+
+    @classmethod
+    def from_modules(cls, *modules: ModuleType) -> 'EntityRegistry':
+        """
+        Creates a registry from the entity classes defined in the given modules. Only the classes
+        defined in the modules themselves are collected, i.e., imported classes are skipped.
+
+        Args:
+            *modules (ModuleType): The modules containing the entity classes.
+
+        Returns:
+            EntityRegistry: The registry with the collected entity classes.
+        """
+        object_types = []
+        vocabulary_types = []
+        dataset_types = []
+        for module in modules:
+            for _, attr in inspect.getmembers(module, inspect.isclass):
+                if attr.__module__ != module.__name__:
+                    continue
+                if issubclass(attr, DataSetType):
+                    dataset_types.append(attr)
+                elif issubclass(attr, ObjectType):
+                    object_types.append(attr)
+                elif issubclass(attr, VocabularyType):
+                    vocabulary_types.append(attr)
+        return cls(
+            object_types=object_types,
+            vocabulary_types=vocabulary_types,
+            dataset_types=dataset_types,
+        )
+
+    @classmethod
+    def from_datamodel(cls) -> 'EntityRegistry':
+        """
+        Creates a registry from the BAM masterdata defined in `bam_masterdata/datamodel/`.
+
+        Returns:
+            EntityRegistry: The registry with the BAM masterdata entity classes.
+        """
+        return cls.from_modules(datamodel_object_types, datamodel_vocabulary_types)
+
+    def instance(self, entity_cls: type):
+        """
+        Returns the cached instance of an entity class, instantiating it the first time.
+
+        Args:
+            entity_cls (type): The `ObjectType` or `VocabularyType` subclass.
+
+        Returns:
+            The instance of `entity_cls`.
+        """
+        instance = self._instances.get(entity_cls)
+        if instance is None:
+            instance = entity_cls()
+            self._instances[entity_cls] = instance
+        return instance
+
+    def get_object_type(self, code: str) -> Optional[ObjectType]:
+        """
+        Returns the instance of the object type with the given `code`, or None if it is not registered.
+        """
+        for object_type in self.object_types:
+            if object_type.defs.code == code:
+                return self.instance(object_type)
+        return None
+
+    def get_vocabulary_type(self, code: str) -> Optional[VocabularyType]:
+        """
+        Returns the instance of the vocabulary type with the given `code`, or None if it is not registered.
+        """
+        for vocabulary_type in self.vocabulary_types:
+            if vocabulary_type.defs.code == code:
+                return self.instance(vocabulary_type)
+        return None
+
+    def iter_property_assignments(
+        self,
+    ) -> Iterator[tuple[type[ObjectType], PropertyTypeAssignment]]:
+        """
+        Iterates over all the property type assignments of the registered object types.
+
+        Yields:
+            tuple[type[ObjectType], PropertyTypeAssignment]: The object type class and each of its
+                property type assignments.
+        """
+        for object_type in self.object_types:
+            for prop in self.instance(object_type).properties:
+                yield object_type, prop
+
+    def iter_vocabulary_terms(
+        self,
+    ) -> Iterator[tuple[type[VocabularyType], VocabularyTerm]]:
+        """
+        Iterates over all the terms of the registered vocabulary types.
+
+        Yields:
+            tuple[type[VocabularyType], VocabularyTerm]: The vocabulary type class and each of its terms.
+        """
+        for vocabulary_type in self.vocabulary_types:
+            for term in self.instance(vocabulary_type).terms:
+                yield vocabulary_type, term
+
+    def to_dict(self) -> dict:
+        """
+        Returns the registered datamodel as a dictionary with the `object_types`, `vocabulary_types` and
+        `dataset_types` keyed by their codes.
+
+        Returns:
+            dict: The dictionary representation of the datamodel.
+        """
+        return {
+            'object_types': {
+                object_type.defs.code: self.instance(object_type).to_dict()
+                for object_type in self.object_types
+            },
+            'vocabulary_types': {
+                vocabulary_type.defs.code: self.instance(vocabulary_type).to_dict()
+                for vocabulary_type in self.vocabulary_types
+            },
+            'dataset_types': {
+                dataset_type.defs.code: self.instance(dataset_type).to_dict()
+                for dataset_type in self.dataset_types
+            },
+        }
+
+    def to_json(self, indent: Optional[int] = None) -> str:
+        """
+        Returns the registered datamodel as a string in JSON format.
+
+        Args:
+            indent (Optional[int], optional): The indent to print in JSON. Defaults to None.
+
+        Returns:
+            str: The JSON representation of the datamodel.
+        """
+        return json.dumps(self.to_dict(), indent=indent)
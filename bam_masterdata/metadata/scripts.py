@@ -0,0 +1,456 @@
+import ast
+import builtins
+import datetime
+import functools
+import math
+import os
+import re
+from collections.abc import Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from types import CodeType, SimpleNamespace
+from typing import Any, NamedTuple, Optional
+
+from bam_masterdata.metadata.definitions import BaseObjectTypeDef, PropertyTypeDef
+from bam_masterdata.metrics import metrics
+
+# Builtins available to the scripts. The import machinery, file access and introspection are excluded.
+SAFE_BUILTINS = {
+    name: getattr(builtins, name)
+    for name in (
+        'abs',
+        'all',
+        'any',
+        'bool',
+        'dict',
+        'enumerate',
+        'Exception',
+        'filter',
+        'float',
+        'int',
+        'isinstance',
+        'len',
+        'list',
+        'map',
+        'max',
+        'min',
+        'range',
+        'reversed',
+        'round',
+        'set',
+        'sorted',
+        'str',
+        'sum',
+        'tuple',
+        'ValueError',
+        'zip',
+        'None',
+        'True',
+        'False',
+    )
+    if hasattr(builtins, name)
+}
+
+# Namespaces available as globals in the scripts, mirroring the modules of the openBIS scripting
+# environment (e.g., `datetime.date`, `math.sqrt` or `re.match`). Only the listed callables and
+# constants are exposed, never the module objects, whose attributes (e.g., `datetime.sys`) reach the
+# rest of the interpreter.
+SAFE_MODULES = {
+    'datetime': SimpleNamespace(
+        date=datetime.date,
+        datetime=datetime.datetime,
+        time=datetime.time,
+        timedelta=datetime.timedelta,
+        timezone=datetime.timezone,
+    ),
+    'math': SimpleNamespace(
+        **{
+            name: getattr(math, name)
+            for name in (
+                'ceil',
+                'e',
+                'exp',
+                'fabs',
+                'floor',
+                'inf',
+                'isclose',
+                'isfinite',
+                'isinf',
+                'isnan',
+                'log',
+                'log10',
+                'nan',
+                'pi',
+                'pow',
+                'sqrt',
+                'trunc',
+            )
+        }
+    ),
+    're': SimpleNamespace(
+        **{
+            name: getattr(re, name)
+            for name in (
+                'compile',
+                'findall',
+                'fullmatch',
+                'IGNORECASE',
+                'match',
+                'search',
+                'split',
+                'sub',
+            )
+        }
+    ),
+}
+
+# Attributes of frames, generators, coroutines and tracebacks, which reach the globals of the calling
+# code, and of `str.format`, which reads the attributes named in the format string
+_FORBIDDEN_ATTRIBUTES = frozenset(
+    (
+        'ag_frame',
+        'cr_frame',
+        'f_back',
+        'f_builtins',
+        'f_globals',
+        'f_locals',
+        'format',
+        'format_map',
+        'gi_code',
+        'gi_frame',
+        'gi_yieldfrom',
+        'tb_frame',
+        'tb_next',
+    )
+)
+
+# Name of a script registered as an openBIS plugin, e.g., `'DEFAULT_EXPERIMENT.date_range_validation'`
+_PLUGIN_NAME = re.compile(r'^[A-Za-z_][\w.\-]*$')
+
+
+class ScriptResult(NamedTuple):
+    """
+    Result of running a script over one record: the `value` returned (the error message of a validation
+    script, the computed value of a dynamic property script) or the `error` raised by the script.
+    """
+
+    index: int
+    value: Any
+    error: Optional[str] = None
+
+
+class ScriptEntity:
+    """
+    Read-only view of an instance record exposing the subset of the openBIS scripting API used by the
+    validation and dynamic property scripts, i.e., `entity.propertyValue(code)` and `entity.code()`.
+    """
+
+    __slots__ = ('_code', '_properties')
+
+    def __init__(self, properties: Mapping[str, Any], code: Optional[str] = None):
+        self._properties = properties
+        self._code = code
+
+    def propertyValue(self, code: str) -> Any:  # noqa: N802
+        value = self._properties.get(code)
+        return None if value is None else str(value)
+
+    def propertyRawValue(self, code: str) -> Any:  # noqa: N802
+        return self._properties.get(code)
+
+    def code(self) -> Optional[str]:
+        return self._code
+
+
+def _check_restricted(tree: ast.AST, name: str) -> None:
+    """
+    Rejects the scripts using imports, names starting with `__`, or attributes starting with `_` or
+    reaching the frames of the interpreter, which would escape the restricted namespace.
+    """
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Import, ast.ImportFrom)):
+            raise ValueError(f'The script {name} cannot import modules.')
+        if isinstance(node, ast.Attribute) and (
+            node.attr.startswith('_') or node.attr in _FORBIDDEN_ATTRIBUTES
+        ):
+            raise ValueError(
+                f'The script {name} cannot access the attribute `{node.attr}`.'
+            )
+        # Class patterns read attributes by name, e.g., `case str(format=fmt):`
+        for attr in getattr(node, 'kwd_attrs', None) or ():
+            if attr.startswith('_') or attr in _FORBIDDEN_ATTRIBUTES:
+                raise ValueError(
+                    f'The script {name} cannot access the attribute `{attr}`.'
+                )
+        if isinstance(node, ast.Name) and node.id.startswith('__'):
+            raise ValueError(f'The script {name} cannot access `{node.id}`.')
+
+
+@functools.lru_cache(maxsize=256)
+def compile_script(source: str, name: str = '<script>') -> tuple[CodeType, bool]:
+    """
+    Compiles a script once into a code object. The results are cached by source, so that the scripts
+    shared by many object types or records are only compiled once per process. Single expressions
+    (e.g., `entity.propertyValue('WIDTH')`) are compiled in `eval` mode.
+
+    Only the Python-compatible subset of the openBIS (Jython) scripts is supported: the scripts using
+    Python 2 syntax, imports, private attributes (starting with `_`) or frame attributes raise a
+    ValueError.
+
+    Args:
+        source (str): The source code of the script.
+        name (str, optional): The name of the script used in the error messages. Defaults to '<script>'.
+
+    Returns:
+        tuple[CodeType, bool]: The code object, and True if the script is a single expression.
+    """
+    metrics.increment('scripts.compiled')
+    source = source.strip()
+    try:
+        tree = ast.parse(source, filename=name, mode='eval')
+        is_expression = True
+    except SyntaxError:
+        try:
+            tree = ast.parse(source, filename=name, mode='exec')
+        except SyntaxError as e:
+            raise ValueError(
+                f'The script {name} is not valid Python: {e.msg} (line {e.lineno}).'
+            ) from e
+        is_expression = False
+    _check_restricted(tree, name)
+    return compile(tree, name, 'eval' if is_expression else 'exec'), is_expression
+
+
+def restricted_namespace() -> dict[str, Any]:
+    """
+    Returns a new global namespace with only the `SAFE_BUILTINS` and `SAFE_MODULES`. The namespace holds
+    no module objects, so that, together with the checks of `compile_script`, the scripts only reach the
+    exposed callables.
+    """
+    return {'__builtins__': dict(SAFE_BUILTINS), **SAFE_MODULES}
+
+
+def run_script(
+    source: str,
+    records: Sequence[Mapping[str, Any]],
+    function: str,
+    codes: Optional[Sequence[Optional[str]]] = None,
+    name: str = '<script>',
+) -> list[ScriptResult]:
+    """
+    Runs a script over a batch of records. The compiled script is executed once per batch in a restricted
+    namespace, and then `function` is called for each record with the global `entity` set to a
+    `ScriptEntity` of the record. If the script is a single expression, it is evaluated for each record.
+
+    Args:
+        source (str): The source code of the script.
+        records (Sequence[Mapping[str, Any]]): The property values of each record keyed by property code.
+        function (str): The function called for each record, e.g., `'validate'` or `'calculate'`.
+        codes (Optional[Sequence[Optional[str]]], optional): The codes of the records. Defaults to None.
+        name (str, optional): The name of the script used in the error messages. Defaults to '<script>'.
+
+    Returns:
+        list[ScriptResult]: The result of each record.
+    """
+    code, is_expression = compile_script(source, name)
+    namespace = restricted_namespace()
+    results = []
+    with metrics.timer('scripts.run'):
+        if not is_expression:
+            exec(code, namespace)  # noqa: S102
+            func = namespace.get(function)
+            if not callable(func):
+                raise ValueError(f'The script {name} does not define `{function}`.')
+            n_args = func.__code__.co_argcount
+        for i, record in enumerate(records):
+            entity = ScriptEntity(record, codes[i] if codes is not None else None)
+            namespace['entity'] = entity
+            try:
+                if is_expression:
+                    value = eval(code, namespace)  # noqa: S307
+                else:
+                    # Validation scripts are called as `validate(entity, isNew)`, dynamic property scripts
+                    # as `calculate()` with the global `entity`
+                    value = func(*(entity, True)[:n_args])
+            except Exception as e:
+                results.append(
+                    ScriptResult(index=i, value=None, error=f'{type(e).__name__}: {e}')
+                )
+                continue
+            results.append(ScriptResult(index=i, value=value))
+    return results
+
+
+def _run_chunk(args: tuple) -> list[ScriptResult]:
+    source, records, function, codes, name, offset = args
+    return [
+        result._replace(index=result.index + offset)
+        for result in run_script(source, records, function, codes, name)
+    ]
+
+
+def run_script_parallel(
+    source: str,
+    records: Sequence[Mapping[str, Any]],
+    function: str,
+    codes: Optional[Sequence[Optional[str]]] = None,
+    name: str = '<script>',
+    *,
+    workers: int = 0,
+    chunk_size: int = 10_000,
+) -> list[ScriptResult]:
+    """
+    Runs a script over the records in chunks of `chunk_size`, fanned out over a pool of `workers`
+    processes (see `run_script`). Each worker compiles the script once. The script is compiled first in
+    the calling process, so that invalid scripts fail before starting the pool.
+
+    Args:
+        source (str): The source code of the script.
+        records (Sequence[Mapping[str, Any]]): The property values of each record keyed by property code.
+        function (str): The function called for each record, e.g., `'validate'` or `'calculate'`.
+        codes (Optional[Sequence[Optional[str]]], optional): The codes of the records. Defaults to None.
+        name (str, optional): The name of the script used in the error messages. Defaults to '<script>'.
+        workers (int, optional): The number of processes. Defaults to 0 (run in the calling process).
+        chunk_size (int, optional): The number of records sent to a worker at once. Defaults to 10000.
+
+    Returns:
+        list[ScriptResult]: The result of each record, in the order of the records.
+    """
+    compile_script(source, name)
+    if workers <= 0 or len(records) <= chunk_size:
+        return run_script(source, records, function, codes, name)
+    chunks = [
+        (
+            source,
+            list(records[start : start + chunk_size]),
+            function,
+            list(codes[start : start + chunk_size]) if codes is not None else None,
+            name,
+            start,
+        )
+        for start in range(0, len(records), chunk_size)
+    ]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk_results in executor.map(_run_chunk, chunks):
+            results.extend(chunk_results)
+    return results
+
+
+class ScriptLibrary:
+    """
+    Sources of the scripts registered as openBIS plugins, keyed by plugin name. The `validation_script`
+    and `dynamic_script` of the definitions can reference a plugin by name (e.g.,
+    `'DEFAULT_EXPERIMENT.date_range_validation'`) or contain the source of the script.
+    """
+
+    def __init__(self, scripts: Optional[dict[str, str]] = None):
+        self.scripts: dict[str, str] = dict(scripts or {})
+
+    @classmethod
+    def from_directory(cls, directory: str) -> 'ScriptLibrary':
+        """
+        Loads the scripts of a directory, named after their file names without the `.py` extension.
+
+        Args:
+            directory (str): The directory of the scripts.
+
+        Returns:
+            ScriptLibrary: The library of scripts.
+        """
+        scripts = {}
+        for filename in sorted(os.listdir(directory)):
+            if filename.endswith('.py'):
+                with open(os.path.join(directory, filename), encoding='utf-8') as f:
+                    scripts[filename[:-3]] = f.read()
+        return cls(scripts)
+
+    def resolve(self, script: str) -> str:
+        """
+        Returns the source of a script given by plugin name or by source.
+
+        Args:
+            script (str): The plugin name or the source of the script.
+
+        Returns:
+            str: The source of the script.
+        """
+        if script in self.scripts:
+            return self.scripts[script]
+        if _PLUGIN_NAME.match(script.strip()) and '(' not in script:
+            raise KeyError(f'The script {script} is not in the library.')
+        return script
+
+
+def validate_records(
+    defs: BaseObjectTypeDef,
+    records: Sequence[Mapping[str, Any]],
+    codes: Optional[Sequence[Optional[str]]] = None,
+    library: Optional[ScriptLibrary] = None,
+    **kwargs: Any,
+) -> list[ScriptResult]:
+    """
+    Runs the `validation_script` of an object, collection or data set type over a batch of records
+    before uploading them. The script must define `validate(entity, isNew)` returning an error message,
+    or None if the record is valid. E.g.:
+
+    ```python
+    results = validate_records(Instrument.defs, records, workers=4)
+    failures = [result for result in results if result.value or result.error]
+    ```
+
+    Args:
+        defs (BaseObjectTypeDef): The definition with the validation script.
+        records (Sequence[Mapping[str, Any]]): The property values of each record keyed by property code.
+        codes (Optional[Sequence[Optional[str]]], optional): The codes of the records. Defaults to None.
+        library (Optional[ScriptLibrary], optional): The library to resolve script names. Defaults to None.
+        **kwargs (Any): The `workers` and `chunk_size` passed to `run_script_parallel`.
+
+    Returns:
+        list[ScriptResult]: The result of each record. All records are valid if the definition has no
+            validation script.
+    """
+    if not defs.validation_script:
+        return [ScriptResult(index=i, value=None) for i in range(len(records))]
+    source = (library or ScriptLibrary()).resolve(defs.validation_script)
+    return run_script_parallel(
+        source,
+        records,
+        'validate',
+        codes,
+        name=f'{defs.code}.validation_script',
+        **kwargs,
+    )
+
+
+def calculate_dynamic_property(
+    prop: PropertyTypeDef,
+    records: Sequence[Mapping[str, Any]],
+    codes: Optional[Sequence[Optional[str]]] = None,
+    library: Optional[ScriptLibrary] = None,
+    **kwargs: Any,
+) -> list[ScriptResult]:
+    """
+    Computes the values of a dynamic property over a batch of records with its `dynamic_script`. The
+    script is either a single expression or defines `calculate()`, using the global `entity`.
+
+    Args:
+        prop (PropertyTypeDef): The property type with the dynamic script.
+        records (Sequence[Mapping[str, Any]]): The property values of each record keyed by property code.
+        codes (Optional[Sequence[Optional[str]]], optional): The codes of the records. Defaults to None.
+        library (Optional[ScriptLibrary], optional): The library to resolve script names. Defaults to None.
+        **kwargs (Any): The `workers` and `chunk_size` passed to `run_script_parallel`.
+
+    Returns:
+        list[ScriptResult]: The computed value of each record.
+    """
+    if not prop.dynamic_script:
+        raise ValueError(f'The property type {prop.code} has no dynamic script.')
+    source = (library or ScriptLibrary()).resolve(prop.dynamic_script)
+    return run_script_parallel(
+        source,
+        records,
+        'calculate',
+        codes,
+        name=f'{prop.code}.dynamic_script',
+        **kwargs,
+    )
@@ -0,0 +1,202 @@
+import json
+import struct
+from multiprocessing import shared_memory
+from typing import Optional
+
+from bam_masterdata.metadata.frozen import (
+    DEFINITION_MODELS,
+    FrozenEntity,
+    freeze_dump,
+)
+from bam_masterdata.metadata.registry import EntityRegistry
+
+# Header of the shared block: magic bytes and the length of the JSON index which follows
+_MAGIC = b'BAMMD1'
+_HEADER = struct.Struct(f'<{len(_MAGIC)}sQ')
+
+# Datamodel attached by `init_worker` in each worker process
+_worker_datamodel: Optional['SharedDatamodel'] = None
+
+
+class SharedDatamodel:
+    """
+    Copy of a registry of the datamodel in a `multiprocessing.shared_memory` block, so that it is
+    serialized once and attached by any number of worker processes without importing, validating or
+    pickling the entities again.
+
+    The block contains a JSON index of the offsets of each entity followed by the JSON of each entity
+    (in the format of `to_dict()`). The workers only parse the entities they access, and convert the
+    validated dumps into the read-only records of `bam_masterdata.metadata.frozen` (see `freeze`)
+    without running the validation again, so that the definitions cached per worker can be shared by
+    all the callers. E.g.:
+
+    ```python
+    with SharedDatamodel.create(EntityRegistry.from_datamodel()) as datamodel:
+        with multiprocessing.Pool(8, initializer=init_worker, initargs=(datamodel.name,)) as pool:
+            pool.map(validate_chunk, chunks)  # calls `worker_datamodel().object_type(code)`
+    ```
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool = False):
+        self.shm = shm
+        self.owner = owner
+        magic, index_length = _HEADER.unpack_from(shm.buf, 0)
+        if magic != _MAGIC:
+            raise ValueError(f'The shared memory block {shm.name} is not a datamodel.')
+        index_start = _HEADER.size
+        self.index: dict[str, dict[str, list[int]]] = json.loads(
+            bytes(shm.buf[index_start : index_start + index_length])
+        )
+        self._data_start = index_start + index_length
+        self._cache: dict[tuple[str, str], FrozenEntity] = {}
+
+    @classmethod
+    def create(
+        cls, registry: EntityRegistry, name: Optional[str] = None
+    ) -> 'SharedDatamodel':
+        """
+        Serializes a registry into a new shared memory block. The creator owns the block and unlinks it
+        when closed.
+
+        Args:
+            registry (EntityRegistry): The registry of the datamodel.
+            name (Optional[str], optional): The name of the block. Defaults to None (a unique name).
+
+        Returns:
+            SharedDatamodel: The shared datamodel.
+        """
+        index: dict[str, dict[str, list[int]]] = {}
+        blobs = []
+        offset = 0
+        for kind, definitions in registry.to_dict().items():
+            index[kind] = {}
+            for code, data in definitions.items():
+                blob = json.dumps(data, separators=(',', ':')).encode()
+                index[kind][code] = [offset, len(blob)]
+                blobs.append(blob)
+                offset += len(blob)
+        index_bytes = json.dumps(index, separators=(',', ':')).encode()
+        size = _HEADER.size + len(index_bytes) + offset
+        shm = shared_memory.SharedMemory(name=name, create=True, size=max(size, 1))
+        _HEADER.pack_into(shm.buf, 0, _MAGIC, len(index_bytes))
+        position = _HEADER.size
+        for blob in [index_bytes, *blobs]:
+            shm.buf[position : position + len(blob)] = blob
+            position += len(blob)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name: str) -> 'SharedDatamodel':
+        """
+        Attaches to a shared datamodel created by the parent process, e.g., in the initializer of the
+        workers of a pool (see `init_worker`).
+
+        Args:
+            name (str): The name of the shared memory block.
+
+        Returns:
+            SharedDatamodel: The shared datamodel.
+        """
+        # The worker processes share the resource tracker of their parent, so that the block is
+        # registered once and only unlinked by its owner
+        return cls(shared_memory.SharedMemory(name=name))
+
+    @property
+    def name(self) -> str:
+        """The name of the shared memory block, passed to the workers."""
+        return self.shm.name
+
+    @property
+    def size(self) -> int:
+        """The size of the serialized datamodel in bytes."""
+        return self._data_start + sum(
+            length for entries in self.index.values() for _, length in entries.values()
+        )
+
+    def close(self) -> None:
+        """Detaches from the block, and unlinks it if this is the owner."""
+        self._cache.clear()
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    def __enter__(self) -> 'SharedDatamodel':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def codes(self, kind: str) -> list[str]:
+        """
+        Returns the codes of the entities of a kind.
+
+        Args:
+            kind (str): `'object_types'`, `'vocabulary_types'` or `'dataset_types'`.
+
+        Returns:
+            list[str]: The codes of the entities.
+        """
+        return list(self.index.get(kind, {}))
+
+    def get(self, kind: str, code: str) -> dict:
+        """
+        Parses the data of an entity, in the format of `to_dict()`.
+
+        Args:
+            kind (str): `'object_types'`, `'vocabulary_types'` or `'dataset_types'`.
+            code (str): The code of the entity.
+
+        Returns:
+            dict: The data of the entity.
+        """
+        entry = self.index.get(kind, {}).get(code)
+        if entry is None:
+            raise KeyError(f'The {kind} {code} is not in the shared datamodel.')
+        start = self._data_start + entry[0]
+        return json.loads(bytes(self.shm.buf[start : start + entry[1]]))
+
+    def _definitions(self, kind: str, code: str) -> FrozenEntity:
+        key = (kind, code)
+        cached = self._cache.get(key)
+        if cached is None:
+            defs_model, item_model, items_key = DEFINITION_MODELS[kind]
+            data = self.get(kind, code)
+            cached = FrozenEntity(
+                defs=freeze_dump(defs_model, data['defs']),
+                items=tuple(
+                    freeze_dump(item_model, item) for item in data.get(items_key, [])
+                ),
+            )
+            self._cache[key] = cached
+        return cached
+
+    def object_type(self, code: str) -> FrozenEntity:
+        """Returns the frozen definition and property assignments of an object type."""
+        return self._definitions('object_types', code)
+
+    def vocabulary_type(self, code: str) -> FrozenEntity:
+        """Returns the frozen definition and terms of a vocabulary type."""
+        return self._definitions('vocabulary_types', code)
+
+    def dataset_type(self, code: str) -> FrozenEntity:
+        """Returns the frozen definition and property assignments of a data set type."""
+        return self._definitions('dataset_types', code)
+
+
+def init_worker(name: str) -> None:
+    """
+    Initializer of the worker processes attaching them to the shared datamodel `name`, e.g., as
+    `multiprocessing.Pool(initializer=init_worker, initargs=(datamodel.name,))`.
+
+    Args:
+        name (str): The name of the shared memory block.
+    """
+    global _worker_datamodel
+    _worker_datamodel = SharedDatamodel.attach(name)
+
+
+def worker_datamodel() -> SharedDatamodel:
+    """Returns the shared datamodel attached by `init_worker` in the current process."""
+    if _worker_datamodel is None:
+        raise RuntimeError('The worker was not initialized with `init_worker`.')
+    return _worker_datamodel
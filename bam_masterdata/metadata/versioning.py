@@ -0,0 +1,362 @@
+import hashlib
+import json
+import sqlite3
+import time
+import zlib
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from bam_masterdata.metadata.definitions import (
+    ObjectTypeDef,
+    PropertyTypeAssignment,
+    VocabularyTerm,
+    VocabularyTypeDef,
+)
+from bam_masterdata.metadata.registry import EntityRegistry
+
+# Kinds of definitions stored, coinciding with the keys of `EntityRegistry.to_dict()`
+KINDS = ('object_types', 'vocabulary_types', 'dataset_types')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS definitions (
+    kind TEXT NOT NULL,
+    code TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    checksum TEXT NOT NULL,
+    released_at REAL NOT NULL,
+    payload BLOB NOT NULL,
+    PRIMARY KEY (kind, code, version)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS definitions_released_at ON definitions (released_at);
+CREATE TABLE IF NOT EXISTS releases (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    released_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS releases_released_at ON releases (released_at);
+CREATE TABLE IF NOT EXISTS release_entries (
+    release_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    code TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    PRIMARY KEY (release_id, kind, code)
+) WITHOUT ROWID;
+"""
+
+
+class Release(BaseModel):
+    """A release of the datamodel recorded in the `DefinitionStore`."""
+
+    name: str = Field(..., description="Name of the release, e.g., `'1.2.0'`.")
+
+    released_at: float = Field(
+        ..., description='Release time as a UNIX timestamp in seconds.'
+    )
+
+    n_new_definitions: int = Field(
+        0,
+        description='Number of definition versions first recorded in this release.',
+    )
+
+
+class DefinitionVersion(BaseModel):
+    """A version of an entity definition recorded in the `DefinitionStore`."""
+
+    kind: str = Field(
+        ...,
+        description="Kind of definition: `'object_types'`, `'vocabulary_types'` or `'dataset_types'`.",
+    )
+
+    code: str = Field(..., description='Code of the definition.')
+
+    version: int = Field(..., description='Version of the definition.')
+
+    released_at: float = Field(
+        ...,
+        description='Time of the release in which this version was first recorded.',
+    )
+
+
+def _checksum(data: dict) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+class DefinitionStore:
+    """
+    Append-only store of every released version of the definitions of the datamodel, in a SQLite file.
+
+    Each definition version is stored once, compressed and indexed by `(kind, code, version)` and by
+    its release timestamp. Each release stores the version of every definition it contains, so that
+    the datamodel as of any release is rebuilt by reading only its own entries, independently of the
+    length of the history. E.g.:
+
+    ```python
+    with DefinitionStore('definitions.sqlite') as store:
+        store.record_release(EntityRegistry.from_datamodel(), name='1.2.0')
+        datamodel = store.as_of(release='1.1.0')  # same structure as `EntityRegistry.to_dict()`
+        defs, properties = store.load_object_type('INSTRUMENT', timestamp=1700000000)
+    ```
+
+    A released version is immutable: recording a definition whose content changed without increasing
+    its `version` raises a ValueError.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """Closes the connection to the SQLite file."""
+        self.connection.close()
+
+    def __enter__(self) -> 'DefinitionStore':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def record_release(
+        self,
+        registry: EntityRegistry,
+        name: str,
+        released_at: Optional[float] = None,
+    ) -> Release:
+        """
+        Records all the definitions of a registry as a new release. The definition versions already
+        stored are not duplicated. The whole release is written in a single transaction.
+
+        Args:
+            registry (EntityRegistry): The registry of the released datamodel.
+            name (str): The unique name of the release.
+            released_at (Optional[float], optional): The release time as a UNIX timestamp. It cannot be
+                earlier than the last recorded release. Defaults to None (now).
+
+        Returns:
+            Release: The recorded release.
+        """
+        if released_at is None:
+            released_at = time.time()
+        cursor = self.connection.cursor()
+        last = cursor.execute('SELECT MAX(released_at) FROM releases').fetchone()[0]
+        if last is not None and released_at < last:
+            raise ValueError(
+                f'The release {name} ({released_at}) is earlier than the last recorded release ({last}).'
+            )
+        if cursor.execute('SELECT 1 FROM releases WHERE name = ?', (name,)).fetchone():
+            raise ValueError(f'The release {name} is already recorded.')
+
+        n_new = 0
+        with self.connection:
+            cursor.execute(
+                'INSERT INTO releases (name, released_at) VALUES (?, ?)',
+                (name, released_at),
+            )
+            release_id = cursor.lastrowid
+            for kind, definitions in registry.to_dict().items():
+                for code, data in definitions.items():
+                    version = data['defs']['version']
+                    checksum = _checksum(data)
+                    stored = cursor.execute(
+                        'SELECT checksum FROM definitions WHERE kind = ? AND code = ? AND version = ?',
+                        (kind, code, version),
+                    ).fetchone()
+                    if stored is None:
+                        payload = zlib.compress(
+                            json.dumps(data, sort_keys=True).encode()
+                        )
+                        cursor.execute(
+                            'INSERT INTO definitions VALUES (?, ?, ?, ?, ?, ?)',
+                            (kind, code, version, checksum, released_at, payload),
+                        )
+                        n_new += 1
+                    elif stored[0] != checksum:
+                        raise ValueError(
+                            f'The definition {code} changed without increasing its version {version}.'
+                        )
+                    cursor.execute(
+                        'INSERT INTO release_entries VALUES (?, ?, ?, ?)',
+                        (release_id, kind, code, version),
+                    )
+        return Release(name=name, released_at=released_at, n_new_definitions=n_new)
+
+    def releases(self) -> list[Release]:
+        """Returns the recorded releases in chronological order."""
+        rows = self.connection.execute(
+            'SELECT name, released_at FROM releases ORDER BY released_at, id'
+        ).fetchall()
+        return [
+            Release(name=name, released_at=released_at) for name, released_at in rows
+        ]
+
+    def get(self, kind: str, code: str, version: int) -> Optional[dict]:
+        """
+        Returns a version of a definition.
+
+        Args:
+            kind (str): The kind of definition, e.g., `'object_types'`.
+            code (str): The code of the definition.
+            version (int): The version of the definition.
+
+        Returns:
+            Optional[dict]: The definition in the format of `to_dict()`, or None if it is not stored.
+        """
+        row = self.connection.execute(
+            'SELECT payload FROM definitions WHERE kind = ? AND code = ? AND version = ?',
+            (kind, code, version),
+        ).fetchone()
+        return json.loads(zlib.decompress(row[0])) if row else None
+
+    def history(self, code: str, kind: Optional[str] = None) -> list[DefinitionVersion]:
+        """
+        Returns all the recorded versions of a definition.
+
+        Args:
+            code (str): The code of the definition.
+            kind (Optional[str], optional): The kind of definition. Defaults to None (all kinds).
+
+        Returns:
+            list[DefinitionVersion]: The versions sorted by kind and version.
+        """
+        query = (
+            'SELECT kind, code, version, released_at FROM definitions WHERE code = ?'
+        )
+        parameters: tuple = (code,)
+        if kind is not None:
+            query += ' AND kind = ?'
+            parameters += (kind,)
+        rows = self.connection.execute(f'{query} ORDER BY kind, version', parameters)
+        return [
+            DefinitionVersion(kind=kind, code=code, version=version, released_at=at)
+            for kind, code, version, at in rows
+        ]
+
+    def released_between(self, start: float, end: float) -> list[DefinitionVersion]:
+        """
+        Returns the definition versions first released in the time interval `[start, end]`.
+
+        Args:
+            start (float): The start of the interval as a UNIX timestamp.
+            end (float): The end of the interval as a UNIX timestamp.
+
+        Returns:
+            list[DefinitionVersion]: The versions sorted by release time.
+        """
+        rows = self.connection.execute(
+            'SELECT kind, code, version, released_at FROM definitions '
+            'WHERE released_at BETWEEN ? AND ? ORDER BY released_at, kind, code',
+            (start, end),
+        )
+        return [
+            DefinitionVersion(kind=kind, code=code, version=version, released_at=at)
+            for kind, code, version, at in rows
+        ]
+
+    def _release_id(
+        self, release: Optional[str] = None, timestamp: Optional[float] = None
+    ) -> int:
+        """Returns the id of the named release, or of the last release at `timestamp`."""
+        if (release is None) == (timestamp is None):
+            raise ValueError('Exactly one of `release` or `timestamp` must be given.')
+        if release is not None:
+            row = self.connection.execute(
+                'SELECT id FROM releases WHERE name = ?', (release,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(f'The release {release} is not recorded.')
+        else:
+            row = self.connection.execute(
+                'SELECT id FROM releases WHERE released_at <= ? '
+                'ORDER BY released_at DESC, id DESC LIMIT 1',
+                (timestamp,),
+            ).fetchone()
+            if row is None:
+                raise KeyError(f'No release was recorded before {timestamp}.')
+        return row[0]
+
+    def as_of(
+        self, release: Optional[str] = None, timestamp: Optional[float] = None
+    ) -> dict:
+        """
+        Rebuilds the datamodel of a release, given by its name or by a point in time (the last release
+        recorded at or before `timestamp`).
+
+        Args:
+            release (Optional[str], optional): The name of the release. Defaults to None.
+            timestamp (Optional[float], optional): The point in time as a UNIX timestamp. Defaults to None.
+
+        Returns:
+            dict: The datamodel with the same structure as `EntityRegistry.to_dict()`.
+        """
+        release_id = self._release_id(release, timestamp)
+        rows = self.connection.execute(
+            'SELECT d.kind, d.code, d.payload FROM release_entries e '
+            'JOIN definitions d ON d.kind = e.kind AND d.code = e.code AND d.version = e.version '
+            'WHERE e.release_id = ? ORDER BY e.kind, e.code',
+            (release_id,),
+        )
+        datamodel: dict = {kind: {} for kind in KINDS}
+        for kind, code, payload in rows:
+            datamodel.setdefault(kind, {})[code] = json.loads(zlib.decompress(payload))
+        return datamodel
+
+    def _load(
+        self, kind: str, code: str, release: Optional[str], timestamp: Optional[float]
+    ) -> dict:
+        release_id = self._release_id(release, timestamp)
+        row = self.connection.execute(
+            'SELECT d.payload FROM release_entries e '
+            'JOIN definitions d ON d.kind = e.kind AND d.code = e.code AND d.version = e.version '
+            'WHERE e.release_id = ? AND e.kind = ? AND e.code = ?',
+            (release_id, kind, code),
+        ).fetchone()
+        if row is None:
+            raise KeyError(f'The definition {code} is not part of the release.')
+        return json.loads(zlib.decompress(row[0]))
+
+    def load_object_type(
+        self,
+        code: str,
+        release: Optional[str] = None,
+        timestamp: Optional[float] = None,
+    ) -> tuple[ObjectTypeDef, list[PropertyTypeAssignment]]:
+        """
+        Loads the definition and property assignments of an object type as they were in a release, e.g.,
+        to validate data against the schema in force when it was registered.
+
+        Args:
+            code (str): The code of the object type.
+            release (Optional[str], optional): The name of the release. Defaults to None.
+            timestamp (Optional[float], optional): The point in time as a UNIX timestamp. Defaults to None.
+
+        Returns:
+            tuple[ObjectTypeDef, list[PropertyTypeAssignment]]: The object type definition and its
+                property assignments.
+        """
+        data = self._load('object_types', code, release, timestamp)
+        return ObjectTypeDef(**data['defs']), [
+            PropertyTypeAssignment(**prop) for prop in data.get('properties', [])
+        ]
+
+    def load_vocabulary_type(
+        self,
+        code: str,
+        release: Optional[str] = None,
+        timestamp: Optional[float] = None,
+    ) -> tuple[VocabularyTypeDef, list[VocabularyTerm]]:
+        """
+        Loads the definition and terms of a vocabulary type as they were in a release.
+
+        Args:
+            code (str): The code of the vocabulary type.
+            release (Optional[str], optional): The name of the release. Defaults to None.
+            timestamp (Optional[float], optional): The point in time as a UNIX timestamp. Defaults to None.
+
+        Returns:
+            tuple[VocabularyTypeDef, list[VocabularyTerm]]: The vocabulary type definition and its terms.
+        """
+        data = self._load('vocabulary_types', code, release, timestamp)
+        return VocabularyTypeDef(**data['defs']), [
+            VocabularyTerm(**term) for term in data.get('terms', [])
+        ]
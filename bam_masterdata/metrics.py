@@ -0,0 +1,295 @@
+import contextlib
+import functools
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Optional
+
+# Prefix of the metric names when exported in the Prometheus text format
+PROMETHEUS_PREFIX = 'bam_masterdata'
+
+# Shared no-op context manager returned by `MetricsRegistry.timer` when the metrics are disabled
+_NULL_TIMER = contextlib.nullcontext()
+
+
+class _Timer:
+    """Context manager measuring the wall time of its block and storing it in a `MetricsRegistry`."""
+
+    __slots__ = ('registry', 'name', 'start')
+
+    def __init__(self, registry: 'MetricsRegistry', name: str):
+        self.registry = registry
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> '_Timer':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.registry.observe(self.name, time.perf_counter() - self.start)
+
+
+class MetricsRegistry:
+    """
+    Thread-safe registry of counters and timers used to instrument the hot paths of the package
+    (entity instantiation and validation, serialization, pyBIS round trips, Excel I/O).
+
+    The registry is disabled by default, in which case `timer` returns a shared no-op context
+    manager and `increment` and `observe` return immediately. It can be enabled by calling `enable()`
+    or by setting the environment variable `BAM_MASTERDATA_METRICS=1`. E.g.:
+
+    ```python
+    from bam_masterdata.metrics import metrics
+
+    metrics.enable()
+    with metrics.timer('export.excel'):
+        ...
+    print(metrics.summary_table())
+    metrics.write_prometheus('/var/lib/node_exporter/bam_masterdata.prom')
+    ```
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = {}
+        # Each timer stores `[count, total, min, max]` in seconds
+        self._timers: dict[str, list] = {}
+
+    def enable(self) -> None:
+        """Enables the collection of metrics."""
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Disables the collection of metrics. The metrics collected so far are kept."""
+        self.enabled = False
+
+    def reset(self) -> None:
+        """Removes all the collected metrics."""
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """
+        Increments the counter `name` by `value`.
+
+        Args:
+            name (str): The name of the counter, e.g., `'pybis.round_trips'`.
+            value (float, optional): The increment. Defaults to 1.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, seconds: float) -> None:
+        """
+        Records a duration of `seconds` in the timer `name`.
+
+        Args:
+            name (str): The name of the timer, e.g., `'entity.to_json'`.
+            seconds (float): The measured duration in seconds.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            stats = self._timers.get(name)
+            if stats is None:
+                self._timers[name] = [1, seconds, seconds, seconds]
+            else:
+                stats[0] += 1
+                stats[1] += seconds
+                stats[2] = min(stats[2], seconds)
+                stats[3] = max(stats[3], seconds)
+
+    def timer(self, name: str):
+        """
+        Returns a context manager measuring the duration of its block in the timer `name`.
+
+        Args:
+            name (str): The name of the timer.
+
+        Returns:
+            The timing context manager, or a no-op context manager if the metrics are disabled.
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name)
+
+    def snapshot(self) -> dict:
+        """
+        Returns a copy of the collected metrics.
+
+        Returns:
+            dict: The `counters` with their values, and the `timers` with their `count`, `total`,
+                `mean`, `min` and `max` durations in seconds.
+        """
+        with self._lock:
+            counters = dict(self._counters)
+            timers = {name: list(stats) for name, stats in self._timers.items()}
+        return {
+            'counters': counters,
+            'timers': {
+                name: {
+                    'count': count,
+                    'total': total,
+                    'mean': total / count,
+                    'min': min_,
+                    'max': max_,
+                }
+                for name, (count, total, min_, max_) in timers.items()
+            },
+        }
+
+    def to_json(self, indent: Optional[int] = None) -> str:
+        """
+        Returns the collected metrics as a string in JSON format.
+
+        Args:
+            indent (Optional[int], optional): The indent to print in JSON. Defaults to None.
+
+        Returns:
+            str: The JSON representation of the metrics.
+        """
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def summary_table(self) -> str:
+        """
+        Returns the collected metrics as a human-readable table, with the timers sorted by their
+        total time.
+
+        Returns:
+            str: The summary table.
+        """
+        data = self.snapshot()
+        lines = [
+            f'{"timer":<40} {"count":>10} {"total ms":>12} {"mean ms":>10} {"min ms":>10} {"max ms":>10}'
+        ]
+        timers = sorted(
+            data['timers'].items(), key=lambda item: item[1]['total'], reverse=True
+        )
+        for name, stats in timers:
+            lines.append(
+                f'{name:<40} {stats["count"]:>10} {stats["total"] * 1e3:>12.3f} '
+                f'{stats["mean"] * 1e3:>10.3f} {stats["min"] * 1e3:>10.3f} {stats["max"] * 1e3:>10.3f}'
+            )
+        if data['counters']:
+            lines.append('')
+            lines.append(f'{"counter":<40} {"value":>10}')
+            for name, value in sorted(data['counters'].items()):
+                lines.append(f'{name:<40} {value:>10g}')
+        return '\n'.join(lines)
+
+    def to_prometheus(self) -> str:
+        """
+        Returns the collected metrics in the Prometheus text exposition format. The counters are
+        exported as `<name>_total` and the timers as summaries `<name>_seconds_count` and
+        `<name>_seconds_sum`.
+
+        Returns:
+            str: The metrics in the Prometheus text format.
+        """
+        data = self.snapshot()
+        lines = []
+        for name, value in sorted(data['counters'].items()):
+            metric = f'{_prometheus_name(name)}_total'
+            lines.append(f'# TYPE {metric} counter')
+            lines.append(f'{metric} {value:g}')
+        for name, stats in sorted(data['timers'].items()):
+            metric = f'{_prometheus_name(name)}_seconds'
+            lines.append(f'# TYPE {metric} summary')
+            lines.append(f'{metric}_count {stats["count"]}')
+            lines.append(f'{metric}_sum {stats["total"]:.9f}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path: str) -> None:
+        """
+        Writes the collected metrics in the Prometheus text format to the file in `path`. The file
+        is replaced atomically, so that it can be read at any time by a textfile collector.
+
+        Args:
+            path (str): The path of the `.prom` file.
+        """
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+
+def _prometheus_name(name: str) -> str:
+    """Converts a metric name into a valid Prometheus metric name, e.g., `'entity.to_json'`."""
+    return f'{PROMETHEUS_PREFIX}_{re.sub(r"[^a-zA-Z0-9_]", "_", name)}'
+
+
+# Global registry used to instrument the package
+metrics = MetricsRegistry(
+    enabled=os.getenv('BAM_MASTERDATA_METRICS', '0') not in ('', '0')
+)
+
+
+def timed(name: str) -> Callable:
+    """
+    Decorator measuring the duration of each call of the decorated function in the timer `name`
+    of the global `metrics` registry. When the metrics are disabled, the function is called directly.
+
+    Args:
+        name (str): The name of the timer.
+
+    Returns:
+        Callable: The decorator.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                metrics.observe(name, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+class InstrumentedClient:
+    """
+    Proxy around a pyBIS `Openbis` client (or any other client object) which times each method call
+    in the global `metrics` registry as `<prefix>.<method>` and counts the round trips in the counter
+    `<prefix>.round_trips`. The attributes which are not callable are returned untouched. E.g.:
+
+    ```python
+    from pybis import Openbis
+
+    openbis = InstrumentedClient(Openbis('https://devel.datastore.bam.de/'))
+    openbis.get_spaces()
+    ```
+    """
+
+    def __init__(self, client: Any, prefix: str = 'pybis'):
+        self._client = client
+        self._prefix = prefix
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._client, name)
+        if not callable(attr) or name.startswith('_'):
+            return attr
+        timer_name = f'{self._prefix}.{name}'
+        counter_name = f'{self._prefix}.round_trips'
+
+        @functools.wraps(attr)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return attr(*args, **kwargs)
+            metrics.increment(counter_name)
+            with metrics.timer(timer_name):
+                return attr(*args, **kwargs)
+
+        return wrapper
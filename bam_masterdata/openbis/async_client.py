@@ -0,0 +1,174 @@
+import asyncio
+import functools
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+from bam_masterdata.metrics import metrics
+
+
+class AsyncOpenbis:
+    """
+    Asyncio facade over a pyBIS `Openbis` client. Each pyBIS method is exposed as a coroutine which
+    runs the blocking call in a dedicated thread pool, so that the event loop is not blocked. The
+    number of calls in flight is bounded by a semaphore of `max_concurrency`, and each call can be
+    given a timeout, e.g.:
+
+    ```python
+    from pybis import Openbis
+
+    async with AsyncOpenbis(Openbis('https://devel.datastore.bam.de/'), max_concurrency=8) as openbis:
+        spaces = await openbis.get_spaces()
+        objects = await openbis.get_objects_many(['/BAM/PROJECT/OBJ1', '/BAM/PROJECT/OBJ2'])
+    ```
+
+    A call which times out or whose task is cancelled is cancelled in the pool if it has not started
+    yet; pyBIS calls which already started cannot be interrupted and run until they return, but their
+    result is discarded and their slot of the semaphore is released.
+    """
+
+    def __init__(
+        self,
+        openbis: Any,
+        max_concurrency: int = 8,
+        timeout: Optional[float] = None,
+        executor: Optional[ThreadPoolExecutor] = None,
+    ):
+        if max_concurrency < 1:
+            raise ValueError(
+                f'`max_concurrency` must be at least 1, got {max_concurrency}.'
+            )
+        self.openbis = openbis
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._owns_executor = executor is None
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix='pybis'
+        )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # The semaphore is created lazily, in the event loop which runs the calls
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def call(
+        self,
+        method: str,
+        *args: Any,
+        timeout: Optional[float] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Calls a method of the pyBIS client in the thread pool.
+
+        Args:
+            method (str): The name of the method, e.g., `'get_object'`.
+            *args (Any): The positional arguments of the method.
+            timeout (Optional[float], optional): The timeout in seconds of the call, including the time
+                waiting for a free slot. Defaults to None (the timeout of the client).
+            **kwargs (Any): The keyword arguments of the method.
+
+        Returns:
+            Any: The result of the method.
+        """
+        function = functools.partial(getattr(self.openbis, method), *args, **kwargs)
+        timeout = self.timeout if timeout is None else timeout
+        return await asyncio.wait_for(self._run(method, function), timeout)
+
+    async def _run(self, method: str, function: functools.partial) -> Any:
+        loop = asyncio.get_running_loop()
+        async with self._get_semaphore():
+            metrics.increment('pybis_async.calls')
+            with metrics.timer(f'pybis_async.{method}'):
+                return await loop.run_in_executor(self.executor, function)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_'):
+            raise AttributeError(name)
+        attr = getattr(self.openbis, name)
+        if not callable(attr):
+            return attr
+
+        async def method(*args, timeout: Optional[float] = None, **kwargs):
+            return await self.call(name, *args, timeout=timeout, **kwargs)
+
+        method.__name__ = name
+        method.__doc__ = getattr(attr, '__doc__', None)
+        return method
+
+    async def _call_many(
+        self,
+        method: str,
+        identifiers: Iterable[str],
+        timeout: Optional[float],
+        return_exceptions: bool,
+        kwargs: dict,
+    ) -> list:
+        return await asyncio.gather(
+            *(
+                self.call(method, identifier, timeout=timeout, **kwargs)
+                for identifier in identifiers
+            ),
+            return_exceptions=return_exceptions,
+        )
+
+    async def get_objects_many(
+        self,
+        identifiers: Iterable[str],
+        timeout: Optional[float] = None,
+        return_exceptions: bool = False,
+        **kwargs: Any,
+    ) -> list:
+        """
+        Fetches objects concurrently with `get_object`, at most `max_concurrency` at a time.
+
+        Args:
+            identifiers (Iterable[str]): The identifiers or permIds of the objects.
+            timeout (Optional[float], optional): The timeout in seconds of each call. Defaults to None.
+            return_exceptions (bool, optional): If True, the failed calls return their exception instead
+                of raising it. Defaults to False.
+            **kwargs (Any): The keyword arguments of `get_object`, e.g., `props='*'`.
+
+        Returns:
+            list: The objects in the order of `identifiers`.
+        """
+        return await self._call_many(
+            'get_object', identifiers, timeout, return_exceptions, kwargs
+        )
+
+    async def get_datasets_many(
+        self,
+        perm_ids: Iterable[str],
+        timeout: Optional[float] = None,
+        return_exceptions: bool = False,
+        **kwargs: Any,
+    ) -> list:
+        """
+        Fetches data sets concurrently with `get_dataset`, at most `max_concurrency` at a time.
+
+        Args:
+            perm_ids (Iterable[str]): The permIds of the data sets.
+            timeout (Optional[float], optional): The timeout in seconds of each call. Defaults to None.
+            return_exceptions (bool, optional): If True, the failed calls return their exception instead
+                of raising it. Defaults to False.
+            **kwargs (Any): The keyword arguments of `get_dataset`.
+
+        Returns:
+            list: The data sets in the order of `perm_ids`.
+        """
+        return await self._call_many(
+            'get_dataset', perm_ids, timeout, return_exceptions, kwargs
+        )
+
+    def close(self) -> None:
+        """Shuts down the thread pool, if it was created by the client."""
+        if self._owns_executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def __aenter__(self) -> 'AsyncOpenbis':
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        self.close()
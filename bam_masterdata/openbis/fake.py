@@ -0,0 +1,1119 @@
+import copy
+import itertools
+import json
+import random
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any, Optional, Union
+
+import pandas as pd
+
+from bam_masterdata.logger import logger
+from bam_masterdata.metadata.registry import EntityRegistry
+
+# Kinds of entities stored by the fake server, keyed by code (masterdata and spaces), identifier
+# (projects, collections and objects) or permId (data sets)
+MASTERDATA_KINDS = (
+    'object_type',
+    'collection_type',
+    'dataset_type',
+    'property_type',
+    'vocabulary',
+)
+ENTITY_KINDS = (
+    *MASTERDATA_KINDS,
+    'space',
+    'project',
+    'collection',
+    'object',
+    'dataset',
+)
+
+# Kind of the type of each typed entity
+_TYPE_KINDS = {
+    'collection': 'collection_type',
+    'object': 'object_type',
+    'dataset': 'dataset_type',
+}
+
+
+class FakeThings(list):
+    """
+    List of entities returned by the listing and search methods, like the `Things` of pyBIS, with their
+    attributes and properties (as with `props='*'` in pyBIS) as a `DataFrame` in `df`, and the number of
+    matches before paging in `totalCount`.
+    """
+
+    def __init__(self, entities: list['FakeEntity'], total_count: Optional[int] = None):
+        super().__init__(entities)
+        self.totalCount = len(entities) if total_count is None else total_count
+
+    @property
+    def df(self) -> pd.DataFrame:
+        return pd.DataFrame(
+            [
+                {
+                    **{
+                        key: value
+                        for key, value in entity.data.items()
+                        if key != 'props'
+                    },
+                    **entity.data.get('props', {}),
+                }
+                for entity in self
+            ]
+        )
+
+
+class FakeEntity:
+    """
+    Entity of the fake openBIS. The attributes of pyBIS (e.g., `code`, `identifier`, `permId`, `type`,
+    `parents` or `props`) are read from `data`, and the changes are only stored in the server by `save`.
+    """
+
+    def __init__(self, openbis: 'FakeOpenbis', kind: str, data: dict):
+        self.__dict__['_openbis'] = openbis
+        self.__dict__['kind'] = kind
+        self.__dict__['data'] = data
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self.__dict__['data'][name]
+        except KeyError:
+            raise AttributeError(f'{self.kind} has no attribute `{name}`.') from None
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        self.data[name] = value
+
+    def __repr__(self) -> str:
+        key = (
+            self.data.get('identifier')
+            or self.data.get('permId')
+            or self.data.get('code')
+        )
+        return f'FakeEntity({self.kind}, {key})'
+
+    @property
+    def is_new(self) -> bool:
+        """If True, the entity was not saved yet."""
+        return not self.data.get('registered', False)
+
+    def set_props(self, props: dict) -> None:
+        self.data.setdefault('props', {}).update(
+            {key.upper(): value for key, value in props.items()}
+        )
+
+    def add_parents(self, parents: Union[str, list]) -> None:
+        parents = parents if isinstance(parents, list) else [parents]
+        self.data.setdefault('parents', []).extend(
+            _identifier(parent) for parent in parents
+        )
+
+    def add_children(self, children: Union[str, list]) -> None:
+        children = children if isinstance(children, list) else [children]
+        self.data.setdefault('children', []).extend(
+            _identifier(child) for child in children
+        )
+
+    def assign_property(
+        self,
+        prop: Union[str, 'FakeEntity'],
+        section: str = '',
+        mandatory: bool = False,
+        **kwargs: Any,
+    ) -> None:
+        """Assigns a property type to an object, collection or data set type, like in pyBIS."""
+        assignment = {
+            'code': _code(prop),
+            'section': section,
+            'mandatory': mandatory,
+            **kwargs,
+        }
+        if self.is_new:
+            self.data.setdefault('assignments', []).append(assignment)
+        else:
+            self._openbis._request(
+                'assign_property',
+                self._openbis.server.assign_property,
+                self,
+                assignment,
+            )
+
+    def save(self) -> 'FakeEntity':
+        """Creates or updates the entity in the server with one round trip."""
+        saved = self._openbis._request('save', self._openbis.server.save, self)
+        self.data.update(saved)
+        return self
+
+    def delete(self, reason: str = '') -> None:
+        """Deletes the entity from the server with one round trip."""
+        self._openbis._request('delete', self._openbis.server.delete, self)
+
+
+def _code(entity: Union[str, FakeEntity]) -> str:
+    return (entity.code if isinstance(entity, FakeEntity) else str(entity)).upper()
+
+
+def _identifier(entity: Union[str, FakeEntity, None]) -> Optional[str]:
+    if entity is None:
+        return None
+    if isinstance(entity, FakeEntity):
+        return entity.data.get('identifier') or entity.data.get('permId')
+    return str(entity)
+
+
+def _payload_size(payload: Any) -> int:
+    def default(value):
+        if isinstance(value, FakeEntity):
+            return value.data
+        return str(value)
+
+    return len(json.dumps(payload, default=default))
+
+
+class FakeStats:
+    """Counters of the requests received by a `FakeOpenbisServer`."""
+
+    def __init__(self):
+        self.round_trips = 0
+        self.calls: Counter = Counter()
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.failures = 0
+
+    def reset(self) -> None:
+        self.__init__()
+
+    def as_dict(self) -> dict:
+        return {
+            'round_trips': self.round_trips,
+            'calls': dict(self.calls),
+            'request_bytes': self.request_bytes,
+            'response_bytes': self.response_bytes,
+            'failures': self.failures,
+        }
+
+
+class FakeOpenbisServer:
+    """
+    In-memory state of a fake openBIS server shared by any number of `FakeOpenbis` clients. The
+    entities are stored in dictionaries keyed by kind, and the requests of the clients are counted in
+    `stats`, delayed by `latency` and can be made to fail, e.g.:
+
+    ```python
+    server = FakeOpenbisServer(latency={'default': 0.01, 'get_objects': 0.05}, failure_rate=0.1)
+    server.load_datamodel(EntityRegistry.from_datamodel())
+    openbis = server.client()
+    ...
+    print(server.stats.round_trips, server.stats.response_bytes)
+    ```
+
+    The methods of the server (e.g., `create`) are used to seed the state without counting requests.
+    """
+
+    def __init__(
+        self,
+        latency: Union[float, dict[str, float]] = 0.0,
+        failure_rate: float = 0.0,
+        users: Optional[dict[str, str]] = None,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.users = users
+        self.stats = FakeStats()
+        self.entities: dict[str, dict[str, dict]] = {kind: {} for kind in ENTITY_KINDS}
+        self.tokens: set[str] = set()
+        self._scheduled_failures: dict[str, list[BaseException]] = {}
+        self._random = random.Random(seed)
+        self._perm_ids = itertools.count(1)
+        self._sessions = itertools.count(1)
+        self._lock = threading.RLock()
+        self._in_flight = 0
+        self.max_in_flight = 0
+
+    def client(self) -> 'FakeOpenbis':
+        """Returns a new client of the server."""
+        return FakeOpenbis(server=self)
+
+    # Injection of latency and failures
+
+    def fail(
+        self, method: str, times: int = 1, exception: Optional[BaseException] = None
+    ) -> None:
+        """
+        Makes the next `times` requests of `method` (or of any method, with `'*'`) fail.
+
+        Args:
+            method (str): The name of the method, e.g., `'get_objects'` or `'commit'`.
+            times (int, optional): The number of failed requests. Defaults to 1.
+            exception (Optional[BaseException], optional): The exception raised. Defaults to None
+                (a `ConnectionError`).
+        """
+        exception = exception or ConnectionError(f'Injected failure of `{method}`.')
+        with self._lock:
+            self._scheduled_failures.setdefault(method, []).extend([exception] * times)
+
+    def _latency(self, method: str) -> float:
+        if isinstance(self.latency, dict):
+            return self.latency.get(method, self.latency.get('default', 0.0))
+        return self.latency
+
+    @contextmanager
+    def request(self, method: str, payload: Any = None) -> Iterator[None]:
+        """
+        Accounts a request of a client: counts it, sleeps the latency of the method and raises the
+        injected failures.
+        """
+        size = _payload_size(payload)
+        with self._lock:
+            self.stats.round_trips += 1
+            self.stats.calls[method] += 1
+            self.stats.request_bytes += size
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+            scheduled = self._scheduled_failures.get(
+                method
+            ) or self._scheduled_failures.get('*')
+            exception = scheduled.pop(0) if scheduled else None
+            if (
+                exception is None
+                and self.failure_rate
+                and self._random.random() < self.failure_rate
+            ):
+                exception = ConnectionError(f'Random failure of `{method}`.')
+            if exception is not None:
+                self.stats.failures += 1
+        try:
+            latency = self._latency(method)
+            if latency:
+                time.sleep(latency)
+            if exception is not None:
+                raise exception
+            yield
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def count_response(self, response: Any) -> None:
+        size = _payload_size(response)
+        with self._lock:
+            self.stats.response_bytes += size
+
+    # Authentication
+
+    def login(self, username: str, password: str) -> str:
+        with self._lock:
+            if self.users is not None and self.users.get(username) != password:
+                raise ValueError('login to openBIS failed')
+            token = f'{username}-{next(self._sessions)}'
+            self.tokens.add(token)
+        return token
+
+    def is_token_valid(self, token: Optional[str]) -> bool:
+        return self.users is None or token in self.tokens
+
+    def expire_sessions(self) -> None:
+        """Invalidates all the session tokens."""
+        with self._lock:
+            self.tokens.clear()
+
+    # Storage
+
+    def _key(self, kind: str, data: dict) -> str:
+        if kind in (*MASTERDATA_KINDS, 'space'):
+            return data['code']
+        if kind == 'dataset':
+            return data['permId']
+        return data['identifier']
+
+    def get(self, kind: str, key: str) -> Optional[dict]:
+        """Returns a copy of the stored data of an entity, or None if it does not exist."""
+        with self._lock:
+            data = self.entities[kind].get(key)
+            if data is None and kind in ('project', 'collection', 'object'):
+                # Like openBIS, the entities can also be found by permId
+                data = next(
+                    (
+                        entity
+                        for entity in self.entities[kind].values()
+                        if entity.get('permId') == key
+                    ),
+                    None,
+                )
+            return copy.deepcopy(data)
+
+    def list_entities(self, kind: str) -> list[dict]:
+        """Returns copies of the stored data of the entities of a kind."""
+        with self._lock:
+            return copy.deepcopy(list(self.entities[kind].values()))
+
+    def _require(self, kind: str, key: Optional[str], what: str) -> dict:
+        data = self.entities[kind].get(key) if key else None
+        if data is None and key and kind in ('project', 'collection', 'object'):
+            data = next(
+                (e for e in self.entities[kind].values() if e.get('permId') == key),
+                None,
+            )
+        if data is None:
+            raise ValueError(f'{what} `{key}` does not exist.')
+        return data
+
+    def _new_perm_id(self) -> str:
+        return f'20240101000000000-{next(self._perm_ids)}'
+
+    def _check_props(self, kind: str, type_code: str, props: dict) -> dict:
+        """Checks that the properties are assigned to the type, and that the mandatory ones are set."""
+        entity_type = self._require(
+            _TYPE_KINDS[kind], type_code, _TYPE_KINDS[kind].replace('_', ' ')
+        )
+        props = {key.upper(): value for key, value in props.items()}
+        assigned = {a['code']: a for a in entity_type.get('assignments', [])}
+        unknown = set(props) - set(assigned)
+        if unknown:
+            raise ValueError(
+                f'The properties {sorted(unknown)} are not assigned to {type_code}.'
+            )
+        missing = [
+            code
+            for code, assignment in assigned.items()
+            if assignment.get('mandatory') and props.get(code) in (None, '')
+        ]
+        if missing:
+            raise ValueError(f'The mandatory properties {missing} are missing.')
+        return props
+
+    def _complete(self, kind: str, data: dict) -> dict:
+        """Validates the data of a new entity and fills its identifier and references."""
+        data = {key: value for key, value in data.items() if value is not None}
+        if kind in (*MASTERDATA_KINDS, 'space'):
+            data['code'] = _code(data['code'])
+            if data['code'] in self.entities[kind]:
+                raise ValueError(f'The {kind} `{data["code"]}` already exists.')
+            if kind == 'vocabulary':
+                data['terms'] = [
+                    {**term, 'code': term['code'].upper()}
+                    for term in data.get('terms', [])
+                ]
+            if kind in _TYPE_KINDS.values():
+                data.setdefault('assignments', [])
+                for assignment in data['assignments']:
+                    self._require('property_type', assignment['code'], 'Property type')
+            if kind == 'property_type' and data.get('vocabulary'):
+                self._require('vocabulary', data['vocabulary'], 'Vocabulary')
+            return data
+
+        if kind in _TYPE_KINDS:
+            data['type'] = _code(data['type'])
+            data['props'] = self._check_props(kind, data['type'], data.get('props', {}))
+
+        if kind == 'project':
+            space = self._require('space', _code(data['space']), 'Space')
+            data['space'] = space['code']
+            data['code'] = _code(data['code'])
+            data['identifier'] = f'/{space["code"]}/{data["code"]}'
+        elif kind == 'collection':
+            project = self._require('project', data['project'], 'Project')
+            data['project'] = project['identifier']
+            data['space'] = project['space']
+            data['code'] = _code(data['code'])
+            data['identifier'] = f'{project["identifier"]}/{data["code"]}'
+        elif kind == 'object':
+            collection = data.pop('collection', None) or data.get('experiment')
+            if collection:
+                collection = self._require('collection', collection, 'Collection')
+                data['experiment'] = collection['identifier']
+                data.setdefault('project', collection['project'])
+                data.setdefault('space', collection['space'])
+            if data.get('project'):
+                project = self._require('project', data['project'], 'Project')
+                data['project'] = project['identifier']
+                data.setdefault('space', project['space'])
+            if not data.get('space'):
+                raise ValueError('The object needs a space.')
+            data['space'] = self._require('space', _code(data['space']), 'Space')[
+                'code'
+            ]
+            if not data.get('code'):
+                entity_type = self.entities['object_type'][data['type']]
+                if not entity_type.get('autoGeneratedCode'):
+                    raise ValueError(f'The objects of {data["type"]} need a code.')
+                prefix = entity_type.get('generatedCodePrefix') or data['type'][:3]
+                count = sum(
+                    1
+                    for entity in self.entities['object'].values()
+                    if entity['type'] == data['type']
+                )
+                data['code'] = f'{prefix}{count + 1}'
+            data['code'] = _code(data['code'])
+            container = data.get('project') or f'/{data["space"]}'
+            data['identifier'] = f'{container}/{data["code"]}'
+            for relation in ('parents', 'children'):
+                data[relation] = [
+                    self._require('object', identifier, 'Object')['identifier']
+                    for identifier in data.get(relation, [])
+                ]
+        elif kind == 'dataset':
+            sample = data.pop('object', None) or data.get('sample')
+            if sample:
+                data['sample'] = self._require('object', sample, 'Object')['identifier']
+            elif data.get('experiment') or data.get('collection'):
+                data['experiment'] = self._require(
+                    'collection',
+                    data.pop('collection', None) or data['experiment'],
+                    'Collection',
+                )['identifier']
+            else:
+                raise ValueError('The data set needs an object or a collection.')
+            data['code'] = data['permId'] = data.get('code') or self._new_perm_id()
+            data['files'] = list(data.get('files', []))
+            data['parents'] = [
+                self._require('dataset', perm_id, 'Data set')['permId']
+                for perm_id in data.get('parents', [])
+            ]
+        if kind in ('project', 'collection', 'object'):
+            if data['identifier'] in self.entities[kind]:
+                raise ValueError(f'The {kind} `{data["identifier"]}` already exists.')
+            data.setdefault('permId', self._new_perm_id())
+        return data
+
+    def create(self, kind: str, data: dict) -> dict:
+        """
+        Stores a new entity, without counting a request (e.g., to seed the server).
+
+        Args:
+            kind (str): One of the `ENTITY_KINDS`.
+            data (dict): The attributes of the entity, with the pyBIS names.
+
+        Returns:
+            dict: The stored data, with the identifier and permId.
+        """
+        with self._lock:
+            data = self._complete(kind, data)
+            data['registered'] = True
+            self.entities[kind][self._key(kind, data)] = data
+            if kind == 'object':
+                for parent in data['parents']:
+                    self.entities['object'][parent].setdefault('children', []).append(
+                        data['identifier']
+                    )
+                for child in data['children']:
+                    self.entities['object'][child].setdefault('parents', []).append(
+                        data['identifier']
+                    )
+            return copy.deepcopy(data)
+
+    def update(self, kind: str, data: dict) -> dict:
+        """Updates the description, properties and parents of an existing entity."""
+        with self._lock:
+            stored = self._require(kind, self._key(kind, data), kind)
+            if 'props' in data and kind in _TYPE_KINDS:
+                stored['props'] = self._check_props(kind, stored['type'], data['props'])
+            for field in ('description', 'terms', 'label'):
+                if field in data:
+                    stored[field] = copy.deepcopy(data[field])
+            if kind == 'object':
+                new_parents = [
+                    self._require('object', parent, 'Object')['identifier']
+                    for parent in data.get('parents', [])
+                ]
+                for parent in set(new_parents) - set(stored.get('parents', [])):
+                    self.entities['object'][parent].setdefault('children', []).append(
+                        stored['identifier']
+                    )
+                for parent in set(stored.get('parents', [])) - set(new_parents):
+                    self.entities['object'][parent]['children'].remove(
+                        stored['identifier']
+                    )
+                stored['parents'] = new_parents
+            return copy.deepcopy(stored)
+
+    def save(self, entity: FakeEntity) -> dict:
+        if entity.is_new:
+            return self.create(entity.kind, dict(entity.data))
+        return self.update(entity.kind, dict(entity.data))
+
+    def delete(self, entity: FakeEntity) -> None:
+        with self._lock:
+            stored = self._require(
+                entity.kind, self._key(entity.kind, entity.data), entity.kind
+            )
+            del self.entities[entity.kind][self._key(entity.kind, stored)]
+            if entity.kind == 'object':
+                for relation, inverse in (
+                    ('parents', 'children'),
+                    ('children', 'parents'),
+                ):
+                    for identifier in stored.get(relation, []):
+                        self.entities['object'][identifier][inverse].remove(
+                            stored['identifier']
+                        )
+
+    def assign_property(self, entity: FakeEntity, assignment: dict) -> None:
+        with self._lock:
+            self._require('property_type', assignment['code'], 'Property type')
+            stored = self._require(entity.kind, entity.code, entity.kind)
+            stored.setdefault('assignments', []).append(assignment)
+            entity.data['assignments'] = copy.deepcopy(stored['assignments'])
+
+    def commit(self, entities: list[FakeEntity]) -> list[dict]:
+        """Saves a list of entities atomically: if one fails, none is stored."""
+        with self._lock:
+            snapshot = copy.deepcopy(self.entities)
+            try:
+                return [self.save(entity) for entity in entities]
+            except Exception:
+                self.entities = snapshot
+                raise
+
+    def load_datamodel(self, registry: EntityRegistry) -> None:
+        """
+        Stores the masterdata of a registry (the vocabularies, property types and object types with
+        their assignments) without counting requests.
+
+        Args:
+            registry (EntityRegistry): The registry of the datamodel.
+        """
+        datamodel = registry.to_dict()
+        for code, vocabulary in datamodel['vocabulary_types'].items():
+            self.create(
+                'vocabulary',
+                {
+                    'code': code,
+                    'description': vocabulary['defs']['description'],
+                    'terms': [
+                        {
+                            'code': term['code'],
+                            'label': term['label'],
+                            'description': term['description'],
+                        }
+                        for term in vocabulary['terms']
+                    ],
+                },
+            )
+        for kind, type_kind in (
+            ('object_types', 'object_type'),
+            ('dataset_types', 'dataset_type'),
+        ):
+            for code, entity in datamodel[kind].items():
+                for prop in entity['properties']:
+                    vocabulary = prop.get('vocabulary_code')
+                    if vocabulary and vocabulary not in self.entities['vocabulary']:
+                        logger.warning(
+                            f'The vocabulary {vocabulary} of {prop["code"]} is not in the datamodel.'
+                        )
+                        vocabulary = None
+                    if prop['code'] not in self.entities['property_type']:
+                        self.create(
+                            'property_type',
+                            {
+                                'code': prop['code'],
+                                'label': prop['property_label'],
+                                'description': prop['description'],
+                                'dataType': prop['data_type'],
+                                'vocabulary': vocabulary,
+                            },
+                        )
+                defs = entity['defs']
+                self.create(
+                    type_kind,
+                    {
+                        'code': code,
+                        'description': defs['description'],
+                        'generatedCodePrefix': defs.get('generated_code_prefix'),
+                        'autoGeneratedCode': defs.get('auto_generated_codes', False),
+                        'validationPlugin': defs.get('validation_script'),
+                        'assignments': [
+                            {
+                                'code': prop['code'],
+                                'section': prop['section'],
+                                'mandatory': prop['mandatory'],
+                            }
+                            for prop in entity['properties']
+                        ],
+                    },
+                )
+
+
+class FakeTransaction:
+    """Transaction of the fake openBIS, committing its entities in a single request."""
+
+    def __init__(self, openbis: 'FakeOpenbis', *entities: FakeEntity):
+        self.openbis = openbis
+        self.entities = list(entities)
+
+    def add(self, entity: FakeEntity) -> None:
+        self.entities.append(entity)
+
+    def commit(self) -> None:
+        saved = self.openbis._request(
+            'commit', self.openbis.server.commit, self.entities
+        )
+        for entity, data in zip(self.entities, saved):
+            entity.data.update(data)
+
+
+class FakeOpenbis:
+    """
+    In-process fake of the pyBIS `Openbis` client, backed by the in-memory dictionaries of a
+    `FakeOpenbisServer`. It implements the subset of pyBIS used by this package: the listing and
+    creation of masterdata, spaces, projects, collections, objects and data sets, the search of objects
+    and data sets, and transactions. Each method call (and each `save`, `delete` or `commit`) counts as
+    one round trip of the server, e.g.:
+
+    ```python
+    openbis = FakeOpenbis(latency=0.01)
+    openbis.new_space(code='LAB').save()
+    graph = ObjectGraph(PybisGraphBackend(openbis))
+    ...
+    assert openbis.server.stats.round_trips == 2
+    ```
+
+    This allows to measure the round trips, payloads and concurrency of the code using pyBIS without an
+    openBIS server, e.g., in the CI.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        *,
+        server: Optional[FakeOpenbisServer] = None,
+        latency: Union[float, dict[str, float]] = 0.0,
+        failure_rate: float = 0.0,
+        users: Optional[dict[str, str]] = None,
+        **kwargs: Any,
+    ):
+        # The other keyword arguments of `Openbis` (e.g., `verify_certificates`) are accepted and ignored
+        self.url = url or 'https://openbis.fake/'
+        self.server = server or FakeOpenbisServer(
+            latency=latency, failure_rate=failure_rate, users=users
+        )
+        self.token: Optional[str] = None
+
+    def _request(
+        self, method: str, operation: Any, *args: Any, payload: Any = None
+    ) -> Any:
+        """Sends a request to the server, with `payload` (or the `args`) as the request body."""
+        with self.server.request(method, args if payload is None else payload):
+            if method not in ('login', 'set_token', 'is_session_active'):
+                if not self.server.is_token_valid(self.token):
+                    raise ValueError('Session is no longer valid. Please log in again.')
+            response = operation(*args)
+        self.server.count_response(response)
+        return response
+
+    def _wrap(self, kind: str, data: dict) -> FakeEntity:
+        return FakeEntity(self, kind, data)
+
+    def _get(self, kind: str, key: Union[str, FakeEntity], method: str) -> FakeEntity:
+        key = _identifier(key)
+        if kind in (*MASTERDATA_KINDS, 'space'):
+            key = key.upper()
+
+        def operation():
+            data = self.server.get(kind, key)
+            if data is None:
+                raise ValueError(f'no such {kind.replace("_", " ")}: {key}')
+            return data
+
+        return self._wrap(kind, self._request(method, operation, payload=key))
+
+    def _list(
+        self,
+        kind: str,
+        method: str,
+        filters: dict,
+        start_with: Optional[int] = None,
+        count: Optional[int] = None,
+    ) -> FakeThings:
+        filters = {key: value for key, value in filters.items() if value is not None}
+        where = {key.upper(): value for key, value in filters.pop('where', {}).items()}
+
+        def operation():
+            matches = []
+            for data in self.server.list_entities(kind):
+                if any(
+                    str(data.get(key, '')).upper() != str(value).upper()
+                    for key, value in filters.items()
+                ):
+                    continue
+                if any(
+                    data.get('props', {}).get(key) != value
+                    for key, value in where.items()
+                ):
+                    continue
+                matches.append(data)
+            start = start_with or 0
+            end = None if count is None else start + count
+            return matches[start:end], len(matches)
+
+        payload = {**filters, 'where': where, 'start_with': start_with, 'count': count}
+        page, total = self._request(method, operation, payload=payload)
+        return FakeThings([self._wrap(kind, data) for data in page], total)
+
+    # Authentication
+
+    def login(self, username=None, password=None, save_token=False) -> str:
+        self.token = self._request('login', self.server.login, username, password)
+        return self.token
+
+    def logout(self) -> None:
+        self._request('logout', self.server.tokens.discard, self.token)
+        self.token = None
+
+    def set_token(self, token, save_token=False) -> None:
+        if not self._request('set_token', self.server.is_token_valid, token):
+            raise ValueError('Session is no longer valid. Please log in again.')
+        self.token = token
+
+    def is_token_valid(self, token: Optional[str] = None) -> bool:
+        return self._request(
+            'is_session_active', self.server.is_token_valid, token or self.token
+        )
+
+    def is_session_active(self) -> bool:
+        return self.is_token_valid(self.token)
+
+    # Masterdata
+
+    def get_object_types(self, type=None, start_with=None, count=None) -> FakeThings:
+        return self._list(
+            'object_type', 'get_object_types', {'code': type}, start_with, count
+        )
+
+    get_sample_types = get_object_types
+
+    def get_object_type(self, type, **kwargs) -> FakeEntity:
+        return self._get('object_type', type, 'get_object_type')
+
+    get_sample_type = get_object_type
+
+    def get_collection_types(
+        self, type=None, start_with=None, count=None
+    ) -> FakeThings:
+        return self._list(
+            'collection_type', 'get_collection_types', {'code': type}, start_with, count
+        )
+
+    def get_dataset_types(self, type=None, start_with=None, count=None) -> FakeThings:
+        return self._list(
+            'dataset_type', 'get_dataset_types', {'code': type}, start_with, count
+        )
+
+    def get_dataset_type(self, type, **kwargs) -> FakeEntity:
+        return self._get('dataset_type', type, 'get_dataset_type')
+
+    def get_property_types(self, code=None, start_with=None, count=None) -> FakeThings:
+        return self._list(
+            'property_type', 'get_property_types', {'code': code}, start_with, count
+        )
+
+    def get_property_type(self, code, **kwargs) -> FakeEntity:
+        return self._get('property_type', code, 'get_property_type')
+
+    def get_vocabularies(self, code=None, start_with=None, count=None) -> FakeThings:
+        return self._list(
+            'vocabulary', 'get_vocabularies', {'code': code}, start_with, count
+        )
+
+    def get_vocabulary(self, code, **kwargs) -> FakeEntity:
+        return self._get('vocabulary', code, 'get_vocabulary')
+
+    def get_terms(self, vocabulary=None) -> FakeThings:
+        terms = self.get_vocabulary(vocabulary).terms
+        return FakeThings([self._wrap('term', dict(term)) for term in terms])
+
+    def new_object_type(
+        self,
+        code,
+        generatedCodePrefix,
+        autoGeneratedCode=False,
+        validationPlugin=None,
+        **kwargs,
+    ) -> FakeEntity:
+        return self._wrap(
+            'object_type',
+            {
+                'code': code,
+                'generatedCodePrefix': generatedCodePrefix,
+                'autoGeneratedCode': autoGeneratedCode,
+                'validationPlugin': validationPlugin,
+                'description': kwargs.get('description', ''),
+            },
+        )
+
+    new_sample_type = new_object_type
+
+    def new_collection_type(self, code, validationPlugin=None, **kwargs) -> FakeEntity:
+        return self._wrap(
+            'collection_type',
+            {'code': code, 'validationPlugin': validationPlugin, **kwargs},
+        )
+
+    def new_dataset_type(self, code, **kwargs) -> FakeEntity:
+        return self._wrap('dataset_type', {'code': code, **kwargs})
+
+    def new_property_type(
+        self, code, label, description, dataType, vocabulary=None, **kwargs
+    ) -> FakeEntity:
+        return self._wrap(
+            'property_type',
+            {
+                'code': code,
+                'label': label,
+                'description': description,
+                'dataType': dataType,
+                'vocabulary': _code(vocabulary) if vocabulary else None,
+            },
+        )
+
+    def new_vocabulary(self, code, terms, **kwargs) -> FakeEntity:
+        return self._wrap(
+            'vocabulary',
+            {
+                'code': code,
+                'terms': [dict(term) for term in terms],
+                'description': kwargs.get('description', ''),
+            },
+        )
+
+    # Spaces, projects and collections
+
+    def get_spaces(
+        self, code=None, start_with=None, count=None, **kwargs
+    ) -> FakeThings:
+        return self._list('space', 'get_spaces', {'code': code}, start_with, count)
+
+    def get_space(self, code, **kwargs) -> FakeEntity:
+        return self._get('space', code, 'get_space')
+
+    def new_space(self, **kwargs) -> FakeEntity:
+        return self._wrap('space', kwargs)
+
+    def get_projects(
+        self, space=None, code=None, start_with=None, count=None
+    ) -> FakeThings:
+        return self._list(
+            'project',
+            'get_projects',
+            {'space': _code(space) if space else None, 'code': code},
+            start_with,
+            count,
+        )
+
+    def get_project(self, projectId, **kwargs) -> FakeEntity:
+        return self._get('project', projectId, 'get_project')
+
+    def _reference(self, kind: str, value: Any, key: str) -> str:
+        """
+        Resolves the container of a new entity like pyBIS: a code or identifier is fetched from the
+        server (one round trip, failing if it does not exist), while for an object the id stored under
+        `key` in its `data` is used without a request.
+        """
+        if isinstance(value, str):
+            entity = self._get(kind, value, f'get_{kind}')
+            return entity.data['code'] if kind == 'space' else entity.data['identifier']
+        ref = value.data.get(key) or value.data.get('code')
+        return ref[key] if isinstance(ref, dict) else ref
+
+    def new_project(self, space, code, description=None, **kwargs) -> FakeEntity:
+        return self._wrap(
+            'project',
+            {
+                'space': _code(self._reference('space', space, 'permId')),
+                'code': code,
+                'description': description,
+            },
+        )
+
+    def get_collections(  # noqa: PLR0917 (same signature as pyBIS)
+        self,
+        code=None,
+        type=None,
+        space=None,
+        project=None,
+        start_with=None,
+        count=None,
+        where=None,
+        **kwargs,
+    ) -> FakeThings:
+        return self._list(
+            'collection',
+            'get_collections',
+            {
+                'code': code,
+                'type': type,
+                'space': _code(space) if space else None,
+                'project': _identifier(project),
+                'where': where or kwargs.get('props_filter'),
+            },
+            start_with,
+            count,
+        )
+
+    get_experiments = get_collections
+
+    def get_collection(self, code, **kwargs) -> FakeEntity:
+        return self._get('collection', code, 'get_collection')
+
+    get_experiment = get_collection
+
+    def new_collection(self, type, code, project, props=None, **kwargs) -> FakeEntity:
+        return self._wrap(
+            'collection',
+            {
+                'type': type,
+                'code': code,
+                'project': self._reference('project', project, 'identifier'),
+                'props': props or {},
+            },
+        )
+
+    new_experiment = new_collection
+
+    # Objects and data sets
+
+    def get_objects(  # noqa: PLR0917 (same signature as pyBIS)
+        self,
+        identifier=None,
+        code=None,
+        space=None,
+        project=None,
+        collection=None,
+        type=None,
+        start_with=None,
+        count=None,
+        where=None,
+        experiment=None,
+        **kwargs,
+    ) -> FakeThings:
+        return self._list(
+            'object',
+            'get_objects',
+            {
+                'identifier': identifier,
+                'code': code,
+                'space': _code(space) if space else None,
+                'project': _identifier(project),
+                'experiment': _identifier(collection or experiment),
+                'type': type,
+                'where': where,
+            },
+            start_with,
+            count,
+        )
+
+    get_samples = get_objects
+
+    def get_object(self, sample_ident, raw_response=False, **kwargs) -> Any:
+        """
+        Returns an object. As in pyBIS, a list of identifiers returns all the objects found with a single
+        request, as the raw JSON of openBIS with `raw_response=True`.
+        """
+        if not isinstance(sample_ident, list):
+            return self._get('object', sample_ident, 'get_object')
+        keys = [_identifier(ident) for ident in sample_ident]
+
+        def operation():
+            found = {}
+            for key in keys:
+                data = self.server.get('object', key)
+                if data is not None:
+                    found[key] = data
+            return found
+
+        found = self._request('get_object', operation, payload=keys)
+        if raw_response:
+            return {
+                key: {
+                    'identifier': {'identifier': data['identifier']},
+                    'permId': {'permId': data['permId']},
+                    'code': data['code'],
+                    'type': {'code': data['type']},
+                    'properties': data.get('props', {}),
+                    'parents': [
+                        {'identifier': {'identifier': parent}}
+                        for parent in data.get('parents', [])
+                    ],
+                    'children': [
+                        {'identifier': {'identifier': child}}
+                        for child in data.get('children', [])
+                    ],
+                }
+                for key, data in found.items()
+            }
+        return FakeThings([self._wrap('object', data) for data in found.values()])
+
+    get_sample = get_object
+
+    def new_object(self, type, project=None, props=None, **kwargs) -> FakeEntity:
+        data = {
+            'type': type,
+            'project': _identifier(project),
+            'props': {key.upper(): value for key, value in (props or {}).items()},
+        }
+        for key in ('code', 'space', 'collection', 'experiment'):
+            if kwargs.get(key) is not None:
+                data[key] = (
+                    _code(kwargs[key]) if key == 'space' else _identifier(kwargs[key])
+                )
+        for relation in ('parents', 'children'):
+            data[relation] = [
+                _identifier(entity) for entity in kwargs.get(relation) or []
+            ]
+        return self._wrap('object', data)
+
+    new_sample = new_object
+
+    def get_datasets(  # noqa: PLR0917 (same signature as pyBIS)
+        self,
+        permId=None,
+        code=None,
+        type=None,
+        start_with=None,
+        count=None,
+        sample=None,
+        collection=None,
+        where=None,
+        **kwargs,
+    ) -> FakeThings:
+        return self._list(
+            'dataset',
+            'get_datasets',
+            {
+                'permId': permId,
+                'code': code,
+                'type': type,
+                'sample': _identifier(sample or kwargs.get('object')),
+                'experiment': _identifier(collection or kwargs.get('experiment')),
+                'where': where,
+            },
+            start_with,
+            count,
+        )
+
+    def get_dataset(self, permIds, **kwargs) -> FakeEntity:
+        return self._get('dataset', permIds, 'get_dataset')
+
+    def new_dataset(
+        self, type=None, kind='PHYSICAL', files=None, props=None, **kwargs
+    ) -> FakeEntity:
+        data = {
+            'type': type,
+            'kind': kind,
+            'files': list(files or []),
+            'props': {key.upper(): value for key, value in (props or {}).items()},
+            'parents': [_identifier(parent) for parent in kwargs.get('parents') or []],
+        }
+        for key in ('sample', 'object', 'collection', 'experiment'):
+            if kwargs.get(key) is not None:
+                data[key] = _identifier(kwargs[key])
+        return self._wrap('dataset', data)
+
+    # Transactions
+
+    def new_transaction(self, *entities: FakeEntity) -> FakeTransaction:
+        return FakeTransaction(self, *entities)
@@ -0,0 +1,262 @@
+import json
+import os
+from collections import deque
+from collections.abc import Iterable
+from typing import Any, NamedTuple, Optional
+
+from bam_masterdata.logger import logger
+from bam_masterdata.metrics import metrics
+
+# Directions in which the graph is walked
+DIRECTIONS = ('parents', 'children', 'both')
+
+
+class GraphNode(NamedTuple):
+    """Identifiers of the direct parents and children of an object."""
+
+    parents: list[str]
+    children: list[str]
+
+
+class PybisGraphBackend:
+    """
+    Fetches the parents and children of batches of objects from openBIS with a single `getSamples`
+    request per batch, using `Openbis.get_sample(identifiers, raw_response=True)`.
+    """
+
+    def __init__(self, openbis: Any):
+        self.openbis = openbis
+
+    def fetch(self, identifiers: list[str]) -> dict[str, GraphNode]:
+        """
+        Fetches the direct parents and children of the objects `identifiers`.
+
+        Args:
+            identifiers (list[str]): The identifiers of the objects, e.g., `'/SPACE/PROJECT/OBJ1'`.
+
+        Returns:
+            dict[str, GraphNode]: The nodes keyed by identifier. The missing objects are skipped.
+        """
+        response = self.openbis.get_sample(list(identifiers), raw_response=True)
+        nodes = {}
+        for data in response.values():
+            nodes[data['identifier']['identifier']] = GraphNode(
+                parents=[
+                    parent['identifier']['identifier']
+                    for parent in data.get('parents') or []
+                ],
+                children=[
+                    child['identifier']['identifier']
+                    for child in data.get('children') or []
+                ],
+            )
+        return nodes
+
+
+class ObjectGraph:
+    """
+    Local index of the parent/child relationships between openBIS objects. The graph is fetched level by
+    level (breadth-first), with one batched request per frontier of unknown objects (split in batches of
+    `batch_size`), instead of one request per object. The ancestor, descendant and path queries are then
+    answered from the in-memory adjacency, which can be persisted in a JSON cache. E.g.:
+
+    ```python
+    graph = ObjectGraph(PybisGraphBackend(openbis), cache_path='.cache/lineage.json')
+    ancestors = graph.ancestors('/BAM/PROJECT/SAMPLE_42')
+    print(graph.round_trips)  # one per level of the lineage
+    graph.save()
+    ```
+    """
+
+    def __init__(
+        self,
+        backend: Any,
+        cache_path: Optional[str] = None,
+        batch_size: int = 500,
+    ):
+        self.backend = backend
+        self.cache_path = cache_path
+        self.batch_size = batch_size
+        self.nodes: dict[str, GraphNode] = {}
+        self.round_trips = 0
+        if cache_path and os.path.exists(cache_path):
+            self._load_cache(cache_path)
+
+    def _load_cache(self, path: str) -> None:
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            logger.warning(f'Ignoring the unreadable graph cache {path}.')
+            return
+        self.nodes = {
+            identifier: GraphNode(parents=node[0], children=node[1])
+            for identifier, node in data.items()
+        }
+
+    def save(self, path: Optional[str] = None) -> None:
+        """
+        Saves the adjacency of the fetched objects. The file is replaced atomically.
+
+        Args:
+            path (Optional[str], optional): The path of the cache. Defaults to None (`cache_path`).
+        """
+        path = path or self.cache_path
+        if not path:
+            raise ValueError('No path was given to save the graph.')
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(
+                {
+                    identifier: [node.parents, node.children]
+                    for identifier, node in self.nodes.items()
+                },
+                f,
+            )
+        os.replace(tmp_path, path)
+
+    def _neighbours(self, identifier: str, direction: str) -> list[str]:
+        node = self.nodes.get(identifier)
+        if node is None:
+            return []
+        if direction == 'parents':
+            return node.parents
+        if direction == 'children':
+            return node.children
+        return node.parents + node.children
+
+    def fetch(
+        self,
+        identifiers: Iterable[str],
+        direction: str = 'both',
+        max_depth: Optional[int] = None,
+    ) -> int:
+        """
+        Fetches the objects reachable from `identifiers` in `direction`, level by level. The objects
+        already in the graph are not fetched again, but are walked through.
+
+        Args:
+            identifiers (Iterable[str]): The identifiers of the starting objects.
+            direction (str, optional): `'parents'`, `'children'` or `'both'`. Defaults to 'both'.
+            max_depth (Optional[int], optional): The maximum number of levels walked from the starting
+                objects. Defaults to None (no limit).
+
+        Returns:
+            int: The number of requests sent to the backend.
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError(
+                f'`direction` must be one of {DIRECTIONS}, got {direction}.'
+            )
+        round_trips = 0
+        visited = set()
+        frontier = list(dict.fromkeys(identifiers))
+        depth = 0
+        while frontier:
+            visited.update(frontier)
+            missing = [
+                identifier for identifier in frontier if identifier not in self.nodes
+            ]
+            for start in range(0, len(missing), self.batch_size):
+                batch = missing[start : start + self.batch_size]
+                fetched = self.backend.fetch(batch)
+                round_trips += 1
+                self.nodes.update(fetched)
+                # Objects which do not exist are recorded without neighbours to avoid fetching them again
+                for identifier in batch:
+                    self.nodes.setdefault(
+                        identifier, GraphNode(parents=[], children=[])
+                    )
+            if max_depth is not None and depth >= max_depth:
+                break
+            frontier = list(
+                dict.fromkeys(
+                    neighbour
+                    for identifier in frontier
+                    for neighbour in self._neighbours(identifier, direction)
+                    if neighbour not in visited
+                )
+            )
+            depth += 1
+        self.round_trips += round_trips
+        metrics.increment('graph.round_trips', round_trips)
+        return round_trips
+
+    def _walk(
+        self, identifier: str, direction: str, max_depth: Optional[int]
+    ) -> list[str]:
+        self.fetch([identifier], direction=direction, max_depth=max_depth)
+        result = []
+        visited = {identifier}
+        queue = deque([(identifier, 0)])
+        while queue:
+            current, depth = queue.popleft()
+            if max_depth is not None and depth >= max_depth:
+                continue
+            for neighbour in self._neighbours(current, direction):
+                if neighbour not in visited:
+                    visited.add(neighbour)
+                    result.append(neighbour)
+                    queue.append((neighbour, depth + 1))
+        return result
+
+    def ancestors(self, identifier: str, max_depth: Optional[int] = None) -> list[str]:
+        """
+        Returns the ancestors of an object in breadth-first order, fetching the unknown ones.
+
+        Args:
+            identifier (str): The identifier of the object.
+            max_depth (Optional[int], optional): The maximum number of generations. Defaults to None.
+
+        Returns:
+            list[str]: The identifiers of the ancestors, the closest first.
+        """
+        return self._walk(identifier, 'parents', max_depth)
+
+    def descendants(
+        self, identifier: str, max_depth: Optional[int] = None
+    ) -> list[str]:
+        """
+        Returns the descendants of an object in breadth-first order, fetching the unknown ones.
+
+        Args:
+            identifier (str): The identifier of the object.
+            max_depth (Optional[int], optional): The maximum number of generations. Defaults to None.
+
+        Returns:
+            list[str]: The identifiers of the descendants, the closest first.
+        """
+        return self._walk(identifier, 'children', max_depth)
+
+    def path(self, source: str, target: str) -> Optional[list[str]]:
+        """
+        Returns the shortest lineage from `source` to `target`, following the children of `source` if
+        `target` is a descendant, or its parents if `target` is an ancestor.
+
+        Args:
+            source (str): The identifier of the first object.
+            target (str): The identifier of the last object.
+
+        Returns:
+            Optional[list[str]]: The identifiers from `source` to `target`, or None if they are not in the
+                same lineage.
+        """
+        for direction in ('children', 'parents'):
+            self.fetch([source], direction=direction)
+            previous: dict[str, Optional[str]] = {source: None}
+            queue = deque([source])
+            while queue:
+                current = queue.popleft()
+                if current == target:
+                    path = [current]
+                    while previous[path[-1]] is not None:
+                        path.append(previous[path[-1]])
+                    return path[::-1]
+                for neighbour in self._neighbours(current, direction):
+                    if neighbour not in previous:
+                        previous[neighbour] = current
+                        queue.append(neighbour)
+        return None
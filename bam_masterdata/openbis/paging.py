@@ -0,0 +1,294 @@
+import datetime
+import math
+import re
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, NamedTuple, Optional
+
+from bam_masterdata.logger import logger
+from bam_masterdata.metadata.definitions import DataType, PropertyTypeAssignment
+from bam_masterdata.metadata.entities import ObjectType
+from bam_masterdata.metadata.registry import EntityRegistry
+from bam_masterdata.metrics import metrics
+
+# Columns of the pyBIS `DataFrame` of the objects which are not properties
+_ATTRIBUTE_COLUMNS = {
+    'identifier',
+    'permId',
+    'code',
+    'type',
+    'space',
+    'project',
+    'experiment',
+    'collection',
+    'parents',
+    'children',
+    'components',
+    'container',
+    'registrator',
+    'registrationDate',
+    'modifier',
+    'modificationDate',
+    'registered',
+    'attachments',
+    'tags',
+}
+
+
+class ObjectRecord(NamedTuple):
+    """
+    Object fetched by `iter_objects`, with its properties keyed by the attribute names of its
+    `ObjectType` (e.g., `name` for `$NAME`) and converted to their Python types.
+    """
+
+    identifier: str
+    perm_id: str
+    code: str
+    type: str
+    properties: dict[str, Any]
+
+
+def iter_pages(
+    fetch: Callable[[int, int], Any],
+    page_size: int = 500,
+    prefetch: bool = True,
+) -> Iterator[Any]:
+    """
+    Pages through the results of a listing or search. The next page is fetched in a background thread
+    while the caller works on the current one, so that at most two pages are kept in memory. E.g.:
+
+    ```python
+    for page in iter_pages(
+        lambda start, count: openbis.get_objects(collection=code, start_with=start, count=count)
+    ):
+        process(page.df)
+    ```
+
+    The pages are requested by offset: the entities created or deleted during the iteration may be
+    skipped or yielded twice.
+
+    Args:
+        fetch (Callable[[int, int], Any]): Function returning the results from an offset (`start_with`)
+            with a maximum length (`count`), e.g., the `Things` of pyBIS. Its `totalCount` attribute, if
+            present, is used to stop without requesting an empty page.
+        page_size (int, optional): The number of results per page. Defaults to 500.
+        prefetch (bool, optional): If True, the next page is fetched in the background. Defaults to True.
+
+    Yields:
+        Any: The non-empty pages.
+    """
+    if page_size < 1:
+        raise ValueError(f'`page_size` must be at least 1, got {page_size}.')
+
+    def fetch_page(start: int) -> Any:
+        with metrics.timer('paging.fetch'):
+            page = fetch(start, page_size)
+        metrics.increment('paging.pages')
+        return page
+
+    def has_next(page: Any, start: int) -> bool:
+        total = getattr(page, 'totalCount', None)
+        if isinstance(total, int):
+            return start + page_size < total
+        return len(page) == page_size
+
+    if not prefetch:
+        start = 0
+        while True:
+            page = fetch_page(start)
+            if len(page) == 0:
+                return
+            yield page
+            if not has_next(page, start):
+                return
+            start += page_size
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix='prefetch') as executor:
+        start = 0
+        future = executor.submit(fetch_page, start)
+        try:
+            while future is not None:
+                page = future.result()
+                if len(page) == 0:
+                    return
+                future = None
+                if has_next(page, start):
+                    start += page_size
+                    future = executor.submit(fetch_page, start)
+                yield page
+                # Drop the reference to the consumed page before waiting for the next one
+                del page
+        finally:
+            if future is not None:
+                future.cancel()
+
+
+# Timestamps of openBIS, e.g., `'2024-02-01 10:00:00 +0100'`, `'2024-02-01T09:00:00.5Z'` or without offset
+_TIMESTAMP = re.compile(
+    r'^(\d{4}-\d\d-\d\d[T ]\d\d:\d\d(?::\d\d)?)(?:\.(\d+))?\s*(?:(Z)|([+-])(\d\d):?(\d\d))?$'
+)
+
+
+def _parse_timestamp(value: Any) -> datetime.datetime:
+    """
+    Converts a timestamp of openBIS into a naive datetime in UTC. The values with a time zone (e.g., the
+    offset `+0100` returned by openBIS) are converted to UTC, and the values without are assumed in UTC.
+    The fraction of a second and the offset are parsed separately, as `datetime.fromisoformat` only
+    accepts 3 or 6 digits and no `Z` before Python 3.11. Digits beyond microseconds are truncated.
+    """
+    if isinstance(value, datetime.datetime):
+        timestamp = value
+    else:
+        match = _TIMESTAMP.match(str(value).strip())
+        if match is None or (match.group(2) and len(match.group(1)) < 19):
+            raise ValueError(f'Invalid timestamp `{value}`.')
+        local, fraction, utc, sign, hours, minutes = match.groups()
+        timestamp = datetime.datetime.fromisoformat(local)
+        if fraction:
+            timestamp = timestamp.replace(microsecond=int(fraction[:6].ljust(6, '0')))
+        if utc:
+            timestamp = timestamp.replace(tzinfo=datetime.timezone.utc)
+        elif sign:
+            offset = datetime.timedelta(hours=int(hours), minutes=int(minutes))
+            timestamp = timestamp.replace(
+                tzinfo=datetime.timezone(-offset if sign == '-' else offset)
+            )
+    if timestamp.tzinfo is None:
+        return timestamp
+    return timestamp.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+
+
+def _converter(data_type: DataType) -> Callable[[Any], Any]:
+    """Returns the function converting the values of openBIS of a data type to its Python type."""
+    if data_type == DataType.BOOLEAN:
+        return lambda value: (
+            value if isinstance(value, bool) else str(value).strip().lower() == 'true'
+        )
+    if data_type == DataType.INTEGER:
+        return int
+    if data_type == DataType.REAL:
+        return float
+    if data_type == DataType.DATE:
+        return lambda value: (
+            value
+            if isinstance(value, datetime.date)
+            else datetime.date.fromisoformat(str(value)[:10])
+        )
+    if data_type == DataType.TIMESTAMP:
+        return _parse_timestamp
+    return str
+
+
+class PropertyMapping(NamedTuple):
+    """Attribute name and converter of the property codes of an object type."""
+
+    fields: dict[str, str]
+    converters: dict[str, Callable[[Any], Any]]
+
+
+def property_mapping(object_type: ObjectType) -> PropertyMapping:
+    """
+    Returns the attribute name and the value converter of each property code of an object type.
+
+    Args:
+        object_type (ObjectType): The object type.
+
+    Returns:
+        PropertyMapping: The attribute names and converters keyed by property code.
+    """
+    fields = {}
+    converters = {}
+    for attr_name in dir(type(object_type)):
+        prop = getattr(type(object_type), attr_name, None)
+        if isinstance(prop, PropertyTypeAssignment):
+            fields[prop.code] = attr_name
+            converters[prop.code] = _converter(prop.data_type)
+    return PropertyMapping(fields, converters)
+
+
+def _is_missing(value: Any) -> bool:
+    return (
+        value is None or value == '' or (isinstance(value, float) and math.isnan(value))
+    )
+
+
+def iter_objects(
+    openbis: Any,
+    object_type: Optional[ObjectType] = None,
+    *,
+    registry: Optional[EntityRegistry] = None,
+    page_size: int = 500,
+    prefetch: bool = True,
+    **filters: Any,
+) -> Iterator[ObjectRecord]:
+    """
+    Streams the objects of a listing or search (e.g., all the objects of a collection) page by page with
+    `Openbis.get_objects(..., props='*', start_with=..., count=...)`, prefetching the next page in the
+    background. Each object is yielded as an `ObjectRecord` with its properties mapped through the
+    `ObjectType` of the object, so that the memory used depends on the page size and not on the number
+    of objects. The TIMESTAMP properties are converted into naive datetimes in UTC. E.g.:
+
+    ```python
+    for record in iter_objects(openbis, Instrument(), collection='/LAB/PROJECT/INSTRUMENTS'):
+        print(record.identifier, record.properties['name'])
+    ```
+
+    Args:
+        openbis (Any): The pyBIS client.
+        object_type (Optional[ObjectType], optional): The object type of the objects. If given, only its
+            objects are listed. Defaults to None.
+        registry (Optional[EntityRegistry], optional): The registry used to map the objects of other types.
+            Defaults to None (the properties of other types are keyed by their lowercase code, unconverted).
+        page_size (int, optional): The number of objects per request. Defaults to 500.
+        prefetch (bool, optional): If True, the next page is fetched in the background. Defaults to True.
+        **filters (Any): The filters of `get_objects`, e.g., `collection`, `space` or `where`.
+
+    Yields:
+        ObjectRecord: The objects with their typed properties.
+    """
+    if object_type is not None:
+        filters['type'] = object_type.defs.code
+    mappings: dict[str, Optional[PropertyMapping]] = {}
+    if object_type is not None:
+        mappings[object_type.defs.code] = property_mapping(object_type)
+
+    def mapping_of(type_code: str) -> Optional[PropertyMapping]:
+        if type_code not in mappings:
+            other = registry.get_object_type(type_code) if registry else None
+            mappings[type_code] = property_mapping(other) if other else None
+            if other is None:
+                logger.info(f'The objects of {type_code} are yielded without mapping.')
+        return mappings[type_code]
+
+    def fetch(start: int, count: int) -> Any:
+        return openbis.get_objects(start_with=start, count=count, props='*', **filters)
+
+    for page in iter_pages(fetch, page_size=page_size, prefetch=prefetch):
+        for row in page.df.to_dict('records'):
+            type_code = row.get('type')
+            mapping = mapping_of(type_code)
+            properties = {}
+            for column, value in row.items():
+                if column in _ATTRIBUTE_COLUMNS or _is_missing(value):
+                    continue
+                code = column.upper()
+                if mapping is None:
+                    properties[code.lower()] = value
+                    continue
+                field = mapping.fields.get(code)
+                if field is None:
+                    continue
+                try:
+                    properties[field] = mapping.converters[code](value)
+                except (TypeError, ValueError):
+                    logger.warning(
+                        f'Keeping the value `{value}` of {code} of {row.get("identifier")} unconverted.'
+                    )
+                    properties[field] = value
+            yield ObjectRecord(
+                identifier=row.get('identifier'),
+                perm_id=row.get('permId'),
+                code=row.get('code'),
+                type=type_code,
+                properties=properties,
+            )
@@ -0,0 +1,354 @@
+import json
+import os
+import re
+from collections.abc import Iterator
+from typing import Any, NamedTuple, Optional
+
+import yaml
+from pydantic import BaseModel, Field, field_validator
+
+from bam_masterdata.logger import logger
+from bam_masterdata.metrics import metrics
+
+
+def _validate_code(value: str) -> str:
+    value = value.strip().upper()
+    if not re.match(r'^[A-Z0-9_\-\.]+$', value):
+        raise ValueError(
+            f'`code` must only contain letters, digits, underscores, dashes and dots, got `{value}`.'
+        )
+    return value
+
+
+class CollectionSpec(BaseModel):
+    """Collection to provision in a project."""
+
+    code: str = Field(..., description='Code of the collection, e.g., `SAMPLES`.')
+
+    type: str = Field(
+        ...,
+        description='Code of the `CollectionType` of the collection, e.g., `DEFAULT_EXPERIMENT`.',
+    )
+
+    props: dict[str, Any] = Field(
+        default={}, description='Properties of the collection keyed by code.'
+    )
+
+    @field_validator('code', 'type')
+    @classmethod
+    def validate_code(cls, value: str) -> str:
+        return _validate_code(value)
+
+
+class ProjectSpec(BaseModel):
+    """Project to provision in a space, with its collections."""
+
+    code: str = Field(..., description='Code of the project, e.g., `WELDING`.')
+
+    description: Optional[str] = Field(None, description='Description of the project.')
+
+    collections: list[CollectionSpec] = Field(
+        default=[], description='Collections of the project.'
+    )
+
+    @field_validator('code')
+    @classmethod
+    def validate_code(cls, value: str) -> str:
+        return _validate_code(value)
+
+
+class SpaceSpec(BaseModel):
+    """Space to provision, with its projects."""
+
+    code: str = Field(..., description='Code of the space, e.g., `MATERIALS`.')
+
+    description: Optional[str] = Field(None, description='Description of the space.')
+
+    projects: list[ProjectSpec] = Field(
+        default=[], description='Projects of the space.'
+    )
+
+    @field_validator('code')
+    @classmethod
+    def validate_code(cls, value: str) -> str:
+        return _validate_code(value)
+
+
+class ProvisioningSpec(BaseModel):
+    """
+    Declarative description of a hierarchy of spaces, projects and collections, e.g., in YAML:
+
+    ```yaml
+    spaces:
+      - code: MATERIALS
+        description: Materials department
+        projects:
+          - code: WELDING
+            collections:
+              - code: SAMPLES
+                type: DEFAULT_EXPERIMENT
+    ```
+    """
+
+    spaces: list[SpaceSpec] = Field(default=[], description='Spaces to provision.')
+
+    def iter_projects(self) -> Iterator[tuple[str, ProjectSpec]]:
+        """Iterates over the identifiers and specifications of the projects."""
+        for space in self.spaces:
+            for project in space.projects:
+                yield f'/{space.code}/{project.code}', project
+
+    def iter_collections(self) -> Iterator[tuple[str, str, CollectionSpec]]:
+        """Iterates over the identifiers, project identifiers and specifications of the collections."""
+        for project_identifier, project in self.iter_projects():
+            for collection in project.collections:
+                yield (
+                    f'{project_identifier}/{collection.code}',
+                    project_identifier,
+                    collection,
+                )
+
+
+def load_spec(path: str) -> ProvisioningSpec:
+    """
+    Loads a provisioning specification from a YAML (`.yaml` or `.yml`) or JSON file.
+
+    Args:
+        path (str): The path of the file.
+
+    Returns:
+        ProvisioningSpec: The validated specification.
+    """
+    with open(path, encoding='utf-8') as f:
+        if os.path.splitext(path)[1].lower() in ('.yaml', '.yml'):
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+    return ProvisioningSpec.model_validate(data or {})
+
+
+class ProvisioningPlan(BaseModel):
+    """Containers of a specification which are missing in openBIS, in dependency order."""
+
+    spaces: list[str] = Field(default=[], description='Codes of the missing spaces.')
+
+    projects: list[str] = Field(
+        default=[], description='Identifiers of the missing projects.'
+    )
+
+    collections: list[str] = Field(
+        default=[], description='Identifiers of the missing collections.'
+    )
+
+    existing: int = Field(
+        0, description='Number of containers of the specification which already exist.'
+    )
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.spaces or self.projects or self.collections)
+
+
+def _listed(things: Any, column: str) -> set[str]:
+    """Returns the values of a column of the `DataFrame` of a pyBIS listing."""
+    df = things.df
+    if df is None or len(df) == 0 or column not in df.columns:
+        return set()
+    return {str(value).upper() for value in df[column]}
+
+
+def plan(openbis: Any, spec: ProvisioningSpec) -> ProvisioningPlan:
+    """
+    Compares a specification with the containers in openBIS, listing each level (spaces, projects and
+    collections) with a single request. The levels below a level where everything is missing are not
+    listed.
+
+    Args:
+        openbis (Any): The pyBIS client.
+        spec (ProvisioningSpec): The specification.
+
+    Returns:
+        ProvisioningPlan: The containers to create.
+    """
+    result = ProvisioningPlan()
+    spaces = [space.code for space in spec.spaces]
+    existing_spaces = _listed(openbis.get_spaces(), 'code') if spaces else set()
+    result.spaces = [code for code in spaces if code not in existing_spaces]
+
+    projects = [identifier for identifier, _ in spec.iter_projects()]
+    # The projects of missing spaces are missing, so that they are only listed if a space exists
+    existing_projects = (
+        _listed(openbis.get_projects(), 'identifier')
+        if projects and existing_spaces
+        else set()
+    )
+    result.projects = [
+        identifier for identifier in projects if identifier not in existing_projects
+    ]
+
+    collections = [identifier for identifier, _, _ in spec.iter_collections()]
+    existing_collections = (
+        _listed(openbis.get_collections(), 'identifier')
+        if collections and existing_projects
+        else set()
+    )
+    result.collections = [
+        identifier
+        for identifier in collections
+        if identifier not in existing_collections
+    ]
+    result.existing = (
+        len(spaces)
+        + len(projects)
+        + len(collections)
+        - len(result.spaces)
+        - len(result.projects)
+        - len(result.collections)
+    )
+    return result
+
+
+class ProvisioningReport(BaseModel):
+    """Summary of a provisioning run."""
+
+    plan: ProvisioningPlan = Field(..., description='The plan which was applied.')
+
+    transactions: int = Field(0, description='Number of transactions committed.')
+
+    dry_run: bool = Field(
+        False, description='If True, the plan was computed but not applied.'
+    )
+
+
+class _Reference(NamedTuple):
+    """
+    Reference to a container by its id, which pyBIS accepts in place of the container object (e.g., as
+    the `space` of `new_project`). A code or identifier given as a string is fetched from openBIS
+    instead, which costs a round trip per entity and fails for the containers of the same run which are
+    not committed yet.
+    """
+
+    data: dict
+
+
+def _space_reference(code: str) -> _Reference:
+    return _Reference(
+        {'permId': {'@type': 'as.dto.space.id.SpacePermId', 'permId': code}}
+    )
+
+
+def _project_reference(identifier: str) -> _Reference:
+    return _Reference(
+        {
+            'identifier': {
+                '@type': 'as.dto.project.id.ProjectIdentifier',
+                'identifier': identifier,
+            }
+        }
+    )
+
+
+def _commit(openbis: Any, entities: list, batch_size: int) -> int:
+    """Commits the new entities in transactions of `batch_size`, returning the number of transactions."""
+    transactions = 0
+    for start in range(0, len(entities), batch_size):
+        batch = entities[start : start + batch_size]
+        openbis.new_transaction(*batch).commit()
+        transactions += 1
+        metrics.increment('provisioning.created', len(batch))
+    return transactions
+
+
+def provision(
+    openbis: Any,
+    spec: ProvisioningSpec,
+    batch_size: int = 200,
+    dry_run: bool = False,
+) -> ProvisioningReport:
+    """
+    Creates the spaces, projects and collections of a specification which are missing in openBIS. The
+    specification is compared with openBIS with one listing per level (see `plan`), and the missing
+    containers are created in dependency order (spaces, then projects, then collections), in batched
+    transactions, so that hundreds of containers take a few round trips. The existing containers are
+    not modified, so that the provisioning can be run again. E.g.:
+
+    ```python
+    report = provision(openbis, load_spec('department.yaml'))
+    print(f'{len(report.plan.collections)} collections created')
+    ```
+
+    Args:
+        openbis (Any): The pyBIS client.
+        spec (ProvisioningSpec): The specification.
+        batch_size (int, optional): The maximum number of containers per transaction. Defaults to 200.
+        dry_run (bool, optional): If True, only the plan is computed. Defaults to False.
+
+    Returns:
+        ProvisioningReport: The plan and the number of transactions.
+    """
+    if batch_size < 1:
+        raise ValueError(f'`batch_size` must be at least 1, got {batch_size}.')
+    with metrics.timer('provisioning.plan'):
+        result = plan(openbis, spec)
+    report = ProvisioningReport(plan=result, dry_run=dry_run)
+    if dry_run or result.is_empty:
+        return report
+
+    missing_collections = set(result.collections)
+    types = {
+        collection.type
+        for identifier, _, collection in spec.iter_collections()
+        if identifier in missing_collections
+    }
+    if types:
+        available = _listed(openbis.get_collection_types(), 'code')
+        unknown = sorted(types - available)
+        if unknown:
+            raise ValueError(f'The collection types {unknown} do not exist in openBIS.')
+
+    missing_spaces = set(result.spaces)
+    missing_projects = set(result.projects)
+    # Each level is built once the previous one is committed, referencing its containers by id
+    levels = [
+        (
+            'spaces',
+            lambda: [
+                openbis.new_space(code=space.code, description=space.description)
+                for space in spec.spaces
+                if space.code in missing_spaces
+            ],
+        ),
+        (
+            'projects',
+            lambda: [
+                openbis.new_project(
+                    space=_space_reference(identifier.split('/')[1]),
+                    code=project.code,
+                    description=project.description,
+                )
+                for identifier, project in spec.iter_projects()
+                if identifier in missing_projects
+            ],
+        ),
+        (
+            'collections',
+            lambda: [
+                openbis.new_collection(
+                    type=collection.type,
+                    code=collection.code,
+                    project=_project_reference(project_identifier),
+                    props=collection.props or None,
+                )
+                for identifier, project_identifier, collection in spec.iter_collections()
+                if identifier in missing_collections
+            ],
+        ),
+    ]
+    for level, build in levels:
+        entities = build()
+        if not entities:
+            continue
+        with metrics.timer(f'provisioning.{level}'):
+            report.transactions += _commit(openbis, entities, batch_size)
+        logger.info(f'Created {len(entities)} {level}.')
+    return report
@@ -0,0 +1,297 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+from pybis import Openbis
+from pydantic import BaseModel, Field
+
+from bam_masterdata.logger import logger
+from bam_masterdata.metrics import metrics
+
+
+class SessionPoolStats(BaseModel):
+    """Counters of the sessions handed out by a `SessionPool`."""
+
+    created: int = Field(0, description='Number of clients created.')
+
+    logins: int = Field(0, description='Number of logins with username and password.')
+
+    token_reuses: int = Field(
+        0,
+        description='Number of clients authenticated with the cached session token instead of a login.',
+    )
+
+    acquired: int = Field(0, description='Number of clients handed out.')
+
+    reuses: int = Field(
+        0, description='Number of clients handed out which were already in the pool.'
+    )
+
+    health_checks: int = Field(
+        0, description='Number of session checks before handing out a client.'
+    )
+
+    refreshes: int = Field(
+        0, description='Number of expired sessions which were authenticated again.'
+    )
+
+    discarded: int = Field(0, description='Number of clients removed from the pool.')
+
+
+class _PooledClient:
+    """Client of the pool with the time of its last session check."""
+
+    __slots__ = ('client', 'checked_at')
+
+    def __init__(self, client: Any, checked_at: float):
+        self.client = client
+        self.checked_at = checked_at
+
+
+class SessionPool:
+    """
+    Thread-safe pool of authenticated pyBIS `Openbis` clients. The clients are created on demand up to
+    `max_size`, and handed out to one thread at a time, e.g.:
+
+    ```python
+    pool = SessionPool('https://devel.datastore.bam.de/', 'user', 'password', max_size=4)
+
+    def job(identifier):
+        with pool.session() as openbis:
+            return openbis.get_object(identifier)
+    ```
+
+    Instead of logging in each client, the session token of the first login is cached (in memory
+    and, if `token_path` is given, in a file shared by the worker scripts) and set in the next clients.
+    Before a client is handed out, its session is checked (at most every `check_interval` seconds) and
+    refreshed if it expired, with a single login shared by all the threads. The `stats` count the
+    logins and the reuses, to confirm the drop of the login traffic.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        username: str,
+        password: str,
+        *,
+        max_size: int = 4,
+        token_path: Optional[str] = None,
+        token_ttl: Optional[float] = None,
+        check_interval: Optional[float] = 60.0,
+        factory: Optional[Callable[[], Any]] = None,
+    ):
+        if max_size < 1:
+            raise ValueError(f'`max_size` must be at least 1, got {max_size}.')
+        self.url = url
+        self.username = username
+        self._password = password
+        self.max_size = max_size
+        self.token_path = token_path
+        self.token_ttl = token_ttl
+        self.check_interval = check_interval
+        self.factory = factory or functools.partial(Openbis, url)
+        self.stats = SessionPoolStats()
+        self._idle: list[_PooledClient] = []
+        self._handed_out: dict[int, _PooledClient] = {}
+        self._size = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._token_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._token: Optional[str] = None
+        self._token_issued_at = 0.0
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            setattr(self.stats, name, getattr(self.stats, name) + 1)
+        metrics.increment(f'session_pool.{name}')
+
+    def _cached_token(self) -> Optional[str]:
+        """Returns the cached session token, unless it is older than `token_ttl`."""
+        if self._token is None and self.token_path and os.path.exists(self.token_path):
+            try:
+                with open(self.token_path, encoding='utf-8') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                logger.warning(
+                    f'Ignoring the unreadable token cache {self.token_path}.'
+                )
+            else:
+                if (
+                    data.get('url') == self.url
+                    and data.get('username') == self.username
+                ):
+                    self._token = data.get('token')
+                    self._token_issued_at = data.get('issued_at', 0.0)
+        if self._token is None:
+            return None
+        if (
+            self.token_ttl is not None
+            and time.time() - self._token_issued_at > self.token_ttl
+        ):
+            return None
+        return self._token
+
+    def _store_token(self, token: str) -> None:
+        self._token = token
+        self._token_issued_at = time.time()
+        if not self.token_path:
+            return
+        directory = os.path.dirname(self.token_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{self.token_path}.tmp'
+        # The token grants access to openBIS, so that the file is only readable by the user
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(
+                {
+                    'url': self.url,
+                    'username': self.username,
+                    'token': token,
+                    'issued_at': self._token_issued_at,
+                },
+                f,
+            )
+        os.replace(tmp_path, self.token_path)
+
+    def _authenticate(self, client: Any) -> None:
+        """
+        Authenticates a client with the cached token or, if there is none or it is no longer valid,
+        with a login. The lock makes the threads with expired sessions wait for a single login.
+        """
+        with self._token_lock:
+            token = self._cached_token()
+            if token and token != getattr(client, 'token', None):
+                try:
+                    client.set_token(token)
+                except ValueError:
+                    logger.info('The cached openBIS session token expired.')
+                else:
+                    self._count('token_reuses')
+                    return
+            client.login(self.username, self._password)
+            self._count('logins')
+            self._store_token(client.token)
+
+    def _check(self, pooled: _PooledClient) -> None:
+        now = time.monotonic()
+        if (
+            self.check_interval is not None
+            and now - pooled.checked_at < self.check_interval
+        ):
+            return
+        self._count('health_checks')
+        if not pooled.client.is_session_active():
+            self._count('refreshes')
+            self._authenticate(pooled.client)
+        pooled.checked_at = now
+
+    def acquire(self, timeout: Optional[float] = None) -> Any:
+        """
+        Hands out an authenticated client, waiting for one to be released if the pool is full. The client
+        must be given back with `release`.
+
+        Args:
+            timeout (Optional[float], optional): The maximum time in seconds waiting for a free client.
+                Defaults to None (no limit).
+
+        Returns:
+            Any: The authenticated pyBIS client.
+        """
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: self._closed or self._idle or self._size < self.max_size,
+                timeout,
+            ):
+                raise TimeoutError(
+                    f'No openBIS session was released within {timeout} s.'
+                )
+            if self._closed:
+                raise RuntimeError('The session pool is closed.')
+            pooled = self._idle.pop() if self._idle else None
+            if pooled is None:
+                self._size += 1
+        try:
+            if pooled is None:
+                client = self.factory()
+                self._count('created')
+                self._authenticate(client)
+                pooled = _PooledClient(client, time.monotonic())
+            else:
+                self._count('reuses')
+                self._check(pooled)
+        except Exception:
+            # The failed client does not take a slot of the pool
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            self._count('discarded')
+            raise
+        self._count('acquired')
+        self._handed_out[id(pooled.client)] = pooled
+        return pooled.client
+
+    def release(self, client: Any, discard: bool = False) -> None:
+        """
+        Gives a client back to the pool.
+
+        Args:
+            client (Any): The client handed out by `acquire`.
+            discard (bool, optional): If True, the client is removed from the pool, e.g., after a
+                connection error. Defaults to False.
+        """
+        pooled = self._handed_out.pop(id(client), None)
+        if pooled is None:
+            raise ValueError('The client was not handed out by this pool.')
+        with self._condition:
+            if discard or self._closed:
+                self._size -= 1
+                self._count('discarded')
+            else:
+                self._idle.append(pooled)
+            self._condition.notify()
+
+    @contextmanager
+    def session(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """
+        Context manager handing out an authenticated client and releasing it on exit. The client is
+        discarded if the block raises a `ConnectionError`.
+
+        Args:
+            timeout (Optional[float], optional): The maximum time in seconds waiting for a free client.
+                Defaults to None (no limit).
+
+        Yields:
+            Any: The authenticated pyBIS client.
+        """
+        client = self.acquire(timeout)
+        try:
+            yield client
+        except ConnectionError:
+            self.release(client, discard=True)
+            raise
+        except BaseException:
+            self.release(client)
+            raise
+        else:
+            self.release(client)
+
+    def close(self) -> None:
+        """Removes the idle clients and refuses to hand out more. The cached token is kept."""
+        with self._condition:
+            self._closed = True
+            self._size -= len(self._idle)
+            self._idle.clear()
+            self._condition.notify_all()
+
+    def __enter__(self) -> 'SessionPool':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -0,0 +1,388 @@
+import bisect
+import hashlib
+import inspect
+import math
+import os
+import pickle
+import re
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+from bam_masterdata.metadata.registry import EntityRegistry
+
+# Tokens are sequences of letters and digits, so that codes are also split by `_`, `.` and `$`
+TOKEN_PATTERN = re.compile(r'[^\W_]+')
+
+# Weight of each indexed field in the ranking of the results
+FIELD_WEIGHTS = {
+    'code': 3.0,
+    'label': 2.0,
+    'description_en': 1.0,
+    'description_de': 1.0,
+}
+
+# Fields searched when filtering by language
+LANGUAGE_FIELDS = {
+    'en': ('code', 'label', 'description_en'),
+    'de': ('description_de',),
+}
+
+# Version of the on-disk format of the index, bumped when the pickled structures change
+CACHE_VERSION = 1
+
+
+def tokenize(text: Optional[str]) -> list[str]:
+    """
+    Splits `text` into case-folded tokens, e.g., `tokenize('WELDING.TORCH_TYPE')` returns
+    `['welding', 'torch', 'type']`.
+
+    Args:
+        text (Optional[str]): The text to tokenize.
+
+    Returns:
+        list[str]: The list of tokens.
+    """
+    if not text:
+        return []
+    return TOKEN_PATTERN.findall(text.casefold())
+
+
+def split_description(description: str) -> tuple[str, str]:
+    """
+    Splits a bilingual description `'English//Deutsch'` into its English and German halves.
+
+    Args:
+        description (str): The description of an entity definition.
+
+    Returns:
+        tuple[str, str]: The English and German descriptions. The German one is empty if not defined.
+    """
+    parts = description.split('//')
+    english = parts[0].strip()
+    german = parts[1].strip() if len(parts) > 1 else ''
+    return english, german
+
+
+class SearchDocument(BaseModel):
+    """
+    Indexed entry representing an entity definition (object type, property type, vocabulary type,
+    vocabulary term or data set type).
+    """
+
+    kind: str = Field(
+        ...,
+        description="""
+        Kind of definition: `'object_type'`, `'property_type'`, `'vocabulary_type'`, `'vocabulary_term'`
+        or `'dataset_type'`.
+        """,
+    )
+
+    code: str = Field(..., description='Code of the definition.')
+
+    label: str = Field(
+        '', description='Property label or vocabulary term label, if any.'
+    )
+
+    description_en: str = Field('', description='English half of the description.')
+
+    description_de: str = Field('', description='German half of the description.')
+
+    parents: list[str] = Field(
+        default=[],
+        description="""
+        Codes of the entities containing the definition, i.e., the object types assigning a property type
+        or the vocabulary type of a term.
+        """,
+    )
+
+
+class SearchResult(BaseModel):
+    """A document matching a query with its relevance `score`."""
+
+    document: SearchDocument
+
+    score: float
+
+
+def _document(kind: str, defs, label: str = '', parent: Optional[str] = None):
+    english, german = split_description(defs.description)
+    return SearchDocument(
+        kind=kind,
+        code=defs.code,
+        label=label or '',
+        description_en=english,
+        description_de=german,
+        parents=[parent] if parent else [],
+    )
+
+
+def collect_documents(registry: EntityRegistry) -> list[SearchDocument]:
+    """
+    Collects the search documents of all the definitions of a registry. The property types assigned
+    to several object types are indexed only once, with all the object types in their `parents`.
+
+    Args:
+        registry (EntityRegistry): The registry of the datamodel.
+
+    Returns:
+        list[SearchDocument]: The documents to index.
+    """
+    documents = []
+    for object_type in registry.object_types:
+        documents.append(_document('object_type', object_type.defs))
+    properties: dict[str, SearchDocument] = {}
+    for object_type, prop in registry.iter_property_assignments():
+        document = properties.get(prop.code)
+        if document is None:
+            document = _document('property_type', prop, label=prop.property_label)
+            properties[prop.code] = document
+            documents.append(document)
+        if object_type.defs.code not in document.parents:
+            document.parents.append(object_type.defs.code)
+    for vocabulary_type in registry.vocabulary_types:
+        documents.append(_document('vocabulary_type', vocabulary_type.defs))
+    for vocabulary_type, term in registry.iter_vocabulary_terms():
+        documents.append(
+            _document(
+                'vocabulary_term',
+                term,
+                label=term.label,
+                parent=vocabulary_type.defs.code,
+            )
+        )
+    for dataset_type in registry.dataset_types:
+        documents.append(_document('dataset_type', dataset_type.defs))
+    return documents
+
+
+def registry_fingerprint(registry: EntityRegistry) -> str:
+    """
+    Returns a fingerprint of a registry which changes whenever its definitions may have changed. It
+    uses the codes and versions of the entity classes and the size and modification time of their
+    source files, so that it is computed without instantiating the entities.
+
+    Args:
+        registry (EntityRegistry): The registry of the datamodel.
+
+    Returns:
+        str: The SHA-256 fingerprint.
+    """
+    fingerprint = hashlib.sha256(f'v{CACHE_VERSION}'.encode())
+    source_files = set()
+    for entity_cls in (
+        registry.object_types + registry.vocabulary_types + registry.dataset_types
+    ):
+        fingerprint.update(
+            f'{entity_cls.defs.code}:{entity_cls.defs.version};'.encode()
+        )
+        try:
+            source_files.add(inspect.getsourcefile(entity_cls))
+        except TypeError:
+            continue
+    for source_file in sorted(filter(None, source_files)):
+        stat = os.stat(source_file)
+        fingerprint.update(f'{source_file}:{stat.st_size}:{stat.st_mtime_ns};'.encode())
+    return fingerprint.hexdigest()
+
+
+class InvertedIndex:
+    """
+    Inverted index over the codes, labels and English and German descriptions of the definitions of a
+    datamodel. The text is tokenized and case-folded, and the queries are ranked using the TF-IDF of the
+    matched tokens weighted by the field in which they appear (see `FIELD_WEIGHTS`). E.g.:
+
+    ```python
+    index = InvertedIndex.load_or_build(EntityRegistry.from_datamodel(), '.cache/search.pkl')
+    for result in index.search('torch typ', prefix=True, kinds=['property_type']):
+        print(result.document.code, result.score)
+    ```
+    """
+
+    def __init__(self, documents: list[SearchDocument]):
+        self.documents = documents
+        # `postings[field][token]` maps the id of each document containing `token` in `field` to the
+        # number of occurrences
+        self.postings: dict[str, dict[str, dict[int, int]]] = {
+            field: {} for field in FIELD_WEIGHTS
+        }
+        # Length normalization `1 / sqrt(number of tokens)` of each field of each document
+        self.norms: dict[str, list[float]] = {field: [] for field in FIELD_WEIGHTS}
+        for doc_id, document in enumerate(documents):
+            for field, postings in self.postings.items():
+                tokens = tokenize(getattr(document, field))
+                self.norms[field].append(1 / math.sqrt(len(tokens)) if tokens else 0.0)
+                for token in tokens:
+                    doc_postings = postings.setdefault(token, {})
+                    doc_postings[doc_id] = doc_postings.get(doc_id, 0) + 1
+        # Sorted list of all the tokens, used for prefix matching
+        self.vocabulary = sorted(
+            {token for postings in self.postings.values() for token in postings}
+        )
+        self.fingerprint: Optional[str] = None
+
+    @classmethod
+    def from_registry(cls, registry: EntityRegistry) -> 'InvertedIndex':
+        """
+        Builds the index of all the definitions of a registry.
+
+        Args:
+            registry (EntityRegistry): The registry of the datamodel.
+
+        Returns:
+            InvertedIndex: The index.
+        """
+        index = cls(collect_documents(registry))
+        index.fingerprint = registry_fingerprint(registry)
+        return index
+
+    def save(self, path: str) -> None:
+        """
+        Saves the index in `path`. The file is replaced atomically.
+
+        Args:
+            path (str): The path of the cache file.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(
+                (CACHE_VERSION, self.fingerprint, self),
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(
+        cls, path: str, fingerprint: Optional[str] = None
+    ) -> Optional['InvertedIndex']:
+        """
+        Loads an index saved with `save`.
+
+        Args:
+            path (str): The path of the cache file.
+            fingerprint (Optional[str], optional): If given, the index is only returned if it was built
+                from a registry with the same fingerprint. Defaults to None.
+
+        Returns:
+            Optional[InvertedIndex]: The index, or None if the cache is missing, outdated or unreadable.
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                version, cached_fingerprint, index = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, AttributeError):
+            return None
+        if version != CACHE_VERSION:
+            return None
+        if fingerprint is not None and cached_fingerprint != fingerprint:
+            return None
+        return index
+
+    @classmethod
+    def load_or_build(
+        cls, registry: EntityRegistry, cache_path: str
+    ) -> 'InvertedIndex':
+        """
+        Loads the index of a registry from the cache in `cache_path`, or builds it and stores it in the
+        cache if it is missing or outdated.
+
+        Args:
+            registry (EntityRegistry): The registry of the datamodel.
+            cache_path (str): The path of the cache file.
+
+        Returns:
+            InvertedIndex: The index.
+        """
+        fingerprint = registry_fingerprint(registry)
+        index = cls.load(cache_path, fingerprint=fingerprint)
+        if index is None:
+            index = cls.from_registry(registry)
+            index.save(cache_path)
+        return index
+
+    def _expand(self, token: str, prefix: bool) -> list[str]:
+        """Returns the indexed tokens matching `token`, or starting with it if `prefix` is True."""
+        if not prefix:
+            return [token]
+        start = bisect.bisect_left(self.vocabulary, token)
+        end = bisect.bisect_left(self.vocabulary, token + '\uffff', lo=start)
+        return self.vocabulary[start:end]
+
+    def search(
+        self,
+        query: str,
+        *,
+        limit: Optional[int] = 10,
+        language: Optional[str] = None,
+        kinds: Optional[list[str]] = None,
+        prefix: bool = False,
+        require_all: bool = False,
+    ) -> list[SearchResult]:
+        """
+        Searches the documents matching the terms of `query`, ranked by relevance.
+
+        Args:
+            query (str): The query, e.g., `'welding torch'`.
+            limit (Optional[int], optional): The maximum number of results. Defaults to 10.
+            language (Optional[str], optional): `'en'` or `'de'` to search only the fields in that
+                language. Defaults to None (all fields).
+            kinds (Optional[list[str]], optional): The kinds of documents to return, e.g.,
+                `['property_type']`. Defaults to None (all kinds).
+            prefix (bool, optional): If True, the query terms match the tokens starting with them.
+                Defaults to False.
+            require_all (bool, optional): If True, only the documents matching all the query terms are
+                returned. Defaults to False.
+
+        Returns:
+            list[SearchResult]: The matching documents sorted by decreasing score.
+        """
+        if language is not None and language not in LANGUAGE_FIELDS:
+            raise ValueError(
+                f'`language` must be one of {list(LANGUAGE_FIELDS)}, got {language}.'
+            )
+        fields = LANGUAGE_FIELDS[language] if language else tuple(FIELD_WEIGHTS)
+        n_documents = len(self.documents) or 1
+
+        scores: dict[int, float] = {}
+        matched_terms: dict[int, int] = {}
+        terms = list(dict.fromkeys(tokenize(query)))
+        for term in terms:
+            term_docs: set[int] = set()
+            for token in self._expand(term, prefix):
+                for field in fields:
+                    doc_postings = self.postings[field].get(token)
+                    if not doc_postings:
+                        continue
+                    idf = math.log(1 + n_documents / len(doc_postings))
+                    weight = FIELD_WEIGHTS[field] * idf
+                    norms = self.norms[field]
+                    for doc_id, count in doc_postings.items():
+                        tf = 1 + math.log(count) if count > 1 else 1.0
+                        scores[doc_id] = (
+                            scores.get(doc_id, 0.0) + weight * tf * norms[doc_id]
+                        )
+                        term_docs.add(doc_id)
+            for doc_id in term_docs:
+                matched_terms[doc_id] = matched_terms.get(doc_id, 0) + 1
+
+        results = []
+        for doc_id, score in scores.items():
+            if require_all and matched_terms[doc_id] < len(terms):
+                continue
+            document = self.documents[doc_id]
+            if kinds is not None and document.kind not in kinds:
+                continue
+            results.append((score, doc_id))
+        # Ties are broken by the order of the documents, so that the results are stable
+        results.sort(key=lambda item: (-item[0], item[1]))
+        if limit is not None:
+            results = results[:limit]
+        return [
+            SearchResult(document=self.documents[doc_id], score=score)
+            for score, doc_id in results
+        ]
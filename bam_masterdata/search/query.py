@@ -0,0 +1,142 @@
+from collections.abc import Iterable
+from typing import Any, NamedTuple
+
+from bam_masterdata.metadata.definitions import PropertyTypeAssignment
+from bam_masterdata.metadata.registry import EntityRegistry
+
+# Fields of the property type assignments with a secondary index. `object_type` is the code of the
+# object type to which the property is assigned.
+INDEXED_FIELDS = (
+    'object_type',
+    'code',
+    'data_type',
+    'section',
+    'mandatory',
+    'vocabulary_code',
+)
+
+
+class AssignmentRow(NamedTuple):
+    """A property type assignment together with the code of its object type."""
+
+    object_type: str
+    assignment: PropertyTypeAssignment
+
+
+class PropertyQuery:
+    """
+    Query API over the property type assignments of a datamodel. Secondary indexes mapping each value
+    of the `INDEXED_FIELDS` to the set of matching assignments are computed once, so that composed
+    filters are evaluated as set intersections instead of iterating over all the object types. The
+    results are returned in the order of the object types in the registry. E.g.:
+
+    ```python
+    query = PropertyQuery(EntityRegistry.from_datamodel())
+    rows = query.filter(
+        data_type='CONTROLLEDVOCABULARY', mandatory=True, section='General information'
+    )
+    object_types = query.object_types_using_vocabulary('WELDING.GMAW_TORCH_TYPE')
+    ```
+    """
+
+    def __init__(self, registry: EntityRegistry):
+        self.rows: list[AssignmentRow] = [
+            AssignmentRow(object_type=object_type.defs.code, assignment=prop)
+            for object_type, prop in registry.iter_property_assignments()
+        ]
+        self.indexes: dict[str, dict[Any, set[int]]] = {
+            field: {} for field in INDEXED_FIELDS
+        }
+        for row_id, row in enumerate(self.rows):
+            for field in INDEXED_FIELDS:
+                if field == 'object_type':
+                    value = row.object_type
+                else:
+                    value = getattr(row.assignment, field)
+                self.indexes[field].setdefault(value, set()).add(row_id)
+
+    def values(self, field: str) -> list:
+        """
+        Returns the distinct values of an indexed field.
+
+        Args:
+            field (str): The name of the indexed field, e.g., `'section'`.
+
+        Returns:
+            list: The distinct values, sorted.
+        """
+        return sorted(
+            self._index(field).keys(), key=lambda value: (value is None, str(value))
+        )
+
+    def _index(self, field: str) -> dict[Any, set[int]]:
+        index = self.indexes.get(field)
+        if index is None:
+            raise KeyError(
+                f'`{field}` is not an indexed field, the indexed fields are {list(INDEXED_FIELDS)}.'
+            )
+        return index
+
+    def select(self, **criteria: Any) -> set[int]:
+        """
+        Returns the ids of the rows matching all the `criteria`. The value of each criterion can be a
+        single value or a list, tuple or set of values, in which case any of them matches, e.g.,
+        `select(data_type=['INTEGER', 'REAL'], mandatory=True)`.
+
+        Args:
+            **criteria (Any): The values of the indexed fields to match.
+
+        Returns:
+            set[int]: The ids of the matching rows.
+        """
+        matches = []
+        for field, value in criteria.items():
+            index = self._index(field)
+            if isinstance(value, (list, tuple, set, frozenset)):
+                ids: set[int] = set()
+                for item in value:
+                    ids |= index.get(item, set())
+            else:
+                ids = index.get(value, set())
+            if not ids:
+                return set()
+            matches.append(ids)
+        if not matches:
+            return set(range(len(self.rows)))
+        # Intersecting from the smallest set keeps the intermediate results small
+        matches.sort(key=len)
+        result = set(matches[0])
+        for ids in matches[1:]:
+            result &= ids
+            if not result:
+                break
+        return result
+
+    def rows_of(self, ids: Iterable[int]) -> list[AssignmentRow]:
+        """Returns the rows with the given ids in stable order."""
+        return [self.rows[row_id] for row_id in sorted(ids)]
+
+    def filter(self, **criteria: Any) -> list[AssignmentRow]:
+        """
+        Returns the property type assignments matching all the `criteria` (see `select`).
+
+        Args:
+            **criteria (Any): The values of the indexed fields to match.
+
+        Returns:
+            list[AssignmentRow]: The matching rows in stable order.
+        """
+        return self.rows_of(self.select(**criteria))
+
+    def object_types_using_vocabulary(self, vocabulary_code: str) -> list[str]:
+        """
+        Returns the codes of the object types with a property using the vocabulary `vocabulary_code`.
+
+        Args:
+            vocabulary_code (str): The code of the vocabulary type.
+
+        Returns:
+            list[str]: The codes of the object types, in stable order.
+        """
+        rows = self.filter(vocabulary_code=vocabulary_code)
+        return list(dict.fromkeys(row.object_type for row in rows))
@@ -0,0 +1,348 @@
+import zlib
+from collections import defaultdict
+from typing import Optional, Union
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+from bam_masterdata.metadata.definitions import PropertyTypeDef, VocabularyTerm
+from bam_masterdata.metadata.registry import EntityRegistry
+from bam_masterdata.search.inverted_index import split_description, tokenize
+
+# Fields of the definitions compared to find near-duplicates
+SIMILARITY_FIELDS = ('code', 'label', 'description')
+
+# Mersenne prime used for the universal hashing of the MinHash permutations
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def trigrams(text: Optional[str]) -> set[str]:
+    """
+    Returns the set of character trigrams of the normalized `text`. The text is tokenized and
+    case-folded (see `tokenize`), and the words are padded with spaces, so that, e.g., `'TORCH_TYPE'`
+    and `'Torch type'` have the same trigrams.
+
+    Args:
+        text (Optional[str]): The text.
+
+    Returns:
+        set[str]: The trigrams of the text.
+    """
+    tokens = tokenize(text)
+    if not tokens:
+        return set()
+    normalized = f' {" ".join(tokens)} '
+    return {normalized[i : i + 3] for i in range(len(normalized) - 2)}
+
+
+def jaccard(first: set, second: set) -> float:
+    """Returns the Jaccard similarity of two sets."""
+    if not first or not second:
+        return 0.0
+    intersection = len(first & second)
+    return intersection / (len(first) + len(second) - intersection)
+
+
+class SimilarityItem(BaseModel):
+    """
+    Definition compared by the `SimilarityIndex`, i.e., a property type or a vocabulary term.
+    """
+
+    kind: str = Field(
+        ..., description="Kind of definition: `'property_type'` or `'vocabulary_term'`."
+    )
+
+    key: str = Field(
+        ...,
+        description="""
+        Unique key of the item: the code of the property types, and `<vocabulary code>:<term code>` for the
+        vocabulary terms.
+        """,
+    )
+
+    code: str = Field(..., description='Code of the definition.')
+
+    label: str = Field('', description='Property label or vocabulary term label.')
+
+    description: str = Field(
+        '', description='English half of the description of the definition.'
+    )
+
+    @classmethod
+    def from_definition(
+        cls,
+        definition: Union[PropertyTypeDef, VocabularyTerm],
+        vocabulary_code: Optional[str] = None,
+    ) -> 'SimilarityItem':
+        """
+        Creates the item of a property type definition (or assignment) or a vocabulary term.
+
+        Args:
+            definition (Union[PropertyTypeDef, VocabularyTerm]): The definition.
+            vocabulary_code (Optional[str], optional): The code of the vocabulary type of the term.
+                Defaults to None.
+
+        Returns:
+            SimilarityItem: The item.
+        """
+        if isinstance(definition, VocabularyTerm):
+            return cls(
+                kind='vocabulary_term',
+                key=f'{vocabulary_code}:{definition.code}',
+                code=definition.code,
+                label=definition.label,
+                description=split_description(definition.description)[0],
+            )
+        return cls(
+            kind='property_type',
+            key=definition.code,
+            code=definition.code,
+            label=definition.property_label,
+            description=split_description(definition.description)[0],
+        )
+
+
+class SimilarPair(BaseModel):
+    """Pair of items whose `field` has a trigram Jaccard `similarity` above the threshold."""
+
+    first: str = Field(..., description='Key of the first item.')
+
+    second: str = Field(..., description='Key of the second item.')
+
+    field: str = Field(..., description='Compared field of the items.')
+
+    similarity: float = Field(..., description='Trigram Jaccard similarity.')
+
+
+class MinHashLSH:
+    """
+    Locality-sensitive hashing of sets using MinHash signatures. The signature of `num_perm` hashes is
+    split into `bands` bands, and two sets are candidates if all the hashes of any band coincide. The
+    probability of two sets with Jaccard similarity `s` to be candidates is `1 - (1 - s**r)**bands`,
+    with `r = num_perm // bands`, so that the candidates are found without comparing all the pairs.
+    """
+
+    def __init__(self, num_perm: int = 60, bands: int = 20, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError(
+                f'`num_perm` ({num_perm}) must be a multiple of `bands` ({bands}).'
+            )
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _MAX_HASH, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _MAX_HASH, size=num_perm, dtype=np.uint64)
+        self._buckets: list[dict[bytes, list[str]]] = [
+            defaultdict(list) for _ in range(bands)
+        ]
+
+    def signature(self, grams: set[str]) -> np.ndarray:
+        """
+        Returns the MinHash signature of a set of strings.
+
+        Args:
+            grams (set[str]): The set of strings, e.g., the trigrams of a text.
+
+        Returns:
+            np.ndarray: The `num_perm` minimum hashes.
+        """
+        hashes = np.fromiter(
+            (zlib.crc32(gram.encode()) for gram in grams),
+            dtype=np.uint64,
+            count=len(grams),
+        )
+        permuted = (
+            self._a[:, None] * hashes[None, :] + self._b[:, None]
+        ) % _MERSENNE_PRIME
+        return permuted.min(axis=1)
+
+    def _band_keys(self, signature: np.ndarray) -> list[bytes]:
+        return [
+            signature[band * self.rows : (band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+
+    def add(self, key: str, grams: set[str]) -> None:
+        """Adds the set `grams` identified by `key` to the buckets."""
+        if not grams:
+            return
+        for band, band_key in enumerate(self._band_keys(self.signature(grams))):
+            self._buckets[band][band_key].append(key)
+
+    def candidates(self, grams: set[str]) -> set[str]:
+        """Returns the keys of the sets sharing at least one bucket with `grams`."""
+        if not grams:
+            return set()
+        keys: set[str] = set()
+        for band, band_key in enumerate(self._band_keys(self.signature(grams))):
+            keys.update(self._buckets[band].get(band_key, ()))
+        return keys
+
+    def candidate_pairs(self) -> set[tuple[str, str]]:
+        """Returns all the pairs of keys sharing at least one bucket."""
+        pairs: set[tuple[str, str]] = set()
+        for buckets in self._buckets:
+            for keys in buckets.values():
+                if len(keys) < 2:
+                    continue
+                for i, first in enumerate(keys):
+                    for second in keys[i + 1 :]:
+                        pairs.add(
+                            (first, second) if first < second else (second, first)
+                        )
+        return pairs
+
+
+class SimilarityIndex:
+    """
+    Index finding near-duplicate property types and vocabulary terms in sub-quadratic time. The codes,
+    labels and descriptions of the items are compared separately: the candidates are found with MinHash
+    LSH over their trigrams, and then checked with their exact trigram Jaccard similarity. E.g.:
+
+    ```python
+    index = SimilarityIndex.from_registry(EntityRegistry.from_datamodel(), threshold=0.5)
+    for pair in index.near_duplicates():
+        print(pair.first, pair.second, pair.field, pair.similarity)
+    ```
+    """
+
+    def __init__(
+        self,
+        items: list[SimilarityItem],
+        threshold: float = 0.5,
+        num_perm: int = 60,
+        bands: int = 20,
+    ):
+        self.threshold = threshold
+        self.items: dict[str, SimilarityItem] = {}
+        self._grams: dict[str, dict[str, set[str]]] = {
+            field: {} for field in SIMILARITY_FIELDS
+        }
+        self._lsh = {
+            field: MinHashLSH(num_perm=num_perm, bands=bands)
+            for field in SIMILARITY_FIELDS
+        }
+        for item in items:
+            self.add(item)
+
+    @classmethod
+    def from_registry(
+        cls, registry: EntityRegistry, threshold: float = 0.5
+    ) -> 'SimilarityIndex':
+        """
+        Creates the index of the property types and vocabulary terms of a registry. The property types
+        assigned to several object types are indexed once.
+
+        Args:
+            registry (EntityRegistry): The registry of the datamodel.
+            threshold (float, optional): The minimum Jaccard similarity of near-duplicates. Defaults to 0.5.
+
+        Returns:
+            SimilarityIndex: The index.
+        """
+        items: dict[str, SimilarityItem] = {}
+        for _, prop in registry.iter_property_assignments():
+            if prop.code not in items:
+                items[prop.code] = SimilarityItem.from_definition(prop)
+        for vocabulary_type, term in registry.iter_vocabulary_terms():
+            item = SimilarityItem.from_definition(term, vocabulary_type.defs.code)
+            items[item.key] = item
+        return cls(list(items.values()), threshold=threshold)
+
+    def add(self, item: SimilarityItem) -> None:
+        """Adds an item to the index."""
+        self.items[item.key] = item
+        for field in SIMILARITY_FIELDS:
+            grams = trigrams(getattr(item, field))
+            if grams:
+                self._grams[field][item.key] = grams
+                self._lsh[field].add(item.key, grams)
+
+    def query(self, item: SimilarityItem) -> list[SimilarPair]:
+        """
+        Returns the indexed items similar to `item` (which does not need to be indexed), e.g., to check
+        a new definition before adding it to the datamodel.
+
+        Args:
+            item (SimilarityItem): The item to check.
+
+        Returns:
+            list[SimilarPair]: The near-duplicates sorted by decreasing similarity.
+        """
+        pairs = []
+        for field in SIMILARITY_FIELDS:
+            grams = trigrams(getattr(item, field))
+            for key in self._lsh[field].candidates(grams):
+                if key == item.key or self.items[key].kind != item.kind:
+                    continue
+                similarity = jaccard(grams, self._grams[field][key])
+                if similarity >= self.threshold:
+                    pairs.append(
+                        SimilarPair(
+                            first=item.key,
+                            second=key,
+                            field=field,
+                            similarity=similarity,
+                        )
+                    )
+        pairs.sort(key=lambda pair: (-pair.similarity, pair.second, pair.field))
+        return pairs
+
+    def near_duplicates(self) -> list[SimilarPair]:
+        """
+        Returns all the pairs of indexed items of the same kind which are near-duplicates in any field.
+
+        Returns:
+            list[SimilarPair]: The near-duplicate pairs sorted by decreasing similarity.
+        """
+        pairs = []
+        for field in SIMILARITY_FIELDS:
+            grams = self._grams[field]
+            for first, second in self._lsh[field].candidate_pairs():
+                if self.items[first].kind != self.items[second].kind:
+                    continue
+                similarity = jaccard(grams[first], grams[second])
+                if similarity >= self.threshold:
+                    pairs.append(
+                        SimilarPair(
+                            first=first,
+                            second=second,
+                            field=field,
+                            similarity=similarity,
+                        )
+                    )
+        pairs.sort(
+            key=lambda pair: (-pair.similarity, pair.first, pair.second, pair.field)
+        )
+        return pairs
+
+
+def lint_new_definitions(
+    registry: EntityRegistry,
+    definitions: list[Union[PropertyTypeDef, VocabularyTerm]],
+    threshold: float = 0.5,
+    vocabulary_code: Optional[str] = None,
+) -> list[SimilarPair]:
+    """
+    Lint step flagging the new `definitions` which are too similar to the existing property types and
+    vocabulary terms of `registry`.
+
+    Args:
+        registry (EntityRegistry): The registry of the existing datamodel.
+        definitions (list[Union[PropertyTypeDef, VocabularyTerm]]): The new definitions.
+        threshold (float, optional): The minimum Jaccard similarity of near-duplicates. Defaults to 0.5.
+        vocabulary_code (Optional[str], optional): The code of the vocabulary type of the new terms.
+            Defaults to None.
+
+    Returns:
+        list[SimilarPair]: The near-duplicates found, with the new definitions as `first`.
+    """
+    index = SimilarityIndex.from_registry(registry, threshold=threshold)
+    pairs = []
+    for definition in definitions:
+        pairs.extend(
+            index.query(SimilarityItem.from_definition(definition, vocabulary_code))
+        )
+    return pairs
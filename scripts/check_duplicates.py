@@ -0,0 +1,30 @@
+#!/usr/bin/env python
+
+import argparse
+
+from bam_masterdata.metadata.registry import EntityRegistry
+from bam_masterdata.search.similarity import SimilarityIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Flag near-duplicate property types and vocabulary terms in the datamodel.'
+    )
+    parser.add_argument('--threshold', type=float, default=0.7)
+    args = parser.parse_args()
+
+    index = SimilarityIndex.from_registry(
+        EntityRegistry.from_datamodel(), threshold=args.threshold
+    )
+    pairs = index.near_duplicates()
+    for pair in pairs:
+        print(
+            f'{pair.first} ~ {pair.second} ({pair.field}, similarity {pair.similarity:.2f})'
+        )
+    if pairs:
+        raise SystemExit(1)
+
+
+# * In the root folder, run `python scripts/check_duplicates.py --threshold 0.7` as a lint step
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+#!/usr/bin/env python
+
+import argparse
+
+from bam_masterdata.metadata.codegen import generate_datamodel, load_export
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Regenerate the datamodel modules from an Excel or JSON masterdata export.'
+    )
+    parser.add_argument('export', help='Path of the Excel or JSON export.')
+    parser.add_argument('--output-dir', default='bam_masterdata/datamodel')
+    args = parser.parse_args()
+
+    for report in generate_datamodel(load_export(args.export), args.output_dir):
+        status = 'written' if report.written else 'unchanged'
+        print(
+            f'{report.path}: {status} ({len(report.added)} added, {len(report.changed)} changed, '
+            f'{len(report.removed)} removed, {len(report.unchanged)} unchanged)'
+        )
+
+
+# * In the root folder, run `python scripts/generate_datamodel.py masterdata.xlsx`
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+
+import argparse
+
+from bam_masterdata.benchmarks.frozen import run_frozen_benchmark
+from bam_masterdata.benchmarks.generator import DatamodelSize
+from bam_masterdata.benchmarks.startup import run_startup_benchmark
+from bam_masterdata.benchmarks.suite import (
+    compare_results,
+    load_results,
+    run_benchmarks,
+    save_results,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Run the masterdata benchmarks over a synthetic datamodel.'
+    )
+    parser.add_argument('--object-types', type=int, default=100)
+    parser.add_argument('--properties', type=int, default=10)
+    parser.add_argument('--vocabularies', type=int, default=20)
+    parser.add_argument('--terms', type=int, default=20)
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--output', default='benchmarks.json')
+    parser.add_argument(
+        '--compare', default=None, help='JSON results of a baseline run.'
+    )
+    parser.add_argument('--tolerance', type=float, default=0.1)
+    parser.add_argument(
+        '--startup-workers',
+        default=None,
+        help='Comma-separated numbers of workers to benchmark the worker startup, e.g., `1,2,4,8`.',
+    )
+    parser.add_argument(
+        '--frozen',
+        action='store_true',
+        help='Compare the memory and attribute access of the pydantic and frozen definitions.',
+    )
+    args = parser.parse_args()
+
+    size = DatamodelSize(
+        n_object_types=args.object_types,
+        n_properties=args.properties,
+        n_vocabularies=args.vocabularies,
+        n_terms=args.terms,
+        depth=args.depth,
+    )
+    # The baseline is loaded before the results are saved, as both may be the same file
+    baseline = load_results(args.compare) if args.compare else None
+    results = run_benchmarks(size, repeats=args.repeats)
+    save_results(results, args.output)
+    for name, timing in results['results'].items():
+        print(f'{name:<20} median {timing["median"] * 1e3:10.3f} ms')
+
+    if args.startup_workers:
+        worker_counts = [int(n) for n in args.startup_workers.split(',')]
+        startup = run_startup_benchmark(size, worker_counts)
+        print(f'shared datamodel: {startup["shared_bytes"] / 1e6:.2f} MB')
+        for strategy, timings in startup['results'].items():
+            for n_workers, seconds in timings.items():
+                print(f'startup {strategy:<14} {n_workers:>3} workers {seconds:8.3f} s')
+
+    if args.frozen:
+        frozen = run_frozen_benchmark(size, repeats=args.repeats)
+        for kind in ('pydantic', 'frozen'):
+            print(
+                f'{kind:<10} {frozen["bytes_per_object"][kind]:8.0f} bytes per property assignment, '
+                f'attribute access median {frozen["attribute_access"][kind]["median"] * 1e3:8.3f} ms'
+            )
+
+    if baseline is not None:
+        regressions = compare_results(baseline, results, tolerance=args.tolerance)
+        for name, regression in regressions.items():
+            print(f'REGRESSION {name}: x{regression["ratio"]:.2f}')
+        if regressions:
+            raise SystemExit(1)
+
+
+# * In the root folder, run `python scripts/run_benchmarks.py --output benchmarks.json` and compare
+# * two commits with `python scripts/run_benchmarks.py --compare <baseline>.json`
+if __name__ == '__main__':
+    main()
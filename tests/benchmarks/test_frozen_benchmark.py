@@ -0,0 +1,26 @@
+from bam_masterdata.benchmarks.frozen import object_overhead, run_frozen_benchmark
+from bam_masterdata.benchmarks.generator import DatamodelSize
+from bam_masterdata.metadata.definitions import VocabularyTerm
+from bam_masterdata.metadata.frozen import freeze
+
+
+def test_object_overhead():
+    """Test that the frozen records are smaller than the pydantic definitions."""
+    term = VocabularyTerm(
+        version=1, code='MANUAL', label='Manual', description='Manual//Handbuch'
+    )
+    assert object_overhead(freeze(term)) < object_overhead(term)
+
+
+def test_run_frozen_benchmark():
+    """Test the benchmark of the frozen datamodel."""
+    size = DatamodelSize(
+        n_object_types=5, n_properties=2, n_vocabularies=1, n_terms=2, depth=2
+    )
+    results = run_frozen_benchmark(size, repeats=1)
+    assert results['n_property_assignments'] > 0
+    assert (
+        results['bytes_per_object']['frozen'] < results['bytes_per_object']['pydantic']
+    )
+    assert set(results['attribute_access']) == {'pydantic', 'frozen'}
+    assert results['freeze']['repeats'] == 1
@@ -0,0 +1,56 @@
+import pytest
+
+from bam_masterdata.benchmarks.generator import (
+    DatamodelSize,
+    code_suffix,
+    generate_datamodel,
+    generate_object_types,
+)
+from bam_masterdata.metadata.definitions import DataType
+
+
+@pytest.mark.parametrize(
+    'index, result',
+    [
+        (0, 'AAAA'),
+        (1, 'AAAB'),
+        (26, 'AABA'),
+        (27, 'AABB'),
+    ],
+)
+def test_code_suffix(index: int, result: str):
+    """Test the `code_suffix` function."""
+    assert code_suffix(index) == result
+
+
+def test_generate_object_types_depth():
+    """Test the inheritance chains generated by `generate_object_types`."""
+    object_types = generate_object_types(n_object_types=4, n_properties=2, depth=2)
+    assert len(object_types) == 4
+    # The second class of each chain inherits from the first one
+    assert issubclass(object_types[1], object_types[0])
+    assert not issubclass(object_types[2], object_types[1])
+    assert object_types[1].defs.code == 'SYNTHETIC_OBJECT_AAAA.SYNTHETIC_OBJECT_AAAB'
+    assert len(object_types[0]().properties) == 2
+    assert len(object_types[1]().properties) == 4
+
+
+def test_generate_datamodel():
+    """Test the sizes of the datamodel generated by `generate_datamodel`."""
+    size = DatamodelSize(
+        n_object_types=3, n_properties=8, n_vocabularies=2, n_terms=5, depth=1
+    )
+    registry = generate_datamodel(size)
+    assert len(registry.object_types) == 3
+    assert len(registry.vocabulary_types) == 2
+    assert all(
+        len(registry.instance(vocab).terms) == 5 for vocab in registry.vocabulary_types
+    )
+    vocabulary_codes = {vocab.defs.code for vocab in registry.vocabulary_types}
+    vocabulary_props = [
+        prop
+        for _, prop in registry.iter_property_assignments()
+        if prop.data_type == DataType.CONTROLLEDVOCABULARY
+    ]
+    assert len(vocabulary_props) == 6
+    assert all(prop.vocabulary_code in vocabulary_codes for prop in vocabulary_props)
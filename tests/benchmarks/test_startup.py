@@ -0,0 +1,15 @@
+from bam_masterdata.benchmarks.generator import DatamodelSize
+from bam_masterdata.benchmarks.startup import STARTUP_STRATEGIES, run_startup_benchmark
+
+
+def test_run_startup_benchmark():
+    """Test the benchmark of the startup of the worker pools."""
+    size = DatamodelSize(
+        n_object_types=5, n_properties=2, n_vocabularies=1, n_terms=2, depth=2
+    )
+    results = run_startup_benchmark(size, worker_counts=[1, 2], repeats=1)
+    assert results['shared_bytes'] > 0
+    assert set(results['results']) == set(STARTUP_STRATEGIES)
+    for timings in results['results'].values():
+        assert set(timings) == {1, 2}
+        assert all(seconds > 0 for seconds in timings.values())
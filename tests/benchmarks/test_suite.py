@@ -0,0 +1,49 @@
+import os
+
+from bam_masterdata.benchmarks.generator import DatamodelSize
+from bam_masterdata.benchmarks.suite import (
+    compare_results,
+    load_results,
+    run_benchmarks,
+    save_results,
+    time_call,
+)
+
+
+def test_time_call():
+    """Test the statistics returned by `time_call`."""
+    calls = []
+    timing = time_call(lambda: calls.append(1), repeats=3)
+    assert len(calls) == 3
+    assert timing['repeats'] == 3
+    assert timing['min'] <= timing['median'] <= timing['max']
+
+
+def test_run_benchmarks(tmp_path):
+    """Test running the benchmarks and storing the results as JSON."""
+    size = DatamodelSize(
+        n_object_types=2, n_properties=2, n_vocabularies=1, n_terms=2, depth=2
+    )
+    results = run_benchmarks(size, repeats=1)
+    assert set(results['results'].keys()) == {
+        'class_definition',
+        'instantiation',
+        'to_json',
+        'to_dict',
+        'validation',
+        'export',
+    }
+    assert results['size'] == size.model_dump()
+
+    path = os.path.join(tmp_path, 'benchmarks.json')
+    save_results(results, path)
+    assert load_results(path) == results
+
+
+def test_compare_results():
+    """Test the detection of regressions in `compare_results`."""
+    baseline = {'results': {'to_json': {'median': 1.0}, 'export': {'median': 1.0}}}
+    current = {'results': {'to_json': {'median': 1.05}, 'export': {'median': 2.0}}}
+    regressions = compare_results(baseline, current, tolerance=0.1)
+    assert list(regressions.keys()) == ['export']
+    assert regressions['export']['ratio'] == 2.0
@@ -1,16 +1,24 @@
 import os
+from typing import Optional
 
 import pytest
 from pydantic import ConfigDict
 
 from bam_masterdata.logger import log_storage
 from bam_masterdata.metadata.definitions import (
+    DataSetTypeDef,
     ObjectTypeDef,
     PropertyTypeAssignment,
     VocabularyTerm,
     VocabularyTypeDef,
 )
-from bam_masterdata.metadata.entities import BaseEntity, ObjectType, VocabularyType
+from bam_masterdata.metadata.entities import (
+    BaseEntity,
+    DataSetType,
+    ObjectType,
+    VocabularyType,
+)
+from bam_masterdata.openbis.fake import FakeOpenbis
 
 if os.getenv('_PYTEST_RAISE', '0') != '0':
 
@@ -140,6 +148,17 @@ class MockedVocabularyType(VocabularyType):
     )
 
 
+class MockedDataSetType(DataSetType):
+    defs = DataSetTypeDef(
+        version=1,
+        code='MOCKED_DATASET_TYPE',
+        description="""
+        Mockup for a data set type definition
+        """,
+        main_dataset_pattern='.*\\.csv',
+    )
+
+
 def generate_base_entity():
     return MockedEntity()
 
@@ -154,3 +173,58 @@ def generate_object_type_longer():
 
 def generate_vocabulary_type():
     return MockedVocabularyType()
+
+
+def generate_dataset_type():
+    return MockedDataSetType()
+
+
+def generate_assignment(
+    code: str, data_type: str, label: Optional[str] = None, **kwargs
+) -> PropertyTypeAssignment:
+    """Returns a property assignment of the General information section, by default optional."""
+    label = label or code.title()
+    return PropertyTypeAssignment(
+        version=kwargs.pop('version', 1),
+        code=code,
+        data_type=data_type,
+        property_label=label,
+        description=f'{label}.',
+        mandatory=kwargs.pop('mandatory', False),
+        show_in_edit_views=True,
+        section='General information',
+        **kwargs,
+    )
+
+
+def generate_lineage(
+    depth: int, width: int, openbis: Optional[FakeOpenbis] = None
+) -> FakeOpenbis:
+    """
+    Seeds a fake openBIS with a lineage of `depth` generations of `width` objects `/S/P/OBJ_<level>_<i>`,
+    where each object is the child of the objects of the previous generation with the same and the
+    next index.
+    """
+    openbis = openbis or FakeOpenbis()
+    server = openbis.server
+    server.create('object_type', {'code': 'SAMPLE', 'generatedCodePrefix': 'SAM'})
+    server.create('space', {'code': 'S'})
+    server.create('project', {'space': 'S', 'code': 'P'})
+    for level in range(depth):
+        for i in range(width):
+            parents = []
+            if level > 0:
+                parents = [
+                    f'/S/P/OBJ_{level - 1}_{j}'
+                    for j in dict.fromkeys((i, (i - 1) % width))
+                ]
+            server.create(
+                'object',
+                {
+                    'type': 'SAMPLE',
+                    'project': '/S/P',
+                    'code': f'OBJ_{level}_{i}',
+                    'parents': parents,
+                },
+            )
+    return openbis
@@ -0,0 +1,122 @@
+import os
+
+import pytest
+
+from bam_masterdata.datasets.classifier import DataSetClassifier
+from bam_masterdata.metadata.definitions import DataSetTypeDef
+from bam_masterdata.metadata.entities import DataSetType
+from bam_masterdata.metadata.registry import EntityRegistry
+
+
+class RawData(DataSetType):
+    defs = DataSetTypeDef(
+        version=1,
+        code='RAW_DATA',
+        description='Raw data//Rohdaten',
+        main_dataset_pattern=r'.*\.raw',
+    )
+
+
+class Spectrum(DataSetType):
+    defs = DataSetTypeDef(
+        version=1,
+        code='SPECTRUM',
+        description='Spectrum//Spektrum',
+        main_dataset_pattern=r'(?P<name>.*)\.csv',
+        main_dataset_path='spectra',
+    )
+
+
+class Table(DataSetType):
+    defs = DataSetTypeDef(
+        version=1,
+        code='TABLE',
+        description='Table//Tabelle',
+        main_dataset_pattern=r'.*\.csv',
+    )
+
+
+def generate_classifier():
+    return DataSetClassifier([RawData, Spectrum, Table])
+
+
+def create_files(root, paths):
+    for path in paths:
+        full_path = os.path.join(root, *path.split('/'))
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'w') as f:
+            f.write('')
+
+
+@pytest.mark.parametrize(
+    'relative_path, result',
+    [
+        ('measurement.raw', 'RAW_DATA'),
+        ('run_a/measurement.raw', 'RAW_DATA'),
+        # `Spectrum` is registered before `Table`
+        ('spectra/peak.csv', 'SPECTRUM'),
+        ('spectra/run_a/peak.csv', 'SPECTRUM'),
+        ('tables/peak.csv', 'TABLE'),
+        ('notes.txt', None),
+    ],
+)
+def test_classify(relative_path: str, result: str):
+    """Test the classification of relative paths with `classify`."""
+    assert generate_classifier().classify(relative_path) == result
+
+
+def test_from_registry():
+    """Test the creation of the classifier from the data set types of a registry."""
+    classifier = DataSetClassifier.from_registry(
+        EntityRegistry(dataset_types=[Table, RawData])
+    )
+    assert list(classifier.codes.values()) == ['TABLE', 'RAW_DATA']
+    assert DataSetClassifier([]).classify('a.csv') is None
+
+
+@pytest.mark.parametrize('workers', [0, 3])
+def test_walk(tmp_path, workers: int):
+    """Test walking a directory tree with and without worker threads."""
+    paths = [
+        'top.raw',
+        'readme.txt',
+        'spectra/a.csv',
+        'spectra/b.csv',
+        'run_a/c.raw',
+        'run_a/deep/d.csv',
+        'run_b/e.txt',
+    ]
+    create_files(str(tmp_path), paths)
+    classifier = generate_classifier()
+    results = {
+        os.path.relpath(path, tmp_path).replace(os.sep, '/'): code
+        for path, code in classifier.walk(str(tmp_path), workers=workers)
+    }
+    assert results == {
+        'top.raw': 'RAW_DATA',
+        'spectra/a.csv': 'SPECTRUM',
+        'spectra/b.csv': 'SPECTRUM',
+        'run_a/c.raw': 'RAW_DATA',
+        'run_a/deep/d.csv': 'TABLE',
+    }
+
+    unmatched = [
+        path
+        for path, code in classifier.walk(
+            str(tmp_path), workers=workers, include_unmatched=True
+        )
+        if code is None
+    ]
+    assert len(unmatched) == 2
+
+
+def test_walk_early_stop(tmp_path):
+    """Test that the worker threads stop when the consumer stops iterating."""
+    create_files(
+        str(tmp_path), [f'dir_{i}/file_{j}.raw' for i in range(4) for j in range(50)]
+    )
+    classifier = DataSetClassifier([RawData], queue_size=2)
+    walker = classifier.walk(str(tmp_path), workers=2)
+    first = next(walker)
+    walker.close()
+    assert first[1] == 'RAW_DATA'
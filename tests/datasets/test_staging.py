@@ -0,0 +1,136 @@
+import os
+
+import pytest
+
+from bam_masterdata.datasets.staging import (
+    DataStore,
+    LocalDataStore,
+    StagingManifest,
+    StagingPipeline,
+    hash_file,
+)
+from bam_masterdata.metadata.definitions import DataSetTypeDef
+
+RAW_DATA = DataSetTypeDef(
+    version=1,
+    code='RAW_DATA',
+    description='Raw data//Rohdaten',
+    main_dataset_pattern=r'.*\.raw',
+)
+
+
+class FailingDataStore(LocalDataStore):
+    """Local data store failing after receiving `fail_after` chunks."""
+
+    def __init__(self, root: str, fail_after: int):
+        super().__init__(root)
+        self.fail_after = fail_after
+
+    def upload_chunk(self, upload_id, index, data, checksum):
+        if sum(self.received_chunks.values()) >= self.fail_after:
+            raise ConnectionError('Connection lost')
+        super().upload_chunk(upload_id, index, data, checksum)
+
+
+def create_file(path: str, size: int) -> str:
+    with open(path, 'wb') as f:
+        f.write(os.urandom(size))
+    return path
+
+
+def test_hash_file(tmp_path):
+    """Test the chunked checksums of `hash_file`."""
+    path = create_file(os.path.join(tmp_path, 'a.raw'), 250)
+    checksum, chunk_checksums = hash_file(path, chunk_size=100)
+    assert len(chunk_checksums) == 3
+    assert hash_file(path, chunk_size=1000)[0] == checksum
+
+    empty = create_file(os.path.join(tmp_path, 'empty.raw'), 0)
+    assert hash_file(empty, chunk_size=100)[1] == []
+
+
+def test_stage(tmp_path):
+    """Test staging several files into a `LocalDataStore`."""
+    paths = [
+        create_file(os.path.join(tmp_path, f'{name}.raw'), size)
+        for name, size in [('a', 250), ('b', 0), ('c', 1000)]
+    ]
+    store = LocalDataStore(os.path.join(tmp_path, 'store'))
+    manifest_path = os.path.join(tmp_path, 'manifest.json')
+    pipeline = StagingPipeline(RAW_DATA, store, manifest_path, chunk_size=100)
+    results = pipeline.stage(paths)
+
+    assert [result.confirmed_chunks for result in results] == [3, 0, 10]
+    for path, result in zip(paths, results):
+        uploaded = os.path.join(
+            store.root, 'RAW_DATA', result.dataset_id, os.path.basename(path)
+        )
+        with open(path, 'rb') as f, open(uploaded, 'rb') as g:
+            assert f.read() == g.read()
+    assert len(StagingManifest.load(manifest_path).files) == 3
+
+    # Staging again does not upload anything
+    pipeline = StagingPipeline(RAW_DATA, store, manifest_path, chunk_size=100)
+    pipeline.stage(paths)
+    assert sum(store.received_chunks.values()) == 13
+
+
+def test_stage_resume(tmp_path):
+    """Test that an interrupted upload saves the manifest and resumes from the last confirmed chunk."""
+    path = create_file(os.path.join(tmp_path, 'a.raw'), 1000)
+    store_root = os.path.join(tmp_path, 'store')
+    manifest_path = os.path.join(tmp_path, 'manifest.json')
+
+    store = FailingDataStore(store_root, fail_after=4)
+    with pytest.raises(ConnectionError):
+        StagingPipeline(RAW_DATA, store, manifest_path, chunk_size=100).stage([path])
+    manifest = StagingManifest.load(manifest_path)
+    assert manifest.files[path].confirmed_chunks == 4
+
+    store = LocalDataStore(store_root)
+    results = StagingPipeline(RAW_DATA, store, manifest_path, chunk_size=100).stage(
+        [path]
+    )
+    # Only the 6 remaining chunks are sent
+    assert store.received_chunks[results[0].upload_id] == 6
+    assert results[0].dataset_id is not None
+
+
+@pytest.mark.parametrize('save_interval, saves', [(0.0, 11), (3600.0, 1)])
+def test_stage_save_interval(tmp_path, monkeypatch, save_interval, saves):
+    """Test that the manifest is saved at most every `save_interval` seconds while uploading."""
+    path = create_file(os.path.join(tmp_path, 'a.raw'), 1000)
+    store = LocalDataStore(os.path.join(tmp_path, 'store'))
+    manifest_path = os.path.join(tmp_path, 'manifest.json')
+    calls = []
+    save = StagingManifest.save
+    monkeypatch.setattr(
+        StagingManifest,
+        'save',
+        lambda self, path: calls.append(path) or save(self, path),
+    )
+    StagingPipeline(
+        RAW_DATA, store, manifest_path, chunk_size=100, save_interval=save_interval
+    ).stage([path])
+    assert len(calls) == saves
+    assert StagingManifest.load(manifest_path).files[path].dataset_id is not None
+
+
+def test_data_store_interface():
+    """Test that the data stores must implement the whole `DataStore` interface."""
+
+    class IncompleteDataStore(DataStore):
+        def confirmed_chunks(self, upload_id):
+            return 0
+
+    with pytest.raises(TypeError, match='abstract'):
+        IncompleteDataStore()
+
+
+def test_stage_pattern_mismatch(tmp_path):
+    """Test that files not matching the `main_dataset_pattern` are rejected."""
+    path = create_file(os.path.join(tmp_path, 'a.txt'), 10)
+    store = LocalDataStore(os.path.join(tmp_path, 'store'))
+    pipeline = StagingPipeline(RAW_DATA, store, os.path.join(tmp_path, 'm.json'))
+    with pytest.raises(ValueError):
+        pipeline.stage([path])
@@ -0,0 +1,303 @@
+import datetime
+import json
+import os
+
+import numpy as np
+import pytest
+
+from bam_masterdata.export.columnar import (
+    MANIFEST_NAME,
+    ColumnarExport,
+    ColumnarWriter,
+    DictionaryColumn,
+    StringColumn,
+    write_columnar,
+)
+from bam_masterdata.metadata.definitions import ObjectTypeDef
+from bam_masterdata.metadata.entities import ObjectType
+from tests.conftest import generate_assignment
+
+
+class Specimen(ObjectType):
+    defs = ObjectTypeDef(version=3, code='SPECIMEN', description='Test specimen.')
+
+    name = generate_assignment('$NAME', 'VARCHAR', mandatory=True)
+
+    weight = generate_assignment('WEIGHT', 'REAL', version=2)
+
+    pieces = generate_assignment('PIECES', 'INTEGER')
+
+    tested = generate_assignment('TESTED', 'BOOLEAN')
+
+    tested_on = generate_assignment('TESTED_ON', 'DATE')
+
+    document = generate_assignment(
+        'DOCUMENT', 'CONTROLLEDVOCABULARY', vocabulary_code='DOCUMENT_TYPE'
+    )
+
+
+VOCABULARIES = {'DOCUMENT_TYPE': frozenset({'MANUAL', 'DATASHEET'})}
+
+
+class TimedSpecimen(Specimen):
+    measured_at = generate_assignment('MEASURED_AT', 'TIMESTAMP')
+
+    note = generate_assignment('NOTE', 'VARCHAR')
+
+
+@pytest.fixture
+def columns():
+    return {
+        '$NAME': ['S1', 'Prüfkörper 2', 'S3'],
+        'WEIGHT': [1.5, None, 3.0],
+        'PIECES': [4, None, 2],
+        'TESTED': [True, False, None],
+        'TESTED_ON': ['2024-02-01', None, '2024-03-15'],
+        'DOCUMENT': ['MANUAL', None, 'DATASHEET'],
+    }
+
+
+class TestColumnar:
+    def test_round_trip(self, tmp_path, columns):
+        """Test writing and reading back all the encodings."""
+        path = str(tmp_path / 'specimens')
+        manifest = write_columnar(path, Specimen(), columns, vocabularies=VOCABULARIES)
+        assert (
+            manifest.object_type,
+            manifest.object_type_version,
+            manifest.n_rows,
+        ) == (
+            'SPECIMEN',
+            3,
+            3,
+        )
+        with open(os.path.join(path, MANIFEST_NAME), encoding='utf-8') as f:
+            stored = json.load(f)
+        weight = next(
+            column for column in stored['columns'] if column['code'] == 'WEIGHT'
+        )
+        assert (weight['version'], weight['encoding'], weight['data_type']) == (
+            2,
+            'plain',
+            'REAL',
+        )
+
+        export = ColumnarExport(path)
+        assert len(export) == 3
+        assert export.codes == list(columns)
+        names = export.column('$NAME')
+        assert isinstance(names, StringColumn)
+        assert names.to_list() == ['S1', 'Prüfkörper 2', 'S3']
+        np.testing.assert_array_equal(export.column('WEIGHT'), [1.5, np.nan, 3.0])
+        assert list(export.valid('WEIGHT')) == [True, False, True]
+        assert list(export.column('PIECES')[export.valid('PIECES')]) == [4, 2]
+        assert list(export.valid('TESTED')) == [True, True, False]
+        assert list(export.column('TESTED')[:2]) == [True, False]
+        assert export.column('TESTED_ON').dtype == np.dtype('datetime64[D]')
+        assert list(export.valid('TESTED_ON')) == [True, False, True]
+        document = export.column('DOCUMENT')
+        assert isinstance(document, DictionaryColumn)
+        assert document.dictionary == ['DATASHEET', 'MANUAL']
+        assert list(document.codes) == [1, -1, 0]
+        assert list(document.decode()) == ['MANUAL', None, 'DATASHEET']
+
+    def test_memory_mapped(self, tmp_path, columns):
+        """Test that the columns are only memory-mapped when accessed, and are plain `.npy` files."""
+        path = str(tmp_path / 'specimens')
+        manifest = write_columnar(path, Specimen(), columns)
+        export = ColumnarExport(path)
+        assert export._cache == {}
+        weights = export.column('WEIGHT')
+        assert isinstance(weights, np.memmap)
+        assert not weights.flags.writeable
+        assert list(export._cache) == ['WEIGHT']
+        # The files can be loaded by other tools with NumPy
+        for spec in manifest.columns:
+            for name in spec.files.values():
+                assert len(np.load(os.path.join(path, name))) in (3, 4, 18)
+
+    def test_batches(self, tmp_path, columns):
+        """Test that the batches are appended, with the string offsets and dictionaries continued."""
+        path = str(tmp_path / 'specimens')
+        with ColumnarWriter(path, Specimen()) as writer:
+            for _ in range(1000):
+                writer.write(columns)
+            writer.write(
+                {
+                    **{code: values[:1] for code, values in columns.items()},
+                    'DOCUMENT': ['CATALOG'],
+                }
+            )
+        export = ColumnarExport(path)
+        assert len(export) == 3001
+        assert export.column('$NAME')[2999] == 'S3'
+        assert export.column('$NAME')[3000] == 'S1'
+        assert export.column('DOCUMENT').dictionary == [
+            'MANUAL',
+            'DATASHEET',
+            'CATALOG',
+        ]
+        assert export.column('DOCUMENT')[3000] == 'CATALOG'
+        assert int(export.valid('PIECES').sum()) == 2001
+
+    def test_rejected_batch(self, tmp_path, columns):
+        """Test that the invalid batches are rejected without writing anything."""
+        path = str(tmp_path / 'specimens')
+        writer = ColumnarWriter(path, Specimen(), vocabularies=VOCABULARIES)
+        invalid = {
+            **columns,
+            '$NAME': [None, 'S2', 'S3'],
+            'PIECES': [1.5, 2, 'x'],
+            'DOCUMENT': ['MANUAL', 'UNKNOWN', None],
+        }
+        with pytest.raises(ValueError) as excinfo:
+            writer.write(invalid)
+        message = str(excinfo.value)
+        assert '$NAME: 1 missing values of a mandatory property' in message
+        assert 'PIECES[0]' in message
+        assert 'PIECES[2]' in message
+        assert '`UNKNOWN` is not a term of DOCUMENT_TYPE' in message
+        with pytest.raises(ValueError, match='not assigned'):
+            writer.write({**columns, 'COLOR': ['red'] * 3})
+        with pytest.raises(ValueError, match='missing mandatory column'):
+            writer.write({'WEIGHT': [1.0]})
+        writer.write({'$NAME': ['S1'], 'WEIGHT': [1.0]})
+        with pytest.raises(ValueError, match='expected'):
+            writer.write(columns)
+        manifest = writer.close()
+        assert manifest.n_rows == 1
+        assert [column.code for column in manifest.columns] == ['$NAME', 'WEIGHT']
+        assert sorted(os.listdir(path)) == [
+            'col_0000.data.npy',
+            'col_0000.offsets.npy',
+            'col_0001.values.npy',
+            MANIFEST_NAME,
+        ]
+
+    @pytest.mark.parametrize('value', [2**70, float('inf')])
+    def test_integer_overflow(self, tmp_path, value):
+        """Test that the integers out of the int64 range reject the batch."""
+        writer = ColumnarWriter(str(tmp_path / 'specimens'), Specimen())
+        with pytest.raises(ValueError, match=r'The batch was rejected: PIECES\[0\]'):
+            writer.write({'$NAME': ['S1'], 'PIECES': [value]})
+        writer.abort()
+
+    @pytest.mark.parametrize(
+        'code, value, message',
+        [
+            (
+                'TESTED_ON',
+                datetime.datetime(2024, 2, 1, 10, 30),
+                'invalid DATE `2024-02-01 10:30:00` with a time of day',
+            ),
+            ('TESTED_ON', '2024-02-01T10:30', 'with a time of day'),
+            (
+                'MEASURED_AT',
+                datetime.datetime(2024, 2, 1, 10, tzinfo=datetime.timezone.utc),
+                'timezone-aware TIMESTAMP',
+            ),
+            ('MEASURED_AT', '2024-02-01 10:00:00+01:00', 'timezone-aware TIMESTAMP'),
+            (
+                'MEASURED_AT',
+                '2024-02-01T10:00:00.5',
+                'invalid TIMESTAMP `2024-02-01T10:00:00.5` with fractions of a second',
+            ),
+            (
+                'MEASURED_AT',
+                np.datetime64('2024-02-01T10:00:00.000000001', 'ns'),
+                'with fractions of a second',
+            ),
+        ],
+    )
+    def test_lossy_dates(self, tmp_path, code, value, message):
+        """Test that the values which would be truncated or shifted in their datetime64 unit are rejected."""
+        writer = ColumnarWriter(str(tmp_path / 'specimens'), TimedSpecimen())
+        with pytest.raises(ValueError, match=message):
+            writer.write({'$NAME': ['S1', 'S2'], code: [None, value]})
+        writer.write(
+            {
+                '$NAME': ['S1'],
+                'TESTED_ON': [datetime.datetime(2024, 2, 1)],
+                'MEASURED_AT': [datetime.datetime(2024, 2, 1, 10, 30)],
+            }
+        )
+        writer.close()
+        export = ColumnarExport(str(tmp_path / 'specimens'))
+        assert str(export.column('TESTED_ON')[0]) == '2024-02-01'
+        assert str(export.column('MEASURED_AT')[0]) == '2024-02-01T10:30:00'
+
+    def test_datetime64_fractions(self, tmp_path):
+        """Test that the datetime64 arrays finer than seconds are only accepted if nothing is lost."""
+        writer = ColumnarWriter(str(tmp_path / 'specimens'), TimedSpecimen())
+        with pytest.raises(ValueError, match=r'MEASURED_AT\[1\]'):
+            writer.write(
+                {
+                    '$NAME': ['S1', 'S2'],
+                    'MEASURED_AT': np.array(
+                        ['2024-02-01T10:00:00', '2024-02-01T10:00:00.5'],
+                        dtype='datetime64[ns]',
+                    ),
+                }
+            )
+        writer.write(
+            {
+                '$NAME': ['S1', 'S2'],
+                'MEASURED_AT': np.array(
+                    ['2024-02-01T10:00:00', 'NaT'], dtype='datetime64[ns]'
+                ),
+            }
+        )
+        writer.close()
+        export = ColumnarExport(str(tmp_path / 'specimens'))
+        assert list(export.valid('MEASURED_AT')) == [True, False]
+
+    def test_blank_strings(self, tmp_path):
+        """Test that the blank strings are missing values, also for the mandatory properties."""
+        writer = ColumnarWriter(str(tmp_path / 'specimens'), TimedSpecimen())
+        with pytest.raises(
+            ValueError, match=r'\$NAME: 1 missing values of a mandatory property'
+        ):
+            writer.write({'$NAME': ['S1', '  ']})
+        writer.write({'$NAME': ['S1', 'S2'], 'NOTE': ['', 'Cracked']})
+        writer.close()
+        export = ColumnarExport(str(tmp_path / 'specimens'))
+        assert export.column('NOTE').to_list() == [None, 'Cracked']
+        assert list(export.valid('NOTE')) == [False, True]
+
+    def test_existing_export(self, tmp_path, columns):
+        """Test that an existing export is only replaced with `overwrite`."""
+        path = str(tmp_path / 'specimens')
+        write_columnar(path, Specimen(), columns)
+        with pytest.raises(FileExistsError):
+            write_columnar(path, Specimen(), columns)
+        write_columnar(
+            path, Specimen(), {'$NAME': np.array(['S9'], dtype=object)}, overwrite=True
+        )
+        assert ColumnarExport(path).codes == ['$NAME']
+
+    def test_abort(self, tmp_path, columns):
+        """Test that a failed export leaves no files."""
+        path = str(tmp_path / 'specimens')
+        with pytest.raises(RuntimeError):
+            with ColumnarWriter(path, Specimen()) as writer:
+                writer.write(columns)
+                raise RuntimeError('interrupted')
+        assert os.listdir(tmp_path) == []
+
+    def test_numpy_columns(self, tmp_path):
+        """Test that the NumPy arrays of the column types are written without conversion."""
+        path = str(tmp_path / 'specimens')
+        write_columnar(
+            path,
+            Specimen(),
+            {
+                '$NAME': ['a', 'b'],
+                'WEIGHT': np.array([1.0, np.nan]),
+                'TESTED_ON': np.array(['2024-01-01', 'NaT'], dtype='datetime64[D]'),
+            },
+        )
+        export = ColumnarExport(path)
+        assert list(export.valid('WEIGHT')) == [True, False]
+        assert list(export.valid('TESTED_ON')) == [True, False]
+        with pytest.raises(KeyError):
+            export.column('PIECES')
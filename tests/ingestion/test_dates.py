@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from bam_masterdata.ingestion.dates import detect_format, format_dates, parse_dates
+from bam_masterdata.metadata.definitions import DataType
+
+
+@pytest.mark.parametrize(
+    'values, data_type, result',
+    [
+        (['2024-02-01', '2024-12-31'], DataType.DATE, '%Y-%m-%d'),
+        (['', '01.02.2024', None, '31.12.2024'], DataType.DATE, '%d.%m.%Y'),
+        (['2024-02-01T10:00:00'], DataType.TIMESTAMP, '%Y-%m-%dT%H:%M:%S'),
+        (['01.02.2024 10:00'], DataType.TIMESTAMP, '%d.%m.%Y %H:%M'),
+        (['not a date'], DataType.DATE, None),
+        ([], DataType.DATE, None),
+    ],
+)
+def test_detect_format(values, data_type, result):
+    """Test the detection of the format of a column."""
+    assert detect_format(values, data_type) == result
+
+
+def test_detect_format_invalid_data_type():
+    """Test that only DATE and TIMESTAMP columns are supported."""
+    with pytest.raises(ValueError):
+        detect_format(['1'], DataType.INTEGER)
+
+
+def test_parse_dates():
+    """Test parsing a column of dates with empty and invalid values."""
+    column = parse_dates(
+        ['01.02.2024', '', '31.02.2024', '1.3.2024', 'garbage', '29.02.2024', None],
+        data_type='DATE',
+    )
+    assert column.format == '%d.%m.%Y'
+    assert column.values.dtype == np.dtype('datetime64[D]')
+    assert [str(value) for value in column.values] == [
+        '2024-02-01',
+        'NaT',
+        'NaT',
+        '2024-03-01',
+        'NaT',
+        '2024-02-29',
+        'NaT',
+    ]
+    assert column.failed.tolist() == [False, False, True, False, True, False, False]
+
+
+def test_parse_timestamps():
+    """Test parsing a column of timestamps."""
+    column = parse_dates(
+        ['2024-02-01 10:20:30', '2024-02-01 24:00:00', '1969-12-31 23:59:59'],
+        data_type=DataType.TIMESTAMP,
+    )
+    assert column.values.dtype == np.dtype('datetime64[s]')
+    assert column.values[0] == np.datetime64('2024-02-01T10:20:30')
+    assert column.values[2] == np.datetime64('1969-12-31T23:59:59')
+    assert column.failed.tolist() == [False, True, False]
+
+
+def test_parse_dates_range():
+    """Test the validation of the range of the values."""
+    column = parse_dates(
+        ['1899-01-01', '2024-01-01', '2200-01-01'],
+        fmt='%Y-%m-%d',
+        min_value='1900-01-01',
+        max_value='2100-01-01',
+    )
+    assert column.failed.tolist() == [True, False, True]
+    assert np.isnat(column.values).tolist() == [True, False, True]
+
+
+@pytest.mark.parametrize(
+    'values, data_type, result',
+    [
+        (
+            np.array(['2024-02-01', 'NaT'], dtype='datetime64[D]'),
+            DataType.DATE,
+            ['2024-02-01', None],
+        ),
+        (
+            np.array(['2024-02-01T10:20:30'], dtype='datetime64[s]'),
+            DataType.TIMESTAMP,
+            ['2024-02-01 10:20:30'],
+        ),
+    ],
+)
+def test_format_dates(values, data_type, result):
+    """Test the conversion back to the openBIS strings."""
+    assert format_dates(values, data_type) == result
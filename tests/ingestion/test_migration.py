@@ -0,0 +1,266 @@
+import datetime
+
+import numpy as np
+import pytest
+
+from bam_masterdata.ingestion.migration import migrate, migrate_columns, plan_migration
+from bam_masterdata.metadata.definitions import ObjectTypeDef, PropertyTypeAssignment
+from bam_masterdata.metadata.entities import ObjectType
+from tests.conftest import generate_assignment, generate_object_type
+
+
+class SampleHolderV1(ObjectType):
+    defs = ObjectTypeDef(
+        version=1, code='SAMPLE_HOLDER', description='Holder of samples.'
+    )
+
+    name = generate_assignment('$NAME', 'VARCHAR', 'Name', mandatory=True)
+
+    alias = generate_assignment('ALIAS', 'VARCHAR', 'Alias')
+
+    weight = generate_assignment('WEIGHT', 'VARCHAR', 'Weight')
+
+    document = generate_assignment('DOCUMENT', 'VARCHAR', 'Document type')
+
+    slots = generate_assignment('SLOTS', 'VARCHAR', 'Number of slots')
+
+    note = generate_assignment('NOTE', 'MULTILINE_VARCHAR', 'Note')
+
+
+class SampleHolder(ObjectType):
+    defs = ObjectTypeDef(
+        version=2, code='SAMPLE_HOLDER', description='Holder of samples.'
+    )
+
+    name = generate_assignment('$NAME', 'VARCHAR', 'Name', mandatory=True)
+
+    nickname = generate_assignment('NICKNAME', 'VARCHAR', 'Alias')
+
+    weight = generate_assignment('WEIGHT', 'REAL', 'Weight')
+
+    document = generate_assignment(
+        'DOCUMENT',
+        'CONTROLLEDVOCABULARY',
+        'Document type',
+        vocabulary_code='DOCUMENT_TYPE',
+    )
+
+    slots = generate_assignment('SLOTS', 'INTEGER', 'Number of slots')
+
+    reusable = generate_assignment('REUSABLE', 'BOOLEAN', 'Reusable')
+
+
+VOCABULARIES = {
+    'DOCUMENT_TYPE': frozenset({'CALIBRATION_CERTIFICATE', 'MANUAL', 'DATASHEET'})
+}
+
+
+@pytest.fixture
+def plan():
+    return plan_migration(
+        SampleHolderV1(),
+        SampleHolder(),
+        term_mappings={'DOCUMENT': {'Calib. cert.': 'CALIBRATION_CERTIFICATE'}},
+        vocabularies=VOCABULARIES,
+        defaults={'REUSABLE': True},
+    )
+
+
+@pytest.fixture
+def columns():
+    return {
+        '$NAME': ['H1', 'H2', 'H3', 'H4'],
+        'ALIAS': ['a', None, 'c', 'd'],
+        'WEIGHT': ['1.5', ' 2 ', 'n/a', None],
+        'DOCUMENT': ['Calib. cert.', 'manual', 'Data sheet', ''],
+        'SLOTS': ['4', '4.0', '4.5', 'NaN'],
+        'NOTE': ['x', 'y', 'z', 'w'],
+        'LEGACY_ID': [1, 2, 3, 4],
+    }
+
+
+class TestPlanMigration:
+    def test_plan(self, plan):
+        """Test the renames, coercions, added and removed properties of the plan."""
+        assert (plan.object_type, plan.source_version, plan.target_version) == (
+            'SAMPLE_HOLDER',
+            1,
+            2,
+        )
+        assert plan.renames == {'ALIAS': 'NICKNAME'}
+        assert sorted(step.target for step in plan.coercions) == [
+            'DOCUMENT',
+            'SLOTS',
+            'WEIGHT',
+        ]
+        assert plan.added == ['REUSABLE']
+        assert plan.removed == ['NOTE']
+        document = next(step for step in plan.steps if step.target == 'DOCUMENT')
+        assert document.terms == ['CALIBRATION_CERTIFICATE', 'DATASHEET', 'MANUAL']
+
+    def test_explicit_renames(self):
+        """Test that the explicit renames replace the inferred ones."""
+        plan = plan_migration(
+            (SampleHolderV1.defs, SampleHolderV1().properties),
+            SampleHolder(),
+            renames={'NOTE': 'NICKNAME'},
+        )
+        assert plan.renames == {'NOTE': 'NICKNAME'}
+        assert sorted(plan.removed) == ['ALIAS']
+        with pytest.raises(ValueError, match='does not match'):
+            plan_migration(
+                SampleHolderV1(), SampleHolder(), renames={'MISSING': 'NICKNAME'}
+            )
+
+    def test_different_object_types(self):
+        """Test that the versions must belong to the same object type."""
+        with pytest.raises(ValueError, match='different object types'):
+            plan_migration(SampleHolderV1(), generate_object_type())
+
+    def test_unknown_vocabulary(self):
+        """Test that the vocabularies of the new version must be known."""
+        with pytest.raises(ValueError, match='Unknown vocabulary'):
+            plan_migration(SampleHolderV1(), SampleHolder(), vocabularies={})
+
+
+class TestMigrateColumns:
+    def test_migrate_columns(self, plan, columns):
+        """Test the migration of a batch with renames, coercions, term mappings and failures."""
+        result = migrate_columns(plan, columns)
+        assert list(result.columns['NICKNAME']) == ['a', None, 'c', 'd']
+        assert 'ALIAS' not in result.columns
+        assert 'NOTE' not in result.columns
+        assert list(result.columns['LEGACY_ID']) == [1, 2, 3, 4]
+        np.testing.assert_array_equal(
+            result.columns['WEIGHT'], [1.5, 2.0, np.nan, np.nan]
+        )
+        assert list(result.failed['WEIGHT']) == [False, False, True, False]
+        assert list(result.columns['DOCUMENT']) == [
+            'CALIBRATION_CERTIFICATE',
+            'MANUAL',
+            None,
+            None,
+        ]
+        # `DATA_SHEET` is not a term of the vocabulary
+        assert list(result.failed['DOCUMENT']) == [False, False, True, False]
+        assert list(result.columns['SLOTS']) == [4, 4, None, None]
+        assert list(result.failed['SLOTS']) == [False, False, True, False]
+        assert list(result.columns['REUSABLE']) == [True] * 4
+        assert list(result.failed_rows()) == [False, False, True, False]
+
+    def test_numeric_columns(self, plan):
+        """Test the coercion of numeric arrays without going through strings."""
+        result = migrate_columns(
+            plan, {'WEIGHT': np.array([1, 2, 3]), 'SLOTS': np.array([1.0, 2.5, np.nan])}
+        )
+        assert result.columns['WEIGHT'].dtype == np.float64
+        assert list(result.columns['SLOTS']) == [1, None, None]
+        assert list(result.failed['SLOTS']) == [False, True, False]
+
+    def test_integer_overflow(self, plan):
+        """Test that the numbers out of the int64 range are flagged instead of wrapped around."""
+        result = migrate_columns(
+            plan,
+            {'SLOTS': np.array([1e20, -1e20, np.inf, 3.0])},
+        )
+        assert list(result.columns['SLOTS']) == [None, None, None, 3]
+        assert list(result.failed['SLOTS']) == [True, True, True, False]
+        result = migrate_columns(
+            plan, {'SLOTS': np.array([2**64 - 1, 5], dtype=np.uint64)}
+        )
+        assert list(result.columns['SLOTS']) == [None, 5]
+        assert list(result.failed['SLOTS']) == [True, False]
+        result = migrate_columns(
+            plan,
+            {
+                'SLOTS': [
+                    '12345678901234567891',
+                    '9007199254740993.0',
+                    '2.0',
+                    '-9223372036854775808',
+                ]
+            },
+        )
+        assert list(result.columns['SLOTS']) == [
+            None,
+            9007199254740993,
+            2,
+            -9223372036854775808,
+        ]
+        assert list(result.failed['SLOTS']) == [True, False, False, False]
+
+    @pytest.mark.parametrize(
+        'source_type, target_type, values, expected',
+        [
+            (
+                'DATE',
+                'TIMESTAMP',
+                np.array(['2024-01-02', 'NaT'], dtype='datetime64[D]'),
+                np.array(['2024-01-02T00:00:00', 'NaT'], dtype='datetime64[s]'),
+            ),
+            (
+                'TIMESTAMP',
+                'DATE',
+                np.array(['2024-01-02T10:30:00', 'NaT'], dtype='datetime64[s]'),
+                np.array(['2024-01-02', 'NaT'], dtype='datetime64[D]'),
+            ),
+            (
+                'TIMESTAMP',
+                'DATE',
+                [datetime.datetime(2024, 1, 2, 3, 4), None],
+                np.array(['2024-01-02', 'NaT'], dtype='datetime64[D]'),
+            ),
+            (
+                'DATE',
+                'TIMESTAMP',
+                [datetime.date(2024, 1, 2), '2024-01-03 10:00:00'],
+                np.array(
+                    ['2024-01-02T00:00:00', '2024-01-03T10:00:00'],
+                    dtype='datetime64[s]',
+                ),
+            ),
+        ],
+    )
+    def test_datetime_columns(self, source_type, target_type, values, expected):
+        """Test that the datetime64 and datetime object columns are cast to the unit of the new type."""
+        old = (
+            ObjectTypeDef(version=1, code='MEASUREMENT', description='Measurement.'),
+            [generate_assignment('MEASURED_ON', source_type, 'Measured on')],
+        )
+        new = (
+            ObjectTypeDef(version=2, code='MEASUREMENT', description='Measurement.'),
+            [generate_assignment('MEASURED_ON', target_type, 'Measured on')],
+        )
+        result = migrate_columns(plan_migration(old, new), {'MEASURED_ON': values})
+        np.testing.assert_array_equal(result.columns['MEASURED_ON'], expected)
+        assert result.columns['MEASURED_ON'].dtype == expected.dtype
+        assert list(result.failed['MEASURED_ON']) == [False, False]
+
+    def test_mandatory_added_without_default(self, columns):
+        """Test that a mandatory property added without default fails all the rows."""
+        plan = plan_migration(SampleHolderV1(), SampleHolder())
+        for step in plan.steps:
+            if step.target == 'REUSABLE':
+                step.mandatory = True
+        result = migrate_columns(plan, columns)
+        assert result.failed['REUSABLE'].all()
+
+    def test_different_lengths(self, plan):
+        """Test that the columns must have the same length."""
+        with pytest.raises(ValueError, match='different lengths'):
+            migrate_columns(plan, {'$NAME': ['a'], 'WEIGHT': ['1', '2']})
+
+
+class TestMigrate:
+    @pytest.mark.parametrize('workers', [0, 2])
+    def test_chunks(self, plan, columns, workers):
+        """Test that the migration in parallel chunks equals the migration of a single batch."""
+        large = {code: values * 50 for code, values in columns.items()}
+        expected = migrate_columns(plan, large)
+        result = migrate(plan, large, chunk_size=30, workers=workers)
+        assert result.columns.keys() == expected.columns.keys()
+        for code, values in expected.columns.items():
+            np.testing.assert_array_equal(result.columns[code], values)
+            np.testing.assert_array_equal(
+                result.failed.get(code), expected.failed.get(code)
+            )
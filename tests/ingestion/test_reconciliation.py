@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+from bam_masterdata.datamodel.vocabulary_types import DocumentType
+from bam_masterdata.ingestion.reconciliation import VocabularyReconciler, normalize_text
+
+
+@pytest.mark.parametrize(
+    'value, result',
+    [
+        ('Calib. Cert.', 'calib cert'),
+        ('  Prüfbericht ', 'prufbericht'),
+        ('Material Safety Datasheet (MSDS)', 'material safety datasheet msds'),
+        ('', ''),
+    ],
+)
+def test_normalize_text(value: str, result: str):
+    """Test the normalization of free-text values."""
+    assert normalize_text(value) == result
+
+
+class TestVocabularyReconciler:
+    @pytest.mark.parametrize(
+        'value, term, tier',
+        [
+            ('CALIBRATION_CERTIFICATE', 'CALIBRATION_CERTIFICATE', 'exact'),
+            ('Kalibrierschein', 'CALIBRATION_CERTIFICATE', 'exact'),
+            ('Calibration Certificate', 'CALIBRATION_CERTIFICATE', 'exact'),
+            ('  calibration certificate ', 'CALIBRATION_CERTIFICATE', 'normalized'),
+            ('Calib. cert.', 'CALIBRATION_CERTIFICATE', 'fuzzy'),
+            ('Data sheet', 'DATASHEET', 'fuzzy'),
+            ('Sicherheitsdatenblatt', 'DATASHEET_MSDS', 'exact'),
+            ('unrelated text', None, None),
+            (None, None, None),
+        ],
+    )
+    def test_match(self, value, term, tier):
+        """Test the tiers of the matches."""
+        match = VocabularyReconciler(DocumentType()).match(value)
+        assert (match.term, match.tier) == (term, tier)
+        if tier == 'fuzzy':
+            assert 0.85 <= match.score < 1.0
+
+    def test_memoized(self):
+        """Test that the repeated values are resolved once."""
+        reconciler = VocabularyReconciler(DocumentType())
+        matches = reconciler.reconcile(['Calib. cert.', 'Kalibrierschein'] * 1000)
+        assert [match.term for match in matches[:2]] == ['CALIBRATION_CERTIFICATE'] * 2
+        assert reconciler.stats == {'fuzzy': 1, 'exact': 1, 'memoized': 1998}
+
+    def test_threshold(self):
+        """Test that the fuzzy matches below the threshold are unresolved."""
+        reconciler = VocabularyReconciler(DocumentType(), threshold=0.95)
+        match = reconciler.match('Calib. cert.')
+        assert match.term is None
+        assert match.score == 0.9
+        with pytest.raises(ValueError):
+            VocabularyReconciler(DocumentType(), threshold=0)
+
+    def test_accept(self, tmp_path):
+        """Test that the accepted decisions are persisted and take precedence."""
+        cache_path = str(tmp_path / 'cache' / 'mappings.json')
+        reconciler = VocabularyReconciler(DocumentType(), cache_path=cache_path)
+        reconciler.accept('KS', 'CALIBRATION_CERTIFICATE')
+        with pytest.raises(ValueError, match='not a term'):
+            reconciler.accept('KS', 'MISSING')
+        assert reconciler.match('KS').tier == 'accepted'
+        reconciler.save()
+
+        with open(cache_path, encoding='utf-8') as f:
+            data = json.load(f)
+        data['OTHER_VOCABULARY'] = {'x': 'Y'}
+        data['DOCUMENT_TYPE']['old'] = 'REMOVED_TERM'
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+        reloaded = VocabularyReconciler(DocumentType(), cache_path=cache_path)
+        assert reloaded.accepted == {'KS': 'CALIBRATION_CERTIFICATE'}
+        assert reloaded.match('KS') == (
+            'KS',
+            'CALIBRATION_CERTIFICATE',
+            'accepted',
+            1.0,
+        )
+        reloaded.save()
+        with open(cache_path, encoding='utf-8') as f:
+            assert json.load(f)['OTHER_VOCABULARY'] == {'x': 'Y'}
+
+    def test_term_mapping(self):
+        """Test the mapping of the resolved values used by the migration plans."""
+        values = ['Calib. cert.', 'Datenblatt', 'unrelated text', 'Calib. cert.']
+        mapping = VocabularyReconciler(DocumentType()).term_mapping(values)
+        assert mapping == {
+            'Calib. cert.': 'CALIBRATION_CERTIFICATE',
+            'Datenblatt': 'DATASHEET',
+        }
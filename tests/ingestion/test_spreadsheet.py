@@ -0,0 +1,228 @@
+import csv
+import datetime
+
+import pytest
+from openpyxl import Workbook
+
+from bam_masterdata.ingestion.spreadsheet import (
+    REPORT_COLUMNS,
+    map_headers,
+    validate_spreadsheet,
+    vocabulary_terms,
+)
+from bam_masterdata.metadata.definitions import ObjectTypeDef, PropertyTypeAssignment
+from bam_masterdata.metadata.entities import ObjectType
+from bam_masterdata.metadata.registry import EntityRegistry
+
+
+class LabInstrument(ObjectType):
+    defs = ObjectTypeDef(
+        version=1,
+        code='LAB_INSTRUMENT',
+        description='Instrument registered by a lab.',
+        generated_code_prefix='LAB',
+    )
+
+    name = PropertyTypeAssignment(
+        version=1,
+        code='$NAME',
+        data_type='VARCHAR',
+        property_label='Name',
+        description='Name of the instrument.',
+        mandatory=True,
+        show_in_edit_views=True,
+        section='General information',
+    )
+
+    inventory_number = PropertyTypeAssignment(
+        version=1,
+        code='INVENTORY_NUMBER',
+        data_type='INTEGER',
+        property_label='Inventory number',
+        description='Inventory number of the instrument.',
+        mandatory=False,
+        show_in_edit_views=True,
+        section='General information',
+    )
+
+    calibrated = PropertyTypeAssignment(
+        version=1,
+        code='CALIBRATED',
+        data_type='BOOLEAN',
+        property_label='Calibrated',
+        description='Whether the instrument is calibrated.',
+        mandatory=False,
+        show_in_edit_views=True,
+        section='General information',
+    )
+
+    calibration_date = PropertyTypeAssignment(
+        version=1,
+        code='CALIBRATION_DATE',
+        data_type='DATE',
+        property_label='Calibration date',
+        description='Date of the last calibration.',
+        mandatory=False,
+        show_in_edit_views=True,
+        section='General information',
+    )
+
+    status = PropertyTypeAssignment(
+        version=1,
+        code='INSTRUMENT_STATUS',
+        data_type='CONTROLLEDVOCABULARY',
+        vocabulary_code='INSTRUMENT_STATUS',
+        property_label='Status',
+        description='Status of the instrument.',
+        mandatory=False,
+        show_in_edit_views=True,
+        section='General information',
+    )
+
+
+VOCABULARIES = {'INSTRUMENT_STATUS': frozenset({'ACTIVE', 'BROKEN'})}
+
+
+def write_workbook(path, rows):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = 'Instruments'
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+    return str(path)
+
+
+HEADERS = ['Name', 'INVENTORY_NUMBER', 'calibrated', 'Calibration date', 'Status']
+
+
+class TestMapHeaders:
+    def test_map_headers(self):
+        """Test mapping the headers to the properties by code and label."""
+        columns, unknown = map_headers(
+            ('  name ', None, 'CALIBRATION_DATE', 'Comments'),
+            LabInstrument().properties,
+        )
+        assert {index: prop.code for index, prop in columns.items()} == {
+            0: '$NAME',
+            2: 'CALIBRATION_DATE',
+        }
+        assert unknown == ['Comments']
+
+
+class TestValidateSpreadsheet:
+    def test_valid_sheet(self, tmp_path):
+        """Test that the chunks of a valid sheet are converted and uploaded."""
+        rows = [
+            [f'Instrument {i}', i, 'yes', datetime.datetime(2024, 2, 1), 'active']
+            for i in range(25)
+        ]
+        path = write_workbook(tmp_path / 'instruments.xlsx', [HEADERS, *rows])
+        uploaded = []
+        report = validate_spreadsheet(
+            path,
+            LabInstrument(),
+            uploaded.append,
+            chunk_size=10,
+            vocabularies=VOCABULARIES,
+        )
+        assert report.rows == report.valid_rows == report.uploaded_rows == 25
+        assert report.chunks == report.uploaded_chunks == 3
+        assert [len(chunk) for chunk in uploaded] == [10, 10, 5]
+        assert uploaded[0][3] == {
+            '$NAME': 'Instrument 3',
+            'INVENTORY_NUMBER': 3,
+            'CALIBRATED': True,
+            'CALIBRATION_DATE': '2024-02-01',
+            'INSTRUMENT_STATUS': 'ACTIVE',
+        }
+        assert report.columns['Calibration date'] == 'CALIBRATION_DATE'
+        assert report.n_errors == 0
+
+    def test_errors(self, tmp_path):
+        """Test the errors of the invalid cells and the report with their coordinates."""
+        rows = [
+            ['Good', 1, True, '01.02.2024', 'BROKEN'],
+            [None, 2.5, 'maybe', '31.02.2024', 'LOST'],
+            [],
+            ['Also good', '3', None, '02.02.2024', None],
+        ]
+        path = write_workbook(tmp_path / 'instruments.xlsx', [HEADERS, *rows])
+        report_path = str(tmp_path / 'errors.csv')
+        uploaded = []
+        report = validate_spreadsheet(
+            path,
+            LabInstrument(),
+            uploaded.append,
+            report_path=report_path,
+            chunk_size=2,
+            vocabularies=VOCABULARIES,
+        )
+        assert [(error.cell, error.message) for error in report.errors] == [
+            ('A3', 'mandatory value is missing'),
+            ('B3', 'expected an integer'),
+            ('C3', 'expected a boolean'),
+            ('D3', 'expected a date'),
+            ('E3', '`LOST` is not a term of INSTRUMENT_STATUS'),
+        ]
+        # The empty row is skipped and the rows keep their number in the sheet
+        assert report.rows == 3
+        assert report.valid_rows == 2
+        assert uploaded == [
+            [
+                {
+                    '$NAME': 'Also good',
+                    'INVENTORY_NUMBER': 3,
+                    'CALIBRATION_DATE': '2024-02-02',
+                }
+            ]
+        ]
+        with open(report_path, newline='', encoding='utf-8') as f:
+            lines = list(csv.reader(f))
+        assert tuple(lines[0]) == REPORT_COLUMNS
+        assert lines[1] == ['A3', '$NAME', '', 'mandatory value is missing']
+        assert len(lines) == 1 + report.n_errors
+
+    def test_partial(self, tmp_path):
+        """Test uploading the valid rows of the chunks with errors."""
+        rows = [['Good', 1], ['Bad', 'one']]
+        path = write_workbook(tmp_path / 'instruments.xlsx', [HEADERS[:2], *rows])
+        uploaded = []
+        report = validate_spreadsheet(
+            path, LabInstrument(), uploaded.append, partial=True, vocabularies={}
+        )
+        assert uploaded == [[{'$NAME': 'Good', 'INVENTORY_NUMBER': 1}]]
+        assert report.uploaded_rows == 1
+        assert report.errors[0].cell == 'B3'
+
+    def test_date_in_numeric_column(self, tmp_path):
+        """Test that a date cell in an INTEGER column is reported as a cell error."""
+        rows = [['Dated', datetime.datetime(2024, 2, 1)], ['Good', 2]]
+        path = write_workbook(tmp_path / 'instruments.xlsx', [HEADERS[:2], *rows])
+        uploaded = []
+        report = validate_spreadsheet(
+            path, LabInstrument(), uploaded.append, partial=True, vocabularies={}
+        )
+        assert [(error.cell, error.message) for error in report.errors] == [
+            ('B2', 'expected an integer')
+        ]
+        assert uploaded == [[{'$NAME': 'Good', 'INVENTORY_NUMBER': 2}]]
+
+    def test_missing_mandatory_column(self, tmp_path):
+        """Test that the rows are invalid when a mandatory property has no column."""
+        path = write_workbook(tmp_path / 'instruments.xlsx', [['Calibrated'], [True]])
+        report = validate_spreadsheet(path, LabInstrument(), vocabularies={})
+        assert report.valid_rows == 0
+        assert report.errors[0].message == 'mandatory property has no column'
+
+    def test_no_matching_headers(self, tmp_path):
+        """Test that a sheet without known headers is rejected."""
+        path = write_workbook(tmp_path / 'instruments.xlsx', [['Foo', 'Bar'], [1, 2]])
+        with pytest.raises(ValueError, match='No header'):
+            validate_spreadsheet(path, LabInstrument())
+
+
+def test_vocabulary_terms():
+    """Test collecting the terms of the vocabularies of the datamodel."""
+    terms = vocabulary_terms(EntityRegistry.from_datamodel())
+    assert 'DATASHEET' in terms['DOCUMENT_TYPE']
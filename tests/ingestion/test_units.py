@@ -0,0 +1,152 @@
+import numpy as np
+import pytest
+
+from bam_masterdata.ingestion.units import (
+    conversion_factors,
+    convert_columns,
+    convert_values,
+    parse_unit,
+    property_unit,
+)
+from bam_masterdata.metadata.definitions import ObjectTypeDef, PropertyTypeAssignment
+from bam_masterdata.metadata.entities import ObjectType
+
+
+class MeasuredObjectType(ObjectType):
+    defs = ObjectTypeDef(
+        version=1,
+        code='MEASURED_OBJECT_TYPE',
+        description='Object type with measured quantities.',
+        generated_code_prefix='MEAS',
+    )
+
+    length = PropertyTypeAssignment(
+        version=1,
+        code='LENGTH',
+        data_type='REAL',
+        property_label='Length',
+        description='Length of the specimen.',
+        metadata={'unit': 'm', 'precision': 4},
+        mandatory=False,
+        show_in_edit_views=True,
+        section='Measurements',
+    )
+
+    temperature = PropertyTypeAssignment(
+        version=1,
+        code='TEMPERATURE',
+        data_type='REAL',
+        property_label='Temperature',
+        description='Temperature of the specimen.',
+        metadata={'unit': 'K'},
+        mandatory=False,
+        show_in_edit_views=True,
+        section='Measurements',
+    )
+
+    count = PropertyTypeAssignment(
+        version=1,
+        code='COUNT',
+        data_type='INTEGER',
+        property_label='Count',
+        description='Number of specimens.',
+        mandatory=False,
+        show_in_edit_views=True,
+        section='Measurements',
+    )
+
+
+@pytest.mark.parametrize(
+    'unit, factor, dimension',
+    [
+        ('m', 1.0, (1, 0, 0, 0, 0, 0, 0)),
+        ('mm', 1e-3, (1, 0, 0, 0, 0, 0, 0)),
+        ('kg', 1.0, (0, 1, 0, 0, 0, 0, 0)),
+        ('N/mm^2', 1e6, (-1, 1, -2, 0, 0, 0, 0)),
+        ('kg*m/s2', 1.0, (1, 1, -2, 0, 0, 0, 0)),
+        ('J mol-1 K-1', 1.0, (2, 1, -2, 0, -1, -1, 0)),
+        ('µm', 1e-6, (1, 0, 0, 0, 0, 0, 0)),
+        ('min', 60.0, (0, 0, 1, 0, 0, 0, 0)),
+        ('%', 0.01, (0, 0, 0, 0, 0, 0, 0)),
+    ],
+)
+def test_parse_unit(unit, factor, dimension):
+    """Test parsing unit expressions."""
+    parsed = parse_unit(unit)
+    assert parsed.factor == pytest.approx(factor)
+    assert parsed.dimension == dimension
+
+
+@pytest.mark.parametrize('unit', ['furlong', 'm^', 'degC*m'])
+def test_parse_unit_invalid(unit):
+    """Test that unknown units and compound units with offsets are rejected."""
+    with pytest.raises(ValueError):
+        parse_unit(unit)
+
+
+def test_conversion_factors():
+    """Test the conversion factors and their caching."""
+    assert conversion_factors('mm', 'm') == pytest.approx((1e-3, 0.0))
+    assert conversion_factors('degC', 'K') == pytest.approx((1.0, 273.15))
+    hits = conversion_factors.cache_info().hits
+    conversion_factors('mm', 'm')
+    assert conversion_factors.cache_info().hits == hits + 1
+    with pytest.raises(ValueError, match='incompatible dimensions'):
+        conversion_factors('mm', 's')
+
+
+def test_convert_values():
+    """Test converting and rounding an array of values."""
+    result = convert_values([1.0, None, 2.5, 123.456], 'mm', 'm', precision=4)
+    assert result.dtype == np.float64
+    np.testing.assert_array_equal(result, [0.001, np.nan, 0.0025, 0.1235])
+    np.testing.assert_allclose(
+        convert_values(np.array([32.0, 212.0]), 'degF', 'degC'), [0.0, 100.0], atol=1e-9
+    )
+
+
+def test_property_unit():
+    """Test reading the unit and precision declared in the metadata of a property."""
+    object_type = MeasuredObjectType()
+    assert property_unit(object_type.length) == ('m', 4)
+    assert property_unit(object_type.temperature) == ('K', None)
+    assert property_unit(object_type.count) == (None, None)
+
+
+class TestConvertColumns:
+    def test_convert_columns(self):
+        """Test converting the columns of a batch into the declared units."""
+        converted = convert_columns(
+            MeasuredObjectType(),
+            {
+                'LENGTH': [1.0, 2.5],
+                'TEMPERATURE': [20.0, -273.15],
+                'COUNT': [1, 2],
+            },
+            units={'LENGTH': 'mm', 'TEMPERATURE': 'degC'},
+        )
+        np.testing.assert_array_equal(converted['LENGTH'], [0.001, 0.0025])
+        np.testing.assert_allclose(converted['TEMPERATURE'], [293.15, 0.0])
+        assert converted['COUNT'] == [1, 2]
+
+    def test_missing_units(self):
+        """Test that the columns without unit are only rounded to the declared precision."""
+        converted = convert_columns(MeasuredObjectType(), {'LENGTH': [0.123456]}, {})
+        np.testing.assert_array_equal(converted['LENGTH'], [0.1235])
+
+    @pytest.mark.parametrize(
+        'units, message',
+        [
+            ({'LENGTH': 's'}, 'incompatible dimensions'),
+            ({'COUNT': 'm'}, 'not a REAL property'),
+            ({'LENGTH': 'parsec'}, 'Unknown unit'),
+        ],
+    )
+    def test_rejected_batch(self, units, message):
+        """Test that a column with a wrong unit rejects the whole batch."""
+        with pytest.raises(ValueError, match=message):
+            convert_columns(
+                MeasuredObjectType(),
+                {'LENGTH': [1.0], 'TEMPERATURE': [1.0], 'COUNT': [1]},
+                units,
+            )
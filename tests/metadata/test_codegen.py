@@ -0,0 +1,192 @@
+import importlib.util
+import json
+import os
+import shutil
+
+from openpyxl import Workbook
+
+from bam_masterdata.metadata.codegen import (
+    generate_datamodel,
+    generate_module,
+    load_export,
+    read_excel_export,
+)
+from bam_masterdata.metadata.registry import EntityRegistry
+
+DATAMODEL_DIR = os.path.join(
+    os.path.dirname(__file__), '..', '..', 'bam_masterdata', 'datamodel'
+)
+
+
+def import_module(path: str, name: str):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def read(path: str) -> str:
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+class TestGenerateDatamodel:
+    def test_unchanged_datamodel(self, tmp_path):
+        """Test that regenerating the datamodel from its own export leaves the modules untouched."""
+        for filename in ('object_types.py', 'vocabulary_types.py'):
+            shutil.copy(os.path.join(DATAMODEL_DIR, filename), tmp_path / filename)
+        mtime = os.stat(tmp_path / 'object_types.py').st_mtime_ns
+        reports = generate_datamodel(
+            EntityRegistry.from_datamodel().to_dict(), str(tmp_path)
+        )
+        assert [report.written for report in reports] == [False, False]
+        assert reports[0].unchanged == [
+            'INSTRUMENT',
+            'INSTRUMENT.WELDING_EQUIPMENT',
+            'INSTRUMENT.WELDING_EQUIPMENT.GMAW_TORCH',
+        ]
+        assert os.stat(tmp_path / 'object_types.py').st_mtime_ns == mtime
+        assert read(tmp_path / 'object_types.py') == read(
+            os.path.join(DATAMODEL_DIR, 'object_types.py')
+        )
+
+    def test_round_trip(self, tmp_path):
+        """Test that the generated modules define the exported datamodel."""
+        export = EntityRegistry.from_datamodel().to_dict()
+        reports = generate_datamodel(export, str(tmp_path))
+        assert all(report.written for report in reports)
+        registry = EntityRegistry.from_modules(
+            import_module(str(tmp_path / 'object_types.py'), 'generated_object_types'),
+            import_module(
+                str(tmp_path / 'vocabulary_types.py'), 'generated_vocabulary_types'
+            ),
+        )
+        assert registry.to_dict() == export
+        generated = read(tmp_path / 'object_types.py')
+        assert 'class WeldingEquipment(Instrument):' in generated
+        assert 'class GmawTorch(WeldingEquipment):' in generated
+        # The inherited properties are only declared in the parent class
+        assert generated.count("code='$NAME'") == 1
+
+        # Generating again is deterministic and does not write the files
+        reports = generate_datamodel(export, str(tmp_path))
+        assert [report.written for report in reports] == [False, False]
+        assert read(tmp_path / 'object_types.py') == generated
+
+    def test_incremental(self, tmp_path):
+        """Test that only the classes whose content changed are rewritten."""
+        path = str(tmp_path / 'object_types.py')
+        shutil.copy(os.path.join(DATAMODEL_DIR, 'object_types.py'), path)
+        export = EntityRegistry.from_datamodel().to_dict()['object_types']
+        torch = export['INSTRUMENT.WELDING_EQUIPMENT.GMAW_TORCH']
+        for prop in torch['properties']:
+            if prop['code'] == 'WELDING.TORCH_TYPE':
+                prop['property_label'] = 'Torch type'
+        del export['INSTRUMENT.WELDING_EQUIPMENT']
+        report = generate_module(path, 'object_types', export)
+        assert report.written
+        assert report.changed == ['INSTRUMENT.WELDING_EQUIPMENT.GMAW_TORCH']
+        assert report.removed == ['INSTRUMENT.WELDING_EQUIPMENT']
+        assert report.unchanged == ['INSTRUMENT']
+        source = read(path)
+        # The source of the unchanged class is kept, including its comments
+        assert '# ... other property types here...' in source
+        # The rewritten class keeps its name and inherits from its closest registered parent
+        assert 'class GMAWTorch(Instrument):' in source
+        assert "property_label='Torch type'" in source
+        assert 'class WeldingEquipment' not in source
+
+
+def test_load_export(tmp_path):
+    """Test loading a masterdata export from JSON."""
+    path = str(tmp_path / 'masterdata.json')
+    export = EntityRegistry.from_datamodel().to_dict()
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(export, f)
+    assert load_export(path) == export
+
+
+def test_read_excel_export(tmp_path):
+    """Test reading an openBIS masterdata export in Excel format."""
+    workbook = Workbook()
+    sheet = workbook.active
+    rows = [
+        ['SAMPLE_TYPE'],
+        [
+            'Version',
+            'Code',
+            'Description',
+            'Generated code prefix',
+            'Auto generate codes',
+        ],
+        [1, 'SAMPLE', 'Sample//Probe', 'SAM', 'TRUE'],
+        [
+            'Version',
+            'Code',
+            'Mandatory',
+            'Show in edit views',
+            'Section',
+            'Property label',
+            'Data type',
+            'Vocabulary code',
+            'Description',
+            'Metadata',
+        ],
+        [
+            1,
+            '$NAME',
+            'TRUE',
+            'TRUE',
+            'General information',
+            'Name',
+            'VARCHAR',
+            None,
+            'Name',
+            None,
+        ],
+        [
+            1,
+            'LENGTH',
+            'FALSE',
+            'TRUE',
+            'Dimensions',
+            'Length',
+            'REAL',
+            None,
+            'Length',
+            '{"unit": "m"}',
+        ],
+        [],
+        ['VOCABULARY_TYPE'],
+        ['Version', 'Code', 'Description'],
+        [1, 'SHAPE', 'Shape//Form'],
+        ['Version', 'Code', 'Label', 'Description'],
+        [1, 'ROUND', 'Round', 'Round//Rund'],
+        [],
+        ['PROPERTY_TYPE'],
+        ['Version', 'Code'],
+        [1, 'IGNORED'],
+    ]
+    for row in rows:
+        sheet.append(row)
+    path = str(tmp_path / 'masterdata.xlsx')
+    workbook.save(path)
+
+    export = read_excel_export(path)
+    assert load_export(path) == export
+    sample = export['object_types']['SAMPLE']
+    assert sample['defs'] == {
+        'version': 1,
+        'code': 'SAMPLE',
+        'description': 'Sample//Probe',
+        'generated_code_prefix': 'SAM',
+        'auto_generated_codes': True,
+    }
+    assert [prop['code'] for prop in sample['properties']] == ['$NAME', 'LENGTH']
+    assert sample['properties'][1]['metadata'] == {'unit': 'm'}
+    assert sample['properties'][1]['mandatory'] is False
+    assert export['vocabulary_types']['SHAPE']['terms'][0]['label'] == 'Round'
+
+    reports = generate_datamodel(export, str(tmp_path / 'datamodel'))
+    assert reports[0].added == ['SAMPLE']
+    assert reports[1].added == ['SHAPE']
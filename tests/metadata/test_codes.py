@@ -0,0 +1,116 @@
+import os
+import threading
+
+import pytest
+
+from bam_masterdata.datamodel.object_types import GMAWTorch, Instrument
+from bam_masterdata.metadata.codes import (
+    CodeAllocator,
+    FileSequenceStore,
+    SequenceStore,
+)
+from bam_masterdata.metadata.definitions import ObjectTypeDef
+
+
+class TestFileSequenceStore:
+    def test_reserve(self, tmp_path):
+        """Test the reservation of consecutive blocks."""
+        store = FileSequenceStore(os.path.join(tmp_path, 'sequences.json'))
+        assert store.reserve('INS', 10) == 1
+        assert store.reserve('INS', 5) == 11
+        assert store.reserve('CHEM', 5) == 1
+        with pytest.raises(ValueError):
+            store.reserve('INS', 0)
+
+    def test_persistence(self, tmp_path):
+        """Test that a new store (e.g., after a restart) never reuses reserved numbers."""
+        path = os.path.join(tmp_path, 'sequences.json')
+        FileSequenceStore(path).reserve('INS', 10)
+        store = FileSequenceStore(path)
+        assert store.reserve('INS', 10) == 11
+        store.ensure_at_least('INS', 500)
+        assert store.reserve('INS', 1) == 500
+        store.ensure_at_least('INS', 5)
+        assert store.reserve('INS', 1) == 501
+
+
+def test_sequence_store_interface():
+    """Test that the sequence stores must implement the whole `SequenceStore` interface."""
+
+    class IncompleteStore(SequenceStore):
+        def reserve(self, prefix, size):
+            return 1
+
+    with pytest.raises(TypeError, match='abstract'):
+        IncompleteStore()
+
+
+class TestCodeAllocator:
+    def test_for_object_type(self, tmp_path):
+        """Test the creation of allocators from object types."""
+        store = FileSequenceStore(os.path.join(tmp_path, 'sequences.json'))
+        allocator = CodeAllocator.for_object_type(GMAWTorch, store)
+        assert allocator.next_code() == 'INS.WLD_EQP.GMAW_TRCH1'
+        with pytest.raises(ValueError):
+            CodeAllocator.for_object_type(
+                ObjectTypeDef(
+                    version=1,
+                    code='SAMPLE',
+                    description='Sample',
+                    auto_generated_codes=False,
+                ),
+                store,
+            )
+
+    def test_next_code(self, tmp_path):
+        """Test handing out codes from reserved blocks."""
+        path = os.path.join(tmp_path, 'sequences.json')
+        allocator = CodeAllocator.for_object_type(
+            Instrument, FileSequenceStore(path), block_size=3
+        )
+        assert [allocator.next_code() for _ in range(4)] == [
+            'INS1',
+            'INS2',
+            'INS3',
+            'INS4',
+        ]
+        # A restart skips the rest of the reserved block
+        allocator = CodeAllocator('INS', FileSequenceStore(path), block_size=3)
+        assert allocator.next_code() == 'INS7'
+
+    def test_allocate(self, tmp_path):
+        """Test the bulk allocation of codes with a single reservation."""
+
+        class CountingStore(FileSequenceStore):
+            reservations = 0
+
+            def reserve(self, prefix, size):
+                self.reservations += 1
+                return super().reserve(prefix, size)
+
+        store = CountingStore(os.path.join(tmp_path, 'sequences.json'))
+        allocator = CodeAllocator('INS', store, block_size=10)
+        assert allocator.next_code() == 'INS1'
+        codes = allocator.allocate(25)
+        assert codes == [f'INS{i}' for i in range(2, 27)]
+        assert store.reservations == 2
+        # The remainder of the last block is reused
+        assert allocator.next_code() == 'INS27'
+        assert store.reservations == 2
+
+    def test_threads(self, tmp_path):
+        """Test that concurrent threads never receive the same code."""
+        store = FileSequenceStore(os.path.join(tmp_path, 'sequences.json'))
+        allocator = CodeAllocator('INS', store, block_size=7)
+        codes: list = []
+
+        def work():
+            codes.extend(allocator.next_code() for _ in range(100))
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(codes) == 800
+        assert len(set(codes)) == 800
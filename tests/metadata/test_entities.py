@@ -1,5 +1,6 @@
 from tests.conftest import (
     generate_base_entity,
+    generate_dataset_type,
     generate_object_type,
     generate_object_type_longer,
     generate_vocabulary_type,
@@ -53,3 +54,11 @@ class TestVocabularyType:
         assert len(vocabulary_type.terms) == 2
         term_names = [term.code for term in vocabulary_type.terms]
         assert term_names == ['OPTION_A', 'OPTION_B']
+
+
+class TestDataSetType:
+    def test_to_dict(self):
+        """Test that the `defs` of a `DataSetType` are a `DataSetTypeDef`."""
+        dataset_type = generate_dataset_type()
+        assert dataset_type.to_dict()['defs']['main_dataset_pattern'] == '.*\\.csv'
+        assert dataset_type.properties == []
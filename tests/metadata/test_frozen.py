@@ -0,0 +1,129 @@
+import json
+
+import pytest
+
+from bam_masterdata.metadata.definitions import (
+    DataSetTypeDef,
+    ObjectTypeDef,
+    PropertyTypeAssignment,
+    VocabularyTerm,
+    VocabularyTypeDef,
+)
+from bam_masterdata.metadata.frozen import (
+    RECORD_TYPES,
+    FrozenDatamodel,
+    FrozenPropertyTypeAssignment,
+    freeze,
+    thaw,
+)
+from bam_masterdata.metadata.registry import EntityRegistry
+from tests.conftest import generate_object_type
+
+
+@pytest.mark.parametrize(
+    'model',
+    [
+        ObjectTypeDef,
+        PropertyTypeAssignment,
+        VocabularyTypeDef,
+        VocabularyTerm,
+        DataSetTypeDef,
+    ],
+)
+def test_record_fields(model):
+    """Test that the records have the fields of their definition models."""
+    assert RECORD_TYPES[model]._fields == tuple(model.model_fields)
+
+
+class TestFreeze:
+    def test_freeze_and_thaw(self):
+        """Test that a frozen property assignment is read-only and converted back unchanged."""
+        prop = PropertyTypeAssignment(
+            version=1,
+            code='LENGTH',
+            data_type='REAL',
+            property_label='Length',
+            description='Length of the sample.',
+            metadata={'unit': 'm', 'precision': 2},
+            mandatory=False,
+            show_in_edit_views=True,
+            section='General information',
+        )
+        record = freeze(prop)
+        assert isinstance(record, FrozenPropertyTypeAssignment)
+        assert not hasattr(record, '__dict__')
+        assert (record.code, record.data_type, record.metadata['unit']) == (
+            'LENGTH',
+            'REAL',
+            'm',
+        )
+        with pytest.raises(AttributeError):
+            record.code = 'WIDTH'
+        with pytest.raises(TypeError):
+            record.metadata['unit'] = 'mm'
+        thawed = thaw(record)
+        assert isinstance(thawed, PropertyTypeAssignment)
+        assert thawed == prop
+        assert thawed.metadata == {'unit': 'm', 'precision': 2}
+
+    def test_interned_strings(self):
+        """Test that the equal strings of different definitions are stored once."""
+        section = ''.join(['General ', 'information'])
+        props = [
+            PropertyTypeAssignment(
+                version=1,
+                code=code,
+                data_type='VARCHAR',
+                property_label=code.title(),
+                description=f'{code}.',
+                mandatory=False,
+                show_in_edit_views=True,
+                section=section if code == 'ALIAS' else 'General information',
+            )
+            for code in ('ALIAS', 'NAME')
+        ]
+        assert props[0].section is not props[1].section
+        records = [freeze(prop) for prop in props]
+        assert records[0].section is records[1].section
+
+    def test_unsupported(self):
+        """Test that only the definitions can be frozen and thawed."""
+        with pytest.raises(TypeError):
+            freeze(generate_object_type())
+        with pytest.raises(TypeError):
+            thaw(('LENGTH',))
+
+
+class TestFrozenDatamodel:
+    def test_from_registry(self):
+        """Test that the frozen datamodel contains the definitions of the registry."""
+        registry = EntityRegistry.from_datamodel()
+        datamodel = FrozenDatamodel.from_registry(registry)
+        assert datamodel.codes('object_types') == [
+            object_type.defs.code for object_type in registry.object_types
+        ]
+        defs, properties = datamodel.object_type('INSTRUMENT')
+        assert defs.code == 'INSTRUMENT'
+        assert '$NAME' in {prop.code for prop in properties}
+        assert datamodel.vocabulary_type('DOCUMENT_TYPE').defs.code == 'DOCUMENT_TYPE'
+        with pytest.raises(KeyError):
+            datamodel.dataset_type('RAW_DATA')
+        # Same dictionary representation as the registry
+        assert json.loads(json.dumps(datamodel.to_dict())) == registry.to_dict()
+
+    def test_shared_definitions(self):
+        """Test that the property assignments inherited by several object types are frozen once."""
+        registry = EntityRegistry.from_datamodel()
+        datamodel = FrozenDatamodel.from_registry(registry)
+        names = {
+            id(prop)
+            for code in datamodel.codes('object_types')
+            for prop in datamodel.object_type(code).items
+            if prop.code == '$NAME'
+        }
+        models = {
+            id(prop)
+            for _, prop in registry.iter_property_assignments()
+            if prop.code == '$NAME'
+        }
+        assert len(names) == len(models)
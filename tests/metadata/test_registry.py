@@ -0,0 +1,48 @@
+from bam_masterdata.metadata.registry import EntityRegistry
+from tests.conftest import (
+    MockedDataSetType,
+    MockedObjectType,
+    MockedVocabularyType,
+)
+
+
+class TestEntityRegistry:
+    def test_from_datamodel(self):
+        """Test collecting the BAM masterdata entity classes with `from_datamodel`."""
+        registry = EntityRegistry.from_datamodel()
+        object_codes = [object_type.defs.code for object_type in registry.object_types]
+        assert 'INSTRUMENT' in object_codes
+        assert 'INSTRUMENT.WELDING_EQUIPMENT.GMAW_TORCH' in object_codes
+        assert [vocab.defs.code for vocab in registry.vocabulary_types] == [
+            'DOCUMENT_TYPE'
+        ]
+
+    def test_instance(self):
+        """Test that the instances of the entity classes are cached."""
+        registry = EntityRegistry(object_types=[MockedObjectType])
+        assert registry.instance(MockedObjectType) is registry.instance(
+            MockedObjectType
+        )
+        assert registry.get_object_type('MOCKED_OBJECT_TYPE') is registry.instance(
+            MockedObjectType
+        )
+        assert registry.get_object_type('NOT_REGISTERED') is None
+
+    def test_iter_property_assignments(self):
+        """Test iterating over the property type assignments of the registry."""
+        registry = EntityRegistry(object_types=[MockedObjectType])
+        codes = [prop.code for _, prop in registry.iter_property_assignments()]
+        assert codes == ['ALIAS', '$NAME']
+
+    def test_to_dict(self):
+        """Test the dictionary representation of the registry."""
+        registry = EntityRegistry(
+            object_types=[MockedObjectType],
+            vocabulary_types=[MockedVocabularyType],
+            dataset_types=[MockedDataSetType],
+        )
+        data = registry.to_dict()
+        assert list(data['object_types'].keys()) == ['MOCKED_OBJECT_TYPE']
+        assert list(data['vocabulary_types'].keys()) == ['MOCKED_VOCABULARY_TYPE']
+        assert len(data['vocabulary_types']['MOCKED_VOCABULARY_TYPE']['terms']) == 2
+        assert list(data['dataset_types'].keys()) == ['MOCKED_DATASET_TYPE']
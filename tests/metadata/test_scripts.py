@@ -0,0 +1,161 @@
+import pytest
+
+from bam_masterdata.metadata.definitions import ObjectTypeDef, PropertyTypeDef
+from bam_masterdata.metadata.scripts import (
+    ScriptLibrary,
+    calculate_dynamic_property,
+    compile_script,
+    run_script,
+    run_script_parallel,
+    validate_records,
+)
+
+VALIDATION_SCRIPT = """
+def validate(entity, isNew):
+    start = entity.propertyValue('START_DATE')
+    end = entity.propertyValue('END_DATE')
+    if start and end and start > end:
+        return 'The start date must be before the end date'
+    return None
+"""
+
+AREA_SCRIPT = """
+def calculate():
+    width = float(entity.propertyValue('WIDTH'))
+    height = float(entity.propertyValue('HEIGHT'))
+    return round(width * height, 2)
+"""
+
+
+class TestCompileScript:
+    def test_cache(self):
+        """Test that the scripts are compiled once."""
+        compile_script.cache_clear()
+        code, is_expression = compile_script(VALIDATION_SCRIPT)
+        assert not is_expression
+        assert compile_script(VALIDATION_SCRIPT)[0] is code
+        assert compile_script.cache_info().misses == 1
+        assert compile_script("entity.propertyValue('WIDTH')")[1]
+
+    @pytest.mark.parametrize(
+        'source, message',
+        [
+            ('print "Python 2"', 'not valid Python'),
+            ('import os', 'cannot import'),
+            ('().__class__.__bases__', 'cannot access'),
+            ('__import__("os")', 'cannot access'),
+            ("datetime._sys.modules['os']", 'cannot access'),
+            ('(x for x in ()).gi_frame.f_back', 'cannot access'),
+            ("'{0.__class__}'.format(entity)", 'cannot access'),
+            (
+                "match '':\n    case str(format=fmt):\n        fmt('{0.__class__}', entity)",
+                'cannot access the attribute `format`',
+            ),
+            (
+                'match entity:\n    case object(_code=code):\n        code',
+                'cannot access',
+            ),
+        ],
+    )
+    def test_invalid(self, source, message):
+        """Test that the unsupported scripts are rejected."""
+        with pytest.raises(ValueError, match=message):
+            compile_script(source)
+
+
+def test_run_script():
+    """Test running a validation script over a batch of records."""
+    records = [
+        {'START_DATE': '2024-01-01', 'END_DATE': '2024-02-01'},
+        {'START_DATE': '2024-03-01', 'END_DATE': '2024-02-01'},
+        {'START_DATE': '2024-03-01'},
+    ]
+    results = run_script(VALIDATION_SCRIPT, records, 'validate')
+    assert [result.value for result in results] == [
+        None,
+        'The start date must be before the end date',
+        None,
+    ]
+    assert all(result.error is None for result in results)
+
+
+def test_run_script_restricted_namespace():
+    """Test that the scripts only have access to the safe builtins."""
+    results = run_script("open('/etc/passwd')", [{}], 'calculate')
+    assert results[0].error.startswith('NameError')
+    with pytest.raises(ValueError, match='does not define'):
+        run_script('x = 1', [{}], 'validate')
+
+
+def test_run_script_safe_modules():
+    """Test that the scripts only reach the exposed callables of `datetime`, `math` and `re`."""
+    results = run_script(
+        'datetime.date(2024, 1, 2) + datetime.timedelta(days=1)', [{}], 'calculate'
+    )
+    assert str(results[0].value) == '2024-01-03'
+    assert run_script('math.sqrt(16)', [{}], 'calculate')[0].value == 4.0
+    assert (
+        run_script("re.match('[A-Z]+', 'AB1').group()", [{}], 'calculate')[0].value
+        == 'AB'
+    )
+    results = run_script("datetime.sys.modules['os'].getcwd()", [{}], 'calculate')
+    assert results[0].value is None
+    assert results[0].error.startswith('AttributeError')
+    assert run_script('math.os', [{}], 'calculate')[0].error.startswith(
+        'AttributeError'
+    )
+
+
+def test_run_script_parallel():
+    """Test that running in a process pool keeps the order of the records."""
+    records = [{'WIDTH': i, 'HEIGHT': 2} for i in range(50)]
+    records[7]['WIDTH'] = 'wide'
+    results = run_script_parallel(
+        AREA_SCRIPT, records, 'calculate', workers=2, chunk_size=10
+    )
+    assert [result.index for result in results] == list(range(50))
+    assert results[3].value == 6.0
+    assert results[7].error.startswith('ValueError')
+
+
+def test_validate_records():
+    """Test running the validation script of an object type referenced by plugin name."""
+    defs = ObjectTypeDef(
+        version=1,
+        code='EXPERIMENT_STEP',
+        description='Experiment step',
+        validation_script='EXPERIMENT_STEP.date_range_validation',
+    )
+    library = ScriptLibrary(
+        {'EXPERIMENT_STEP.date_range_validation': VALIDATION_SCRIPT}
+    )
+    results = validate_records(
+        defs,
+        [{'START_DATE': '2024-03-01', 'END_DATE': '2024-02-01'}],
+        library=library,
+    )
+    assert results[0].value == 'The start date must be before the end date'
+    with pytest.raises(KeyError):
+        validate_records(defs, [{}])
+
+    defs.validation_script = None
+    assert validate_records(defs, [{}, {}])[1].value is None
+
+
+def test_calculate_dynamic_property(tmp_path):
+    """Test computing a dynamic property with a script loaded from a directory."""
+    (tmp_path / 'AREA.calculation.py').write_text(AREA_SCRIPT)
+    prop = PropertyTypeDef(
+        version=1,
+        code='AREA',
+        description='Area',
+        property_label='Area',
+        data_type='REAL',
+        dynamic_script='AREA.calculation',
+    )
+    results = calculate_dynamic_property(
+        prop,
+        [{'WIDTH': 1.5, 'HEIGHT': 2}],
+        library=ScriptLibrary.from_directory(str(tmp_path)),
+    )
+    assert results[0].value == 3.0
@@ -0,0 +1,77 @@
+import multiprocessing
+
+import pytest
+
+from bam_masterdata.metadata.definitions import DataType
+from bam_masterdata.metadata.frozen import freeze, thaw
+from bam_masterdata.metadata.registry import EntityRegistry
+from bam_masterdata.metadata.shared import (
+    SharedDatamodel,
+    init_worker,
+    worker_datamodel,
+)
+from tests.conftest import MockedDataSetType, MockedObjectType, MockedVocabularyType
+
+
+def count_properties(code: str) -> int:
+    return len(worker_datamodel().object_type(code)[1])
+
+
+@pytest.fixture
+def registry():
+    return EntityRegistry(
+        object_types=[MockedObjectType],
+        vocabulary_types=[MockedVocabularyType],
+        dataset_types=[MockedDataSetType],
+    )
+
+
+class TestSharedDatamodel:
+    def test_create_and_attach(self, registry):
+        """Test attaching to a shared datamodel and rebuilding its definitions."""
+        with SharedDatamodel.create(registry) as shared:
+            attached = SharedDatamodel.attach(shared.name)
+            assert attached.codes('object_types') == ['MOCKED_OBJECT_TYPE']
+            assert (
+                attached.get('object_types', 'MOCKED_OBJECT_TYPE')
+                == (registry.to_dict()['object_types']['MOCKED_OBJECT_TYPE'])
+            )
+            defs, properties = attached.object_type('MOCKED_OBJECT_TYPE')
+            assert defs == freeze(MockedObjectType.defs)
+            assert thaw(defs) == MockedObjectType.defs
+            assert [thaw(prop) for prop in properties] == (
+                registry.instance(MockedObjectType).properties
+            )
+            assert properties[0].data_type == DataType.VARCHAR
+            # The cached definitions are shared by all the callers, so they are read-only
+            with pytest.raises(AttributeError):
+                properties[0].mandatory = True
+            with pytest.raises(AttributeError):
+                defs.code = 'EDITED'
+            # The definitions are rebuilt once
+            assert attached.object_type('MOCKED_OBJECT_TYPE')[0] is defs
+            _, terms = attached.vocabulary_type('MOCKED_VOCABULARY_TYPE')
+            assert [term.code for term in terms] == ['OPTION_A', 'OPTION_B']
+            defs, _ = attached.dataset_type('MOCKED_DATASET_TYPE')
+            assert defs.main_dataset_pattern == '.*\\.csv'
+            with pytest.raises(KeyError):
+                attached.object_type('NOT_SHARED')
+            attached.close()
+        # The owner unlinks the block
+        with pytest.raises(FileNotFoundError):
+            SharedDatamodel.attach(shared.name)
+
+    def test_workers(self, registry):
+        """Test sharing the datamodel with the workers of a pool."""
+        with SharedDatamodel.create(registry) as shared:
+            context = multiprocessing.get_context('fork')
+            with context.Pool(
+                2, initializer=init_worker, initargs=(shared.name,)
+            ) as pool:
+                counts = pool.map(count_properties, ['MOCKED_OBJECT_TYPE'] * 4)
+        assert counts == [2, 2, 2, 2]
+
+    def test_worker_not_initialized(self):
+        """Test that the workers must be initialized with `init_worker`."""
+        with pytest.raises(RuntimeError):
+            worker_datamodel()
@@ -0,0 +1,127 @@
+import pytest
+
+from bam_masterdata.metadata.definitions import ObjectTypeDef, PropertyTypeAssignment
+from bam_masterdata.metadata.registry import EntityRegistry
+from bam_masterdata.metadata.versioning import DefinitionStore
+from tests.conftest import MockedObjectType, MockedVocabularyType
+
+
+class MockedObjectTypeV2(MockedObjectType):
+    defs = ObjectTypeDef(
+        version=2,
+        code='MOCKED_OBJECT_TYPE',
+        description="""
+        Mockup for an object type definition
+        """,
+        generated_code_prefix='MOCKOBJTYPE',
+    )
+
+    comments = PropertyTypeAssignment(
+        version=1,
+        code='COMMENTS',
+        data_type='MULTILINE_VARCHAR',
+        property_label='Comments',
+        description="""
+        Comments
+        """,
+        mandatory=False,
+        show_in_edit_views=True,
+        section='General information',
+    )
+
+
+class MockedObjectTypeModified(MockedObjectTypeV2):
+    defs = ObjectTypeDef(
+        version=2,
+        code='MOCKED_OBJECT_TYPE',
+        description="""
+        Modified without increasing the version
+        """,
+        generated_code_prefix='MOCKOBJTYPE',
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    with DefinitionStore(str(tmp_path / 'definitions.sqlite')) as store:
+        store.record_release(
+            EntityRegistry(
+                object_types=[MockedObjectType],
+                vocabulary_types=[MockedVocabularyType],
+            ),
+            name='1.0.0',
+            released_at=100.0,
+        )
+        store.record_release(
+            EntityRegistry(
+                object_types=[MockedObjectTypeV2],
+                vocabulary_types=[MockedVocabularyType],
+            ),
+            name='1.1.0',
+            released_at=200.0,
+        )
+        yield store
+
+
+class TestDefinitionStore:
+    def test_record_release(self, store):
+        """Test that only the new definition versions are stored for each release."""
+        assert [release.name for release in store.releases()] == ['1.0.0', '1.1.0']
+        release = store.record_release(
+            EntityRegistry(
+                object_types=[MockedObjectTypeV2],
+                vocabulary_types=[MockedVocabularyType],
+            ),
+            name='1.1.1',
+            released_at=300.0,
+        )
+        assert release.n_new_definitions == 0
+        history = store.history('MOCKED_OBJECT_TYPE')
+        assert [(v.version, v.released_at) for v in history] == [(1, 100.0), (2, 200.0)]
+
+    def test_record_release_invalid(self, store):
+        """Test that released versions and the order of the releases are immutable."""
+        registry = EntityRegistry(object_types=[MockedObjectTypeModified])
+        with pytest.raises(ValueError, match='without increasing its version'):
+            store.record_release(registry, name='1.1.1', released_at=300.0)
+        # The failed release is rolled back
+        assert [release.name for release in store.releases()] == ['1.0.0', '1.1.0']
+        with pytest.raises(ValueError, match='earlier'):
+            store.record_release(registry, name='0.9.0', released_at=50.0)
+        with pytest.raises(ValueError, match='already recorded'):
+            store.record_release(registry, name='1.1.0', released_at=300.0)
+
+    def test_as_of(self, store):
+        """Test rebuilding the datamodel of a release by name and by point in time."""
+        old = store.as_of(release='1.0.0')
+        assert old['object_types']['MOCKED_OBJECT_TYPE']['defs']['version'] == 1
+        assert 'MOCKED_VOCABULARY_TYPE' in old['vocabulary_types']
+        assert store.as_of(timestamp=150.0) == old
+        assert (
+            store.as_of(timestamp=250.0)['object_types']['MOCKED_OBJECT_TYPE']['defs'][
+                'version'
+            ]
+            == 2
+        )
+        with pytest.raises(KeyError):
+            store.as_of(timestamp=50.0)
+        with pytest.raises(ValueError):
+            store.as_of()
+
+    def test_load_object_type(self, store):
+        """Test loading the definitions of an object type in force at a given time."""
+        defs, properties = store.load_object_type('MOCKED_OBJECT_TYPE', timestamp=150.0)
+        assert defs.version == 1
+        assert [prop.code for prop in properties] == ['ALIAS', '$NAME']
+        defs, properties = store.load_object_type('MOCKED_OBJECT_TYPE', release='1.1.0')
+        assert defs.version == 2
+        assert [prop.code for prop in properties] == ['ALIAS', 'COMMENTS', '$NAME']
+        defs, terms = store.load_vocabulary_type(
+            'MOCKED_VOCABULARY_TYPE', release='1.0.0'
+        )
+        assert [term.code for term in terms] == ['OPTION_A', 'OPTION_B']
+
+    def test_released_between(self, store):
+        """Test listing the definition versions released in a time interval."""
+        versions = store.released_between(150.0, 250.0)
+        assert [(v.code, v.version) for v in versions] == [('MOCKED_OBJECT_TYPE', 2)]
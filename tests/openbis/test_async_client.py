@@ -0,0 +1,96 @@
+import asyncio
+import time
+
+import pytest
+
+from bam_masterdata.openbis.async_client import AsyncOpenbis
+from bam_masterdata.openbis.fake import FakeOpenbis
+from tests.conftest import generate_lineage
+
+IDENTIFIERS = [f'/S/P/OBJ_{level}_{i}' for level in range(4) for i in range(4)]
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+@pytest.fixture
+def openbis():
+    return generate_lineage(depth=4, width=4, openbis=FakeOpenbis(latency=0.05))
+
+
+class TestAsyncOpenbis:
+    def test_proxy(self, openbis):
+        """Test that the pyBIS methods are exposed as coroutines."""
+
+        async def main():
+            async with AsyncOpenbis(openbis) as client:
+                return await client.get_object('/S/P/OBJ_0_0')
+
+        assert run(main()).identifier == '/S/P/OBJ_0_0'
+        assert openbis.server.stats.round_trips == 1
+
+    def test_get_objects_many(self, openbis):
+        """Test that the throughput scales with the concurrency, bounded by `max_concurrency`."""
+
+        async def fetch(max_concurrency):
+            async with AsyncOpenbis(openbis, max_concurrency=max_concurrency) as client:
+                start = time.perf_counter()
+                objects = await client.get_objects_many(IDENTIFIERS)
+                return objects, time.perf_counter() - start
+
+        objects, sequential = run(fetch(1))
+        assert [obj.identifier for obj in objects] == IDENTIFIERS
+        assert openbis.server.max_in_flight == 1
+        objects, concurrent = run(fetch(8))
+        assert openbis.server.max_in_flight == 8
+        assert concurrent < sequential / 3
+
+    def test_exceptions(self, openbis):
+        """Test the failed calls of the bulk helpers."""
+
+        async def main(return_exceptions):
+            async with AsyncOpenbis(openbis) as client:
+                return await client.get_objects_many(
+                    ['/S/P/OBJ_0_0', '/S/P/MISSING'],
+                    return_exceptions=return_exceptions,
+                )
+
+        objects = run(main(True))
+        assert objects[0].identifier == '/S/P/OBJ_0_0'
+        assert isinstance(objects[1], ValueError)
+        with pytest.raises(ValueError, match='no such object'):
+            run(main(False))
+
+    def test_timeout(self, openbis):
+        """Test that a call exceeding its timeout is cancelled."""
+
+        async def main():
+            async with AsyncOpenbis(openbis, max_concurrency=1) as client:
+                with pytest.raises(asyncio.TimeoutError):
+                    await client.get_objects_many(IDENTIFIERS[:3], timeout=0.08)
+                # The slots of the semaphore are released after the timeout
+                return await client.get_object('/S/P/OBJ_0_0', timeout=1)
+
+        assert run(main()).identifier == '/S/P/OBJ_0_0'
+        # The calls still waiting for a slot are not sent
+        assert openbis.server.stats.round_trips < len(IDENTIFIERS[:3]) + 1
+
+    def test_cancellation(self, openbis):
+        """Test that cancelling a task does not send its pending calls."""
+
+        async def main():
+            async with AsyncOpenbis(openbis, max_concurrency=2) as client:
+                task = asyncio.ensure_future(client.get_objects_many(IDENTIFIERS))
+                await asyncio.sleep(0.01)
+                task.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await task
+
+        run(main())
+        assert openbis.server.stats.round_trips == 2
+
+    def test_invalid_concurrency(self, openbis):
+        """Test that the concurrency must be positive."""
+        with pytest.raises(ValueError):
+            AsyncOpenbis(openbis, max_concurrency=0)
@@ -0,0 +1,175 @@
+import time
+
+import pytest
+
+from bam_masterdata.metadata.registry import EntityRegistry
+from bam_masterdata.openbis.fake import FakeOpenbis, FakeOpenbisServer
+
+
+@pytest.fixture
+def openbis():
+    server = FakeOpenbisServer()
+    server.load_datamodel(EntityRegistry.from_datamodel())
+    openbis = server.client()
+    openbis.new_space(code='LAB').save()
+    openbis.new_project(space='LAB', code='PROJECT').save()
+    server.create('collection_type', {'code': 'DEFAULT_EXPERIMENT'})
+    server.create('dataset_type', {'code': 'RAW_DATA'})
+    openbis.new_collection(
+        type='DEFAULT_EXPERIMENT', code='COLLECTION', project='/LAB/PROJECT'
+    ).save()
+    server.stats.reset()
+    return openbis
+
+
+class TestFakeOpenbis:
+    def test_masterdata(self, openbis):
+        """Test listing the masterdata loaded from the datamodel."""
+        object_types = openbis.get_object_types()
+        assert 'INSTRUMENT' in [object_type.code for object_type in object_types]
+        assert 'code' in object_types.df.columns
+        vocabulary = openbis.get_vocabulary('document_type')
+        assert 'DATASHEET' in [term['code'] for term in vocabulary.terms]
+        assert openbis.server.stats.round_trips == 2
+
+    def test_new_masterdata(self, openbis):
+        """Test creating masterdata with property assignments."""
+        openbis.new_property_type(
+            code='WEIGHT', label='Weight', description='', dataType='REAL'
+        ).save()
+        object_type = openbis.new_object_type(
+            code='SCALE', generatedCodePrefix='SCA', autoGeneratedCode=True
+        )
+        object_type.assign_property('WEIGHT', mandatory=True)
+        object_type.save()
+        obj = openbis.new_object(type='SCALE', space='LAB', props={'weight': 1.5})
+        obj.save()
+        assert obj.identifier == '/LAB/SCA1'
+        assert openbis.get_object('/LAB/SCA1').props == {'WEIGHT': 1.5}
+        with pytest.raises(ValueError, match='mandatory'):
+            openbis.new_object(type='SCALE', space='LAB').save()
+        with pytest.raises(ValueError, match='not assigned'):
+            openbis.new_object(type='SCALE', space='LAB', props={'foo': 1}).save()
+
+    def test_objects_and_datasets(self, openbis):
+        """Test creating, searching and deleting objects and data sets."""
+        for i in range(5):
+            openbis.new_object(
+                type='INSTRUMENT',
+                project='/LAB/PROJECT',
+                code=f'INS_{"ABCDE"[i]}',
+                props={'$name': f'Instrument {i % 2}'},
+            ).save()
+        child = openbis.new_object(
+            type='INSTRUMENT',
+            collection='/LAB/PROJECT/COLLECTION',
+            code='CHILD',
+            props={'$name': 'Child'},
+            parents=['/LAB/PROJECT/INS_A'],
+        )
+        child.save()
+        assert child.experiment == '/LAB/PROJECT/COLLECTION'
+        assert openbis.get_object('/LAB/PROJECT/INS_A').children == [
+            '/LAB/PROJECT/CHILD'
+        ]
+        found = openbis.get_objects(
+            type='INSTRUMENT', where={'$name': 'Instrument 0'}, count=2
+        )
+        assert [obj.code for obj in found] == ['INS_A', 'INS_C']
+        assert found.totalCount == 3
+        dataset = openbis.new_dataset(type='RAW_DATA', sample=child, files=['a.csv'])
+        dataset.save()
+        assert openbis.get_dataset(dataset.permId).files == ['a.csv']
+        assert len(openbis.get_datasets(sample='/LAB/PROJECT/CHILD')) == 1
+        assert openbis.get_projects(space='LAB')[0].identifier == '/LAB/PROJECT'
+        child.delete()
+        assert openbis.get_object('/LAB/PROJECT/INS_A').children == []
+        with pytest.raises(ValueError, match='no such object'):
+            openbis.get_object('/LAB/PROJECT/CHILD')
+
+    def test_transaction(self, openbis):
+        """Test that the transactions are committed atomically in one request."""
+        parent = openbis.new_object(
+            type='INSTRUMENT',
+            project='/LAB/PROJECT',
+            code='PARENT',
+            props={'$name': 'Parent'},
+        )
+        child = openbis.new_object(
+            type='INSTRUMENT',
+            project='/LAB/PROJECT',
+            code='CHILD',
+            props={'$name': 'Child'},
+            parents=['/LAB/PROJECT/PARENT'],
+        )
+        openbis.new_transaction(parent, child).commit()
+        assert openbis.server.stats.calls['commit'] == 1
+        assert len(openbis.get_objects()) == 2
+        other = openbis.new_object(
+            type='INSTRUMENT',
+            project='/LAB/PROJECT',
+            code='OTHER',
+            props={'$name': 'Other'},
+        )
+        transaction = openbis.new_transaction(other)
+        transaction.add(
+            openbis.new_object(
+                type='INSTRUMENT',
+                project='/LAB/PROJECT',
+                code='CHILD',
+                props={'$name': 'Duplicate'},
+            )
+        )
+        with pytest.raises(ValueError, match='already exists'):
+            transaction.commit()
+        assert len(openbis.get_objects()) == 2
+
+    def test_container_lookups(self, openbis):
+        """Test that the containers given by code are fetched like in pyBIS, and the objects are not."""
+        openbis.new_project(space='LAB', code='OTHER')
+        openbis.new_collection(
+            type='DEFAULT_EXPERIMENT', code='OTHER', project='/LAB/PROJECT'
+        )
+        assert openbis.server.stats.calls['get_space'] == 1
+        assert openbis.server.stats.calls['get_project'] == 1
+        with pytest.raises(ValueError, match='no such space'):
+            openbis.new_project(space='MISSING', code='OTHER')
+        openbis.server.stats.reset()
+        space = openbis.new_space(code='NEW')
+        project = openbis.new_project(space=space, code='OTHER')
+        assert project.space == 'NEW'
+        assert openbis.server.stats.round_trips == 0
+
+    def test_latency_and_failures(self):
+        """Test the injection of latency and failures, and the counters."""
+        openbis = FakeOpenbis(latency={'default': 0.0, 'get_spaces': 0.05})
+        start = time.perf_counter()
+        openbis.get_spaces()
+        assert time.perf_counter() - start >= 0.05
+        openbis.server.fail('get_spaces', times=2)
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                openbis.get_spaces()
+        openbis.get_spaces()
+        stats = openbis.server.stats.as_dict()
+        assert stats['round_trips'] == 4
+        assert stats['failures'] == 2
+        assert stats['request_bytes'] > 0
+        assert stats['response_bytes'] > 0
+        unreliable = FakeOpenbis(failure_rate=1.0)
+        with pytest.raises(ConnectionError):
+            unreliable.get_spaces()
+
+    def test_authentication(self):
+        """Test that the requests need a valid session when the server has users."""
+        server = FakeOpenbisServer(users={'user': 'secret'})
+        openbis = server.client()
+        with pytest.raises(ValueError, match='Session'):
+            openbis.get_spaces()
+        token = openbis.login('user', 'secret')
+        assert openbis.get_spaces() == []
+        other = server.client()
+        other.set_token(token)
+        assert other.is_session_active()
+        server.expire_sessions()
+        assert not other.is_session_active()
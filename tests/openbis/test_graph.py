@@ -0,0 +1,69 @@
+import pytest
+
+from bam_masterdata.openbis.graph import ObjectGraph, PybisGraphBackend
+from tests.conftest import generate_lineage
+
+
+@pytest.fixture
+def openbis():
+    return generate_lineage(depth=30, width=20)
+
+
+class TestObjectGraph:
+    def test_descendants(self, openbis):
+        """Test that the descendants are fetched with one request per generation."""
+        graph = ObjectGraph(PybisGraphBackend(openbis))
+        descendants = graph.descendants('/S/P/OBJ_0_0')
+        assert descendants[:2] == ['/S/P/OBJ_1_0', '/S/P/OBJ_1_1']
+        assert '/S/P/OBJ_29_19' in descendants
+        assert graph.round_trips == openbis.server.stats.round_trips == 30
+        # The queries over fetched objects are answered locally
+        graph.descendants('/S/P/OBJ_1_0')
+        assert openbis.server.stats.round_trips == 30
+
+    def test_ancestors(self, openbis):
+        """Test the ancestors of an object."""
+        graph = ObjectGraph(PybisGraphBackend(openbis), batch_size=5)
+        ancestors = graph.ancestors('/S/P/OBJ_3_0', max_depth=2)
+        assert ancestors == [
+            '/S/P/OBJ_2_0',
+            '/S/P/OBJ_2_19',
+            '/S/P/OBJ_1_0',
+            '/S/P/OBJ_1_19',
+            '/S/P/OBJ_1_18',
+        ]
+        assert len(graph.ancestors('/S/P/OBJ_3_0')) == 2 + 3 + 4
+        assert graph.ancestors('/S/P/OBJ_0_0') == []
+        assert graph.ancestors('/S/P/MISSING') == []
+
+    def test_path(self, openbis):
+        """Test the shortest lineage between two objects."""
+        graph = ObjectGraph(PybisGraphBackend(openbis))
+        assert graph.path('/S/P/OBJ_0_0', '/S/P/OBJ_2_2') == [
+            '/S/P/OBJ_0_0',
+            '/S/P/OBJ_1_1',
+            '/S/P/OBJ_2_2',
+        ]
+        assert graph.path('/S/P/OBJ_2_2', '/S/P/OBJ_0_0') == [
+            '/S/P/OBJ_2_2',
+            '/S/P/OBJ_1_1',
+            '/S/P/OBJ_0_0',
+        ]
+        assert graph.path('/S/P/OBJ_1_0', '/S/P/OBJ_1_1') is None
+
+    def test_cache(self, openbis, tmp_path):
+        """Test persisting the graph in the cache."""
+        cache_path = str(tmp_path / 'graph.json')
+        graph = ObjectGraph(PybisGraphBackend(openbis), cache_path=cache_path)
+        descendants = graph.descendants('/S/P/OBJ_20_0')
+        graph.save()
+        calls = openbis.server.stats.round_trips
+        cached = ObjectGraph(PybisGraphBackend(openbis), cache_path=cache_path)
+        assert cached.descendants('/S/P/OBJ_20_0') == descendants
+        assert openbis.server.stats.round_trips == calls
+        assert cached.round_trips == 0
+
+    def test_invalid_direction(self, openbis):
+        """Test that the direction of the walk is validated."""
+        with pytest.raises(ValueError):
+            ObjectGraph(PybisGraphBackend(openbis)).fetch(['/S/P/OBJ_0_0'], 'siblings')
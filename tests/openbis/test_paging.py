@@ -0,0 +1,220 @@
+import datetime
+import time
+
+import pytest
+
+from bam_masterdata.datamodel.object_types import Instrument
+from bam_masterdata.metadata.definitions import ObjectTypeDef, PropertyTypeAssignment
+from bam_masterdata.metadata.entities import ObjectType
+from bam_masterdata.metadata.registry import EntityRegistry
+from bam_masterdata.openbis.fake import FakeOpenbis
+from bam_masterdata.openbis.paging import iter_objects, iter_pages, property_mapping
+
+
+class Measurement(ObjectType):
+    defs = ObjectTypeDef(
+        version=1,
+        code='MEASUREMENT',
+        description='Measurement of a specimen.',
+        generated_code_prefix='MEAS',
+    )
+
+    count = PropertyTypeAssignment(
+        version=1,
+        code='COUNT',
+        data_type='INTEGER',
+        property_label='Count',
+        description='Number of specimens.',
+        mandatory=False,
+        show_in_edit_views=True,
+        section='General information',
+    )
+
+    measured_on = PropertyTypeAssignment(
+        version=1,
+        code='MEASURED_ON',
+        data_type='DATE',
+        property_label='Measured on',
+        description='Date of the measurement.',
+        mandatory=False,
+        show_in_edit_views=True,
+        section='General information',
+    )
+
+
+@pytest.fixture
+def openbis():
+    openbis = FakeOpenbis(latency={'get_objects': 0.01})
+    server = openbis.server
+    server.load_datamodel(EntityRegistry([Instrument, Measurement], [], []))
+    server.create('space', {'code': 'LAB'})
+    for i in range(250):
+        server.create(
+            'object',
+            {
+                'type': 'INSTRUMENT',
+                'space': 'LAB',
+                'code': f'INS_{i:03d}',
+                'props': {'$NAME': f'Instrument {i}'},
+            },
+        )
+    for i in range(5):
+        server.create(
+            'object',
+            {
+                'type': 'MEASUREMENT',
+                'space': 'LAB',
+                'code': f'MEAS_{"ABCDE"[i]}',
+                'props': {'COUNT': str(i), 'MEASURED_ON': f'2024-02-0{i + 1}'},
+            },
+        )
+    server.stats.reset()
+    return openbis
+
+
+class TestIterPages:
+    @pytest.mark.parametrize('prefetch', [True, False])
+    def test_pages(self, openbis, prefetch):
+        """Test paging through a listing with and without prefetching."""
+        pages = list(
+            iter_pages(
+                lambda start, count: openbis.get_objects(
+                    type='INSTRUMENT', start_with=start, count=count
+                ),
+                page_size=100,
+                prefetch=prefetch,
+            )
+        )
+        assert [len(page) for page in pages] == [100, 100, 50]
+        assert openbis.server.stats.round_trips == 3
+
+    def test_prefetch_overlaps(self):
+        """Test that the next page is fetched while the current one is processed."""
+        fetched = []
+
+        def fetch(start, count):
+            time.sleep(0.05)
+            fetched.append(start)
+            return list(range(start, min(start + count, 500)))
+
+        def consume(prefetch):
+            start = time.perf_counter()
+            for i, page in enumerate(
+                iter_pages(fetch, page_size=100, prefetch=prefetch)
+            ):
+                # At most the next page is fetched ahead
+                assert len(fetched) <= i + 2
+                time.sleep(0.05)
+            return time.perf_counter() - start
+
+        sequential = consume(False)
+        fetched.clear()
+        assert consume(True) < sequential * 0.8
+
+    def test_early_stop(self):
+        """Test that closing the iterator stops the prefetching."""
+        fetched = []
+
+        def fetch(start, count):
+            fetched.append(start)
+            return list(range(count))
+
+        pages = iter_pages(fetch, page_size=10)
+        next(pages)
+        pages.close()
+        # Only the page being prefetched when the iterator is closed may have been fetched
+        assert fetched in ([0], [0, 10])
+
+    def test_invalid_page_size(self):
+        """Test that the page size must be positive."""
+        with pytest.raises(ValueError):
+            list(iter_pages(lambda start, count: [], page_size=0))
+
+
+class TestIterObjects:
+    def test_typed_records(self, openbis):
+        """Test that the properties are mapped through the object type."""
+        records = list(iter_objects(openbis, Measurement(), page_size=2))
+        assert [record.code for record in records] == [
+            'MEAS_A',
+            'MEAS_B',
+            'MEAS_C',
+            'MEAS_D',
+            'MEAS_E',
+        ]
+        assert records[1].properties == {
+            'count': 1,
+            'measured_on': datetime.date(2024, 2, 2),
+        }
+        assert records[1].identifier == '/LAB/MEAS_B'
+        assert openbis.server.stats.round_trips == 3
+
+    def test_registry(self, openbis):
+        """Test mapping the objects of any type through a registry."""
+        registry = EntityRegistry([Instrument, Measurement], [], [])
+        records = list(iter_objects(openbis, registry=registry, page_size=100))
+        assert len(records) == 255
+        assert records[0].properties == {'name': 'Instrument 0'}
+        assert records[-1].properties['count'] == 4
+        unmapped = next(iter_objects(openbis, type='MEASUREMENT'))
+        assert unmapped.properties == {'count': '0', 'measured_on': '2024-02-01'}
+
+    def test_filters(self, openbis):
+        """Test passing the search filters to pyBIS."""
+        records = list(
+            iter_objects(openbis, Instrument(), where={'$NAME': 'Instrument 7'})
+        )
+        assert [record.properties['name'] for record in records] == ['Instrument 7']
+
+
+def test_property_mapping():
+    """Test the attribute names of the property codes."""
+    mapping = property_mapping(Instrument())
+    assert mapping.fields == {'$NAME': 'name', 'ALIAS': 'alias'}
+
+
+@pytest.mark.parametrize(
+    'value, expected',
+    [
+        ('2024-02-01 10:00:00 +0100', datetime.datetime(2024, 2, 1, 9)),
+        ('2024-02-01 10:00:00 -0230', datetime.datetime(2024, 2, 1, 12, 30)),
+        ('2024-02-01T10:00:00+01:00', datetime.datetime(2024, 2, 1, 9)),
+        ('2024-02-01T10:00:00.500Z', datetime.datetime(2024, 2, 1, 10, 0, 0, 500000)),
+        ('2024-02-01 10:00:00', datetime.datetime(2024, 2, 1, 10)),
+        ('2024-02-01 10:00:00.5 +0100', datetime.datetime(2024, 2, 1, 9, 0, 0, 500000)),
+        ('2024-02-01T10:00:00.12345Z', datetime.datetime(2024, 2, 1, 10, 0, 0, 123450)),
+        (
+            '2024-02-01T10:00:00.123456789',
+            datetime.datetime(2024, 2, 1, 10, 0, 0, 123456),
+        ),
+        ('2024-02-01 10:00', datetime.datetime(2024, 2, 1, 10)),
+        (
+            datetime.datetime(
+                2024, 2, 1, 10, tzinfo=datetime.timezone(datetime.timedelta(hours=2))
+            ),
+            datetime.datetime(2024, 2, 1, 8),
+        ),
+    ],
+)
+def test_timestamp_converter(value, expected):
+    """Test that the timestamps are converted into naive datetimes in UTC."""
+
+    class Event(ObjectType):
+        defs = ObjectTypeDef(version=1, code='EVENT', description='Event.')
+
+        started_at = PropertyTypeAssignment(
+            version=1,
+            code='STARTED_AT',
+            data_type='TIMESTAMP',
+            property_label='Started at',
+            description='Start of the event.',
+            mandatory=False,
+            show_in_edit_views=True,
+            section='General information',
+        )
+
+    converter = property_mapping(Event()).converters['STARTED_AT']
+    assert converter(value) == expected
+    for invalid in ('yesterday', '2024-02-01 10:00.5'):
+        with pytest.raises(ValueError, match='Invalid timestamp'):
+            converter(invalid)
@@ -0,0 +1,132 @@
+import json
+
+import pytest
+import yaml
+
+from bam_masterdata.openbis.fake import FakeOpenbis
+from bam_masterdata.openbis.provisioning import (
+    ProvisioningSpec,
+    load_spec,
+    plan,
+    provision,
+)
+
+
+def department_spec(n_spaces=3, n_projects=5, n_collections=10) -> dict:
+    return {
+        'spaces': [
+            {
+                'code': f'SPACE_{s}',
+                'description': f'Space {s}',
+                'projects': [
+                    {
+                        'code': f'PROJECT_{p}',
+                        'collections': [
+                            {'code': f'collection_{c}', 'type': 'default_experiment'}
+                            for c in range(n_collections)
+                        ],
+                    }
+                    for p in range(n_projects)
+                ],
+            }
+            for s in range(n_spaces)
+        ]
+    }
+
+
+@pytest.fixture
+def openbis():
+    openbis = FakeOpenbis()
+    openbis.server.create('collection_type', {'code': 'DEFAULT_EXPERIMENT'})
+    return openbis
+
+
+class TestProvisioning:
+    def test_provision(self, openbis):
+        """Test that hundreds of containers are created with a few round trips."""
+        spec = ProvisioningSpec.model_validate(department_spec())
+        report = provision(openbis, spec, batch_size=100)
+        assert len(report.plan.spaces) == 3
+        assert len(report.plan.projects) == 15
+        assert len(report.plan.collections) == 150
+        assert report.plan.collections[0] == '/SPACE_0/PROJECT_0/COLLECTION_0'
+        # One listing of spaces and collection types, and transactions of 3, 15 and 150 (100 + 50)
+        assert openbis.server.stats.round_trips == 6
+        assert report.transactions == 4
+        assert len(openbis.get_collections(project='/SPACE_2/PROJECT_4')) == 10
+
+    def test_incremental(self, openbis):
+        """Test that only the missing containers are created when provisioning again."""
+        provision(openbis, ProvisioningSpec.model_validate(department_spec(1, 2, 2)))
+        openbis.server.stats.reset()
+        spec = ProvisioningSpec.model_validate(department_spec(2, 2, 3))
+        result = plan(openbis, spec)
+        assert result.spaces == ['SPACE_1']
+        assert result.projects == ['/SPACE_1/PROJECT_0', '/SPACE_1/PROJECT_1']
+        assert len(result.collections) == 2 + 6
+        assert result.existing == 1 + 2 + 4
+        # One listing per level
+        assert openbis.server.stats.round_trips == 3
+        report = provision(openbis, spec)
+        assert report.plan == result
+        assert len(openbis.get_collections()) == 12
+        # Nothing is created when everything exists
+        openbis.server.stats.reset()
+        report = provision(openbis, spec)
+        assert report.plan.is_empty
+        assert report.transactions == 0
+        assert openbis.server.stats.calls['commit'] == 0
+
+    def test_no_container_lookups(self, openbis):
+        """Test that the new projects and collections reference their containers without fetching them."""
+        openbis.new_space(code='SPACE_0').save()
+        openbis.server.stats.reset()
+        report = provision(
+            openbis, ProvisioningSpec.model_validate(department_spec(2, 2, 2))
+        )
+        assert report.plan.spaces == ['SPACE_1']
+        assert openbis.server.stats.calls['get_space'] == 0
+        assert openbis.server.stats.calls['get_project'] == 0
+        # Listings of spaces, projects and collection types, and one transaction per level
+        assert openbis.server.stats.round_trips == 6
+        assert len(openbis.get_collections(project='/SPACE_1/PROJECT_1')) == 2
+
+    def test_dry_run(self, openbis):
+        """Test that the dry run does not create anything."""
+        report = provision(
+            openbis, ProvisioningSpec.model_validate(department_spec()), dry_run=True
+        )
+        assert report.dry_run
+        assert len(report.plan.collections) == 150
+        assert openbis.get_spaces() == []
+
+    def test_unknown_collection_type(self, openbis):
+        """Test that the unknown collection types are rejected before creating anything."""
+        spec = department_spec(1, 1, 1)
+        spec['spaces'][0]['projects'][0]['collections'][0]['type'] = 'MISSING'
+        with pytest.raises(ValueError, match='MISSING'):
+            provision(openbis, ProvisioningSpec.model_validate(spec))
+        assert openbis.server.stats.calls['commit'] == 0
+
+    def test_failed_transaction(self, openbis):
+        """Test that a failed transaction does not create its containers."""
+        openbis.server.fail('commit')
+        with pytest.raises(ConnectionError):
+            provision(
+                openbis, ProvisioningSpec.model_validate(department_spec(1, 1, 1))
+            )
+        assert openbis.get_spaces() == []
+
+    @pytest.mark.parametrize('extension', ['yaml', 'json'])
+    def test_load_spec(self, tmp_path, extension):
+        """Test loading the specification from YAML and JSON."""
+        path = tmp_path / f'department.{extension}'
+        dump = yaml.safe_dump if extension == 'yaml' else json.dumps
+        path.write_text(dump(department_spec(1, 1, 1)), encoding='utf-8')
+        spec = load_spec(str(path))
+        assert spec.spaces[0].projects[0].collections[0].type == 'DEFAULT_EXPERIMENT'
+
+    def test_invalid_code(self):
+        """Test that the codes are validated."""
+        with pytest.raises(ValueError):
+            ProvisioningSpec.model_validate({'spaces': [{'code': 'NOT VALID'}]})
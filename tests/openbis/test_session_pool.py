@@ -0,0 +1,120 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from bam_masterdata.openbis.fake import FakeOpenbisServer
+from bam_masterdata.openbis.session_pool import SessionPool
+
+
+@pytest.fixture
+def server():
+    return FakeOpenbisServer(users={'user': 'secret'})
+
+
+def new_pool(server, **kwargs):
+    return SessionPool(
+        'https://openbis.test/', 'user', 'secret', factory=server.client, **kwargs
+    )
+
+
+class TestSessionPool:
+    def test_token_reuse(self, server):
+        """Test that the clients of the pool share the token of a single login."""
+        pool = new_pool(server, max_size=4)
+        barrier = threading.Barrier(4)
+
+        def job(_):
+            with pool.session() as client:
+                barrier.wait(timeout=5)
+                return client.token
+
+        with ThreadPoolExecutor(8) as executor:
+            tokens = list(executor.map(job, range(40)))
+        assert set(tokens) == {'user-1'}
+        assert server.stats.calls['login'] == 1
+        assert pool.stats.created == 4
+        assert pool.stats.token_reuses == 3
+        assert pool.stats.acquired == 40
+        assert pool.stats.reuses == 36
+
+    def test_max_size(self, server):
+        """Test that the pool does not hand out more than `max_size` clients."""
+        pool = new_pool(server, max_size=1)
+        client = pool.acquire()
+        with pytest.raises(TimeoutError):
+            pool.acquire(timeout=0.01)
+        pool.release(client)
+        assert pool.acquire(timeout=0.01) is client
+
+    def test_refresh(self, server):
+        """Test that the expired sessions are refreshed with a single login."""
+        pool = new_pool(server, max_size=2, check_interval=0)
+        clients = [pool.acquire(), pool.acquire()]
+        for client in clients:
+            pool.release(client)
+        server.expire_sessions()
+        clients = [pool.acquire(), pool.acquire()]
+        assert {client.token for client in clients} == {'user-2'}
+        assert server.stats.calls['login'] == 2
+        assert pool.stats.refreshes == 2
+        assert pool.stats.health_checks == 2
+
+    def test_check_interval(self, server):
+        """Test that the sessions are not checked more often than `check_interval`."""
+        pool = new_pool(server, check_interval=60)
+        for _ in range(5):
+            with pool.session():
+                pass
+        assert pool.stats.health_checks == 0
+        assert server.stats.calls['set_token'] == 0
+        assert server.stats.calls['is_session_active'] == 0
+
+    def test_token_file(self, server, tmp_path):
+        """Test that the token cached in a file is reused by other pools."""
+        token_path = str(tmp_path / 'token.json')
+        with new_pool(server, token_path=token_path) as pool, pool.session():
+            pass
+        with open(token_path, encoding='utf-8') as f:
+            assert json.load(f)['token'] == 'user-1'
+        assert os.stat(token_path).st_mode & 0o777 == 0o600
+        other = new_pool(server, token_path=token_path)
+        with other.session() as client:
+            assert client.token == 'user-1'
+        assert server.stats.calls['login'] == 1
+        assert other.stats.token_reuses == 1
+        # Tokens older than `token_ttl` are not reused
+        expiring = new_pool(server, token_path=token_path, token_ttl=-1)
+        with expiring.session() as client:
+            assert client.token == 'user-2'
+
+    def test_failed_login(self, server):
+        """Test that a failed login does not take a slot of the pool."""
+        pool = SessionPool(
+            'https://openbis.test/', 'user', 'wrong', factory=server.client
+        )
+        pool.max_size = 1
+        with pytest.raises(ValueError, match='login to openBIS failed'):
+            pool.acquire()
+        assert pool.stats.discarded == 1
+        pool._password = 'secret'
+        assert pool.acquire(timeout=0.01).token == 'user-1'
+
+    def test_discard(self, server):
+        """Test that the clients are discarded after a connection error."""
+        pool = new_pool(server, max_size=1)
+        with pytest.raises(ConnectionError), pool.session():
+            raise ConnectionError
+        assert pool.stats.discarded == 1
+        with pool.session():
+            pass
+        assert pool.stats.created == 2
+
+    def test_close(self, server):
+        """Test that a closed pool does not hand out clients."""
+        pool = new_pool(server)
+        pool.close()
+        with pytest.raises(RuntimeError):
+            pool.acquire()
@@ -0,0 +1,113 @@
+import os
+
+import pytest
+
+from bam_masterdata.metadata.registry import EntityRegistry
+from bam_masterdata.search.inverted_index import (
+    InvertedIndex,
+    collect_documents,
+    split_description,
+    tokenize,
+)
+
+
+@pytest.mark.parametrize(
+    'text, result',
+    [
+        ('WELDING.TORCH_TYPE', ['welding', 'torch', 'type']),
+        ('$NAME', ['name']),
+        (
+            'Schweißbrenner für MSG-Schweißen',
+            ['schweissbrenner', 'für', 'msg', 'schweissen'],
+        ),
+        (None, []),
+    ],
+)
+def test_tokenize(text, result):
+    """Test the tokenization and case-folding of `tokenize`."""
+    assert tokenize(text) == result
+
+
+@pytest.mark.parametrize(
+    'description, result',
+    [
+        (
+            'Chemical Substance//Chemische Substanz',
+            ('Chemical Substance', 'Chemische Substanz'),
+        ),
+        ('Name', ('Name', '')),
+        ('a//b//c', ('a', 'b')),
+    ],
+)
+def test_split_description(description, result):
+    """Test splitting the bilingual descriptions."""
+    assert split_description(description) == result
+
+
+def generate_index():
+    return InvertedIndex.from_registry(EntityRegistry.from_datamodel())
+
+
+def test_collect_documents():
+    """Test that the property types assigned to several object types are indexed once."""
+    documents = collect_documents(EntityRegistry.from_datamodel())
+    name = [doc for doc in documents if doc.code == '$NAME']
+    assert len(name) == 1
+    assert set(name[0].parents) == {
+        'INSTRUMENT',
+        'INSTRUMENT.WELDING_EQUIPMENT',
+        'INSTRUMENT.WELDING_EQUIPMENT.GMAW_TORCH',
+    }
+
+
+class TestInvertedIndex:
+    def test_search(self):
+        """Test a ranked multi-term query."""
+        results = generate_index().search('torch type')
+        assert results[0].document.code == 'WELDING.TORCH_TYPE'
+        scores = [result.score for result in results]
+        assert scores == sorted(scores, reverse=True)
+
+    def test_search_language(self):
+        """Test filtering the query by language."""
+        index = generate_index()
+        results = index.search('kalibrierschein', language='de')
+        assert [result.document.code for result in results] == [
+            'CALIBRATION_CERTIFICATE'
+        ]
+        assert index.search('kalibrierschein', language='en') == []
+        with pytest.raises(ValueError):
+            index.search('kalibrierschein', language='fr')
+
+    def test_search_prefix_and_kinds(self):
+        """Test prefix matching and filtering by kind of definition."""
+        index = generate_index()
+        assert index.search('certif') == []
+        results = index.search(
+            'certif', prefix=True, kinds=['vocabulary_term'], limit=None
+        )
+        assert {result.document.code for result in results} == {
+            'ACCEPTANCE_CERTIFICATE',
+            'CALIBRATION_CERTIFICATE',
+            'INSPECTION_CERTIFICATE',
+        }
+
+    def test_search_require_all(self):
+        """Test requiring all the query terms to match."""
+        index = generate_index()
+        results = index.search('welding equipment', require_all=True, limit=None)
+        assert [result.document.code for result in results] == [
+            'INSTRUMENT.WELDING_EQUIPMENT',
+            'INSTRUMENT.WELDING_EQUIPMENT.GMAW_TORCH',
+        ]
+
+    def test_load_or_build(self, tmp_path):
+        """Test caching the index on disk."""
+        registry = EntityRegistry.from_datamodel()
+        cache_path = os.path.join(tmp_path, 'cache', 'search.pkl')
+        index = InvertedIndex.load_or_build(registry, cache_path)
+        assert os.path.exists(cache_path)
+        cached = InvertedIndex.load(cache_path, fingerprint=index.fingerprint)
+        assert cached is not None
+        assert len(cached.documents) == len(index.documents)
+        assert InvertedIndex.load(cache_path, fingerprint='outdated') is None
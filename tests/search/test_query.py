@@ -0,0 +1,58 @@
+import pytest
+
+from bam_masterdata.metadata.definitions import DataType
+from bam_masterdata.metadata.registry import EntityRegistry
+from bam_masterdata.search.query import PropertyQuery
+
+
+def generate_query():
+    return PropertyQuery(EntityRegistry.from_datamodel())
+
+
+class TestPropertyQuery:
+    def test_filter(self):
+        """Test composed filters over the property type assignments."""
+        query = generate_query()
+        rows = query.filter(
+            data_type='CONTROLLEDVOCABULARY',
+            mandatory=True,
+            section='General information',
+        )
+        assert [(row.object_type, row.assignment.code) for row in rows] == [
+            ('INSTRUMENT.WELDING_EQUIPMENT.GMAW_TORCH', 'WELDING.TORCH_TYPE')
+        ]
+        # `DataType` members and strings are equivalent
+        assert query.filter(data_type=DataType.CONTROLLEDVOCABULARY) == rows
+
+    def test_filter_multiple_values(self):
+        """Test filtering with several values of a field."""
+        query = generate_query()
+        rows = query.filter(code=['$NAME', 'ALIAS'], object_type='INSTRUMENT')
+        assert [row.assignment.code for row in rows] == ['ALIAS', '$NAME']
+        assert query.filter(code='NOT_ASSIGNED') == []
+        assert len(query.filter()) == len(query.rows)
+
+    def test_filter_stable_order(self):
+        """Test that the results follow the order of the registry."""
+        query = generate_query()
+        rows = query.filter(code='$NAME')
+        assert [row.object_type for row in rows] == [
+            object_type.defs.code
+            for object_type in EntityRegistry.from_datamodel().object_types
+        ]
+
+    def test_invalid_field(self):
+        """Test that filtering by a non-indexed field fails."""
+        with pytest.raises(KeyError):
+            generate_query().filter(property_label='Name')
+
+    def test_object_types_using_vocabulary(self):
+        """Test finding the object types using a vocabulary."""
+        query = generate_query()
+        assert query.object_types_using_vocabulary('WELDING.GMAW_TORCH_TYPE') == [
+            'INSTRUMENT.WELDING_EQUIPMENT.GMAW_TORCH'
+        ]
+
+    def test_values(self):
+        """Test the distinct values of an indexed field."""
+        assert generate_query().values('mandatory') == [False, True]
@@ -0,0 +1,109 @@
+import pytest
+
+from bam_masterdata.benchmarks.generator import DatamodelSize, generate_datamodel
+from bam_masterdata.metadata.definitions import PropertyTypeDef, VocabularyTerm
+from bam_masterdata.metadata.registry import EntityRegistry
+from bam_masterdata.search.similarity import (
+    MinHashLSH,
+    SimilarityIndex,
+    SimilarityItem,
+    jaccard,
+    lint_new_definitions,
+    trigrams,
+)
+
+
+def test_trigrams():
+    """Test that the trigrams are computed over the normalized text."""
+    assert trigrams('TORCH_TYPE') == trigrams('Torch type')
+    assert ' to' in trigrams('TORCH_TYPE')
+    assert trigrams('') == set()
+
+
+@pytest.mark.parametrize(
+    'first, second, result',
+    [
+        ({'a', 'b'}, {'a', 'b'}, 1.0),
+        ({'a', 'b'}, {'b', 'c'}, 1 / 3),
+        ({'a'}, set(), 0.0),
+    ],
+)
+def test_jaccard(first: set, second: set, result: float):
+    """Test the Jaccard similarity."""
+    assert jaccard(first, second) == pytest.approx(result)
+
+
+class TestMinHashLSH:
+    def test_signature(self):
+        """Test that equal sets have equal signatures."""
+        lsh = MinHashLSH(num_perm=60, bands=20)
+        signature = lsh.signature(trigrams('welding torch type'))
+        assert signature.shape == (60,)
+        assert (signature == lsh.signature(trigrams('Welding torch-type'))).all()
+        with pytest.raises(ValueError):
+            MinHashLSH(num_perm=60, bands=7)
+
+    def test_candidates(self):
+        """Test that similar sets are candidates and dissimilar ones are not."""
+        lsh = MinHashLSH()
+        lsh.add('WELDING.TORCH_TYPE', trigrams('WELDING.TORCH_TYPE'))
+        lsh.add('SAMPLE_WEIGHT', trigrams('SAMPLE_WEIGHT'))
+        assert lsh.candidates(trigrams('TORCH_TYPE')) == {'WELDING.TORCH_TYPE'}
+        assert lsh.candidate_pairs() == set()
+
+
+class TestSimilarityIndex:
+    def test_query(self):
+        """Test finding the near-duplicates of a new property type."""
+        index = SimilarityIndex.from_registry(EntityRegistry.from_datamodel())
+        item = SimilarityItem.from_definition(
+            PropertyTypeDef(
+                version=1,
+                code='TORCH_TYPE',
+                description='Type of the torch',
+                property_label='Torch type',
+                data_type='VARCHAR',
+            )
+        )
+        pairs = index.query(item)
+        assert pairs[0].second == 'WELDING.TORCH_TYPE'
+        assert pairs[0].field == 'code'
+        assert pairs[0].similarity == pytest.approx(10 / 18)
+
+    def test_near_duplicates(self):
+        """Test the near-duplicates found in a synthetic datamodel."""
+        registry = generate_datamodel(
+            DatamodelSize(n_object_types=20, n_properties=5, n_vocabularies=0)
+        )
+        index = SimilarityIndex.from_registry(registry, threshold=0.95)
+        pairs = index.near_duplicates()
+        assert all(pair.similarity >= 0.95 for pair in pairs)
+        # The synthetic property types of all object types share the same labels
+        label_pairs = [pair for pair in pairs if pair.field == 'label']
+        assert len(label_pairs) == 5 * (20 * 19 // 2)
+        assert all(pair.similarity == 1.0 for pair in label_pairs)
+
+
+def test_lint_new_definitions():
+    """Test flagging new vocabulary terms similar to existing ones."""
+    pairs = lint_new_definitions(
+        EntityRegistry.from_datamodel(),
+        [
+            VocabularyTerm(
+                version=1,
+                code='CALIBRATION_CERTIFICATES',
+                label='Calibration certificates',
+                description='Calibration certificates//Kalibrierscheine',
+            ),
+            VocabularyTerm(
+                version=1,
+                code='MANUAL',
+                label='Manual',
+                description='Manual//Handbuch',
+            ),
+        ],
+        vocabulary_code='DOCUMENT_TYPE',
+        threshold=0.7,
+    )
+    assert {pair.first for pair in pairs} == {'DOCUMENT_TYPE:CALIBRATION_CERTIFICATES'}
+    assert {pair.second for pair in pairs} == {'DOCUMENT_TYPE:CALIBRATION_CERTIFICATE'}
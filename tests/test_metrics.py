@@ -0,0 +1,113 @@
+import json
+import os
+import threading
+
+import pytest
+
+from bam_masterdata.metrics import InstrumentedClient, MetricsRegistry, metrics
+from tests.conftest import generate_object_type
+
+
+@pytest.fixture
+def enabled_metrics():
+    """Fixture to enable and clear the global `metrics` registry during a test."""
+    metrics.reset()
+    metrics.enable()
+    yield metrics
+    metrics.disable()
+    metrics.reset()
+
+
+class TestMetricsRegistry:
+    def test_disabled(self):
+        """Test that nothing is recorded when the registry is disabled."""
+        registry = MetricsRegistry()
+        registry.increment('calls')
+        with registry.timer('block'):
+            pass
+        assert registry.snapshot() == {'counters': {}, 'timers': {}}
+
+    def test_counters_and_timers(self):
+        """Test the recording of counters and timers."""
+        registry = MetricsRegistry(enabled=True)
+        registry.increment('calls')
+        registry.increment('calls', 2)
+        registry.observe('block', 0.5)
+        registry.observe('block', 1.5)
+        data = registry.snapshot()
+        assert data['counters'] == {'calls': 3}
+        assert data['timers']['block'] == {
+            'count': 2,
+            'total': 2.0,
+            'mean': 1.0,
+            'min': 0.5,
+            'max': 1.5,
+        }
+        assert json.loads(registry.to_json()) == data
+        assert 'block' in registry.summary_table()
+
+    def test_thread_safety(self):
+        """Test that concurrent increments are not lost."""
+        registry = MetricsRegistry(enabled=True)
+
+        def work():
+            for _ in range(1000):
+                registry.increment('calls')
+                with registry.timer('block'):
+                    pass
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        data = registry.snapshot()
+        assert data['counters']['calls'] == 8000
+        assert data['timers']['block']['count'] == 8000
+
+    def test_write_prometheus(self, tmp_path):
+        """Test the export of the metrics in the Prometheus text format."""
+        registry = MetricsRegistry(enabled=True)
+        registry.increment('pybis.round_trips', 4)
+        registry.observe('entity.to_json', 0.25)
+        path = os.path.join(tmp_path, 'metrics.prom')
+        registry.write_prometheus(path)
+        with open(path, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        assert lines == [
+            '# TYPE bam_masterdata_pybis_round_trips_total counter',
+            'bam_masterdata_pybis_round_trips_total 4',
+            '# TYPE bam_masterdata_entity_to_json_seconds summary',
+            'bam_masterdata_entity_to_json_seconds_count 1',
+            'bam_masterdata_entity_to_json_seconds_sum 0.250000000',
+        ]
+
+
+def test_entity_hooks(enabled_metrics: MetricsRegistry):
+    """Test that the instantiation and serialization of the entities are timed."""
+    object_type = generate_object_type()
+    object_type.to_dict()
+    timers = enabled_metrics.snapshot()['timers']
+    assert timers['entity.init']['count'] == 1
+    assert timers['entity.collect_assignments']['count'] == 1
+    assert timers['entity.to_dict']['count'] == 1
+    # `to_dict` calls `to_json` internally
+    assert timers['entity.to_json']['count'] == 1
+
+
+def test_instrumented_client(enabled_metrics: MetricsRegistry):
+    """Test the timing and counting of the calls of an `InstrumentedClient`."""
+
+    class Client:
+        url = 'https://localhost'
+
+        def get_spaces(self):
+            return ['DEFAULT']
+
+    client = InstrumentedClient(Client())
+    assert client.url == 'https://localhost'
+    assert client.get_spaces() == ['DEFAULT']
+    assert client.get_spaces() == ['DEFAULT']
+    data = enabled_metrics.snapshot()
+    assert data['counters'] == {'pybis.round_trips': 2}
+    assert data['timers']['pybis.get_spaces']['count'] == 2